@@ -12,10 +12,13 @@ from lwe.core.provider_manager import ProviderManager
 from lwe.core.workflow_manager import WorkflowManager
 from lwe.core.tool_manager import ToolManager
 from lwe.core.plugin_manager import PluginManager
+from lwe.core.llm_handle_cache import LlmHandleCache
 import lwe.core.constants as constants
 import lwe.core.util as util
 from lwe.backends.api.request import ApiRequest
+from lwe.backends.api.template_batch import TemplateBatchRunner
 from lwe.backends.api.conversation_storage_manager import ConversationStorageManager
+from lwe.backends.api.title_generator import TitleGenerator
 from lwe.backends.api.user import UserManager
 from lwe.backends.api.conversation import ConversationManager
 from lwe.backends.api.message import MessageManager
@@ -45,7 +48,9 @@ class ApiBackend:
         self.conversation_title = None
         self.current_user = None
         self.request = None
+        self.last_request_stats = None
         self.logfile = None
+        self.workflow_command_runner = None
         self.orm = orm or Orm(config)
         self.user_manager = UserManager(config, self.orm)
         self.conversation = ConversationManager(config, self.orm)
@@ -154,6 +159,172 @@ class ApiBackend:
         response = self.run_template_compiled(message, overrides)
         return response
 
+    def run_template_batch(
+        self,
+        template_name,
+        input_source,
+        output_file,
+        query=None,
+        template_vars=None,
+        overrides=None,
+        concurrency=None,
+        resume=True,
+    ):
+        """
+        Runs the given template over each row of a dataset.
+
+        Row values are passed as template variables. Requests are run with bounded
+        concurrency, isolated from the current conversation, and are not stored.
+
+        :param template_name: Name of the template to run.
+        :param input_source: Path to a CSV, JSONL or SQLite file.
+        :param output_file: Path to the JSONL output file.
+        :param query: Optional SQL query, required for SQLite sources.
+        :param template_vars: Optional dictionary of template variables shared by all rows.
+        :param overrides: Optional dictionary of overrides, will be merged with any set in the template.
+        :param concurrency: Optional maximum number of requests in flight.
+        :param resume: Skip rows already completed in the output file.
+        :return: A tuple containing a success indicator, batch stats, and a user message.
+        """
+        success, template_name, user_message = self.template_manager.ensure_template(template_name)
+        if not success:
+            return success, template_name, user_message
+        runner = TemplateBatchRunner(self, self.config)
+        return runner.run(
+            template_name,
+            input_source,
+            output_file,
+            query=query,
+            template_vars=template_vars,
+            overrides=overrides,
+            concurrency=concurrency,
+            resume=resume,
+        )
+
+    def run_isolated_request(self, input, request_overrides=None):
+        """
+        Ask the LLM a question outside of the current conversation.
+
+        The request does not see or store conversation history, and does not
+        change backend state, so it is safe to run from multiple threads.
+
+        :param input: The input to be sent to the LLM.
+        :type input: str | list
+        :param request_overrides: Overrides for this specific request.
+        :type request_overrides: dict, optional
+        :returns: success, LLM response, message
+        :rtype: tuple
+        """
+        success, response, user_message = self.make_isolated_request(input, request_overrides)
+        if not success:
+            return success, response, user_message
+        response_content, _request, _new_messages = response
+        return True, response_content, user_message
+
+    def make_isolated_request(self, input, request_overrides=None):
+        """
+        Run an isolated request, keeping what's needed to store it later.
+
+        Same as run_isolated_request, but also returns the request and the
+        new messages, which can be passed to store_isolated_request.
+
+        :param input: The input to be sent to the LLM.
+        :type input: str | list
+        :param request_overrides: Overrides for this specific request.
+        :type request_overrides: dict, optional
+        :returns: success, tuple of LLM response, request and new messages, message
+        :rtype: tuple
+        """
+        request_overrides = request_overrides or {}
+        request = ApiRequest(
+            self.config,
+            self.provider,
+            self.provider_manager,
+            self.tool_manager,
+            input,
+            self.active_preset,
+            self.preset_manager,
+            self.system_message,
+            [],
+            self.max_submission_tokens,
+            request_overrides,
+            return_only=True,
+            orm=self.orm,
+            llm_handle_cache=self.llm_handle_cache,
+        )
+        success, response, user_message = request.set_request_llm()
+        if not success:
+            return success, response, user_message
+        new_messages, messages = request.prepare_ask_request()
+        success, response_obj, user_message = request.call_llm(messages)
+        if not success:
+            return success, response_obj, user_message
+        response_content, new_messages = request.post_response(response_obj, new_messages)
+        return True, (response_content, request, new_messages), "Isolated request complete"
+
+    def store_isolated_request(self, request, new_messages, response_content, user, title=None):
+        """
+        Store an isolated request as a new conversation.
+
+        Uses the backend's database session, so call it from the thread that
+        owns the backend.
+
+        :param request: The request returned by make_isolated_request
+        :type request: ApiRequest
+        :param new_messages: The new messages returned by make_isolated_request
+        :type new_messages: list
+        :param response_content: The LLM response
+        :type response_content: str | dict
+        :param user: The user that owns the conversation
+        :type user: User
+        :param title: Conversation title, generated if not provided
+        :type title: str, optional
+        :returns: success, conversation, message
+        :rtype: tuple
+        """
+        conversation_storage_manager = ConversationStorageManager(
+            self.config,
+            self.tool_manager,
+            user,
+            None,
+            request.provider,
+            request.model_name,
+            request.preset_name,
+            provider_manager=self.provider_manager,
+            orm=self.orm,
+            title_generator=self.title_generator,
+        )
+        return conversation_storage_manager.store_conversation_messages(
+            new_messages, response_content, title
+        )
+
+    def make_native_executor(self):
+        """
+        Creates the native workflow executor.
+
+        Imported here, as the executor loads Ansible's template plugins, which
+        is only worth doing when workflows run natively.
+
+        :return: Native workflow executor.
+        """
+        from lwe.backends.api.workflow.native_executor import NativeWorkflowExecutor
+
+        native_executor = NativeWorkflowExecutor(self)
+        if self.workflow_command_runner:
+            native_executor.set_command_runner(self.workflow_command_runner)
+        return native_executor
+
+    def set_workflow_command_runner(self, command_runner):
+        """
+        Sets the callable used to run lwe_command tasks of native workflows.
+
+        :param command_runner: Callable with the return signature of Repl.run_command_get_response.
+        """
+        self.workflow_command_runner = command_runner
+        native_executor = self.workflow_manager.native_executor
+        if native_executor:
+            native_executor.set_command_runner(command_runner)
+
     def initialize_backend(self, config=None):
         """
         Initializes the backend with provided or default configuration,
@@ -178,7 +349,12 @@ class ApiBackend:
         )
         self.provider_manager = ProviderManager(self.config, self.plugin_manager)
         self.workflow_manager = WorkflowManager(self.config)
+        self.workflow_manager.set_native_executor_factory(self.make_native_executor)
         self.tool_manager = ToolManager(self.config)
+        self.llm_handle_cache = LlmHandleCache(self.config)
+        if getattr(self, "title_generator", None):
+            self.title_generator.shutdown()
+        self.title_generator = TitleGenerator(self.config, self.provider_manager, self.orm)
         self.workflow_manager.load_workflows()
         self.init_provider()
         self.set_available_models()
@@ -398,6 +574,8 @@ class ApiBackend:
         :returns: success, plugin_instance, message
         :rtype: tuple
         """
+        self.llm_handle_cache.clear()
+        self.title_generator.reset()
         return self.plugin_manager.reload_plugin(plugin_name)
 
     def _handle_response(self, success, obj, message):
@@ -496,6 +674,7 @@ class ApiBackend:
             self.active_preset_name or "",
             provider_manager=self.provider_manager,
             orm=self.orm,
+            title_generator=self.title_generator,
         )
         tokens = conversation_storage_manager.get_conversation_token_count()
         self.set_conversation_tokens(tokens)
@@ -676,6 +855,27 @@ class ApiBackend:
             return success, history, message
         return self._handle_response(success, conversations, message)
 
+    def backfill_titles(self, user_id=None, batch_size=None, concurrency=None, limit=None):
+        """
+        Generate titles for untitled conversations.
+
+        :param user_id: User id, defaults to current
+        :type user_id: int, optional
+        :param batch_size: Conversations per LLM request, defaults to configured value
+        :type batch_size: int, optional
+        :param concurrency: Concurrent LLM requests, defaults to configured value
+        :type concurrency: int, optional
+        :param limit: Maximum number of conversations to title, defaults to all
+        :type limit: int, optional
+        :returns: success, stats, message
+        :rtype: tuple
+        """
+        user_id = user_id if user_id else self.current_user.id
+        success, stats, message = self.title_generator.backfill(
+            user_id, batch_size=batch_size, concurrency=concurrency, limit=limit
+        )
+        return self._handle_response(success, stats, message)
+
     def get_conversation(self, id=None):
         """
         Get a conversation.
@@ -810,6 +1010,7 @@ ASSISTANT:
             self.max_submission_tokens,
             request_overrides,
             orm=self.orm,
+            llm_handle_cache=self.llm_handle_cache,
         )
         self.request = request
         success, response, user_message = request.set_request_llm()
@@ -818,6 +1019,7 @@ ASSISTANT:
             return self._handle_response(success, response, user_message)
         new_messages, messages = request.prepare_ask_request()
         success, response_obj, user_message = request.call_llm(messages)
+        self.last_request_stats = request.get_stats()
         files = request_overrides.get("files", [])
         if files:
             self.log.debug("Files attached, returning directly")
@@ -830,6 +1032,7 @@ ASSISTANT:
             )
             self.log.debug(f"LLM Response: {response_data}")
             response_content, new_messages = request.post_response(response_obj, new_messages)
+            self.last_request_stats = request.get_stats()
             self.message_clipboard = response_content
             title = request_overrides.get("title")
             conversation_storage_manager = ConversationStorageManager(
@@ -842,6 +1045,7 @@ ASSISTANT:
                 request.preset_name,
                 provider_manager=self.provider_manager,
                 orm=self.orm,
+                title_generator=self.title_generator,
             )
             (
                 success,
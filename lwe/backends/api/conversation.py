@@ -12,6 +12,14 @@ class ConversationManager(Manager):
         except SQLAlchemyError as e:
             return self._handle_error(f"Failed to retrieve conversations: {str(e)}")
 
+    def get_untitled_conversations(self, user_id, limit=None, after_id=None):
+        try:
+            user = self.orm_get_user(user_id)
+            conversations = self.orm_get_untitled_conversations(user, limit, after_id)
+            return True, conversations, "Untitled conversations retrieved successfully."
+        except SQLAlchemyError as e:
+            return self._handle_error(f"Failed to retrieve untitled conversations: {str(e)}")
+
     def add_conversation(self, user_id, title=None, hidden=False):
         try:
             user = self.orm_get_user(user_id)
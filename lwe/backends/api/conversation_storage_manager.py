@@ -1,16 +1,13 @@
-import threading
-
 from lwe.core.logger import Logger
 
 from lwe.core import constants
-import lwe.core.util as util
 from lwe.core.tool_cache import ToolCache
 from lwe.core.token_manager import TokenManager
 
 from lwe.backends.api.orm import Orm
 from lwe.backends.api.conversation import ConversationManager
 from lwe.backends.api.message import MessageManager
-from lwe.backends.api.request import ApiRequest
+from lwe.backends.api.title_generator import TitleGenerator
 
 
 class ConversationStorageManager:
@@ -27,6 +24,7 @@ class ConversationStorageManager:
         preset_name=None,
         provider_manager=None,
         orm=None,
+        title_generator=None,
     ):
         self.config = config
         self.log = Logger(self.__class__.__name__, self.config)
@@ -44,6 +42,9 @@ class ConversationStorageManager:
         self.orm = orm or Orm(self.config)
         self.conversation = ConversationManager(config, self.orm)
         self.message = MessageManager(config, self.orm)
+        self.title_generator = title_generator or TitleGenerator(
+            self.config, self.provider_manager, self.orm
+        )
 
     def store_conversation_messages(self, new_messages, response_content=None, title=None):
         """
@@ -152,100 +153,16 @@ class ConversationStorageManager:
             self.preset_name,
         )
 
-    def get_title_provider_llm(self):
-        """
-        Get the title provider and LLM.
-
-        :returns: provider, llm
-        :rtype: tuple
-        """
-        title_provider_name = self.config.get("backend_options.title_generation.provider")
-        if title_provider_name:
-            provider = self.provider_manager.get_provider_from_name(title_provider_name)
-            if not provider:
-                raise RuntimeError(f"Failed to load title provider: {title_provider_name}")
-            customizations = {
-                "temperature": 0,
-            }
-            title_provider_model = self.config.get("backend_options.title_generation.model")
-            if title_provider_model:
-                customizations[provider.model_property_name] = title_provider_model
-            llm = provider.make_llm(customizations=customizations)
-        else:
-            provider = self.provider_manager.get_provider_from_name("chat_openai")
-            llm = provider.make_llm(
-                customizations={
-                    "model_name": constants.API_BACKEND_DEFAULT_MODEL,
-                    "temperature": 0,
-                },
-                use_defaults=True,
-            )
-        return provider, llm
-
-    def gen_title_thread(self, conversation_id):
-        """
-        Generate the title for a conversation in a separate thread.
-
-        :param conversation_id: Conversation ID
-        :type conversation_id: int
-        """
-        self.log.info(f"Generating title for conversation {conversation_id}")
-        # NOTE: This might need to be smarter in the future, but for now
-        # it should be reasonable to assume that the second record is the
-        # first user message we need for generating the title.
-        message_manager = MessageManager(self.config, self.orm)
-        conversation_manager = ConversationManager(self.config, self.orm)
-        success, messages, user_message = message_manager.get_messages(conversation_id, limit=2)
-        if not success:
-            self.log.warning(f"Failed to generate title for conversation: {user_message}")
-            return
-        user_content = messages[1]["message"][: constants.TITLE_GENERATION_MAX_CHARACTERS]
-        new_messages = [
-            self.message.build_message("system", constants.DEFAULT_TITLE_GENERATION_SYSTEM_PROMPT),
-            self.message.build_message(
-                "user",
-                "%s: %s" % (constants.DEFAULT_TITLE_GENERATION_USER_PROMPT, user_content),
-            ),
-        ]
-        provider, llm = self.get_title_provider_llm()
-        new_messages = util.transform_messages_to_chat_messages(new_messages)
-        new_messages = [provider.convert_dict_to_message(m) for m in new_messages]
-        try:
-            self.log.debug(
-                f"Title generation LLM provider: {provider.name}, model: {getattr(llm, provider.model_property_name, 'N/A')}"
-            )
-            result = llm.invoke(new_messages)
-            provider_non_streaming_method = getattr(provider, "handle_non_streaming_response", None)
-            if provider_non_streaming_method:
-                result = provider_non_streaming_method(result)
-            request = ApiRequest(orm=self.orm, config=self.config)
-            message, _tool_calls = request.extract_message_content(result)
-            title = message["message"].replace("\n", ", ").strip().strip("'\"")
-            self.log.info(f"Title generated for conversation {conversation_id}: {title}")
-            success, conversation, user_message = conversation_manager.edit_conversation_title(
-                conversation_id, title
-            )
-            if success:
-                self.log.debug(f"Title saved for conversation {conversation_id}")
-        except ValueError as e:
-            self.log.warning(f"Failed to generate title for conversation: {str(e)}")
-
     def gen_title(self, conversation):
         """
         Generate the title for a conversation.
 
+        Title generation is queued on the title generator's worker pool.
+
         :param conversation: Conversation
         :type conversation: Conversation
         """
-        conversation_id = conversation.id
-        database = self.config.get("database")
-        if database.startswith("sqlite") and ":memory:" in database:
-            # Special case for in memory SQLite, as it cannot access the
-            # in memory database from another thread.
-            self.gen_title_thread(conversation_id)
-        else:
-            thread = threading.Thread(target=self.gen_title_thread, args=(conversation_id,))
-            thread.start()
+        self.title_generator.submit(conversation.id)
 
     def get_conversation_token_count(self):
         """Get token count for conversation.
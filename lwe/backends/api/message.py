@@ -77,6 +77,16 @@ class MessageManager(Manager):
             return self._handle_error(f"Failed to retrieve last message: {str(e)}")
         return True, last_message, "Last message retrieved successfully"
 
+    def get_first_user_messages(self, conversation_ids):
+        try:
+            messages = self.orm_get_first_user_messages(conversation_ids)
+            messages = {
+                message.conversation_id: self.message_from_storage(message) for message in messages
+            }
+        except SQLAlchemyError as e:
+            return self._handle_error(f"Failed to retrieve first user messages: {str(e)}")
+        return True, messages, "First user messages retrieved successfully"
+
     def add_message(
         self,
         conversation_id,
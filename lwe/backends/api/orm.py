@@ -4,7 +4,7 @@ from sqlalchemy import event
 from sqlalchemy.engine import Engine
 from sqlite3 import Connection as SQLite3Connection
 from sqlalchemy import MetaData, ForeignKey, Index, Column, Integer, String, DateTime, JSON, Boolean
-from sqlalchemy import desc
+from sqlalchemy import desc, func, or_
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import create_engine
@@ -158,6 +158,31 @@ class Manager:
         conversations = query.all()
         return conversations
 
+    def orm_get_untitled_conversations(self, user, limit=None, after_id=None):
+        self.log.debug(f"Retrieving untitled Conversations for User with id {user.id}")
+        query = (
+            self.session.query(Conversation)
+            .filter(Conversation.user_id == user.id)
+            .filter(or_(Conversation.title.is_(None), Conversation.title == ""))
+            .order_by(Conversation.id)
+        )
+        if after_id is not None:
+            query = query.filter(Conversation.id > after_id)
+        query = self._apply_limit_offset(query, limit, None)
+        conversations = query.all()
+        return conversations
+
+    def orm_get_first_user_messages(self, conversation_ids):
+        self.log.debug(f"Retrieving first user Messages for {len(conversation_ids)} Conversations")
+        first_message_ids = (
+            self.session.query(func.min(Message.id))
+            .filter(Message.conversation_id.in_(conversation_ids))
+            .filter(Message.role == "user")
+            .group_by(Message.conversation_id)
+        )
+        messages = self.session.query(Message).filter(Message.id.in_(first_message_ids)).all()
+        return messages
+
     def orm_get_messages(self, conversation, limit=None, offset=None, target_id=None):
         self.log.debug(f"Retrieving Messages for Conversation with id {conversation.id}")
         query = (
@@ -94,6 +94,7 @@ class ApiRepl(Repl):
         if not getattr(self, "backend", None):
             self.backend = ApiBackend(self.config)
         self.user_management = UserManager(self.config, self.backend.orm)
+        self.backend.set_workflow_command_runner(self.run_command_get_response)
 
     def launch_backend(self, interactive=True):
         if interactive:
@@ -690,7 +691,7 @@ Before you can start using the shell, you must create a new user.
 
     def command_providers(self, arg):
         """
-        List currently enabled providers
+        List currently enabled providers, and the state of their circuit breakers
 
         Examples:
             {COMMAND}
@@ -701,6 +702,23 @@ Before you can start using the shell, you must create a new user.
             for provider in self.backend.provider_manager.provider_plugins.values()
         ]
         util.print_markdown("## Providers:\n\n%s" % "\n".join(sorted(provider_plugins)))
+        circuit_breakers = self.backend.provider_manager.get_circuit_breaker_states()
+        if circuit_breakers:
+            util.print_markdown(
+                "## Circuit breakers:\n\n%s"
+                % "\n".join(
+                    self.format_circuit_breaker_state(name, state)
+                    for name, state in sorted(circuit_breakers.items())
+                )
+            )
+
+    def format_circuit_breaker_state(self, name, state):
+        line = f"* {name}: {state['state'].replace('_', ' ')}"
+        if state["retry_in"] is not None:
+            line += f", retry in {state['retry_in']:.0f}s"
+        if state["consecutive_failures"]:
+            line += f", {state['consecutive_failures']} consecutive failures"
+        return line
 
     def command_provider(self, arg):
         """
@@ -1,4 +1,5 @@
-import copy
+import os
+import time
 
 from langchain_community.adapters.openai import convert_message_to_dict
 from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
@@ -9,6 +10,15 @@ from lwe.core import constants
 import lwe.core.util as util
 from lwe.core.tool_cache import ToolCache
 from lwe.core.token_manager import TokenManager
+from lwe.core.rate_limiter import get_rate_limiter
+from lwe.core.adaptive_limiter import get_adaptive_limiter
+from lwe.core.hedging import (
+    DEFAULT_MAX_EXTRA_RATIO,
+    DEFAULT_MIN_SAMPLES,
+    DEFAULT_PERCENTILE,
+    get_latency_tracker,
+    run_hedged,
+)
 
 from lwe.backends.api.orm import Orm
 from lwe.backends.api.message import MessageManager
@@ -32,6 +42,7 @@ class ApiRequest:
         request_overrides=None,
         return_only=False,
         orm=None,
+        llm_handle_cache=None,
     ):
         self.config = config
         self.log = Logger(self.__class__.__name__, self.config)
@@ -51,8 +62,21 @@ class ApiRequest:
         self.request_overrides = request_overrides or {}
         self.return_only = return_only
         self.orm = orm or Orm(self.config)
+        self.llm_handle_cache = llm_handle_cache
         self.message = MessageManager(config, self.orm)
         self.streaming = False
+        self.first_chunk_time = None
+        self.stats = {
+            "llm_calls": 0,
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "llm_time": 0.0,
+            "time_to_first_token": None,
+            "rate_limit_wait": 0.0,
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+            "fallbacks": 0,
+        }
         self.log.debug(
             f"Inintialized ApiRequest with input: {self.input}, default preset name: {self.default_preset_name}, system_message: {self.system_message}, max_submission_tokens: {self.max_submission_tokens}, request_overrides: {self.request_overrides}, return only: {self.return_only}"
         )
@@ -108,24 +132,24 @@ class ApiRequest:
             return success, provider, user_message
         config = self.merge_preset_overrides(config)
         preset = (config["metadata"], config["customizations"])
-        customizations, tools, tool_choice = self.expand_tools(config["customizations"])
+        preset_name = config["metadata"].get("name", "")
+        customizations, tool_names, tool_choice = self.prepare_tools(config["customizations"])
         config["customizations"] = customizations
-        llm = provider.make_llm(
-            config["customizations"], tools=tools, tool_choice=tool_choice, use_defaults=True
+        success, response, user_message = self.get_llm_handle(
+            provider, config, tool_names, tool_choice
         )
-        preset_name = config["metadata"].get("name", "")
-        model_name = getattr(llm, provider.model_property_name)
-        success, response, user_message = provider.validate_model(model_name)
         if not success:
             return success, response, user_message
+        llm, model_name = response
         token_manager = TokenManager(self.config, provider, model_name, self.tool_cache)
         message = f"Built LLM based on preset_name: {preset_name or 'None'}, metadata: {config['metadata']}, customizations: {config['customizations']}, preset_overrides: {config['preset_overrides']}"
         self.log.debug(message)
         return True, (provider, preset, llm, preset_name, model_name, token_manager), message
 
     def prepare_config(self, config):
-        config["metadata"] = copy.deepcopy(config["metadata"] or {})
-        config["customizations"] = copy.deepcopy(config["customizations"] or {})
+        # Presets are shared, merges and tool handling copy what they change.
+        config["metadata"] = dict(config["metadata"] or {})
+        config["customizations"] = dict(config["customizations"] or {})
         config["preset_overrides"] = config["preset_overrides"] or {}
         return config
 
@@ -140,14 +164,14 @@ class ApiRequest:
                 self.log.info(
                     f"Merging preset overrides for metadata: {config['preset_overrides']['metadata']}"
                 )
-                config["metadata"] = util.merge_dicts(
+                config["metadata"] = util.merge_dicts_copy(
                     config["metadata"], config["preset_overrides"]["metadata"]
                 )
             if "model_customizations" in config["preset_overrides"]:
                 self.log.info(
                     f"Merging preset overrides for model customizations: {config['preset_overrides']['model_customizations']}"
                 )
-                config["customizations"] = util.merge_dicts(
+                config["customizations"] = util.merge_dicts_copy(
                     config["customizations"], config["preset_overrides"]["model_customizations"]
                 )
         return config
@@ -199,25 +223,82 @@ class ApiRequest:
             f"Retrieved metadata and customizations for preset: {preset_name}",
         )
 
-    def expand_tools(self, customizations):
-        """Expand any configured tools to their full definition.
+    def prepare_tools(self, customizations):
+        """Collect the tools for the request, and strip tool settings from customizations.
 
         :param customizations: Model customizations
         :type customizations: dict
-        :returns: customizations, tools, tool_choice
+        :returns: customizations, tool names, tool_choice
         :rtype: tuple
         """
-        customizations = copy.deepcopy(customizations)
+        customizations = dict(customizations)
         self.tool_cache = ToolCache(self.config, self.tool_manager, customizations)
         self.tool_cache.add_message_tools(self.old_messages)
-        tools = [
-            self.tool_manager.get_tool_config(tool_name) for tool_name in self.tool_cache.tools
-        ]
         if "tools" in customizations:
             del customizations["tools"]
         tool_choice = customizations.pop("tool_choice", None)
+        return customizations, list(self.tool_cache.tools), tool_choice
+
+    def expand_tools(self, customizations):
+        """Expand any configured tools to their full definition.
+
+        :param customizations: Model customizations
+        :type customizations: dict
+        :returns: customizations, tools, tool_choice
+        :rtype: tuple
+        """
+        customizations, tool_names, tool_choice = self.prepare_tools(customizations)
+        tools = [self.tool_manager.get_tool_config(tool_name) for tool_name in tool_names]
         return customizations, tools, tool_choice
 
+    def get_llm_handle_dependencies(self, config, tool_names):
+        filepaths = [config["metadata"].get("filepath")]
+        for tool_name in tool_names:
+            tool_path = getattr(self.tool_manager, "tools", {}).get(tool_name)
+            if tool_path:
+                filepaths.append(tool_path)
+                filepaths.append(os.path.splitext(tool_path)[0] + ".config.yaml")
+        return filepaths
+
+    def get_llm_handle(self, provider, config, tool_names, tool_choice):
+        """Get an LLM with tools bound, reusing a warm handle when possible.
+
+        :param provider: Provider instance
+        :type provider: ProviderBase
+        :param config: Request config, with tool settings stripped from customizations
+        :type config: dict
+        :param tool_names: Names of tools to attach
+        :type tool_names: list
+        :param tool_choice: Tool choice
+        :type tool_choice: str | dict | None
+        :returns: success, (llm, model_name), message
+        :rtype: tuple
+        """
+        cache_key = None
+        if self.llm_handle_cache:
+            cache_key = self.llm_handle_cache.make_key(
+                provider,
+                config["metadata"].get("name", ""),
+                config["customizations"],
+                tool_names,
+                tool_choice,
+            )
+            dependencies = self.get_llm_handle_dependencies(config, tool_names)
+            handle = self.llm_handle_cache.get(cache_key, provider, dependencies)
+            if handle:
+                return True, handle, "Reused cached LLM"
+        tools = [self.tool_manager.get_tool_config(tool_name) for tool_name in tool_names]
+        llm = provider.make_llm(
+            config["customizations"], tools=tools, tool_choice=tool_choice, use_defaults=True
+        )
+        model_name = getattr(llm, provider.model_property_name)
+        success, response, user_message = provider.validate_model(model_name)
+        if not success:
+            return success, response, user_message
+        if cache_key:
+            self.llm_handle_cache.set(cache_key, provider, dependencies, (llm, model_name))
+        return True, (llm, model_name), "Built LLM"
+
     def prepare_default_new_conversation_messages(self):
         """
         Prepare default new conversation messages.
@@ -284,7 +365,8 @@ class ApiRequest:
         :returns: Messages
         :rtype: list
         """
-        messages = copy.deepcopy(messages)
+        # Message records are never modified in place, so only the list is copied.
+        messages = list(messages)
         token_count = self.token_manager.get_num_tokens_from_messages(messages)
         self.log.debug(
             f"Stripping messages over max tokens: {max_tokens}, initial token count: {token_count}"
@@ -319,35 +401,474 @@ class ApiRequest:
         """
         stream = self.request_overrides.get("stream", False)
         self.log.debug(f"Calling LLM with message count: {len(messages)}")
-        llm_pre_call_method = getattr(self.provider, "llm_pre_call", None)
+        circuit_breaker = self.get_circuit_breaker()
+        if circuit_breaker and not circuit_breaker.allow_request():
+            return self.execute_llm_circuit_open(messages, stream)
+        circuit_recorded = False
+
+        def record_circuit_result(error=None):
+            nonlocal circuit_recorded
+            if circuit_breaker and not circuit_recorded:
+                circuit_breaker.record_result(error)
+            circuit_recorded = True
+
+        try:
+            return self.execute_llm_call(messages, stream, record_circuit_result)
+        finally:
+            # Calls that failed before the provider responded, or were
+            # interrupted, don't count for or against the provider, but must
+            # give back a half open probe.
+            if circuit_breaker and not circuit_recorded:
+                circuit_breaker.release_probe()
+
+    def execute_llm_call(self, messages, stream, record_circuit_result):
+        """
+        Call the LLM, within the rate limits and adaptive concurrency limit.
+
+        :param messages: Messages
+        :type messages: list
+        :param stream: Whether to stream the response
+        :type stream: bool
+        :param record_circuit_result: Records the outcome of the call to the
+                                      provider with its circuit breaker, only
+                                      the first outcome recorded counts
+        :type record_circuit_result: callable
+        :returns: success, response, message
+        :rtype: tuple
+        """
+        rate_limiter, estimated_tokens = self.wait_for_rate_limit(messages)
+        hedging = None if stream else self.get_hedging_options()
+        fallback_presets = [] if stream else self.get_fallback_presets()
+        resilient = bool(hedging or fallback_presets)
+        if not resilient:
+            llm_pre_call_method = getattr(self.provider, "llm_pre_call", None)
+            if llm_pre_call_method:
+                messages = llm_pre_call_method(self.llm, messages)
+            messages = self.build_chat_request(messages)
+        adaptive_limiter = self.get_adaptive_limiter()
+        slot = adaptive_limiter.acquire() if adaptive_limiter else None
+        limiter_error = None
+        start = time.perf_counter()
+        self.first_chunk_time = None
+        try:
+            if stream:
+                result = self.execute_llm_streaming(messages)
+            elif resilient:
+                result = self.execute_llm_resilient(
+                    messages, hedging, fallback_presets, record_circuit_result
+                )
+            else:
+                result = self.execute_llm_non_streaming(messages)
+            success, response, user_message = result
+            if not success:
+                limiter_error = user_message
+        except BaseException as e:
+            limiter_error = e
+            if isinstance(e, Exception):
+                record_circuit_result(e)
+            raise
+        finally:
+            # The limiter is shared by the process, a slot that isn't released
+            # is lost for good.
+            if adaptive_limiter:
+                adaptive_limiter.release(slot, limiter_error)
+        record_circuit_result(None if success else user_message)
+        if success:
+            self.record_llm_call(response, start)
+            usage = getattr(response, "usage_metadata", None)
+            if rate_limiter and usage:
+                rate_limiter.record_usage(
+                    estimated_tokens, usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+                )
+        return result
+
+    def prepare_llm_messages(self, provider, llm, messages):
+        """
+        Prepare messages for a provider's LLM.
+
+        :param provider: Provider
+        :type provider: Provider
+        :param llm: LLM
+        :param messages: Messages
+        :type messages: list
+        :returns: Prepared messages
+        :rtype: list
+        """
+        llm_pre_call_method = getattr(provider, "llm_pre_call", None)
         if llm_pre_call_method:
-            messages = llm_pre_call_method(self.llm, messages)
-        messages = self.build_chat_request(messages)
-        if stream:
-            return self.execute_llm_streaming(messages)
-        else:
-            return self.execute_llm_non_streaming(messages)
+            messages = llm_pre_call_method(llm, messages)
+        return self.build_chat_request(messages, provider)
+
+    def get_hedging_options(self):
+        """
+        Get the hedging options for the request.
+
+        The hedging request override is either a boolean, or a dict of
+        options overriding the backend_options.hedging settings.
+
+        :returns: Hedging options, or None if hedging is not enabled
+        :rtype: dict | None
+        """
+        options = dict(self.config.get("backend_options.hedging") or {})
+        override = self.request_overrides.get("hedging")
+        if isinstance(override, dict):
+            options.update({"enabled": True, **override})
+        elif override is not None:
+            options["enabled"] = bool(override)
+        return options if options.get("enabled") else None
+
+    def get_fallback_presets(self):
+        """
+        Get the presets to fall back to, in order, if the LLM call fails.
+
+        :returns: Preset names, from the fallback_presets request override
+                  or the backend_options.fallback_presets setting
+        :rtype: list
+        """
+        presets = self.request_overrides.get("fallback_presets")
+        if presets is None:
+            presets = self.config.get("backend_options.fallback_presets")
+        return list(presets or [])
+
+    def get_preset_llm_target(self, preset_name):
+        """
+        Build the provider and LLM of a preset, to send the request to instead.
+
+        :param preset_name: Preset name
+        :type preset_name: str
+        :returns: success, (provider, llm, preset_name), message
+        :rtype: tuple
+        """
+        success, response, user_message = self.get_preset_metadata_customizations(preset_name)
+        if not success:
+            return success, response, user_message
+        metadata, customizations = response
+        config = {
+            "preset_name": preset_name,
+            "preset_overrides": None,
+            "metadata": metadata,
+            "customizations": customizations,
+        }
+        # Building the LLM replaces the tool cache, which belongs to the request's own LLM.
+        tool_cache = getattr(self, "tool_cache", None)
+        try:
+            success, response, user_message = self.build_request_config(config)
+        finally:
+            self.tool_cache = tool_cache
+        if not success:
+            return success, response, user_message
+        provider, _preset, llm, _preset_name, _model_name, _token_manager = response
+        return True, (provider, llm, preset_name), f"Built LLM for preset {preset_name}"
+
+    def invoke_llm_target(self, target, messages):
+        provider, llm, _preset_name = target
+        response = llm.invoke(self.prepare_llm_messages(provider, llm, messages))
+        return self.handle_non_streaming_response(provider, response)
+
+    async def ainvoke_llm_target(self, target, messages):
+        provider, llm, _preset_name = target
+        response = await llm.ainvoke(self.prepare_llm_messages(provider, llm, messages))
+        return self.handle_non_streaming_response(provider, response)
+
+    def handle_non_streaming_response(self, provider, response):
+        provider_non_streaming_method = getattr(provider, "handle_non_streaming_response", None)
+        if provider_non_streaming_method:
+            response = provider_non_streaming_method(response)
+        return response
+
+    def execute_llm_resilient(
+        self, messages, hedging, fallback_presets, record_circuit_result=None
+    ):
+        """
+        Call the LLM non-streaming, hedging slow calls and falling back to
+        other presets on errors.
+
+        :param messages: Messages, not yet prepared for the LLM
+        :type messages: list
+        :param hedging: Hedging options, or None to not hedge
+        :type hedging: dict | None
+        :param fallback_presets: Presets to fall back to, in order
+        :type fallback_presets: list
+        :param record_circuit_result: Records the outcome of the call to the
+                                      request's provider with its circuit breaker
+        :type record_circuit_result: callable, optional
+        :returns: success, response, message
+        :rtype: tuple
+        """
+        target = (self.provider, self.llm, getattr(self, "preset_name", None))
+        try:
+            if hedging:
+                response = self.execute_llm_hedged(target, messages, hedging)
+            else:
+                response = self.invoke_llm_target(target, messages)
+            if record_circuit_result:
+                record_circuit_result()
+            return True, response, "Response received"
+        except Exception as e:
+            if record_circuit_result:
+                record_circuit_result(e)
+            if not fallback_presets:
+                if isinstance(e, ValueError):
+                    return False, messages, e
+                raise
+            self.log.warning(f"LLM call failed, falling back to presets {fallback_presets}: {e}")
+            return self.execute_llm_fallbacks(messages, fallback_presets, e)
+
+    def execute_llm_circuit_open(self, messages, stream):
+        """
+        Fail fast while the provider's circuit breaker is open, or send the
+        request to the fallback presets.
+
+        :param messages: Messages, not yet prepared for the LLM
+        :type messages: list
+        :param stream: Whether the request is streaming, which doesn't fall back
+        :type stream: bool
+        :returns: success, response, message
+        :rtype: tuple
+        """
+        message = f"Provider {self.provider.display_name} is unavailable, circuit breaker is open"
+        fallback_presets = [] if stream else self.get_fallback_presets()
+        if fallback_presets:
+            self.log.warning(f"{message}, falling back to presets {fallback_presets}")
+            return self.execute_llm_fallbacks(messages, fallback_presets, ValueError(message))
+        self.log.warning(message)
+        return False, messages, message
+
+    def execute_llm_hedged(self, target, messages, hedging):
+        """
+        Call the LLM, and send a duplicate request if it's slow.
+
+        The duplicate request is sent after the configured delay, or the
+        observed latency percentile of the provider and model, to the hedge
+        preset or the same LLM. The first response wins, and the other
+        request is cancelled.
+
+        :param target: Provider, LLM and preset name of the primary request
+        :type target: tuple
+        :param messages: Messages, not yet prepared for the LLM
+        :type messages: list
+        :param hedging: Hedging options
+        :type hedging: dict
+        :returns: Response
+        """
+        tracker = get_latency_tracker(f"{self.provider.name}:{getattr(self, 'model_name', None)}")
+        tracker.record_request()
+        delay = hedging.get("delay")
+        if delay is None:
+            delay = tracker.percentile(
+                hedging.get("percentile", DEFAULT_PERCENTILE),
+                hedging.get("min_samples", DEFAULT_MIN_SAMPLES),
+            )
+        hedge_target = target
+        if delay is not None and hedging.get("preset"):
+            success, response, user_message = self.get_preset_llm_target(hedging["preset"])
+            if success:
+                hedge_target = response
+            else:
+                self.log.warning(f"Not hedging, hedge preset unavailable: {user_message}")
+                delay = None
+        max_extra_ratio = hedging.get("max_extra_ratio", DEFAULT_MAX_EXTRA_RATIO)
+
+        def hedge():
+            if not tracker.allow_hedge(max_extra_ratio):
+                self.log.debug("Not hedging, hedge request budget used up")
+                return None
+            self.log.info(f"No response after {delay:.2f} seconds, sending hedge request")
+            self.stats["hedged_requests"] += 1
+            return self.ainvoke_llm_target(hedge_target, messages)
+
+        start = time.perf_counter()
+        response, hedge_won = run_hedged(
+            lambda: self.ainvoke_llm_target(target, messages), hedge, delay
+        )
+        tracker.record_latency(time.perf_counter() - start)
+        if hedge_won:
+            self.log.info(f"Hedge request to preset {hedge_target[2] or 'None'} won")
+            self.stats["hedge_wins"] += 1
+        return response
+
+    def execute_llm_fallbacks(self, messages, fallback_presets, error):
+        """
+        Send the request to each fallback preset in order, until one succeeds.
+
+        :param messages: Messages, not yet prepared for the LLM
+        :type messages: list
+        :param fallback_presets: Preset names
+        :type fallback_presets: list
+        :param error: Error of the failed primary call, raised if all fallbacks fail
+        :type error: Exception
+        :returns: success, response, message
+        :rtype: tuple
+        """
+        for preset_name in fallback_presets:
+            success, target, user_message = self.get_preset_llm_target(preset_name)
+            if not success:
+                self.log.warning(f"Skipping fallback preset {preset_name}: {user_message}")
+                continue
+            try:
+                response = self.invoke_llm_target(target, messages)
+            except Exception as e:
+                self.log.warning(f"Fallback preset {preset_name} failed: {e}")
+                continue
+            self.log.info(f"Fallback preset {preset_name} succeeded")
+            self.stats["fallbacks"] += 1
+            return True, response, f"Response received from fallback preset {preset_name}"
+        if isinstance(error, ValueError):
+            return False, messages, error
+        raise error
+
+    def get_circuit_breaker(self):
+        """
+        Get the circuit breaker for the request's provider and endpoint.
+
+        :returns: Circuit breaker, or None if circuit breakers are disabled
+        :rtype: CircuitBreaker | None
+        """
+        if not self.provider_manager:
+            return None
+        llm = getattr(self, "llm", None)
+        # LLMs with tools bound wrap the provider's LLM.
+        llm = getattr(llm, "bound", llm)
+        endpoint = getattr(llm, "openai_api_base", None)
+        # Load balanced requests can go to any endpoint, and the load balancer
+        # ejects failing ones, so the provider has one breaker for all of them.
+        load_balancer = getattr(getattr(self.provider, "http_clients", None), "load_balancer", None)
+        if load_balancer and endpoint == load_balancer.base_url:
+            endpoint = None
+        return self.provider_manager.get_circuit_breaker(self.provider.name, endpoint)
+
+    def get_adaptive_limiter(self):
+        """
+        Get the adaptive concurrency limiter for the request's provider and model.
+
+        Used when the adaptive_concurrency request override or the
+        backend_options.adaptive_concurrency.enabled setting is true.
+
+        :returns: Adaptive limiter, or None if not enabled
+        :rtype: AdaptiveConcurrencyLimiter | None
+        """
+        enabled = self.request_overrides.get("adaptive_concurrency")
+        if enabled is None:
+            enabled = self.config.get("backend_options.adaptive_concurrency.enabled")
+        if not enabled:
+            return None
+        key = f"{self.provider.name}:{getattr(self, 'model_name', None)}"
+        return get_adaptive_limiter(key, self.config)
+
+    def get_rate_limits(self):
+        """
+        Get the rate limits for the request.
+
+        Limits set in the preset metadata override the limits in the provider
+        plugin's rate_limits config, where limits for the model override the
+        default limits.
+
+        :returns: Rate limits, with requests_per_minute and tokens_per_minute keys
+        :rtype: dict
+        """
+        preset = getattr(self, "preset", None)
+        metadata = preset[0] if preset else {}
+        provider_limits = self.config.get(f"plugins.{self.provider.name}.rate_limits") or {}
+        limits = {
+            **(provider_limits.get("default") or {}),
+            **(provider_limits.get(getattr(self, "model_name", None)) or {}),
+        }
+        for key in ("requests_per_minute", "tokens_per_minute"):
+            if metadata.get(key):
+                limits[key] = metadata[key]
+        return limits
 
-    def build_chat_request(self, messages):
+    def wait_for_rate_limit(self, messages):
+        """
+        Wait until the rate limits of the provider and model allow the request.
+
+        Rate limits are shared by all requests in the process for the same
+        provider and model.
+
+        :param messages: Messages
+        :type messages: list
+        :returns: Rate limiter or None if there are no limits, estimated prompt tokens
+        :rtype: tuple
+        """
+        limits = self.get_rate_limits()
+        key = f"{self.provider.name}:{getattr(self, 'model_name', None)}"
+        rate_limiter = get_rate_limiter(
+            key, limits.get("requests_per_minute"), limits.get("tokens_per_minute")
+        )
+        if not rate_limiter:
+            return None, 0
+        estimated_tokens = 0
+        if rate_limiter.limits_tokens:
+            estimated_tokens = self.token_manager.get_num_tokens_from_messages(messages)
+        wait = rate_limiter.acquire(estimated_tokens)
+        if wait > 0:
+            self.log.info(f"Rate limited {key}, waited {wait:.2f} seconds")
+        self.stats["rate_limit_wait"] += wait
+        return rate_limiter, estimated_tokens
+
+    def record_llm_call(self, response, start):
+        """
+        Record timing and token usage of an LLM call.
+
+        Token counts are taken from the usage reported by the provider, and
+        left as None if the provider doesn't report them.
+
+        :param response: LLM response
+        :param start: perf_counter value when the call started
+        :type start: float
+        """
+        end = time.perf_counter()
+        self.stats["llm_calls"] += 1
+        self.stats["llm_time"] += end - start
+        if self.stats["time_to_first_token"] is None:
+            # Non-streaming responses arrive all at once.
+            self.stats["time_to_first_token"] = (self.first_chunk_time or end) - start
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            for key, usage_key in (
+                ("prompt_tokens", "input_tokens"),
+                ("completion_tokens", "output_tokens"),
+            ):
+                self.stats[key] = (self.stats[key] or 0) + usage.get(usage_key, 0)
+
+    def get_stats(self):
+        """
+        Get timing and token usage stats for the request.
+
+        :returns: Stats, including provider, model and preset names
+        :rtype: dict
+        """
+        return {
+            "provider": getattr(self.provider, "name", None),
+            "model": getattr(self, "model_name", None),
+            "preset": getattr(self, "preset_name", None),
+            **self.stats,
+        }
+
+    def build_chat_request(self, messages, provider=None):
         """
         Build chat request for LLM.
 
         :param messages: Messages
         :type messages: list
+        :param provider: Provider to build the request for, defaults to the request's provider
+        :type provider: Provider, optional
         :returns: Prepared messages
         :rtype: list
         """
+        provider = provider or self.provider
         self.log.debug(f"Building messages for LLM, message count: {len(messages)}")
         messages = util.transform_messages_to_chat_messages(messages)
-        messages = self.provider.prepare_messages_for_llm(messages)
-        messages = self.attach_files(messages)
+        messages = provider.prepare_messages_for_llm(messages)
+        messages = self.attach_files(messages, provider)
         return messages
 
-    def attach_files(self, messages):
+    def attach_files(self, messages, provider=None):
+        provider = provider or self.provider
         files = self.request_overrides.get("files", [])
         if files:
             for file in files:
-                file_data = self.provider.prepare_file_for_llm(file)
+                file_data = provider.prepare_file_for_llm(file)
                 messages.append(file_data)
         return messages
 
@@ -375,6 +896,8 @@ class ApiRequest:
                 response = content if not response else response + content
             else:
                 raise ValueError(f"Unexpected chunk type: {type(chunk)}")
+            if content and self.first_chunk_time is None:
+                self.first_chunk_time = time.perf_counter()
             self.output_chunk_content(content, print_stream, stream_callback)
             if not self.streaming:
                 if getattr(response, "tool_call_chunks", None):
@@ -404,11 +927,9 @@ class ApiRequest:
     def execute_llm_non_streaming(self, messages):
         self.log.info("Starting non-streaming request")
         self.log.debug(f"Non-streaming with LLM attributes: {self.llm.dict()}")
-        provider_non_streaming_method = getattr(self.provider, "handle_non_streaming_response", None)
         try:
             response = self.llm.invoke(messages)
-            if provider_non_streaming_method:
-                response = provider_non_streaming_method(response)
+            response = self.handle_non_streaming_response(self.provider, response)
         except ValueError as e:
             return False, messages, e
         return True, response, "Response received"
@@ -453,9 +974,29 @@ class ApiRequest:
             raise ValueError(f"Tool call failed: {user_message}")
         return tool_response
 
+    def run_tool_calls(self, tool_calls):
+        """Run all tool calls for a turn concurrently.
+
+        :param tool_calls: Tool calls requested by the LLM
+        :type tool_calls: list
+        :raises ValueError: If any tool call fails
+        :returns: Tool responses, in tool call order
+        :rtype: list
+        """
+        results = self.tool_manager.run_tools(
+            [(tool_call["name"], tool_call["args"]) for tool_call in tool_calls]
+        )
+        tool_responses = []
+        for tool_call, (success, response, user_message) in zip(tool_calls, results):
+            json_obj = self.output_tool_response(tool_call["name"], success, response, user_message)
+            if not success:
+                raise ValueError(f"Tool call failed: {user_message}")
+            tool_responses.append(json_obj)
+        return tool_responses
+
     def execute_tool_calls(self, tool_calls, new_messages):
-        for tool_call in tool_calls:
-            tool_response = self.execute_tool_call(tool_call)
+        tool_responses = self.run_tool_calls(tool_calls)
+        for tool_call, tool_response in zip(tool_calls, tool_responses):
             new_messages.append(self.build_tool_response_message(tool_call, tool_response))
 
         # If a tool call is forced, we cannot recurse, as there will
@@ -482,13 +1023,59 @@ class ApiRequest:
         }
         if "id" in tool_call:
             message_metadata["id"] = tool_call["id"]
+        fitted_response, modified = self.fit_tool_response(tool_call["name"], tool_response)
+        if modified:
+            message_metadata["full_response"] = tool_response
         return self.message.build_message(
             "tool",
-            tool_response,
+            fitted_response,
             message_type="tool_response",
             message_metadata=message_metadata,
         )
 
+    def fit_tool_response(self, tool_name, tool_response):
+        """Fit a tool response within the tool's response token limit.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :param tool_response: Tool response
+        :type tool_response: dict
+        :returns: Response to send to the LLM, and whether it was modified
+        :rtype: tuple
+        """
+        settings = self.tool_manager.get_tool_response_config(tool_name)
+        if not settings.get("max_tokens"):
+            return tool_response, False
+        if not settings.get("summarize_max_input_tokens"):
+            # The summary request has to fit the model's context window too.
+            settings["summarize_max_input_tokens"] = max(
+                settings["max_tokens"],
+                self.max_submission_tokens
+                - settings["max_tokens"]
+                - constants.TOOL_RESPONSE_SUMMARY_RESERVED_TOKENS,
+            )
+        return self.token_manager.fit_tool_response(
+            tool_response, settings, summarizer=self.summarize_tool_response
+        )
+
+    def summarize_tool_response(self, text, max_tokens):
+        """Summarize an oversized tool response with the request's model.
+
+        :param text: Serialized tool response
+        :type text: str
+        :param max_tokens: Token budget for the summary
+        :type max_tokens: int
+        :returns: Summary
+        :rtype: str
+        """
+        self.log.debug(f"Summarizing tool response to at most {max_tokens} tokens")
+        llm = self.provider.make_llm({self.provider.model_property_name: self.model_name})
+        messages = [
+            ("system", constants.DEFAULT_TOOL_RESPONSE_SUMMARY_SYSTEM_PROMPT),
+            ("human", f"Summarize in at most {max_tokens} tokens:\n\n{text}"),
+        ]
+        return llm.invoke(messages).content
+
     def extract_message_content(self, message):
         """
         Extract the content from an LLM message.
@@ -589,11 +1176,28 @@ class ApiRequest:
         :rtype: tuple
         """
         success, response, user_message = self.tool_manager.run_tool(tool_name, data)
+        json_obj = self.output_tool_response(tool_name, success, response, user_message)
+        return success, json_obj, user_message
+
+    def output_tool_response(self, tool_name, success, response, user_message):
+        """Build and optionally display a tool response.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :param success: Whether the tool ran successfully
+        :type success: bool
+        :param response: Tool response
+        :type response: dict
+        :param user_message: Tool status message
+        :type user_message: str
+        :returns: Tool response, or error object on failure
+        :rtype: dict
+        """
         json_obj = response if success else {"error": user_message}
         if not self.return_only:
             util.print_markdown(f"### Tool response:\n* Name: {tool_name}\n* Success: {success}")
             util.print_markdown(json_obj)
-        return success, json_obj, user_message
+        return json_obj
 
     def is_tool_response_message(self, message):
         """Check if a message is a tool response.
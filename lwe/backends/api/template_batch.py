@@ -0,0 +1,252 @@
+import os
+import csv
+import json
+import sqlite3
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from lwe.core.config import Config
+from lwe.core.logger import Logger
+from lwe.core.adaptive_limiter import get_adaptive_limiter_metrics
+
+DEFAULT_BATCH_CONCURRENCY = 4
+SQLITE_FETCH_SIZE = 500
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+def iter_csv_rows(filepath):
+    with open(filepath, newline="") as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def iter_jsonl_rows(filepath):
+    with open(filepath) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_sqlite_rows(filepath, query):
+    conn = sqlite3.connect(filepath)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(query)
+        while True:
+            rows = cursor.fetchmany(SQLITE_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(row)
+    finally:
+        conn.close()
+
+
+def iter_rows(input_source, query=None):
+    """
+    Stream rows from a CSV, JSONL or SQLite input source.
+
+    :param input_source: Path to the input file
+    :type input_source: str
+    :param query: SQL query, required for SQLite sources
+    :type query: str, optional
+    :returns: Generator of row dicts
+    :rtype: Generator
+    :raises ValueError: If the input type is not supported
+    """
+    extension = os.path.splitext(input_source)[1].lower()
+    if query or extension in SQLITE_EXTENSIONS:
+        if not query:
+            raise ValueError(f"A query is required for SQLite input: {input_source}")
+        return iter_sqlite_rows(input_source, query)
+    if extension == ".csv":
+        return iter_csv_rows(input_source)
+    if extension in JSONL_EXTENSIONS:
+        return iter_jsonl_rows(input_source)
+    raise ValueError(f"Unsupported batch input type: {input_source}")
+
+
+class TemplateBatchRunner:
+    """
+    Run a template over each row of a dataset.
+
+    Each row's values are passed as template variables, the rendered requests
+    are run with bounded concurrency, and results are streamed to a JSONL
+    output file, one line per row, tagged with the row index. Requests also
+    share the adaptive concurrency limit of their provider and model.
+
+    Rows already completed successfully in an existing output file are
+    skipped, so an interrupted batch can be resumed.
+    """
+
+    def __init__(self, backend, config=None):
+        """
+        Initializes the runner.
+
+        :param backend: The API backend used to build and run requests
+        :type backend: ApiBackend
+        :param config: Configuration settings. If not provided, the backend's config is used.
+        :type config: Config, optional
+        """
+        self.backend = backend
+        self.config = config or getattr(backend, "config", None) or Config()
+        self.log = Logger(self.__class__.__name__, self.config)
+
+    def load_completed_indexes(self, output_file):
+        """
+        Load indexes of rows already completed successfully.
+
+        :param output_file: Path to the output file
+        :type output_file: str
+        :returns: Set of completed row indexes
+        :rtype: set
+        """
+        completed = set()
+        if not os.path.exists(output_file):
+            return completed
+        with open(output_file) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partially written line from an interrupted run.
+                    continue
+                if result.get("success"):
+                    completed.add(result["index"])
+        return completed
+
+    def terminate_partial_line(self, output_file):
+        if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+            with open(output_file, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    def run_row(self, index, row, message, request_overrides):
+        try:
+            success, response, user_message = self.backend.run_isolated_request(
+                message, request_overrides
+            )
+        except Exception as e:
+            success, response, user_message = False, None, f"Error running row {index}: {e}"
+        return self.build_result(index, row, success, response, user_message)
+
+    def build_result(self, index, row, success, response, user_message):
+        result = {
+            "index": index,
+            "success": success,
+            "row": row,
+        }
+        if success:
+            result["response"] = response
+        else:
+            result["error"] = user_message
+        return result
+
+    def write_result(self, out, result, stats):
+        out.write(json.dumps(result, default=str) + "\n")
+        out.flush()
+        stats["succeeded" if result["success"] else "failed"] += 1
+        if not result["success"]:
+            self.log.warning(f"Batch row {result['index']} failed: {result['error']}")
+
+    def run(
+        self,
+        template_name,
+        input_source,
+        output_file,
+        query=None,
+        template_vars=None,
+        overrides=None,
+        concurrency=None,
+        resume=True,
+    ):
+        """
+        Run the batch.
+
+        :param template_name: Name of the template to run
+        :type template_name: str
+        :param input_source: Path to a CSV, JSONL or SQLite file
+        :type input_source: str
+        :param output_file: Path to the JSONL output file
+        :type output_file: str
+        :param query: SQL query, required for SQLite sources
+        :type query: str, optional
+        :param template_vars: Template variables shared by all rows, row values take precedence
+        :type template_vars: dict, optional
+        :param overrides: Overrides merged with any set in the template
+        :type overrides: dict, optional
+        :param concurrency: Maximum number of requests in flight
+        :type concurrency: int, optional
+        :param resume: Skip rows already completed in the output file
+        :type resume: bool
+        :returns: success, batch stats, user message
+        :rtype: tuple
+        """
+        try:
+            concurrency = max(1, int(concurrency or DEFAULT_BATCH_CONCURRENCY))
+        except (TypeError, ValueError):
+            return False, None, f"Invalid batch concurrency {concurrency!r}, must be an integer"
+        template_vars = template_vars or {}
+        try:
+            rows = iter_rows(input_source, query)
+        except ValueError as e:
+            return False, None, str(e)
+        completed = self.load_completed_indexes(output_file) if resume else set()
+        stats = {"total": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+        self.log.info(
+            f"Running template {template_name} over {input_source}, concurrency: {concurrency}, output: {output_file}"
+        )
+        mode = "a" if resume else "w"
+        try:
+            if resume:
+                self.terminate_partial_line(output_file)
+            with (
+                ThreadPoolExecutor(max_workers=concurrency) as executor,
+                open(output_file, mode) as out,
+            ):
+                pending = set()
+                for index, row in enumerate(rows):
+                    stats["total"] += 1
+                    if index in completed:
+                        stats["skipped"] += 1
+                        continue
+                    try:
+                        success, response, user_message = self.backend.build_message_from_template(
+                            template_name,
+                            template_vars={**template_vars, **row},
+                            overrides=overrides,
+                        )
+                    except Exception as e:
+                        success, response, user_message = (
+                            False,
+                            None,
+                            f"Error rendering template for row {index}: {e}",
+                        )
+                    if not success:
+                        result = self.build_result(index, row, False, None, user_message)
+                        self.write_result(out, result, stats)
+                        continue
+                    message, template_overrides = response
+                    request_overrides = {
+                        "adaptive_concurrency": True,
+                        **template_overrides.get("request_overrides", {}),
+                    }
+                    pending.add(
+                        executor.submit(self.run_row, index, row, message, request_overrides)
+                    )
+                    # Bound the rows held in memory to what can run.
+                    if len(pending) >= concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self.write_result(out, future.result(), stats)
+                for future in wait(pending).done:
+                    self.write_result(out, future.result(), stats)
+        except (OSError, sqlite3.Error, json.JSONDecodeError) as e:
+            return False, stats, f"Batch run of template {template_name} failed: {e}"
+        message = f"Batch run of template {template_name} complete: {stats['succeeded']} succeeded, {stats['failed']} failed, {stats['skipped']} skipped, results written to {output_file}"
+        self.log.info(message)
+        self.log.debug(f"Adaptive concurrency: {get_adaptive_limiter_metrics()}")
+        return True, stats, message
@@ -0,0 +1,530 @@
+import re
+import json
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lwe.core.logger import Logger
+
+from lwe.core import constants
+import lwe.core.util as util
+from lwe.core.title_extractor import extract_title
+
+from lwe.backends.api.conversation import ConversationManager
+from lwe.backends.api.message import MessageManager
+from lwe.backends.api.request import ApiRequest
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_SUBMIT_TIMEOUT = 10
+DEFAULT_DRAIN_TIMEOUT = 30
+DEFAULT_BACKFILL_BATCH_SIZE = 20
+DEFAULT_BACKFILL_CONCURRENCY = 2
+
+TITLE_STRATEGY_LLM = "llm"
+TITLE_STRATEGY_HEURISTIC = "heuristic"
+TITLE_STRATEGIES = [TITLE_STRATEGY_LLM, TITLE_STRATEGY_HEURISTIC]
+
+JSON_LIST_REGEX = re.compile(r"\[.*\]", re.DOTALL)
+
+
+class TitleGenerator:
+    """
+    Generate conversation titles in a bounded pool of background workers.
+
+    Conversations are queued for a fixed number of worker threads, which
+    share one title LLM. When the queue is full, submitting blocks for up
+    to submit_timeout seconds, then the title is generated in the calling
+    thread, so titles are never dropped. Queued titles are drained at exit.
+
+    With the heuristic strategy, titles are extracted from the first user
+    message locally, and generated synchronously without calling an LLM.
+    """
+
+    def __init__(self, config, provider_manager, orm):
+        """
+        Initializes the title generator.
+
+        :param config: Configuration settings
+        :type config: Config
+        :param provider_manager: Provider manager to load the title provider from
+        :type provider_manager: ProviderManager
+        :param orm: ORM used to read messages and save titles
+        :type orm: Orm
+        """
+        self.config = config
+        self.log = Logger(self.__class__.__name__, self.config)
+        self.provider_manager = provider_manager
+        self.orm = orm
+        self.workers = (
+            self.config.get("backend_options.title_generation.workers") or DEFAULT_WORKERS
+        )
+        self.queue = queue.Queue(
+            maxsize=self.config.get("backend_options.title_generation.queue_size")
+            or DEFAULT_QUEUE_SIZE
+        )
+        self.submit_timeout = self.config.get("backend_options.title_generation.submit_timeout")
+        if self.submit_timeout is None:
+            self.submit_timeout = DEFAULT_SUBMIT_TIMEOUT
+        self.drain_timeout = self.config.get("backend_options.title_generation.drain_timeout")
+        if self.drain_timeout is None:
+            self.drain_timeout = DEFAULT_DRAIN_TIMEOUT
+        self.strategy = (
+            self.config.get("backend_options.title_generation.strategy") or TITLE_STRATEGY_LLM
+        )
+        if self.strategy not in TITLE_STRATEGIES:
+            self.log.warning(
+                f"Invalid title generation strategy: {self.strategy}, using {TITLE_STRATEGY_LLM}"
+            )
+            self.strategy = TITLE_STRATEGY_LLM
+        self.lock = threading.Lock()
+        self.threads = []
+        self.accepting = True
+        self.title_llm = None
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "inline": 0,
+            "max_queue_depth": 0,
+            "generation_time": 0.0,
+        }
+
+    def is_in_memory_database(self):
+        database = self.config.get("database")
+        return database.startswith("sqlite") and ":memory:" in database
+
+    def get_title_provider_llm(self):
+        """
+        Get the title provider and LLM, building the LLM on first use.
+
+        :returns: provider, llm
+        :rtype: tuple
+        """
+        with self.lock:
+            if self.title_llm is None:
+                self.title_llm = self.make_title_provider_llm()
+            return self.title_llm
+
+    def make_title_provider_llm(self):
+        """
+        Build the title provider and LLM.
+
+        :returns: provider, llm
+        :rtype: tuple
+        """
+        title_provider_name = self.config.get("backend_options.title_generation.provider")
+        if title_provider_name:
+            provider = self.provider_manager.get_provider_from_name(title_provider_name)
+            if not provider:
+                raise RuntimeError(f"Failed to load title provider: {title_provider_name}")
+            customizations = {
+                "temperature": 0,
+            }
+            title_provider_model = self.config.get("backend_options.title_generation.model")
+            if title_provider_model:
+                customizations[provider.model_property_name] = title_provider_model
+            llm = provider.make_llm(customizations=customizations)
+        else:
+            provider = self.provider_manager.get_provider_from_name("chat_openai")
+            llm = provider.make_llm(
+                customizations={
+                    "model_name": constants.API_BACKEND_DEFAULT_MODEL,
+                    "temperature": 0,
+                },
+                use_defaults=True,
+            )
+        return provider, llm
+
+    def reset(self):
+        """
+        Discard the title LLM, so it is rebuilt on next use, e.g. after a plugin reload.
+        """
+        with self.lock:
+            self.title_llm = None
+
+    def generate_title(self, conversation_id):
+        """
+        Generate and save the title for a conversation.
+
+        :param conversation_id: Conversation ID
+        :type conversation_id: int
+        :returns: True if the title was saved
+        :rtype: bool
+        """
+        self.log.info(f"Generating title for conversation {conversation_id}")
+        # NOTE: This might need to be smarter in the future, but for now
+        # it should be reasonable to assume that the second record is the
+        # first user message we need for generating the title.
+        message_manager = MessageManager(self.config, self.orm)
+        conversation_manager = ConversationManager(self.config, self.orm)
+        success, messages, user_message = message_manager.get_messages(conversation_id, limit=2)
+        if not success:
+            self.log.warning(f"Failed to generate title for conversation: {user_message}")
+            return False
+        user_content = messages[1]["message"][: constants.TITLE_GENERATION_MAX_CHARACTERS]
+        try:
+            if self.strategy == TITLE_STRATEGY_HEURISTIC:
+                title = self.generate_heuristic_title(user_content)
+            else:
+                title = self.generate_llm_title(message_manager, user_content)
+            self.log.info(f"Title generated for conversation {conversation_id}: {title}")
+            success, conversation, user_message = conversation_manager.edit_conversation_title(
+                conversation_id, title
+            )
+            if success:
+                self.log.debug(f"Title saved for conversation {conversation_id}")
+            return success
+        except ValueError as e:
+            self.log.warning(f"Failed to generate title for conversation: {str(e)}")
+            return False
+
+    def generate_heuristic_title(self, content):
+        """
+        Extract a title from content locally.
+
+        :param content: Content to title
+        :type content: str
+        :returns: Title
+        :rtype: str
+        :raises ValueError: If no title can be extracted
+        """
+        title = extract_title(content)
+        if not title:
+            raise ValueError("Content has no words to build a title from")
+        return title
+
+    def generate_llm_title(self, message_manager, content):
+        """
+        Generate a title for content with the title LLM.
+
+        :param message_manager: Message manager
+        :type message_manager: MessageManager
+        :param content: Content to title
+        :type content: str
+        :returns: Title
+        :rtype: str
+        """
+        new_messages = [
+            message_manager.build_message(
+                "system", constants.DEFAULT_TITLE_GENERATION_SYSTEM_PROMPT
+            ),
+            message_manager.build_message(
+                "user",
+                "%s: %s" % (constants.DEFAULT_TITLE_GENERATION_USER_PROMPT, content),
+            ),
+        ]
+        result = self.invoke_title_llm(new_messages)
+        return self.clean_title(self.extract_content(result))
+
+    def invoke_title_llm(self, messages):
+        """
+        Send messages to the title LLM.
+
+        :param messages: Messages, as built by MessageManager.build_message()
+        :type messages: list
+        :returns: LLM response
+        :rtype: BaseMessage
+        """
+        provider, llm = self.get_title_provider_llm()
+        messages = util.transform_messages_to_chat_messages(messages)
+        messages = [provider.convert_dict_to_message(m) for m in messages]
+        self.log.debug(
+            f"Title generation LLM provider: {provider.name}, model: {getattr(llm, provider.model_property_name, 'N/A')}"
+        )
+        result = llm.invoke(messages)
+        provider_non_streaming_method = getattr(provider, "handle_non_streaming_response", None)
+        if provider_non_streaming_method:
+            result = provider_non_streaming_method(result)
+        return result
+
+    def extract_content(self, result):
+        request = ApiRequest(orm=self.orm, config=self.config)
+        message, _tool_calls = request.extract_message_content(result)
+        return message["message"]
+
+    def clean_title(self, title):
+        return title.replace("\n", ", ").strip().strip("'\"")
+
+    def parse_batch_titles(self, content, count):
+        """
+        Parse the titles from a batch title response.
+
+        :param content: LLM response content
+        :type content: str
+        :param count: Number of titles expected
+        :type count: int
+        :returns: Titles
+        :rtype: list
+        :raises ValueError: If the response is not a JSON list of the expected number of titles
+        """
+        match = JSON_LIST_REGEX.search(content)
+        if not match:
+            raise ValueError("Response does not contain a JSON list")
+        titles = json.loads(match.group(0))
+        if not isinstance(titles, list) or len(titles) != count:
+            raise ValueError(f"Expected a list of {count} titles")
+        titles = [self.clean_title(title) if isinstance(title, str) else "" for title in titles]
+        if not all(titles):
+            raise ValueError("Response contains empty titles")
+        return titles
+
+    def build_batch_messages(self, message_manager, contents):
+        contents = [content[: constants.TITLE_GENERATION_MAX_CHARACTERS] for content in contents]
+        return [
+            message_manager.build_message("system", constants.DEFAULT_TITLE_BACKFILL_SYSTEM_PROMPT),
+            message_manager.build_message(
+                "user",
+                "%s\n\n%s"
+                % (constants.DEFAULT_TITLE_BACKFILL_USER_PROMPT, json.dumps(contents, indent=2)),
+            ),
+        ]
+
+    def save_batch_titles(self, conversation_manager, batch, future, stats):
+        try:
+            content = self.extract_content(future.result())
+            titles = self.parse_batch_titles(content, len(batch))
+        except Exception as e:
+            self.log.warning(
+                f"Batch title generation failed, titling {len(batch)} conversations individually: {e}"
+            )
+            stats["fallback"] += len(batch)
+            for conversation_id, _content in batch:
+                stats["titled" if self.generate_title(conversation_id) else "failed"] += 1
+            return
+        self.save_titles(conversation_manager, batch, titles, stats)
+
+    def save_heuristic_titles(self, conversation_manager, items, stats):
+        titles = []
+        for conversation_id, content in items:
+            title = extract_title(content)
+            if not title:
+                self.log.warning(f"Failed to extract title for conversation {conversation_id}")
+            titles.append(title)
+        self.save_titles(conversation_manager, items, titles, stats)
+
+    def save_titles(self, conversation_manager, items, titles, stats):
+        for (conversation_id, _content), title in zip(items, titles):
+            if not title:
+                stats["failed"] += 1
+                continue
+            success, _conversation, user_message = conversation_manager.edit_conversation_title(
+                conversation_id, title
+            )
+            if success:
+                stats["titled"] += 1
+            else:
+                self.log.warning(f"Failed to save title for conversation: {user_message}")
+                stats["failed"] += 1
+
+    def backfill(self, user_id, batch_size=None, concurrency=None, limit=None):
+        """
+        Generate titles for a user's untitled conversations.
+
+        Untitled conversations are read in pages, and the first user message of
+        batch_size conversations is sent in each LLM request, which returns a JSON
+        list of titles. Up to concurrency requests run at once. Conversations in
+        a batch with an invalid response are titled one at a time instead.
+
+        With the heuristic strategy, titles are extracted locally instead.
+
+        :param user_id: User ID
+        :type user_id: int
+        :param batch_size: Conversations per LLM request, defaults to the backfill_batch_size setting
+        :type batch_size: int, optional
+        :param concurrency: Concurrent LLM requests, defaults to the backfill_concurrency setting
+        :type concurrency: int, optional
+        :param limit: Maximum number of conversations to title, defaults to all
+        :type limit: int, optional
+        :returns: success, stats with counts of conversations, batches, titled, failed, skipped
+                  and fallback conversations, message
+        :rtype: tuple
+        """
+        batch_size = (
+            batch_size
+            or self.config.get("backend_options.title_generation.backfill_batch_size")
+            or DEFAULT_BACKFILL_BATCH_SIZE
+        )
+        concurrency = (
+            concurrency
+            or self.config.get("backend_options.title_generation.backfill_concurrency")
+            or DEFAULT_BACKFILL_CONCURRENCY
+        )
+        message_manager = MessageManager(self.config, self.orm)
+        conversation_manager = ConversationManager(self.config, self.orm)
+        stats = {
+            "conversations": 0,
+            "batches": 0,
+            "titled": 0,
+            "failed": 0,
+            "skipped": 0,
+            "fallback": 0,
+        }
+        page_size = batch_size * concurrency
+        after_id = None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while limit is None or stats["conversations"] < limit:
+                page_limit = (
+                    page_size if limit is None else min(page_size, limit - stats["conversations"])
+                )
+                success, conversations, user_message = (
+                    conversation_manager.get_untitled_conversations(
+                        user_id, limit=page_limit, after_id=after_id
+                    )
+                )
+                if not success:
+                    return success, stats, user_message
+                if not conversations:
+                    break
+                # Failed conversations stay untitled, paging by ID moves past them.
+                after_id = conversations[-1].id
+                stats["conversations"] += len(conversations)
+                success, first_messages, user_message = message_manager.get_first_user_messages(
+                    [conversation.id for conversation in conversations]
+                )
+                if not success:
+                    return success, stats, user_message
+                items = [
+                    (conversation.id, first_messages[conversation.id]["message"])
+                    for conversation in conversations
+                    if conversation.id in first_messages
+                ]
+                stats["skipped"] += len(conversations) - len(items)
+                if self.strategy == TITLE_STRATEGY_HEURISTIC:
+                    self.save_heuristic_titles(conversation_manager, items, stats)
+                    continue
+                batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+                futures = [
+                    executor.submit(
+                        self.invoke_title_llm,
+                        self.build_batch_messages(
+                            message_manager, [content for _id, content in batch]
+                        ),
+                    )
+                    for batch in batches
+                ]
+                # Database writes stay in this thread, only the LLM requests run concurrently.
+                for batch, future in zip(batches, futures):
+                    self.save_batch_titles(conversation_manager, batch, future, stats)
+                stats["batches"] += len(batches)
+        message = (
+            f"Titled {stats['titled']} of {stats['conversations']} untitled conversations"
+            f" in {stats['batches']} batches"
+        )
+        self.log.info(f"{message}: {stats}")
+        return True, stats, message
+
+    def run_job(self, conversation_id):
+        start = time.perf_counter()
+        try:
+            success = self.generate_title(conversation_id)
+        except Exception as e:
+            self.log.error(f"Failed to generate title for conversation {conversation_id}: {e}")
+            success = False
+        with self.lock:
+            self.metrics["completed" if success else "failed"] += 1
+            self.metrics["generation_time"] += time.perf_counter() - start
+
+    def worker(self):
+        while True:
+            conversation_id = self.queue.get()
+            try:
+                if conversation_id is None:
+                    return
+                self.run_job(conversation_id)
+            finally:
+                # Workers are long lived, don't keep stale objects in their sessions.
+                self.orm.session.remove()
+                self.queue.task_done()
+
+    def start_workers(self):
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self.worker, name=f"TitleGenerator-{i}", daemon=True
+                )
+                thread.start()
+                self.threads.append(thread)
+            atexit.register(self.shutdown)
+        self.log.debug(f"Started {self.workers} title generation workers")
+
+    def submit(self, conversation_id):
+        """
+        Queue title generation for a conversation.
+
+        :param conversation_id: Conversation ID
+        :type conversation_id: int
+        """
+        with self.lock:
+            self.metrics["submitted"] += 1
+        if (
+            not self.accepting
+            or self.strategy == TITLE_STRATEGY_HEURISTIC
+            or self.is_in_memory_database()
+        ):
+            # Heuristic titles are cheap enough to generate inline, and in memory
+            # SQLite databases can't be accessed from another thread.
+            self.run_job(conversation_id)
+            return
+        self.start_workers()
+        try:
+            self.queue.put(conversation_id, timeout=self.submit_timeout)
+        except queue.Full:
+            self.log.warning(
+                f"Title generation queue full, generating title for conversation {conversation_id} inline"
+            )
+            with self.lock:
+                self.metrics["inline"] += 1
+            self.run_job(conversation_id)
+            return
+        with self.lock:
+            self.metrics["max_queue_depth"] = max(
+                self.metrics["max_queue_depth"], self.queue.qsize()
+            )
+
+    def get_metrics(self):
+        """
+        Get title generation metrics.
+
+        :returns: Counts of submitted, completed, failed and inline titles, the current
+                  and maximum queue depth, and the total generation time
+        :rtype: dict
+        """
+        with self.lock:
+            return {**self.metrics, "queue_depth": self.queue.qsize(), "workers": len(self.threads)}
+
+    def shutdown(self, timeout=None):
+        """
+        Stop accepting new titles, and wait for queued titles to be generated.
+
+        :param timeout: Seconds to wait for the queue to drain, defaults to drain_timeout
+        :type timeout: float, optional
+        :returns: True if all queued titles were generated
+        :rtype: bool
+        """
+        self.accepting = False
+        with self.lock:
+            threads, self.threads = self.threads, []
+        if not threads:
+            return True
+        atexit.unregister(self.shutdown)
+        deadline = time.monotonic() + (self.drain_timeout if timeout is None else timeout)
+        for _thread in threads:
+            try:
+                self.queue.put(None, timeout=max(0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        drained = not any(thread.is_alive() for thread in threads)
+        if drained:
+            self.log.debug(f"Title generation workers stopped: {self.get_metrics()}")
+        else:
+            self.log.warning(
+                f"Title generation workers did not finish within the timeout: {self.get_metrics()}"
+            )
+        return drained
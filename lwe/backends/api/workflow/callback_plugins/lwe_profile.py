@@ -0,0 +1,229 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import json
+import time
+import tempfile
+import datetime
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = """
+  name: lwe_profile
+  type: aggregate
+  short_description: Profile LWE workflow runs
+  description:
+    - Records the wall time of each task, and for LLM tasks the provider, model,
+      prompt/completion tokens and time to first token.
+    - Prints a summary sorted by task duration at the end of the run, and writes
+      a JSON profile of the run.
+  options:
+    output_dir:
+      description: Directory to write JSON profiles to, defaults to the system temp directory.
+      env:
+        - name: LWE_WORKFLOW_PROFILE_DIR
+      ini:
+        - section: callback_lwe_profile
+          key: output_dir
+    summary_limit:
+      description: Maximum number of tasks listed in the printed summary, 0 for all.
+      default: 20
+      type: int
+      env:
+        - name: LWE_WORKFLOW_PROFILE_SUMMARY_LIMIT
+      ini:
+        - section: callback_lwe_profile
+          key: summary_limit
+"""
+
+STATUS_OK = "ok"
+STATUS_CHANGED = "changed"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+STATUS_UNREACHABLE = "unreachable"
+
+
+def merge_llm_stats(total, stats):
+    """
+    Merge LLM stats into a running total.
+
+    :param total: Running total, or None
+    :type total: dict | None
+    :param stats: Stats returned by an LLM task, or another total
+    :type stats: dict
+    :returns: The updated total
+    :rtype: dict
+    """
+    if total is None:
+        total = {
+            "providers": [],
+            "models": [],
+            "requests": 0,
+            "llm_calls": 0,
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "llm_time": 0.0,
+            "time_to_first_token": None,
+        }
+    for key, value_key in (("providers", "provider"), ("models", "model")):
+        for value in stats.get(key) or [stats.get(value_key)]:
+            if value and value not in total[key]:
+                total[key].append(value)
+    total["requests"] += stats.get("requests", 1)
+    total["llm_calls"] += stats.get("llm_calls") or 0
+    total["llm_time"] += stats.get("llm_time") or 0.0
+    for key in ("prompt_tokens", "completion_tokens"):
+        if stats.get(key) is not None:
+            total[key] = (total[key] or 0) + stats[key]
+    if total["time_to_first_token"] is None:
+        total["time_to_first_token"] = stats.get("time_to_first_token")
+    return total
+
+
+def extract_llm_stats(result):
+    """
+    Extract LLM stats from a task result, including all loop items.
+
+    :param result: Task result data
+    :type result: dict
+    :returns: Merged stats, or None if the task made no LLM requests
+    :rtype: dict | None
+    """
+    total = None
+    for item in [result] + list(result.get("results") or []):
+        if isinstance(item, dict) and isinstance(item.get("stats"), dict):
+            total = merge_llm_stats(total, item["stats"])
+    return total
+
+
+def format_task_summary(task):
+    line = f"{task['name']} ({task['action']}, {task['status']}): {task['duration']:.2f}s"
+    llm = task.get("llm")
+    if llm:
+        tokens = "?" if llm["prompt_tokens"] is None else llm["prompt_tokens"]
+        tokens = f"{tokens}/{'?' if llm['completion_tokens'] is None else llm['completion_tokens']}"
+        details = [
+            f"{', '.join(llm['providers'])}/{', '.join(llm['models'])}",
+            f"tokens in/out: {tokens}",
+        ]
+        if llm["time_to_first_token"] is not None:
+            details.append(f"first token: {llm['time_to_first_token']:.2f}s")
+        line += f" [{'; '.join(details)}]"
+    return line
+
+
+class CallbackModule(CallbackBase):
+    """
+    Profile LWE workflow runs.
+    """
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "lwe_profile"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self.playbook_name = None
+        self.started = None
+        self.start_time = None
+        self.tasks = []
+        self.running = {}
+
+    def v2_playbook_on_start(self, playbook):
+        self.playbook_name = os.path.splitext(os.path.basename(playbook._file_name))[0]
+        self.started = datetime.datetime.now()
+        self.start_time = time.perf_counter()
+
+    def start_task(self, task):
+        entry = {
+            "name": task.get_name().strip() or task.action,
+            "action": task.action,
+            "status": None,
+            "start": time.perf_counter(),
+            "duration": 0.0,
+            "llm": None,
+        }
+        self.tasks.append(entry)
+        self.running[task._uuid] = entry
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self.start_task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self.start_task(task)
+
+    def finish_task(self, result, status):
+        entry = self.running.get(result._task._uuid)
+        if entry is None:
+            return
+        entry["duration"] = time.perf_counter() - entry["start"]
+        entry["status"] = status
+        entry["llm"] = extract_llm_stats(result._result)
+
+    def v2_runner_on_ok(self, result):
+        self.finish_task(result, STATUS_CHANGED if result._result.get("changed") else STATUS_OK)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.finish_task(result, STATUS_FAILED)
+
+    def v2_runner_on_skipped(self, result):
+        self.finish_task(result, STATUS_SKIPPED)
+
+    def v2_runner_on_unreachable(self, result):
+        self.finish_task(result, STATUS_UNREACHABLE)
+
+    def build_profile(self):
+        """
+        Build the JSON profile of the run.
+
+        :returns: Profile data
+        :rtype: dict
+        """
+        tasks = [{k: v for k, v in task.items() if k != "start"} for task in self.tasks]
+        llm_total = None
+        for task in tasks:
+            if task["llm"]:
+                llm_total = merge_llm_stats(llm_total, task["llm"])
+        return {
+            "playbook": self.playbook_name,
+            "started": self.started.isoformat() if self.started else None,
+            "duration": time.perf_counter() - self.start_time if self.start_time else None,
+            "tasks": tasks,
+            "llm": llm_total,
+        }
+
+    def write_profile(self, profile):
+        output_dir = self.get_option("output_dir") or tempfile.gettempdir()
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = (self.started or datetime.datetime.now()).strftime("%Y%m%d-%H%M%S")
+        filepath = os.path.join(
+            output_dir, f"lwe-workflow-profile-{self.playbook_name}-{timestamp}.json"
+        )
+        with open(filepath, "w") as f:
+            json.dump(profile, f, indent=2, default=str)
+        return filepath
+
+    def v2_playbook_on_stats(self, stats):
+        profile = self.build_profile()
+        tasks = sorted(profile["tasks"], key=lambda task: task["duration"], reverse=True)
+        limit = self.get_option("summary_limit")
+        if limit:
+            tasks = tasks[: int(limit)]
+        self._display.banner("LWE WORKFLOW PROFILE")
+        for task in tasks:
+            self._display.display(format_task_summary(task))
+        if profile["duration"] is not None:
+            self._display.display(f"Total: {profile['duration']:.2f}s")
+        llm = profile["llm"]
+        if llm:
+            self._display.display(
+                f"LLM: {llm['requests']} requests, {llm['llm_time']:.2f}s, tokens in/out: {llm['prompt_tokens']}/{llm['completion_tokens']}"
+            )
+        try:
+            filepath = self.write_profile(profile)
+            self._display.display(f"Profile written to: {filepath}")
+        except OSError as e:
+            self._display.warning(f"Failed to write workflow profile: {e}")
@@ -83,18 +83,19 @@ user_message:
 """
 
 
-def run_module():
-    module_args = dict(
-        command=dict(type="str", required=True),
-        arguments=dict(type="str", required=False, default=""),
-        profile=dict(type="str", required=False, default="default"),
-        user=dict(type="raw", required=False),
-        conversation_id=dict(type="int", required=False),
-    )
+MODULE_ARGS = dict(
+    command=dict(type="str", required=True),
+    arguments=dict(type="str", required=False, default=""),
+    profile=dict(type="str", required=False, default="default"),
+    user=dict(type="raw", required=False),
+    conversation_id=dict(type="int", required=False),
+)
+
 
+def run_module():
     result = dict(changed=False, response=dict())
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(argument_spec=MODULE_ARGS, supports_check_mode=True)
 
     command = module.params["command"]
     arguments = module.params["arguments"]
@@ -145,29 +145,71 @@ user_message:
     description: Human-readable user status message for the response.
     type: str
     returned: always
+stats:
+    description: Timing and token usage of the request.
+    type: dict
+    returned: success
+    contains:
+        provider:
+            description: The provider used for the request.
+            type: str
+        model:
+            description: The model used for the request.
+            type: str
+        preset:
+            description: The preset used for the request, if any.
+            type: str
+        llm_calls:
+            description: Number of LLM calls made, more than one if tools were called.
+            type: int
+        prompt_tokens:
+            description: Prompt tokens reported by the provider, None if not reported.
+            type: int
+        completion_tokens:
+            description: Completion tokens reported by the provider, None if not reported.
+            type: int
+        llm_time:
+            description: Seconds spent waiting on the LLM.
+            type: float
+        time_to_first_token:
+            description: Seconds until the first token of the first LLM call was received.
+            type: float
+        rate_limit_wait:
+            description: Seconds spent waiting on client side rate limits.
+            type: float
+        hedged_requests:
+            description: Number of hedge requests sent for slow LLM calls.
+            type: int
+        hedge_wins:
+            description: Number of LLM calls answered first by the hedge request.
+            type: int
+        fallbacks:
+            description: Number of LLM calls answered by a fallback preset.
+            type: int
 """
 
 
-def run_module():
-    module_args = dict(
-        message=dict(type="str", required=False),
-        profile=dict(type="str", required=False, default="default"),
-        # provider=dict(type='str', required=False, default='chat_openai'),
-        # model=dict(type='str', required=False, default=constants.API_BACKEND_DEFAULT_MODEL),
-        preset=dict(type="str", required=False),
-        preset_overrides=dict(type="dict", required=False),
-        system_message=dict(type="str", required=False),
-        max_submission_tokens=dict(type="int", required=False),
-        template=dict(type="str", required=False),
-        template_vars=dict(type="dict", required=False),
-        user=dict(type="raw", required=False),
-        conversation_id=dict(type="int", required=False),
-        title=dict(type="str", required=False),
-    )
+MODULE_ARGS = dict(
+    message=dict(type="str", required=False),
+    profile=dict(type="str", required=False, default="default"),
+    # provider=dict(type='str', required=False, default='chat_openai'),
+    # model=dict(type='str', required=False, default=constants.API_BACKEND_DEFAULT_MODEL),
+    preset=dict(type="str", required=False),
+    preset_overrides=dict(type="dict", required=False),
+    system_message=dict(type="str", required=False),
+    max_submission_tokens=dict(type="int", required=False),
+    template=dict(type="str", required=False),
+    template_vars=dict(type="dict", required=False),
+    user=dict(type="raw", required=False),
+    conversation_id=dict(type="int", required=False),
+    title=dict(type="str", required=False),
+)
+
 
+def run_module():
     result = dict(changed=False, response=dict())
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(argument_spec=MODULE_ARGS, supports_check_mode=True)
 
     message = module.params["message"]
     profile = module.params["profile"]
@@ -264,6 +306,7 @@ def run_module():
     result["response"] = response
     result["conversation_id"] = gpt.conversation_id
     result["user_message"] = user_message
+    result["stats"] = gpt.last_request_stats
     gpt.log.info("[lwe_llm module]: execution completed successfully")
     module.exit_json(**result)
 
@@ -0,0 +1,397 @@
+#!/usr/bin/python
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import copy
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule
+
+from lwe.core.config import Config
+from lwe.core.adaptive_limiter import get_adaptive_limiter_metrics
+from lwe import ApiBackend
+import lwe.core.util as util
+
+DEFAULT_CONCURRENCY = 4
+
+DOCUMENTATION = r"""
+---
+module: lwe_llm_batch
+
+short_description: Make many LLM requests via LWE concurrently.
+
+version_added: "1.0.0"
+
+description:
+    - Runs a list of messages, or a template over a list of template variable sets,
+      through one LWE backend with bounded concurrency.
+    - Each item is an independent request, with no conversation history.
+    - Results are returned in input order, with per-item success or error.
+
+options:
+    messages:
+        description: The messages to send to the model, one request per message.
+        required: true if template not provided
+        type: list
+    template:
+        description: An LWE template to use for constructing each prompt.
+        required: true if messages not provided
+        default: None
+        type: str
+    items:
+        description: A list of template variable dictionaries, one request per item.
+        required: true if template provided
+        default: None
+        type: list
+    template_vars:
+        description: Template variables shared by all items, item values take precedence.
+        required: false
+        default: None
+        type: dict
+    concurrency:
+        description: Maximum number of requests in flight. Requests also share an adaptive
+                     concurrency limit per provider and model, which is lowered when the
+                     provider returns rate limit or server errors.
+        required: false
+        default: 4
+        type: int
+    profile:
+        description: The LWE profile to use.
+        required: false
+        default: 'default'
+        type: str
+    preset:
+        description: The LWE preset to use.
+        required: false
+        default: None
+        type: str
+    preset_overrides:
+        description: A dictionary of metadata and model customization overrides to apply to the preset.
+        required: false
+        default: None
+        type: dict
+    system_message:
+        description: The LWE system message to use, either an alias or custom message.
+        required: false
+        default: None
+        type: str
+    max_submission_tokens:
+        description: The maximum number of tokens that can be submitted. Default is max for the model.
+        required: false
+        default: None
+        type: int
+    user:
+        description: The LWE user to load for the execution, a user ID or username.
+                     NOTE: A user must be provided to persist items as conversations.
+        required: false
+        default: None (anonymous)
+        type: str
+    persist:
+        description: Store each item as its own conversation for the user.
+        required: false
+        default: false
+        type: bool
+    title:
+        description: Custom title for persisted conversations, generated if not provided.
+        required: false
+        default: None
+        type: str
+    fail_on_error:
+        description: Fail the task if any item fails.
+        required: false
+        default: false
+        type: bool
+
+author:
+    - Chad Phillips (@thehunmonkgroup)
+"""
+
+EXAMPLES = r"""
+# Ask several questions at once
+- name: Ask questions
+  lwe_llm_batch:
+    messages:
+      - "What is the capital of France?"
+      - "What is the capital of Spain?"
+  register: answers
+
+# Run a template over rows from a database query, four at a time,
+# storing each result as a conversation for user 1.
+- name: Analyze transcriptions
+  lwe_llm_batch:
+    preset: turbo
+    template: example-voicemail-sentiment-analysis.md
+    items: "{{ unanalyzed_transcriptions.data }}"
+    concurrency: 4
+    user: 1
+    persist: true
+  register: analyses
+"""
+
+RETURN = r"""
+results:
+    description: One result per input item, in input order.
+    type: list
+    returned: always
+    contains:
+        index:
+            description: Index of the input item.
+            type: int
+        success:
+            description: Whether the request succeeded.
+            type: bool
+        response:
+            description: The response from the model, on success.
+            type: str
+        error:
+            description: The error message, on failure.
+            type: str
+        conversation_id:
+            description: The ID of the stored conversation, if persisted.
+            type: int
+success_count:
+    description: The number of items that succeeded.
+    type: int
+    returned: always
+failure_count:
+    description: The number of items that failed.
+    type: int
+    returned: always
+adaptive_concurrency:
+    description: Adaptive concurrency metrics by provider and model, including the current
+                 limit and observed latencies.
+    type: dict
+    returned: always
+"""
+
+
+def validate_params(messages, template_name, items, persist, user):
+    """
+    Validate the batch arguments.
+
+    :returns: Error message, or None if valid
+    :rtype: str | None
+    """
+    if (messages is None) == (template_name is None):
+        return "One and only one of 'messages' or 'template' arguments must be set."
+    if template_name is not None and items is None:
+        return "'items' must be set when 'template' is set."
+    if persist and user is None:
+        return "'user' must be set when 'persist' is enabled."
+    return None
+
+
+def build_requests(
+    gpt, messages=None, template_name=None, items=None, template_vars=None, request_overrides=None
+):
+    """
+    Build the message and request overrides for each batch item.
+
+    :returns: List of tuples of (message, request overrides, error)
+    :rtype: list
+    """
+    request_overrides = request_overrides or {}
+    if template_name is None:
+        return [(message, copy.deepcopy(request_overrides), None) for message in messages]
+    template_vars = template_vars or {}
+    requests = []
+    for item in items:
+        success, response, user_message = gpt.build_message_from_template(
+            template_name, template_vars={**template_vars, **item}
+        )
+        if success:
+            message, template_overrides = response
+            overrides = template_overrides.get("request_overrides", {})
+            util.merge_dicts(overrides, copy.deepcopy(request_overrides))
+            requests.append((message, overrides, None))
+        else:
+            requests.append((None, None, user_message))
+    return requests
+
+
+def run_batch(
+    gpt,
+    messages=None,
+    template_name=None,
+    items=None,
+    template_vars=None,
+    request_overrides=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    user=None,
+    title=None,
+):
+    """
+    Run a batch of isolated requests through one backend.
+
+    Requests run concurrently in worker threads, conversations are stored
+    from the calling thread, which owns the backend's database session.
+
+    :param gpt: The backend to run requests with
+    :type gpt: ApiBackend
+    :param messages: Messages to send, one request per message
+    :type messages: list, optional
+    :param template_name: Template to build each message from
+    :type template_name: str, optional
+    :param items: Template variables, one request per item
+    :type items: list, optional
+    :param template_vars: Template variables shared by all items
+    :type template_vars: dict, optional
+    :param request_overrides: Request overrides applied to every item
+    :type request_overrides: dict, optional
+    :param concurrency: Maximum number of requests in flight
+    :type concurrency: int
+    :param user: Store each item as a conversation for this user
+    :type user: User, optional
+    :param title: Title for stored conversations
+    :type title: str, optional
+    :returns: List of results in input order
+    :rtype: list
+    """
+    requests = build_requests(gpt, messages, template_name, items, template_vars, request_overrides)
+    for _message, overrides, error in requests:
+        if error is None:
+            overrides.setdefault("adaptive_concurrency", True)
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        futures = [
+            (
+                executor.submit(gpt.make_isolated_request, message, overrides)
+                if error is None
+                else None
+            )
+            for message, overrides, error in requests
+        ]
+        for index, ((_message, _overrides, error), future) in enumerate(zip(requests, futures)):
+            result = {"index": index, "success": False}
+            if future is not None:
+                try:
+                    success, response, user_message = future.result()
+                except Exception as e:
+                    success, response, user_message = False, None, str(e)
+                if success:
+                    response_content, request, new_messages = response
+                    result["success"] = True
+                    result["response"] = response_content
+                    if user:
+                        success, conversation, user_message = gpt.store_isolated_request(
+                            request, new_messages, response_content, user, title
+                        )
+                        if success:
+                            result["conversation_id"] = conversation.id
+                        else:
+                            gpt.log.warning(
+                                f"[lwe_llm_batch module]: Failed to store item {index}: {user_message}"
+                            )
+                else:
+                    error = f"Error fetching LLM response: {user_message}"
+            if error:
+                result["error"] = error
+                gpt.log.error(f"[lwe_llm_batch module]: Item {index} failed: {error}")
+            results.append(result)
+    return results
+
+
+MODULE_ARGS = dict(
+    messages=dict(type="list", elements="str", required=False),
+    template=dict(type="str", required=False),
+    items=dict(type="list", elements="dict", required=False),
+    template_vars=dict(type="dict", required=False),
+    concurrency=dict(type="int", required=False, default=DEFAULT_CONCURRENCY),
+    profile=dict(type="str", required=False, default="default"),
+    preset=dict(type="str", required=False),
+    preset_overrides=dict(type="dict", required=False),
+    system_message=dict(type="str", required=False),
+    max_submission_tokens=dict(type="int", required=False),
+    user=dict(type="raw", required=False),
+    persist=dict(type="bool", required=False, default=False),
+    title=dict(type="str", required=False),
+    fail_on_error=dict(type="bool", required=False, default=False),
+)
+
+
+def run_module():
+    result = dict(
+        changed=False, results=[], success_count=0, failure_count=0, adaptive_concurrency={}
+    )
+
+    module = AnsibleModule(argument_spec=MODULE_ARGS, supports_check_mode=True)
+
+    messages = module.params["messages"]
+    template_name = module.params["template"]
+    items = module.params["items"]
+    user = module.params["user"]
+    try:
+        user = int(user)
+    except Exception:
+        pass
+    persist = module.params["persist"]
+
+    error = validate_params(messages, template_name, items, persist, user)
+    if error:
+        module.fail_json(msg=error)
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    config_args = {
+        "profile": module.params["profile"],
+    }
+    config_dir = os.environ.get("LWE_CONFIG_DIR", None)
+    data_dir = os.environ.get("LWE_DATA_DIR", None)
+    if config_dir:
+        config_args["config_dir"] = config_dir
+    if data_dir:
+        config_args["data_dir"] = data_dir
+    config = Config(**config_args)
+    config.load_from_file()
+    config.set("debug.log.enabled", True)
+    config.set("model.default_preset", module.params["preset"])
+    config.set("backend_options.default_user", user)
+    gpt = ApiBackend(config)
+    if module.params["max_submission_tokens"]:
+        gpt.set_max_submission_tokens(module.params["max_submission_tokens"])
+    gpt.set_return_only(True)
+
+    gpt.log.info("[lwe_llm_batch module]: Starting execution")
+
+    request_overrides = {}
+    if module.params["preset_overrides"]:
+        request_overrides["preset_overrides"] = module.params["preset_overrides"]
+    if module.params["system_message"]:
+        request_overrides["system_message"] = module.params["system_message"]
+
+    results = run_batch(
+        gpt,
+        messages=messages,
+        template_name=template_name,
+        items=items,
+        template_vars=module.params["template_vars"],
+        request_overrides=request_overrides,
+        concurrency=module.params["concurrency"],
+        user=gpt.current_user if persist else None,
+        title=module.params["title"],
+    )
+
+    result["changed"] = True
+    result["results"] = results
+    result["success_count"] = sum(1 for r in results if r["success"])
+    result["failure_count"] = len(results) - result["success_count"]
+    result["adaptive_concurrency"] = get_adaptive_limiter_metrics()
+    message = f"{result['success_count']} succeeded, {result['failure_count']} failed"
+    if result["failure_count"] and module.params["fail_on_error"]:
+        gpt.log.error(f"[lwe_llm_batch module]: {message}")
+        module.fail_json(msg=message, **result)
+    gpt.log.info(f"[lwe_llm_batch module]: execution completed: {message}")
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/python
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+
+from lwe.core.config import Config
+from lwe.core.text_chunker import TextChunker, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
+from lwe.backends.api.workflow.library.lwe_llm_batch import run_batch, DEFAULT_CONCURRENCY
+from lwe import ApiBackend
+
+DEFAULT_MAP_PROMPT = (
+    "Summarize the following section of a larger document. "
+    "Include all of its key points, facts and conclusions, "
+    "the summary will be combined with the summaries of the other sections."
+)
+DEFAULT_REDUCE_PROMPT = (
+    "The following are summaries of consecutive sections of a document. "
+    "Combine them into a single coherent summary of the document, "
+    "keeping the key points, facts and conclusions."
+)
+SUMMARY_SEPARATOR = "\n\n---\n\n"
+
+DOCUMENTATION = r"""
+---
+module: lwe_llm_map_reduce
+
+short_description: Process documents larger than the context window via LWE.
+
+version_added: "1.0.0"
+
+description:
+    - Splits content into token-sized chunks, runs a map prompt over every chunk
+      concurrently, then combines the results with a reduce prompt.
+    - When the combined map results are too large for one request, they are
+      reduced in concurrent groups first, until they fit.
+    - Each request is independent, with no conversation history, and nothing is stored.
+
+options:
+    content:
+        description: The content to process.
+        required: true if chunks not provided
+        type: str
+    chunks:
+        description: Already chunked content, a list of strings or of dictionaries with a content key.
+        required: true if content not provided
+        type: list
+    chunk_size:
+        description: Maximum number of tokens per chunk.
+        required: false
+        default: 2000
+        type: int
+    overlap:
+        description: Number of tokens from the end of each chunk repeated at the start of the next.
+        required: false
+        default: 200
+        type: int
+    map_prompt:
+        description: Prompt for each chunk, the chunk is appended to it. Defaults to a summarization prompt.
+        required: false
+        type: str
+    map_template:
+        description: An LWE template to build each chunk's prompt with, instead of map_prompt.
+                     Receives the chunk, chunk_number and chunk_count variables.
+        required: false
+        type: str
+    reduce_prompt:
+        description: Prompt for combining map results, they are appended to it. Defaults to a summarization prompt.
+        required: false
+        type: str
+    reduce_template:
+        description: An LWE template to build the combining prompt with, instead of reduce_prompt.
+                     Receives the summaries variable.
+        required: false
+        type: str
+    template_vars:
+        description: Additional variables for map_template and reduce_template.
+        required: false
+        type: dict
+    max_reduce_tokens:
+        description: Maximum number of tokens of map results combined in one request, defaults to chunk_size.
+        required: false
+        type: int
+    concurrency:
+        description: Maximum number of requests in flight.
+        required: false
+        default: 4
+        type: int
+    profile:
+        description: The LWE profile to use.
+        required: false
+        default: 'default'
+        type: str
+    preset:
+        description: The LWE preset to use.
+        required: false
+        type: str
+    preset_overrides:
+        description: A dictionary of metadata and model customization overrides to apply to the preset.
+        required: false
+        type: dict
+    system_message:
+        description: The LWE system message to use, either an alias or custom message.
+        required: false
+        type: str
+    max_submission_tokens:
+        description: The maximum number of tokens that can be submitted. Default is max for the model.
+        required: false
+        type: int
+
+author:
+    - Chad Phillips (@thehunmonkgroup)
+"""
+
+EXAMPLES = r"""
+# Summarize a document of any length
+- name: Extract content
+  text_extractor:
+    path: "/path/to/your/book.pdf"
+  register: extracted
+
+- name: Summarize content
+  lwe_llm_map_reduce:
+    content: "{{ extracted.content }}"
+    chunk_size: 4000
+    concurrency: 8
+  register: summary
+
+# Answer a question from a long document
+- name: Answer question
+  lwe_llm_map_reduce:
+    content: "{{ extracted.content }}"
+    map_prompt: "List everything in the following text relevant to this question: {{ question }}"
+    reduce_prompt: "Answer this question using the notes below: {{ question }}"
+  register: answer
+"""
+
+RETURN = r"""
+response:
+    description: The combined response.
+    type: str
+    returned: success
+chunk_count:
+    description: The number of chunks the content was split into.
+    type: int
+    returned: success
+map_results:
+    description: The response for each chunk, in order.
+    type: list
+    returned: success
+reduce_rounds:
+    description: The number of reduce rounds, including the final one.
+    type: int
+    returned: success
+"""
+
+
+def validate_params(content, chunks):
+    """
+    Validate the map-reduce arguments.
+
+    :returns: Error message, or None if valid
+    :rtype: str | None
+    """
+    if (content is None) == (chunks is None):
+        return "One and only one of 'content' or 'chunks' arguments must be set."
+    return None
+
+
+def run_step(gpt, texts, prompt, template_name, template_var, template_vars, **kwargs):
+    """
+    Run a prompt or template over texts concurrently.
+
+    :returns: success, list of responses in order, user message
+    :rtype: tuple
+    """
+    if template_name:
+        items = [
+            {template_var: text, "chunk_number": i + 1, "chunk_count": len(texts)}
+            for i, text in enumerate(texts)
+        ]
+        results = run_batch(
+            gpt, template_name=template_name, items=items, template_vars=template_vars, **kwargs
+        )
+    else:
+        results = run_batch(gpt, messages=[f"{prompt}\n\n{text}" for text in texts], **kwargs)
+    failed = [result for result in results if not result["success"]]
+    if failed:
+        return False, None, f"{len(failed)} of {len(results)} requests failed: {failed[0]['error']}"
+    return True, [result["response"] for result in results], f"{len(results)} requests succeeded"
+
+
+def group_summaries(chunker, summaries, max_tokens):
+    """
+    Group consecutive summaries so each group fits in max_tokens.
+
+    :returns: List of groups, each a list of summaries
+    :rtype: list
+    """
+    groups = []
+    group_tokens = 0
+    for summary in summaries:
+        tokens = chunker.count_tokens(summary)
+        if groups and group_tokens + tokens <= max_tokens:
+            groups[-1].append(summary)
+            group_tokens += tokens
+        else:
+            groups.append([summary])
+            group_tokens = tokens
+    return groups
+
+
+def run_map_reduce(
+    gpt,
+    chunker,
+    content=None,
+    chunks=None,
+    map_prompt=DEFAULT_MAP_PROMPT,
+    map_template=None,
+    reduce_prompt=DEFAULT_REDUCE_PROMPT,
+    reduce_template=None,
+    template_vars=None,
+    max_reduce_tokens=None,
+    request_overrides=None,
+    concurrency=DEFAULT_CONCURRENCY,
+):
+    """
+    Map a prompt over the chunks of a document, then reduce the results to one response.
+
+    :param gpt: The backend to run requests with
+    :type gpt: ApiBackend
+    :param chunker: Chunker to split content and count tokens with
+    :type chunker: TextChunker
+    :param content: Content to chunk
+    :type content: str, optional
+    :param chunks: Already chunked content, strings or dicts with a content key
+    :type chunks: list, optional
+    :param map_prompt: Prompt the chunk is appended to
+    :type map_prompt: str
+    :param map_template: Template to build chunk prompts with, instead of map_prompt
+    :type map_template: str, optional
+    :param reduce_prompt: Prompt the map results are appended to
+    :type reduce_prompt: str
+    :param reduce_template: Template to build combining prompts with, instead of reduce_prompt
+    :type reduce_template: str, optional
+    :param template_vars: Additional template variables
+    :type template_vars: dict, optional
+    :param max_reduce_tokens: Maximum tokens of map results combined in one request
+    :type max_reduce_tokens: int, optional
+    :param request_overrides: Request overrides applied to every request
+    :type request_overrides: dict, optional
+    :param concurrency: Maximum number of requests in flight
+    :type concurrency: int
+    :returns: success, dict with response, chunk_count, map_results and reduce_rounds, user message
+    :rtype: tuple
+    """
+    if chunks is None:
+        chunks = chunker.chunk(content)
+    texts = [chunk["content"] if isinstance(chunk, dict) else chunk for chunk in chunks]
+    if not texts:
+        return False, None, "No content to process"
+    max_reduce_tokens = max_reduce_tokens or chunker.chunk_size
+    step_kwargs = {
+        "template_vars": template_vars,
+        "request_overrides": request_overrides,
+        "concurrency": concurrency,
+    }
+    gpt.log.info(f"[lwe_llm_map_reduce module]: Mapping {len(texts)} chunks")
+    success, map_results, user_message = run_step(
+        gpt, texts, map_prompt or DEFAULT_MAP_PROMPT, map_template, "chunk", **step_kwargs
+    )
+    if not success:
+        return False, None, f"Map step failed: {user_message}"
+    summaries = map_results
+    rounds = 0
+    while rounds == 0 or len(summaries) > 1:
+        groups = group_summaries(chunker, summaries, max_reduce_tokens)
+        if len(groups) == len(summaries):
+            groups = [summaries]
+        gpt.log.info(
+            f"[lwe_llm_map_reduce module]: Reducing {len(summaries)} results in {len(groups)} groups"
+        )
+        success, summaries, user_message = run_step(
+            gpt,
+            [SUMMARY_SEPARATOR.join(group) for group in groups],
+            reduce_prompt or DEFAULT_REDUCE_PROMPT,
+            reduce_template,
+            "summaries",
+            **step_kwargs,
+        )
+        if not success:
+            return False, None, f"Reduce step failed: {user_message}"
+        rounds += 1
+    result = {
+        "response": summaries[0],
+        "chunk_count": len(texts),
+        "map_results": map_results,
+        "reduce_rounds": rounds,
+    }
+    return True, result, "Map-reduce completed"
+
+
+MODULE_ARGS = dict(
+    content=dict(type="str", required=False),
+    chunks=dict(type="list", required=False),
+    chunk_size=dict(type="int", required=False, default=DEFAULT_CHUNK_SIZE),
+    overlap=dict(type="int", required=False, default=DEFAULT_CHUNK_OVERLAP),
+    map_prompt=dict(type="str", required=False),
+    map_template=dict(type="str", required=False),
+    reduce_prompt=dict(type="str", required=False),
+    reduce_template=dict(type="str", required=False),
+    template_vars=dict(type="dict", required=False),
+    max_reduce_tokens=dict(type="int", required=False),
+    concurrency=dict(type="int", required=False, default=DEFAULT_CONCURRENCY),
+    profile=dict(type="str", required=False, default="default"),
+    preset=dict(type="str", required=False),
+    preset_overrides=dict(type="dict", required=False),
+    system_message=dict(type="str", required=False),
+    max_submission_tokens=dict(type="int", required=False),
+)
+
+
+def run_module():
+    result = dict(changed=False, response="")
+
+    module = AnsibleModule(argument_spec=MODULE_ARGS, supports_check_mode=True)
+
+    error = validate_params(module.params["content"], module.params["chunks"])
+    if error:
+        module.fail_json(msg=error)
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    config_args = {
+        "profile": module.params["profile"],
+    }
+    config_dir = os.environ.get("LWE_CONFIG_DIR", None)
+    data_dir = os.environ.get("LWE_DATA_DIR", None)
+    if config_dir:
+        config_args["config_dir"] = config_dir
+    if data_dir:
+        config_args["data_dir"] = data_dir
+    config = Config(**config_args)
+    config.load_from_file()
+    config.set("debug.log.enabled", True)
+    config.set("model.default_preset", module.params["preset"])
+    gpt = ApiBackend(config)
+    if module.params["max_submission_tokens"]:
+        gpt.set_max_submission_tokens(module.params["max_submission_tokens"])
+    gpt.set_return_only(True)
+
+    gpt.log.info("[lwe_llm_map_reduce module]: Starting execution")
+
+    request_overrides = {}
+    if module.params["preset_overrides"]:
+        request_overrides["preset_overrides"] = module.params["preset_overrides"]
+    if module.params["system_message"]:
+        request_overrides["system_message"] = module.params["system_message"]
+
+    try:
+        chunker = TextChunker(module.params["chunk_size"], module.params["overlap"])
+        success, response, user_message = run_map_reduce(
+            gpt,
+            chunker,
+            content=module.params["content"],
+            chunks=module.params["chunks"],
+            map_prompt=module.params["map_prompt"],
+            map_template=module.params["map_template"],
+            reduce_prompt=module.params["reduce_prompt"],
+            reduce_template=module.params["reduce_template"],
+            template_vars=module.params["template_vars"],
+            max_reduce_tokens=module.params["max_reduce_tokens"],
+            request_overrides=request_overrides,
+            concurrency=module.params["concurrency"],
+        )
+    except Exception as e:
+        success, response, user_message = False, None, str(e)
+    if not success:
+        gpt.log.error(f"[lwe_llm_map_reduce module]: {user_message}")
+        module.fail_json(msg=user_message, **result)
+    result["changed"] = True
+    result.update(response)
+    gpt.log.info(f"[lwe_llm_map_reduce module]: execution completed: {user_message}")
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 #!/usr/bin/python
 
+import os
+import re
+import csv
+import json
 import sqlite3
 from ansible.module_utils.basic import AnsibleModule
 
@@ -30,8 +34,52 @@ options:
     query_params:
       description:
           - Optional query params to pass to a parameterized query. Should be a list for a single query or a list of lists for multiple queries.
+          - With executemany, a list of parameter lists for a single query, or a list of those for multiple queries.
       type: raw
       required: false
+    executemany:
+      description:
+          - Run each query once per item in its parameter list, in bulk, using executemany.
+      type: bool
+      required: false
+      default: false
+    limit:
+      description:
+          - Maximum number of rows to return from a single SELECT query.
+      type: int
+      required: false
+    offset:
+      description:
+          - Number of rows to skip, for paging through the results of a single SELECT query with limit.
+      type: int
+      required: false
+    keyset_column:
+      description:
+          - Page by this column instead of by offset, which stays fast for deep pages. Rows are ordered by the column, which should be unique.
+          - Requires limit.
+      type: str
+      required: false
+    after:
+      description:
+          - Return rows with a keyset_column value greater than this, usually the next_cursor of the previous page.
+      type: raw
+      required: false
+    output_file:
+      description:
+          - Stream the rows of a single SELECT query to this file instead of returning them.
+      type: str
+      required: false
+    output_format:
+      description:
+          - Format of output_file, detected from its extension if not given.
+      type: str
+      required: false
+      choices: [jsonl, csv]
+    pragmas:
+      description:
+          - PRAGMA settings applied to the connection before running the queries, e.g. journal_mode, synchronous, cache_size.
+      type: dict
+      required: false
 author:
     - Chad Phillips (@thehunmonkgroup)
 """
@@ -53,6 +101,31 @@ EXAMPLES = r"""
       query_params:
         - ["value1", "value2"]
         - ["new_value", 1]
+
+  - name: Bulk insert rows
+    lwe_sqlite_query:
+      db: "/path/to/your/database.db"
+      query: "INSERT INTO table1 (column1, column2) VALUES (?, ?)"
+      executemany: true
+      query_params: "{{ rows }}"
+      pragmas:
+        journal_mode: WAL
+        synchronous: NORMAL
+
+  - name: Get the next page of rows
+    lwe_sqlite_query:
+      db: "/path/to/your/database.db"
+      query: "SELECT * FROM table1"
+      keyset_column: id
+      after: "{{ previous_page.next_cursor }}"
+      limit: 1000
+    register: page
+
+  - name: Export a large table to a file
+    lwe_sqlite_query:
+      db: "/path/to/your/database.db"
+      query: "SELECT * FROM table1"
+      output_file: "/tmp/table1.jsonl"
 """
 
 RETURN = r"""
@@ -64,80 +137,305 @@ RETURN = r"""
       description: The total number of rows affected or returned from all queries.
       type: int
       returned: success
+  next_offset:
+      description: Offset of the next page, or None if this was the last page.
+      type: int
+      returned: when limit is set without keyset_column
+  next_cursor:
+      description: Value to pass as after to get the next page, or None if this was the last page.
+      type: raw
+      returned: when keyset_column is set
+  output_file:
+      description: The file the rows were written to.
+      type: str
+      returned: when output_file is set
 """
 
+FETCH_SIZE = 1000
+OUTPUT_FORMATS = ("jsonl", "csv")
+IDENTIFIER_REGEX = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+PRAGMA_VALUE_REGEX = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def connect(db, pragmas=None):
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    for name, value in (pragmas or {}).items():
+        log.debug(f"Setting PRAGMA {name} = {value}")
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
 
-def run_single_query(cursor, query, params=()):
-    cursor.execute(query, params)
-    if not query.lower().strip().startswith(("select")):
+def paginate_query(query, params, limit=None, offset=None, keyset_column=None, after=None):
+    """
+    Wrap a SELECT query to return a single page of rows.
+
+    :returns: Tuple of paged query and params
+    :rtype: tuple
+    """
+    if not limit:
+        return query, params
+    params = list(params)
+    if keyset_column:
+        where = ""
+        if after is not None:
+            where = f' WHERE "{keyset_column}" > ?'
+            params.append(after)
+        query = f'SELECT * FROM ({query}){where} ORDER BY "{keyset_column}" LIMIT ?'
+        params.append(limit)
+    else:
+        query = f"SELECT * FROM ({query}) LIMIT ? OFFSET ?"
+        params.extend([limit, offset or 0])
+    return query, params
+
+
+def iter_rows(cursor):
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        yield from rows
+
+
+def write_rows(cursor, output_file, output_format):
+    """
+    Stream query rows to a file.
+
+    :returns: Number of rows written, and the last row
+    :rtype: tuple
+    """
+    columns = [column[0] for column in cursor.description]
+    row_count = 0
+    last_row = None
+    with open(output_file, "w", newline="") as f:
+        if output_format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        for row in iter_rows(cursor):
+            if output_format == "csv":
+                writer.writerow(tuple(row))
+            else:
+                f.write(json.dumps(dict(row), default=str) + "\n")
+            row_count += 1
+            last_row = row
+    return row_count, last_row
+
+
+def check_keyset_column(cursor, keyset_column):
+    """
+    Check the keyset column is selected by the query, so the next cursor can be read from it.
+
+    :raises ValueError: If the column is not in the query results
+    """
+    if not keyset_column:
+        return
+    columns = [column[0].lower() for column in cursor.description]
+    if keyset_column.lower() not in columns:
+        raise ValueError(f"keyset_column {keyset_column!r} is not selected by the query")
+
+
+def run_single_query(cursor, query, params=(), executemany=False):
+    if executemany:
+        cursor.executemany(query, params)
+    else:
+        cursor.execute(query, params)
+    if cursor.description is None:
         return [], cursor.rowcount
-    data = [dict(row) for row in cursor.fetchall()]
+    data = [dict(row) for row in iter_rows(cursor)]
     return data, len(data)
 
 
-def run_query(db, query, params=()):
-    conn = sqlite3.connect(db)
-    conn.row_factory = sqlite3.Row
+def get_output_format(output_file, output_format=None):
+    if output_format:
+        return output_format.lower()
+    return "csv" if os.path.splitext(output_file)[1].lower() == ".csv" else "jsonl"
+
+
+def run_query(
+    db,
+    query,
+    params=(),
+    executemany=False,
+    limit=None,
+    offset=None,
+    keyset_column=None,
+    after=None,
+    output_file=None,
+    output_format=None,
+    pragmas=None,
+):
+    """
+    Run a query, or multiple queries in a transaction.
+
+    :returns: Result dict with data and row_count, plus pagination and output file details
+    :rtype: dict
+    """
+    conn = connect(db, pragmas)
     cursor = conn.cursor()
-    total_data = []
-    total_row_count = 0
+    result = {"data": [], "row_count": 0}
     try:
         if isinstance(query, str):
-            data, row_count = run_single_query(cursor, query, params)
-            total_data.extend(data)
-            total_row_count += row_count
+            if limit or output_file:
+                query, params = paginate_query(query, params, limit, offset, keyset_column, after)
+                cursor.execute(query, params)
+                check_keyset_column(cursor, keyset_column)
+                if output_file:
+                    row_count, last_row = write_rows(
+                        cursor, output_file, get_output_format(output_file, output_format)
+                    )
+                    result["output_file"] = output_file
+                else:
+                    rows = cursor.fetchall()
+                    result["data"] = [dict(row) for row in rows]
+                    row_count, last_row = len(rows), rows[-1] if rows else None
+                result["row_count"] = row_count
+                if limit:
+                    has_more = row_count == limit
+                    if keyset_column:
+                        result["next_cursor"] = last_row[keyset_column] if has_more else None
+                    else:
+                        result["next_offset"] = (offset or 0) + row_count if has_more else None
+            else:
+                data, row_count = run_single_query(cursor, query, params, executemany)
+                result["data"] = data
+                result["row_count"] = row_count
             conn.commit()
         else:
             conn.execute('BEGIN TRANSACTION')
             for q, p in zip(query, params):
-                data, row_count = run_single_query(cursor, q, p)
-                total_data.extend(data)
-                total_row_count += row_count
+                data, row_count = run_single_query(cursor, q, p, executemany)
+                result["data"].extend(data)
+                result["row_count"] += row_count
             conn.commit()
     except Exception as e:
         conn.rollback()
         raise e
     finally:
         conn.close()
-    return total_data, total_row_count
+    return result
+
+
+def validate_query(query, query_params, executemany=False, **options):
+    """
+    Validate query and query parameter arguments.
+
+    :param query: A query, or list of queries
+    :type query: str | list
+    :param query_params: Query parameters, or a list of parameter lists
+    :type query_params: list
+    :param executemany: Whether params are lists of parameter lists, for bulk execution
+    :type executemany: bool
+    :param options: Pagination, output file and pragma options
+    :returns: Error message, or None if valid
+    :rtype: str | None
+    """
+    if isinstance(query, list):
+        if not isinstance(query_params, list):
+            return "query_params must be a list when query is a list"
+        if len(query) != len(query_params):
+            return "query and query_params must have the same length"
+        if not all(isinstance(p, list) for p in query_params):
+            return "Each item in query_params must be a list when query is a list"
+        if executemany and not all(
+            isinstance(item, (list, dict)) for p in query_params for item in p
+        ):
+            return "Each item in query_params must be a list of parameter lists with executemany"
+        if any(options.get(key) for key in ("limit", "keyset_column", "output_file")):
+            return "limit, keyset_column and output_file require a single query"
+    elif not isinstance(query_params, list):
+        return "query_params must be a list"
+    elif executemany:
+        if not all(isinstance(p, (list, dict)) for p in query_params):
+            return "query_params must be a list of parameter lists with executemany"
+        if any(options.get(key) for key in ("limit", "keyset_column", "output_file")):
+            return "limit, keyset_column and output_file can't be used with executemany"
+    output_format = options.get("output_format")
+    if output_format and output_format.lower() not in OUTPUT_FORMATS:
+        return f"output_format must be one of: {', '.join(OUTPUT_FORMATS)}"
+    return validate_pagination(**options) or validate_pragmas(options.get("pragmas"))
+
+
+def validate_pagination(limit=None, offset=None, keyset_column=None, **_options):
+    """
+    Validate limit, offset and keyset pagination arguments.
+
+    :returns: Error message, or None if valid
+    :rtype: str | None
+    """
+    if keyset_column:
+        if not limit:
+            return "keyset_column requires limit"
+        if offset:
+            return "offset can't be used with keyset_column"
+        if not IDENTIFIER_REGEX.match(keyset_column):
+            return f"Invalid keyset_column: {keyset_column}"
+    if offset and not limit:
+        return "offset requires limit"
+    return None
+
+
+def validate_pragmas(pragmas):
+    """
+    Validate PRAGMA names and values, which can't be bound as query parameters.
+
+    :returns: Error message, or None if valid
+    :rtype: str | None
+    """
+    for name, value in (pragmas or {}).items():
+        if not IDENTIFIER_REGEX.match(str(name)) or not PRAGMA_VALUE_REGEX.match(str(value)):
+            return f"Invalid PRAGMA: {name} = {value}"
+    return None
+
+
+MODULE_ARGS = dict(
+    db=dict(type="str", required=True),
+    query=dict(type="raw", required=True),
+    query_params=dict(type="raw", required=False, default=[]),
+    executemany=dict(type="bool", required=False, default=False),
+    limit=dict(type="int", required=False),
+    offset=dict(type="int", required=False),
+    keyset_column=dict(type="str", required=False),
+    after=dict(type="raw", required=False),
+    output_file=dict(type="str", required=False),
+    output_format=dict(type="str", required=False, choices=list(OUTPUT_FORMATS)),
+    pragmas=dict(type="dict", required=False),
+)
 
 
 def main():
     result = dict(changed=False, response=dict())
 
     module = AnsibleModule(
-        argument_spec=dict(
-            db=dict(type="str", required=True),
-            query=dict(type="raw", required=True),
-            query_params=dict(type="raw", required=False, default=[]),
-        ),
+        argument_spec=MODULE_ARGS,
         supports_check_mode=True,
     )
     db = module.params["db"]
     query = module.params["query"]
     query_params = module.params["query_params"]
+    options = {
+        key: module.params[key]
+        for key in (
+            "limit",
+            "offset",
+            "keyset_column",
+            "after",
+            "output_file",
+            "output_format",
+            "pragmas",
+        )
+    }
 
     if module.check_mode:
         module.exit_json(**result)
 
-    # Validate input
-    if isinstance(query, list):
-        if not isinstance(query_params, list):
-            module.fail_json(msg="query_params must be a list when query is a list")
-        if len(query) != len(query_params):
-            module.fail_json(msg="query and query_params must have the same length")
-        if not all(isinstance(p, list) for p in query_params):
-            module.fail_json(msg="Each item in query_params must be a list when query is a list")
-    else:
-        if not isinstance(query_params, list):
-            module.fail_json(msg="query_params must be a list")
+    error = validate_query(query, query_params, module.params["executemany"], **options)
+    if error:
+        module.fail_json(msg=error)
 
     try:
         log.debug(f"Running query on database: {db}: query: {query}, params: {query_params}")
-        data, row_count = run_query(db, query, query_params)
+        result.update(run_query(db, query, query_params, module.params["executemany"], **options))
         result["changed"] = True
-        result["data"] = data
-        result["row_count"] = row_count
         module.exit_json(**result)
     except Exception as e:
         result["failed"] = True
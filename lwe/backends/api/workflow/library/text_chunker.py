@@ -0,0 +1,118 @@
+#!/usr/bin/python
+
+from ansible.module_utils.basic import AnsibleModule
+
+from lwe.core.config import Config
+from lwe.core.logger import Logger
+from lwe.core.text_chunker import TextChunker, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
+
+config = Config()
+config.set("debug.log.enabled", True)
+log = Logger("text_chunker", config)
+
+DOCUMENTATION = r"""
+---
+module: text_chunker
+short_description: Split text into chunks of a maximum number of tokens
+description:
+    - Splits text on markdown headings and paragraphs where possible, and on token boundaries otherwise.
+    - Tokens are counted with tiktoken, using the encoding of the given model.
+options:
+    content:
+      description:
+          - The text to split.
+      type: str
+      required: true
+    chunk_size:
+      description:
+          - Maximum number of tokens per chunk.
+      type: int
+      default: 2000
+    overlap:
+      description:
+          - Number of tokens from the end of each chunk repeated at the start of the next.
+      type: int
+      default: 200
+    model:
+      description:
+          - Model to count tokens for, the cl100k_base encoding is used if not provided.
+      type: str
+      required: false
+author:
+    - Chad Phillips (@thehunmonkgroup)
+"""
+
+EXAMPLES = r"""
+  - name: Extract content from a large PDF
+    text_extractor:
+      path: "/path/to/your/book.pdf"
+    register: extracted
+
+  - name: Split the content into chunks
+    text_chunker:
+      content: "{{ extracted.content }}"
+      chunk_size: 3000
+      overlap: 100
+    register: chunked
+
+  - name: Summarize each chunk
+    lwe_llm_batch:
+      template: summarize-section.md
+      items: "{{ chunked.chunks }}"
+"""
+
+RETURN = r"""
+  chunks:
+      description: The chunks, in order.
+      type: list
+      returned: success
+      contains:
+          index:
+              description: Index of the chunk.
+              type: int
+          content:
+              description: Text of the chunk.
+              type: str
+          tokens:
+              description: Approximate number of tokens in the chunk.
+              type: int
+  chunk_count:
+      description: The number of chunks.
+      type: int
+      returned: success
+"""
+
+
+MODULE_ARGS = dict(
+    content=dict(type="str", required=True),
+    chunk_size=dict(type="int", default=DEFAULT_CHUNK_SIZE),
+    overlap=dict(type="int", default=DEFAULT_CHUNK_OVERLAP),
+    model=dict(type="str", required=False),
+)
+
+
+def main():
+    result = dict(changed=False, chunks=[], chunk_count=0)
+    module = AnsibleModule(
+        argument_spec=MODULE_ARGS,
+        supports_check_mode=True,
+    )
+    try:
+        chunker = TextChunker(
+            module.params["chunk_size"],
+            module.params["overlap"],
+            model_name=module.params["model"],
+        )
+        chunks = chunker.chunk(module.params["content"])
+    except Exception as e:
+        message = f"Failed to chunk content: {e}"
+        log.error(message)
+        module.fail_json(msg=message, **result)
+    log.info(f"Split content into {len(chunks)} chunks")
+    result["chunks"] = chunks
+    result["chunk_count"] = len(chunks)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,16 @@
 
 import os
 import re
+import math
+import hashlib
+import mimetypes
 import requests
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version, PackageNotFoundError
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 
 import kreuzberg
 import pymupdf4llm
@@ -15,6 +22,7 @@ from ansible.module_utils.basic import AnsibleModule
 
 from lwe.core.config import Config
 from lwe.core.logger import Logger
+from lwe.core.extraction_cache import ExtractionCache, hash_file
 
 config = Config()
 config.set("debug.log.enabled", True)
@@ -68,6 +76,8 @@ short_description: Extract text content from a file or URL
 description:
     - This module extracts the main text content from a given file or URL
     - For URLs, it extracts the main text content from the page, excluding header and footer.
+    - URLs are streamed to disk, and their file type is detected from the Content-Type header.
+    - With the cache enabled, downloads are kept and revalidated with conditional requests.
     - For files, see the SUPPORTED_FILE_EXTENSIONS variables in the module code.
 options:
     path:
@@ -85,6 +95,38 @@ options:
           - Default file extension to use if the file has no extension.
       type: str
       default: ".pdf"
+    use_cache:
+      description:
+          - Use the extraction cache, which returns previously extracted content for unchanged files and URLs.
+      type: bool
+      default: true
+    max_download_size:
+      description:
+          - Maximum size in bytes of a URL download, larger downloads fail.
+      type: int
+      default: 104857600
+    pages:
+      description:
+          - Only extract these pages, numbered from 1. Only supported for PDF and similar documents.
+      type: list
+      elements: int
+      required: false
+    page_range:
+      description:
+          - Only extract these pages, as a comma separated list of page numbers and ranges, e.g. "1-5,8,10-".
+          - Only supported for PDF and similar documents.
+      type: str
+      required: false
+    early_stop:
+      description:
+          - With max_length, extract PDF pages a few at a time, and stop once max_length is reached.
+      type: bool
+      default: false
+    workers:
+      description:
+          - Number of processes to extract PDF pages with. Pages are extracted in chunks and reassembled in order.
+      type: int
+      default: 1
 author:
     - Chad Phillips (@thehunmonkgroup)
 """
@@ -99,6 +141,18 @@ EXAMPLES = r"""
       path: "https://example.com/sample.html"
       max_length: 3000
 
+  - name: Extract the first 5000 characters of a large PDF
+    text_extractor:
+      path: "/path/to/your/book.pdf"
+      max_length: 5000
+      early_stop: true
+
+  - name: Extract the first chapter of a large PDF using all cores
+    text_extractor:
+      path: "/path/to/your/book.pdf"
+      page_range: "1-40"
+      workers: 8
+
   - name: Extract content from a file with no extension
     text_extractor:
       path: "/path/to/your/file"
@@ -117,74 +171,299 @@ RETURN = r"""
 """
 
 
-def extract_text_pymupdf(path):
-    return pymupdf4llm.to_markdown(path)
+DEFAULT_MAX_DOWNLOAD_SIZE = 100 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_POOL_SIZE = 10
 
+CONTENT_TYPE_EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "application/epub+zip": ".epub",
+    "application/xhtml+xml": ".xhtml",
+    "application/xml": ".xml",
+    "application/rtf": ".rtf",
+    "text/html": ".html",
+    "text/plain": ".txt",
+    "text/markdown": ".md",
+    "text/csv": ".csv",
+    "text/xml": ".xml",
+    "message/rfc822": ".eml",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": ".pptx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": ".xlsx",
+    "application/vnd.oasis.opendocument.text": ".odt",
+    "application/vnd.oasis.opendocument.spreadsheet": ".ods",
+    "application/vnd.oasis.opendocument.presentation": ".odp",
+}
 
-def extract_text_kreuzberg(path):
-    return kreuzberg.extract_file_sync(path)
+session = None
+session_lock = threading.Lock()
 
+EARLY_STOP_PAGE_BATCH_SIZE = 4
+CHUNKS_PER_WORKER = 2
 
-def get_file_extension(path, default_extension):
-    file_extension = default_extension
-    for ext in set(KREUZBERG_SUPPORTED_FILE_EXTENSIONS + PYMUPDF_SUPPORTED_EXTENSIONS):
-        if path.lower().endswith(ext):
-            file_extension = ext
-            break
-    return file_extension
+EXTRACTOR_PACKAGES = {
+    "pymupdf4llm": "pymupdf4llm",
+    "kreuzberg": "kreuzberg",
+    "utf8": None,
+}
 
 
-def main():
-    result = dict(changed=False, response=dict())
-    module = AnsibleModule(
-        argument_spec=dict(
-            path=dict(type="path", required=True),
-            max_length=dict(type="int", required=False),
-            default_extension=dict(type="str", default=".pdf"),
-        ),
-        supports_check_mode=True,
-    )
-    path = module.params["path"]
-    max_length = module.params["max_length"]
-    default_extension = module.params["default_extension"].lower()
-    if not default_extension.startswith("."):
-        default_extension = f".{default_extension}"
+def get_extractor_version(extractor):
+    package = EXTRACTOR_PACKAGES.get(extractor)
+    if package is None:
+        return "1"
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
 
-    if module.check_mode:
-        module.exit_json(**result)
 
-    parsed_url = urlparse(path)
-    is_url = parsed_url.scheme in ["http", "https"]
-    cleanup_tmpfile_path = None
-    if is_url:
-        log.debug(f"Downloading content from URL: {path}")
-        try:
-            response = requests.get(path)
+def get_session():
+    """
+    Get the shared HTTP session, so repeated downloads reuse pooled connections.
+
+    :returns: The session
+    :rtype: requests.Session
+    """
+    global session
+    with session_lock:
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=DOWNLOAD_POOL_SIZE, pool_maxsize=DOWNLOAD_POOL_SIZE
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return session
+
+
+def get_url_extension(url, content_type=None):
+    """
+    Get the file extension for downloaded content.
+
+    Uses the Content-Type header if it maps to a supported file type, then the
+    extension of the URL path, and falls back to HTML.
+
+    :param url: The URL
+    :type url: str
+    :param content_type: The Content-Type header of the response
+    :type content_type: str, optional
+    :returns: File extension
+    :rtype: str
+    """
+    supported = KREUZBERG_SUPPORTED_FILE_EXTENSIONS + PYMUPDF_SUPPORTED_EXTENSIONS
+    if content_type:
+        mime_type = content_type.split(";")[0].strip().lower()
+        extension = CONTENT_TYPE_EXTENSIONS.get(mime_type) or mimetypes.guess_extension(mime_type)
+        if extension in supported:
+            return extension
+    url_extension = os.path.splitext(urlparse(url).path)[1].lower()
+    if url_extension in supported:
+        return url_extension
+    return ".html"
+
+
+def download_url(url, max_size=DEFAULT_MAX_DOWNLOAD_SIZE, cached=None, directory=None):
+    """
+    Stream a URL to a file.
+
+    :param url: The URL
+    :type url: str
+    :param max_size: Maximum size of the download in bytes
+    :type max_size: int
+    :param cached: Record of a previous download, revalidated with a conditional request
+    :type cached: dict, optional
+    :param directory: Directory to download to, the system temp directory if not provided
+    :type directory: str, optional
+    :returns: success, download record with path, etag, last_modified, extension, sha256
+              and not_modified, user message
+    :rtype: tuple
+    """
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    tmpfile_path = None
+    try:
+        with get_session().get(
+            url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            if cached and response.status_code == 304:
+                log.debug(f"Using cached download of URL: {url}")
+                return True, {**cached, "not_modified": True}, "Not modified"
             response.raise_for_status()
-            content = response.text
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html") as f:
-                f.write(content)
-                path = cleanup_tmpfile_path = f.name
-        except Exception as e:
-            message = f"Error downloading content from URL {path}: {str(e)}"
-            log.error(message)
-            module.fail_json(msg=message)
-    if not os.access(path, os.R_OK):
-        message = f"File not found or not readable: {path}"
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit() and int(content_length) > max_size:
+                raise ValueError(f"Content-Length {content_length} exceeds {max_size} bytes")
+            extension = get_url_extension(url, response.headers.get("Content-Type"))
+            digest = hashlib.sha256()
+            size = 0
+            with tempfile.NamedTemporaryFile(
+                mode="wb", delete=False, suffix=extension, dir=directory
+            ) as f:
+                tmpfile_path = f.name
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise ValueError(f"Download exceeds {max_size} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+            record = {
+                "path": tmpfile_path,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "extension": extension,
+                "sha256": digest.hexdigest(),
+                "not_modified": False,
+            }
+    except Exception as e:
+        if tmpfile_path and os.path.exists(tmpfile_path):
+            os.remove(tmpfile_path)
+        message = f"Error downloading content from URL {url}: {str(e)}"
         log.error(message)
-        module.fail_json(msg=message)
+        return False, None, message
+    log.debug(f"Downloaded {size} bytes from URL: {url}")
+    return True, record, "Downloaded successfully"
 
-    file_extension = get_file_extension(path, default_extension)
 
-    if file_extension in PYMUPDF_SUPPORTED_EXTENSIONS:
+def parse_page_range(page_range, page_count):
+    """
+    Parse a page range string into page numbers.
+
+    :param page_range: Comma separated page numbers and ranges, e.g. "1-5,8,10-"
+    :type page_range: str
+    :param page_count: Number of pages in the document
+    :type page_count: int
+    :returns: Page numbers, numbered from 1
+    :rtype: list
+    :raises ValueError: If the range is invalid
+    """
+    pages = []
+    for part in page_range.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            start = parse_page_number(start, part) if start.strip() else 1
+            end = parse_page_number(end, part) if end.strip() else page_count
+            if start > end:
+                raise ValueError(f"Invalid page range {part!r}: start page is after end page")
+            pages.extend(range(start, end + 1))
+        else:
+            pages.append(parse_page_number(part, part))
+    return pages
+
+
+def parse_page_number(value, part):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid page range {part!r}: {value.strip()!r} is not a page number")
+
+
+def get_page_count(path):
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def resolve_pages(path, pages=None, page_range=None):
+    """
+    Resolve the requested pages of a document to zero-based page indexes.
+
+    Pages are always extracted in document order.
+
+    :returns: Page indexes, or None for all pages
+    :rtype: list | None
+    :raises ValueError: If a requested page doesn't exist
+    """
+    if not pages and not page_range:
+        return None
+    page_count = get_page_count(path)
+    pages = list(pages) if pages else parse_page_range(page_range, page_count)
+    for page in pages:
+        if page < 1 or page > page_count:
+            raise ValueError(f"Page {page} out of range, document has {page_count} pages")
+    return sorted({page - 1 for page in pages})
+
+
+def extract_pages_pymupdf(path, pages):
+    return pymupdf4llm.to_markdown(path, pages=pages)
+
+
+def extract_text_pymupdf(path, pages=None, stop_at=None, workers=1):
+    """
+    Extract the text content of a document with pymupdf4llm.
+
+    Pages are extracted in chunks when stopping early or using multiple
+    worker processes, and the chunks are reassembled in page order.
+
+    :param path: Path to the document
+    :type path: str
+    :param pages: Zero-based page indexes to extract, all pages if not provided
+    :type pages: list, optional
+    :param stop_at: Stop extracting once the content reaches this length
+    :type stop_at: int, optional
+    :param workers: Number of worker processes
+    :type workers: int
+    :returns: The content, and whether all requested pages were extracted
+    :rtype: tuple
+    """
+    workers = max(1, workers or 1)
+    if not stop_at and workers == 1:
+        return extract_pages_pymupdf(path, pages), True
+    if pages is None:
+        pages = list(range(get_page_count(path)))
+    if stop_at:
+        chunk_size = EARLY_STOP_PAGE_BATCH_SIZE
+    else:
+        chunk_size = max(1, math.ceil(len(pages) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [pages[i : i + chunk_size] for i in range(0, len(pages), chunk_size)]
+    executor = None
+    if workers > 1 and len(chunks) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+        results = executor.map(extract_pages_pymupdf, [path] * len(chunks), chunks)
+    else:
+        results = (extract_pages_pymupdf(path, chunk) for chunk in chunks)
+    parts = []
+    length = 0
+    try:
+        for part in results:
+            parts.append(part)
+            length += len(part)
+            if stop_at and length >= stop_at:
+                break
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    log.debug(f"Extracted {len(parts)} of {len(chunks)} page chunks from {path}")
+    return "".join(parts), len(parts) == len(chunks)
+
+
+def extract_text_kreuzberg(path):
+    return kreuzberg.extract_file_sync(path)
+
+
+def run_extractor(path, extractor, file_extension, pages=None, stop_at=None, workers=1):
+    """
+    Extract the text content from a local file with the given extractor.
+
+    :returns: success, content and whether it is complete, user message
+    :rtype: tuple
+    """
+    complete = True
+    if extractor == "pymupdf4llm":
         log.debug(f"Extracting content from {path} with pymupdf4llm")
         try:
-            content = extract_text_pymupdf(path)
+            content, complete = extract_text_pymupdf(path, pages, stop_at, workers)
         except Exception as e:
             message = f"Error extracting {path} content with pymupdf4llm: {str(e)}"
             log.error(message)
-            module.fail_json(msg=message)
-    elif file_extension in KREUZBERG_SUPPORTED_FILE_EXTENSIONS:
+            return False, None, message
+    elif extractor == "kreuzberg":
         log.debug(f"Extracting content from {path} with kreuzberg")
         try:
             extraction = extract_text_kreuzberg(path)
@@ -192,21 +471,247 @@ def main():
         except Exception as e:
             message = f"Error extracting {file_extension} content with kreuzberg: {str(e)}"
             log.error(message)
-            module.fail_json(msg=message)
+            return False, None, message
     else:
         log.warning(f"Unsupported file extension: {file_extension}, trying to read as UTF-8")
         # Last ditch, try to read the file as UTF-8.
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
             # Get rid of any non-ascii characters.
             content = re.sub(r"[^\x00-\x7F]+", "", f.read())
+    return True, (content, complete), "Content extracted successfully"
+
+
+def get_file_extension(path, default_extension):
+    file_extension = default_extension
+    for ext in set(KREUZBERG_SUPPORTED_FILE_EXTENSIONS + PYMUPDF_SUPPORTED_EXTENSIONS):
+        if path.lower().endswith(ext):
+            file_extension = ext
+            break
+    return file_extension
+
+
+def download_url_cached(url, max_download_size=DEFAULT_MAX_DOWNLOAD_SIZE, cache=None):
+    """
+    Download a URL, reusing the cached download if the server reports it unchanged.
+
+    :returns: success, download record with an added cached flag, user message
+    :rtype: tuple
+    """
+    if not cache or not cache.enabled:
+        log.debug(f"Downloading content from URL: {url}")
+        success, download, user_message = download_url(url, max_download_size)
+        if success:
+            download["cached"] = False
+        return success, download, user_message
+    cached = cache.get_download(url)
+    log.debug(f"Downloading content from URL: {url}, conditional: {cached is not None}")
+    success, download, user_message = download_url(
+        url, max_download_size, cached, cache.make_download_dir()
+    )
+    if success:
+        if not download["not_modified"]:
+            record = {k: download[k] for k in ("etag", "last_modified", "extension", "sha256")}
+            download["path"] = cache.set_download(url, download["path"], record)
+        download["cached"] = download["path"] == cache.download_paths(url)[1]
+    return success, download, user_message
+
+
+def select_extractor(path, file_extension, pages=None, page_range=None):
+    """
+    Choose the extractor for a file, and resolve the pages to extract.
+
+    :returns: success, (extractor, page indexes) tuple, user message
+    :rtype: tuple
+    """
+    if file_extension in PYMUPDF_SUPPORTED_EXTENSIONS:
+        extractor = "pymupdf4llm"
+    elif file_extension in KREUZBERG_SUPPORTED_FILE_EXTENSIONS:
+        extractor = "kreuzberg"
+    else:
+        extractor = "utf8"
+    page_indexes = None
+    if pages or page_range:
+        if extractor != "pymupdf4llm":
+            message = f"Page selection is not supported for {file_extension} files"
+            log.error(message)
+            return False, None, message
+        try:
+            page_indexes = resolve_pages(path, pages, page_range)
+        except Exception as e:
+            message = f"Invalid page selection for {path}: {str(e)}"
+            log.error(message)
+            return False, None, message
+    return True, (extractor, page_indexes), f"Using {extractor} extractor"
+
+
+def run_extractor_cached(
+    path,
+    extractor,
+    file_extension,
+    page_indexes=None,
+    stop_at=None,
+    workers=1,
+    cache=None,
+    source_key=None,
+):
+    """
+    Run an extractor, reusing a cached extraction of the same content.
+
+    Extractions stopped early are not cached.
+
+    :returns: success, content, user message
+    :rtype: tuple
+    """
+    cache_key = None
+    if cache and cache.enabled:
+        source_key = source_key or f"sha256:{hash_file(path)}"
+        if page_indexes is not None:
+            source_key += f":pages={','.join(str(i) for i in page_indexes)}"
+        cache_key = cache.make_key(source_key, extractor, get_extractor_version(extractor))
+        content = cache.get(cache_key)
+        if content is not None:
+            log.debug(f"Using cached extraction of {path}")
+            return True, content, "Using cached extraction"
+    success, response, user_message = run_extractor(
+        path, extractor, file_extension, page_indexes, stop_at, workers
+    )
+    if not success:
+        return False, None, user_message
+    content, complete = response
+    if cache_key and complete:
+        cache.set(cache_key, content)
+    return True, content, user_message
+
+
+def extract_content(
+    path,
+    max_length=None,
+    default_extension=".pdf",
+    cache=None,
+    pages=None,
+    page_range=None,
+    early_stop=False,
+    workers=1,
+    max_download_size=DEFAULT_MAX_DOWNLOAD_SIZE,
+):
+    """
+    Extract the text content from a file or URL.
+
+    :param path: Path to the file, or an http(s) URL
+    :type path: str
+    :param max_length: Maximum length of the returned content
+    :type max_length: int, optional
+    :param default_extension: Extension to assume when the path has no supported extension
+    :type default_extension: str
+    :param cache: Cache for extracted content, no caching if not provided
+    :type cache: ExtractionCache, optional
+    :param pages: Pages to extract, numbered from 1, PDF and similar documents only
+    :type pages: list, optional
+    :param page_range: Pages to extract as a range string, e.g. "1-5,8,10-"
+    :type page_range: str, optional
+    :param early_stop: Stop extracting pages once max_length is reached
+    :type early_stop: bool
+    :param workers: Number of processes to extract pages with
+    :type workers: int
+    :param max_download_size: Maximum size in bytes of a URL download
+    :type max_download_size: int
+    :returns: success, content, user message
+    :rtype: tuple
+    """
+    default_extension = default_extension.lower()
+    if not default_extension.startswith("."):
+        default_extension = f".{default_extension}"
+    parsed_url = urlparse(path)
+    is_url = parsed_url.scheme in ["http", "https"]
+    cleanup_tmpfile_path = None
+    source_key = None
+    try:
+        if is_url:
+            success, download, user_message = download_url_cached(path, max_download_size, cache)
+            if not success:
+                return False, None, user_message
+            if not download["cached"]:
+                cleanup_tmpfile_path = download["path"]
+            path = download["path"]
+            default_extension = download["extension"]
+            source_key = f"sha256:{download['sha256']}"
+        if not os.access(path, os.R_OK):
+            message = f"File not found or not readable: {path}"
+            log.error(message)
+            return False, None, message
+
+        file_extension = get_file_extension(path, default_extension)
+        success, response, user_message = select_extractor(path, file_extension, pages, page_range)
+        if not success:
+            return False, None, user_message
+        extractor, page_indexes = response
+        stop_at = max_length if early_stop else None
+        success, content, user_message = run_extractor_cached(
+            path, extractor, file_extension, page_indexes, stop_at, workers, cache, source_key
+        )
+        if not success:
+            return False, None, user_message
+    finally:
+        if cleanup_tmpfile_path:
+            os.remove(cleanup_tmpfile_path)
 
     if max_length:
         content = content[:max_length]
-    if cleanup_tmpfile_path:
-        os.remove(cleanup_tmpfile_path)
+    log.info("Content extracted successfully")
+    return True, content, "Content extracted successfully"
+
+
+MODULE_ARGS = dict(
+    path=dict(type="path", required=True),
+    max_length=dict(type="int", required=False),
+    default_extension=dict(type="str", default=".pdf"),
+    use_cache=dict(type="bool", default=True),
+    max_download_size=dict(type="int", default=DEFAULT_MAX_DOWNLOAD_SIZE),
+    pages=dict(type="list", elements="int", required=False),
+    page_range=dict(type="str", required=False),
+    early_stop=dict(type="bool", default=False),
+    workers=dict(type="int", default=1),
+)
+MUTUALLY_EXCLUSIVE = [("pages", "page_range")]
+
+
+def main():
+    result = dict(changed=False, response=dict())
+    module = AnsibleModule(
+        argument_spec=MODULE_ARGS,
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        supports_check_mode=True,
+    )
+    path = module.params["path"]
+    max_length = module.params["max_length"]
+    default_extension = module.params["default_extension"]
+
+    if module.check_mode:
+        module.exit_json(**result)
+
+    cache = None
+    if module.params["use_cache"]:
+        cache_config = Config(
+            config_dir=os.environ.get("LWE_CONFIG_DIR", None),
+            data_dir=os.environ.get("LWE_DATA_DIR", None),
+        )
+        cache_config.load_from_file()
+        cache = ExtractionCache(cache_config)
+    success, content, user_message = extract_content(
+        path,
+        max_length,
+        default_extension,
+        cache,
+        pages=module.params["pages"],
+        page_range=module.params["page_range"],
+        early_stop=module.params["early_stop"],
+        workers=module.params["workers"],
+        max_download_size=module.params["max_download_size"],
+    )
+    if not success:
+        module.fail_json(msg=user_message)
     result["content"] = content
     result["length"] = len(content)
-    log.info("Content extracted successfully")
     module.exit_json(**result)
 
 
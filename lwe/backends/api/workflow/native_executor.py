@@ -0,0 +1,788 @@
+import os
+import re
+import time
+import shlex
+import importlib
+import contextlib
+
+import yaml
+
+from jinja2 import Environment, StrictUndefined, TemplateError
+from rich.markup import escape
+
+from lwe.core.config import Config
+from lwe.core.logger import Logger
+from lwe.core.extraction_cache import ExtractionCache
+from lwe.core.text_chunker import TextChunker
+import lwe.core.util as util
+
+BUILTIN_PREFIX = "ansible.builtin."
+SUPPORTED_HOSTS = ("localhost", "127.0.0.1")
+SUPPORTED_PLAY_KEYS = {"name", "hosts", "gather_facts", "vars", "tasks"}
+SUPPORTED_TASK_KEYS = {
+    "name",
+    "register",
+    "when",
+    "loop",
+    "loop_control",
+    "vars",
+    "until",
+    "retries",
+    "delay",
+    "ignore_errors",
+}
+SUPPORTED_LOOP_CONTROL_KEYS = {"loop_var", "index_var", "label"}
+SUPPORTED_LOOKUPS = ("env", "file")
+SUPPORTED_ACTIONS = (
+    "lwe_llm",
+    "lwe_llm_batch",
+    "lwe_llm_map_reduce",
+    "lwe_command",
+    "text_extractor",
+    "text_chunker",
+    "lwe_sqlite_query",
+    "set_fact",
+    "debug",
+    "include_tasks",
+    "block",
+)
+LIBRARY_ACTIONS = (
+    "lwe_llm",
+    "lwe_llm_batch",
+    "lwe_llm_map_reduce",
+    "lwe_command",
+    "text_extractor",
+    "text_chunker",
+    "lwe_sqlite_query",
+)
+DEFAULT_UNTIL_RETRIES = 3
+DEFAULT_UNTIL_DELAY = 5
+
+SINGLE_EXPRESSION_REGEX = re.compile(r"^\s*\{\{(.*?)\}\}\s*$", re.DOTALL)
+LOOKUP_REGEX = re.compile(r"lookup\(\s*['\"]([\w.]+)['\"]")
+
+
+class WorkflowTaskError(Exception):
+    pass
+
+
+class NativeWorkflowExecutor:
+    """
+    Run workflows in-process against a live backend.
+
+    Supports the subset of playbook syntax LWE workflows commonly use:
+    the lwe_llm, lwe_llm_batch, lwe_llm_map_reduce, lwe_command, text_extractor,
+    text_chunker, lwe_sqlite_query, set_fact, debug and include_tasks actions, blocks, and the register, when, loop,
+    vars, until and ignore_errors task keywords.
+
+    Workflows using anything else are reported as unsupported, so the caller
+    can fall back to running them with Ansible.
+    """
+
+    def __init__(self, backend, config=None):
+        """
+        Initializes the executor.
+
+        :param backend: The API backend requests are run against
+        :type backend: ApiBackend
+        :param config: Configuration settings. If not provided, the backend's config is used.
+        :type config: Config, optional
+        """
+        self.backend = backend
+        self.config = config or getattr(backend, "config", None) or Config()
+        self.log = Logger(self.__class__.__name__, self.config)
+        self.command_runner = None
+        self.extraction_cache = None
+        self.env = self.make_template_env()
+        self.expression_cache = {}
+        self.template_cache = {}
+
+    def set_command_runner(self, command_runner):
+        """
+        Set the callable used to run lwe_command tasks.
+
+        :param command_runner: Callable taking command and arguments, with the
+                               return signature of Repl.run_command_get_response
+        :type command_runner: callable
+        """
+        self.command_runner = command_runner
+
+    def make_template_env(self):
+        # Loading Ansible's filter and test plugins is slow, only do it when needed.
+        from ansible.plugins.filter.core import FilterModule as CoreFilters
+        from ansible.plugins.filter.mathstuff import FilterModule as MathFilters
+        from ansible.plugins.test.core import TestModule as CoreTests
+
+        env = Environment(undefined=StrictUndefined, keep_trailing_newline=True)
+        filters = {**CoreFilters().filters(), **MathFilters().filters()}
+        tests = CoreTests().tests()
+        env.filters.update(filters)
+        env.filters.update({f"{BUILTIN_PREFIX}{name}": f for name, f in filters.items()})
+        env.tests.update(tests)
+        env.tests.update({f"{BUILTIN_PREFIX}{name}": t for name, t in tests.items()})
+        env.globals["lookup"] = self.lookup
+        return env
+
+    def print_output(self, output, style="none"):
+        """
+        Print workflow output, or only log it if the backend is in return only mode.
+
+        :param output: Output
+        :type output: str
+        :param style: Rich style
+        :type style: str, optional
+        """
+        if self.backend.return_only:
+            self.log.info(output)
+            return
+        util.print_status_message(True, escape(output), style=style)
+
+    def lookup(self, name, *terms, **kwargs):
+        name = util.remove_prefix(name, BUILTIN_PREFIX)
+        values = []
+        for term in terms:
+            if name == "env":
+                values.append(os.environ.get(term, kwargs.get("default", "")))
+            elif name == "file":
+                with open(term) as f:
+                    values.append(f.read().rstrip("\n"))
+            else:
+                raise WorkflowTaskError(f"Unsupported lookup: {name}")
+        return ",".join(values)
+
+    # Templating.
+
+    def evaluate_expression(self, expression, context):
+        compiled = self.expression_cache.get(expression)
+        if compiled is None:
+            compiled = self.env.compile_expression(expression, undefined_to_none=False)
+            self.expression_cache[expression] = compiled
+        return compiled(**context)
+
+    def compile_string(self, value):
+        match = SINGLE_EXPRESSION_REGEX.match(value)
+        if match and "{{" not in match.group(1) and "{%" not in value:
+            # A lone expression keeps its native type, as in Ansible.
+            expression = match.group(1).strip()
+            compiled = self.expression_cache.get(expression)
+            if compiled is None:
+                compiled = self.env.compile_expression(expression, undefined_to_none=False)
+                self.expression_cache[expression] = compiled
+            return compiled
+        template = self.template_cache.get(value)
+        if template is None:
+            template = self.env.from_string(value)
+            self.template_cache[value] = template
+        return template.render
+
+    def render_string(self, value, context):
+        if "{{" not in value and "{%" not in value:
+            return value
+        return self.compile_string(value)(**context)
+
+    def render(self, value, context):
+        """
+        Recursively render a value with the given variables.
+
+        :param value: String, list or dict to render
+        :param context: Template variables
+        :type context: dict
+        :returns: The rendered value
+        """
+        if isinstance(value, str):
+            return self.render_string(value, context)
+        if isinstance(value, list):
+            return [self.render(item, context) for item in value]
+        if isinstance(value, dict):
+            return {key: self.render(item, context) for key, item in value.items()}
+        return value
+
+    def evaluate_conditional(self, conditional, context):
+        conditionals = conditional if isinstance(conditional, list) else [conditional]
+        for condition in conditionals:
+            if isinstance(condition, bool):
+                result = condition
+            else:
+                condition = str(condition).strip()
+                match = SINGLE_EXPRESSION_REGEX.match(condition)
+                if match:
+                    condition = match.group(1).strip()
+                result = self.evaluate_expression(condition, context)
+            if isinstance(result, str):
+                result = result.strip().lower() in ("true", "yes", "on", "1")
+            if not result:
+                return False
+        return True
+
+    # Support checks.
+
+    def get_task_action(self, task):
+        actions = [key for key in task if key not in SUPPORTED_TASK_KEYS]
+        if len(actions) != 1:
+            return None, None
+        action = actions[0]
+        return util.remove_prefix(action, BUILTIN_PREFIX), task[action]
+
+    def get_include_file(self, args, base_dir):
+        filename = args.get("file") if isinstance(args, dict) else args
+        if not isinstance(filename, str) or "{{" in filename:
+            return None
+        return filename if os.path.isabs(filename) else os.path.join(base_dir, filename)
+
+    def load_task_file(self, filepath):
+        with open(filepath) as f:
+            return yaml.safe_load(f) or []
+
+    def check_strings(self, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                self.check_strings(key)
+                self.check_strings(item)
+        elif isinstance(value, list):
+            for item in value:
+                self.check_strings(item)
+        elif isinstance(value, str) and ("{{" in value or "{%" in value):
+            if "ansible_" in value or "query(" in value:
+                raise WorkflowTaskError(f"Unsupported variable or lookup in: {value}")
+            for name in LOOKUP_REGEX.findall(value):
+                if util.remove_prefix(name, BUILTIN_PREFIX) not in SUPPORTED_LOOKUPS:
+                    raise WorkflowTaskError(f"Unsupported lookup: {name}")
+            try:
+                self.compile_string(value)
+            except TemplateError as e:
+                raise WorkflowTaskError(f"Unsupported template {value!r}: {e}")
+
+    def get_library_module(self, action):
+        if action not in LIBRARY_ACTIONS:
+            return None
+        return importlib.import_module(f"lwe.backends.api.workflow.library.{action}")
+
+    def get_task_profile(self, action, args):
+        """
+        Get the profile a task runs in, applying the module's default profile.
+
+        :param action: Task action
+        :type action: str
+        :param args: Task arguments
+        :type args: dict
+        :returns: Profile name, or None if the module takes no profile
+        :rtype: str | None
+        """
+        module = self.get_library_module(action)
+        if module is None or "profile" not in module.MODULE_ARGS:
+            return None
+        profile = args.get("profile") if isinstance(args, dict) else None
+        return profile or module.MODULE_ARGS["profile"].get("default")
+
+    def validate_module_args(self, action, args):
+        """
+        Validate task arguments against the module's argument spec.
+
+        Arguments are type coerced and defaulted the same way Ansible does
+        when it runs the module.
+
+        :param action: Task action
+        :type action: str
+        :param args: Rendered task arguments
+        :type args: dict
+        :returns: Validated arguments
+        :rtype: dict
+        """
+        module = self.get_library_module(action)
+        if module is None:
+            return args
+        from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+
+        validator = ArgumentSpecValidator(
+            module.MODULE_ARGS, mutually_exclusive=getattr(module, "MUTUALLY_EXCLUSIVE", None)
+        )
+        result = validator.validate(args)
+        if result.error_messages:
+            raise ValueError("; ".join(result.error_messages))
+        return result.validated_parameters
+
+    def check_tasks(self, tasks, base_dir, include_stack):
+        if not isinstance(tasks, list):
+            raise WorkflowTaskError("Task list has invalid format")
+        for task in tasks:
+            if not isinstance(task, dict):
+                raise WorkflowTaskError("Task has invalid format")
+            action, args = self.get_task_action(task)
+            if action not in SUPPORTED_ACTIONS:
+                raise WorkflowTaskError(f"Unsupported task keys: {', '.join(task.keys())}")
+            if action == "lwe_command" and not self.command_runner:
+                raise WorkflowTaskError("lwe_command requires a shell to run commands")
+            loop_control = task.get("loop_control", {})
+            if not isinstance(loop_control, dict) or not set(loop_control).issubset(
+                SUPPORTED_LOOP_CONTROL_KEYS
+            ):
+                raise WorkflowTaskError(f"Unsupported loop_control: {loop_control}")
+            profile = self.get_task_profile(action, args)
+            if profile and "{{" not in str(profile) and profile != self.config.profile:
+                raise WorkflowTaskError(f"Task uses a different profile: {profile}")
+            self.check_strings({key: value for key, value in task.items() if key != action})
+            if action == "block":
+                self.check_tasks(args, base_dir, include_stack)
+            elif action == "include_tasks":
+                filepath = self.get_include_file(args, base_dir)
+                if not filepath:
+                    raise WorkflowTaskError(f"Unsupported include_tasks arguments: {args}")
+                if filepath in include_stack:
+                    raise WorkflowTaskError(f"Recursive include: {filepath}")
+                if not os.path.isfile(filepath):
+                    raise WorkflowTaskError(f"Included file not found: {filepath}")
+                self.check_tasks(
+                    self.load_task_file(filepath),
+                    os.path.dirname(filepath),
+                    include_stack + [filepath],
+                )
+            else:
+                self.check_strings(args)
+
+    def check_workflow(self, workflow, workflow_file):
+        """
+        Check if a workflow can be run natively.
+
+        :param workflow: Loaded playbook
+        :type workflow: list
+        :param workflow_file: Path to the playbook file
+        :type workflow_file: str
+        :returns: success, workflow, user message
+        :rtype: tuple
+        """
+        try:
+            if not isinstance(workflow, list):
+                raise WorkflowTaskError("Workflow has invalid format")
+            for play in workflow:
+                if not isinstance(play, dict) or not set(play).issubset(SUPPORTED_PLAY_KEYS):
+                    raise WorkflowTaskError("Unsupported play keys")
+                if play.get("hosts", "localhost") not in SUPPORTED_HOSTS:
+                    raise WorkflowTaskError(f"Unsupported hosts: {play.get('hosts')}")
+                self.check_strings(play.get("vars", {}))
+                self.check_tasks(
+                    play.get("tasks", []), os.path.dirname(workflow_file), [workflow_file]
+                )
+        except (WorkflowTaskError, OSError, yaml.YAMLError) as e:
+            message = f"Workflow can't be run natively: {e}"
+            self.log.debug(message)
+            return False, workflow, message
+        return True, workflow, "Workflow can be run natively"
+
+    # Execution.
+
+    def parse_extra_vars(self, workflow_args):
+        extra_vars = {}
+        for arg in shlex.split(workflow_args or ""):
+            key, value = arg.split("=", maxsplit=1)
+            extra_vars[key] = value
+        return extra_vars
+
+    def make_context(self, scope, task_vars, loop_vars=None):
+        # Same precedence as Ansible: facts and registered results override
+        # play, block and task vars, and only loop and extra vars override facts.
+        return {
+            **scope["play_vars"],
+            **task_vars,
+            **scope["facts"],
+            **(loop_vars or {}),
+            **scope["extra_vars"],
+        }
+
+    def run(self, workflow_name, workflow, workflow_file, workflow_args=""):
+        """
+        Run a workflow natively.
+
+        :param workflow_name: Workflow name
+        :type workflow_name: str
+        :param workflow: Loaded playbook
+        :type workflow: list
+        :param workflow_file: Path to the playbook file
+        :type workflow_file: str
+        :param workflow_args: Space separated key=value extra variables
+        :type workflow_args: str
+        :returns: success, task stats, user message
+        :rtype: tuple
+        """
+        self.stats = {"ok": 0, "changed": 0, "failed": 0, "skipped": 0}
+        try:
+            extra_vars = self.parse_extra_vars(workflow_args)
+        except ValueError as e:
+            return False, self.stats, f"Invalid workflow arguments {workflow_args!r}: {e}"
+        base_dir = os.path.dirname(workflow_file)
+        self.log.info(f"Running workflow {workflow_name} natively with vars: {extra_vars}")
+        try:
+            for play in workflow:
+                scope = {"play_vars": {}, "facts": {}, "extra_vars": extra_vars}
+                for key, value in (play.get("vars") or {}).items():
+                    scope["play_vars"][key] = self.render(value, self.make_context(scope, {}))
+                if play.get("name"):
+                    self.print_output(f"PLAY [{play['name']}]", style="bold")
+                self.run_tasks(play.get("tasks") or [], scope, {}, base_dir)
+        except WorkflowTaskError as e:
+            message = f"Error running workflow {workflow_name}: {e}"
+            self.log.error(message)
+            return False, self.stats, message
+        return True, self.stats, f"Workflow {workflow_name} completed"
+
+    def run_tasks(self, tasks, scope, inherited_vars, base_dir, loop_vars=None):
+        for task in tasks:
+            self.run_task(task, scope, inherited_vars, base_dir, loop_vars)
+
+    def run_task(self, task, scope, inherited_vars, base_dir, loop_vars=None):
+        action, args = self.get_task_action(task)
+        if "loop" in task:
+            try:
+                items = self.render(
+                    task["loop"], self.make_context(scope, inherited_vars, loop_vars)
+                )
+            except Exception as e:
+                items = []
+                result = {"failed": True, "msg": f"Error evaluating loop: {e}"}
+            else:
+                loop_control = task.get("loop_control", {})
+                loop_var = loop_control.get("loop_var", "item")
+                index_var = loop_control.get("index_var")
+                results = []
+                for index, item in enumerate(items or []):
+                    item_vars = {**(loop_vars or {}), loop_var: item}
+                    if index_var:
+                        item_vars[index_var] = index
+                    results.append(
+                        self.run_task_item(
+                            task, action, args, scope, inherited_vars, base_dir, item_vars
+                        )
+                    )
+                result = {
+                    "results": results,
+                    "changed": any(r.get("changed") for r in results),
+                    "failed": any(r.get("failed") for r in results),
+                    "skipped": bool(results) and all(r.get("skipped") for r in results),
+                    "msg": "All items completed",
+                }
+        else:
+            result = self.run_task_item(
+                task, action, args, scope, inherited_vars, base_dir, loop_vars
+            )
+        if task.get("register"):
+            scope["facts"][task["register"]] = result
+        if result.get("failed"):
+            self.stats["failed"] += 1
+            message = f"Task {task.get('name', action)!r} failed: {result.get('msg')}"
+            if not task.get("ignore_errors"):
+                raise WorkflowTaskError(message)
+            self.log.warning(f"{message}, ignoring")
+        elif result.get("skipped"):
+            self.stats["skipped"] += 1
+        else:
+            self.stats["changed" if result.get("changed") else "ok"] += 1
+
+    def run_task_item(self, task, action, args, scope, task_vars, base_dir, loop_vars=None):
+        try:
+            task_vars = dict(task_vars)
+            for key, value in (task.get("vars") or {}).items():
+                task_vars[key] = self.render(value, self.make_context(scope, task_vars, loop_vars))
+            context = self.make_context(scope, task_vars, loop_vars)
+            if "when" in task and not self.evaluate_conditional(task["when"], context):
+                return {"changed": False, "skipped": True}
+            name = self.render(task.get("name", action), context)
+        except WorkflowTaskError:
+            raise
+        except Exception as e:
+            return {"failed": True, "msg": f"Error templating task: {e}"}
+        self.print_output(f"TASK [{name}]", style="bold")
+        self.log.debug(f"Running task {name!r} with action {action}")
+        if action == "block":
+            self.run_tasks(args, scope, task_vars, base_dir, loop_vars)
+            return {"changed": False}
+        if action == "include_tasks":
+            filepath = self.get_include_file(args, base_dir)
+            self.run_tasks(
+                self.load_task_file(filepath),
+                scope,
+                task_vars,
+                os.path.dirname(filepath),
+                loop_vars,
+            )
+            return {"changed": False}
+        until = task.get("until")
+        retries = int(task.get("retries", DEFAULT_UNTIL_RETRIES)) if until else 0
+        delay = float(task.get("delay", DEFAULT_UNTIL_DELAY))
+        for attempt in range(1, retries + 2):
+            result = self.run_action(
+                action, args, scope, self.make_context(scope, task_vars, loop_vars)
+            )
+            if not until:
+                break
+            result["attempts"] = attempt
+            until_context = self.make_context(scope, task_vars, loop_vars)
+            if task.get("register"):
+                until_context[task["register"]] = result
+            try:
+                if self.evaluate_conditional(until, until_context):
+                    break
+            except Exception as e:
+                return {"failed": True, "msg": f"Error evaluating until condition: {e}"}
+            if attempt <= retries:
+                self.log.info(f"Retrying task {name!r}, attempt {attempt} of {retries}")
+                time.sleep(delay)
+        else:
+            result["failed"] = True
+        return result
+
+    def run_action(self, action, args, scope, context):
+        try:
+            args = self.render(args, context)
+            if action == "set_fact":
+                scope["facts"].update(args)
+                return {"changed": False, "ansible_facts": args}
+            args = self.validate_module_args(action, args or {})
+            return getattr(self, f"run_{action}")(args, context)
+        except WorkflowTaskError:
+            raise
+        except Exception as e:
+            return {"failed": True, "msg": str(e)}
+
+    def run_debug(self, args, context):
+        if "var" in args:
+            value = self.evaluate_expression(args["var"], context)
+            output = {args["var"]: value}
+        else:
+            output = args.get("msg", "Hello world!")
+        self.print_output(output if isinstance(output, str) else util.dict_to_pretty_json(output))
+        return {"changed": False, "msg": output}
+
+    @contextlib.contextmanager
+    def backend_state(self, user=None, conversation_id=None):
+        """
+        Temporarily switch the backend's user and conversation.
+
+        The live session's user, conversation and request settings are
+        restored when the task completes.
+
+        :param user: User id or username/email
+        :type user: int | str, optional
+        :param conversation_id: Conversation id
+        :type conversation_id: int, optional
+        """
+        attributes = (
+            "current_user",
+            "conversation_id",
+            "conversation_title",
+            "conversation_tokens",
+            "max_submission_tokens",
+            "return_only",
+        )
+        saved = {attribute: getattr(self.backend, attribute, None) for attribute in attributes}
+        try:
+            current_user = None
+            if user is not None:
+                try:
+                    user = int(user)
+                except (TypeError, ValueError):
+                    pass
+                if isinstance(user, int):
+                    success, current_user, user_message = self.backend.user_manager.get_by_user_id(
+                        user
+                    )
+                else:
+                    (
+                        success,
+                        current_user,
+                        user_message,
+                    ) = self.backend.user_manager.get_by_username_or_email(user)
+                if not success or not current_user:
+                    raise ValueError(user_message)
+            self.backend.current_user = current_user
+            self.backend.conversation_id = int(conversation_id) if conversation_id else None
+            self.backend.conversation_title = None
+            self.backend.set_return_only(True)
+            yield
+        finally:
+            for attribute, value in saved.items():
+                setattr(self.backend, attribute, value)
+
+    def check_profile(self, args):
+        profile = args.get("profile")
+        if profile and profile != self.config.profile:
+            raise ValueError(f"Task uses a different profile: {profile}")
+
+    def run_lwe_llm(self, args, _context):
+        message = args.get("message")
+        template_name = args.get("template")
+        if (message is None) == (template_name is None):
+            raise ValueError("One and only one of 'message' or 'template' arguments must be set.")
+        self.check_profile(args)
+        overrides = {
+            "request_overrides": {},
+        }
+        if args.get("preset"):
+            overrides["request_overrides"]["preset"] = args["preset"]
+        if args.get("preset_overrides"):
+            overrides["request_overrides"]["preset_overrides"] = args["preset_overrides"]
+        if args.get("system_message"):
+            overrides["request_overrides"]["system_message"] = args["system_message"]
+        if args.get("title"):
+            overrides["request_overrides"]["title"] = args["title"]
+        with self.backend_state(args.get("user"), args.get("conversation_id")):
+            if args.get("max_submission_tokens"):
+                self.backend.set_max_submission_tokens(args["max_submission_tokens"])
+            if template_name is not None:
+                success, response, user_message = self.backend.run_template(
+                    template_name, args.get("template_vars") or {}, overrides
+                )
+            else:
+                success, response, user_message = self.backend.ask(message, **overrides)
+            conversation_id = self.backend.conversation_id
+        if not success:
+            return {"failed": True, "msg": f"Error fetching LLM response: {user_message}"}
+        if not response:
+            return {"failed": True, "msg": f"Empty LLM response: {user_message}"}
+        return {
+            "changed": True,
+            "response": response,
+            "conversation_id": conversation_id,
+            "user_message": user_message,
+            "stats": self.backend.last_request_stats,
+        }
+
+    def run_lwe_llm_batch(self, args, _context):
+        from lwe.backends.api.workflow.library import lwe_llm_batch
+
+        persist = args["persist"]
+        error = lwe_llm_batch.validate_params(
+            args.get("messages"), args.get("template"), args.get("items"), persist, args.get("user")
+        )
+        if error:
+            raise ValueError(error)
+        self.check_profile(args)
+        request_overrides = {}
+        for key in ("preset", "preset_overrides", "system_message"):
+            if args.get(key):
+                request_overrides[key] = args[key]
+        with self.backend_state(args.get("user")):
+            if args.get("max_submission_tokens"):
+                self.backend.set_max_submission_tokens(args["max_submission_tokens"])
+            results = lwe_llm_batch.run_batch(
+                self.backend,
+                messages=args.get("messages"),
+                template_name=args.get("template"),
+                items=args.get("items"),
+                template_vars=args.get("template_vars"),
+                request_overrides=request_overrides,
+                concurrency=args["concurrency"],
+                user=self.backend.current_user if persist else None,
+                title=args.get("title"),
+            )
+        success_count = sum(1 for result in results if result["success"])
+        result = {
+            "changed": True,
+            "results": results,
+            "success_count": success_count,
+            "failure_count": len(results) - success_count,
+        }
+        if result["failure_count"] and args.get("fail_on_error"):
+            result["failed"] = True
+            result["msg"] = f"{success_count} succeeded, {result['failure_count']} failed"
+        return result
+
+    def run_lwe_llm_map_reduce(self, args, _context):
+        from lwe.backends.api.workflow.library import lwe_llm_map_reduce
+
+        error = lwe_llm_map_reduce.validate_params(args.get("content"), args.get("chunks"))
+        if error:
+            raise ValueError(error)
+        self.check_profile(args)
+        request_overrides = {}
+        for key in ("preset", "preset_overrides", "system_message"):
+            if args.get(key):
+                request_overrides[key] = args[key]
+        chunker = TextChunker(args["chunk_size"], args["overlap"])
+        with self.backend_state():
+            if args.get("max_submission_tokens"):
+                self.backend.set_max_submission_tokens(args["max_submission_tokens"])
+            success, response, user_message = lwe_llm_map_reduce.run_map_reduce(
+                self.backend,
+                chunker,
+                content=args.get("content"),
+                chunks=args.get("chunks"),
+                map_prompt=args.get("map_prompt"),
+                map_template=args.get("map_template"),
+                reduce_prompt=args.get("reduce_prompt"),
+                reduce_template=args.get("reduce_template"),
+                template_vars=args.get("template_vars"),
+                max_reduce_tokens=args.get("max_reduce_tokens"),
+                request_overrides=request_overrides,
+                concurrency=args["concurrency"],
+            )
+        if not success:
+            return {"failed": True, "msg": user_message}
+        return {"changed": True, **response}
+
+    def run_text_chunker(self, args, _context):
+        chunker = TextChunker(args["chunk_size"], args["overlap"], model_name=args["model"])
+        chunks = chunker.chunk(args["content"])
+        return {"changed": False, "chunks": chunks, "chunk_count": len(chunks)}
+
+    def run_lwe_command(self, args, _context):
+        self.check_profile(args)
+        with self.backend_state(args.get("user"), args.get("conversation_id")):
+            _, command_result = self.command_runner(args["command"], args["arguments"])
+        try:
+            success, response, user_message = command_result
+        except Exception:
+            success, response, user_message = False, None, command_result
+        if not success:
+            return {"failed": True, "msg": f"Error executing LWE command: {user_message}"}
+        return {"changed": True, "response": response, "user_message": user_message}
+
+    def run_text_extractor(self, args, _context):
+        from lwe.backends.api.workflow.library import text_extractor
+
+        cache = None
+        if args["use_cache"]:
+            if self.extraction_cache is None:
+                self.extraction_cache = ExtractionCache(self.config)
+            cache = self.extraction_cache
+        success, content, user_message = text_extractor.extract_content(
+            args["path"],
+            args["max_length"],
+            args["default_extension"],
+            cache,
+            pages=args["pages"],
+            page_range=args["page_range"],
+            early_stop=args["early_stop"],
+            workers=args["workers"],
+            max_download_size=args["max_download_size"],
+        )
+        if not success:
+            return {"failed": True, "msg": user_message}
+        return {"changed": False, "content": content, "length": len(content)}
+
+    def run_lwe_sqlite_query(self, args, _context):
+        from lwe.backends.api.workflow.library import lwe_sqlite_query
+
+        query = args["query"]
+        query_params = args["query_params"]
+        executemany = args["executemany"]
+        options = {
+            key: args.get(key)
+            for key in (
+                "limit",
+                "offset",
+                "keyset_column",
+                "after",
+                "output_file",
+                "output_format",
+                "pragmas",
+            )
+        }
+        error = lwe_sqlite_query.validate_query(query, query_params, executemany, **options)
+        if error:
+            return {"failed": True, "msg": error}
+        try:
+            result = lwe_sqlite_query.run_query(
+                args["db"], query, query_params, executemany, **options
+            )
+        except Exception as e:
+            return {"failed": True, "msg": f"Failed to run query: {query}, error: {e}"}
+        return {"changed": True, **result}
@@ -0,0 +1,209 @@
+import time
+import threading
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 32
+DEFAULT_DECREASE_FACTOR = 0.5
+DEFAULT_LATENCY_TOLERANCE = 2.0
+LATENCY_SMOOTHING = 0.2
+
+OVERLOAD_STATUS_CODES = (429, 500, 502, 503, 504, 529)
+
+adaptive_limiters = {}
+adaptive_limiters_lock = threading.Lock()
+
+
+def is_overload_error(error):
+    """
+    Check if an error shows the provider is overloaded.
+
+    Rate limit (429) and server (5xx) errors and timeouts count as overload.
+
+    :param error: The error
+    :type error: Exception
+    :returns: True if the error is an overload error
+    :rtype: bool
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in OVERLOAD_STATUS_CODES or status_code >= 500
+    if isinstance(error, TimeoutError):
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "RateLimit" in name
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) concurrency limiter.
+
+    The limit grows by one for each limit's worth of successful requests
+    while their latency stays within latency_tolerance times the baseline
+    latency, and is multiplied by decrease_factor on an overload error.
+    Only requests started after the last decrease can decrease the limit
+    again, so one burst of errors cuts the limit once.
+    """
+
+    def __init__(
+        self,
+        initial_limit=DEFAULT_INITIAL_LIMIT,
+        min_limit=DEFAULT_MIN_LIMIT,
+        max_limit=DEFAULT_MAX_LIMIT,
+        decrease_factor=DEFAULT_DECREASE_FACTOR,
+        latency_tolerance=DEFAULT_LATENCY_TOLERANCE,
+        clock=time.monotonic,
+    ):
+        """
+        Initializes the limiter.
+
+        :param initial_limit: Starting concurrency limit
+        :type initial_limit: int
+        :param min_limit: Lowest concurrency limit
+        :type min_limit: int
+        :param max_limit: Highest concurrency limit
+        :type max_limit: int
+        :param decrease_factor: Factor the limit is multiplied by on overload
+        :type decrease_factor: float
+        :param latency_tolerance: Latency increase over the baseline that stops the limit growing
+        :type latency_tolerance: float
+        :param clock: Function returning the current time in seconds
+        :type clock: callable, optional
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.last_decrease = None
+        self.latency = None
+        self.baseline_latency = None
+        self.metrics = {
+            "requests": 0,
+            "succeeded": 0,
+            "overloaded": 0,
+            "failed": 0,
+            "increases": 0,
+            "decreases": 0,
+            "wait_time": 0.0,
+        }
+
+    def acquire(self):
+        """
+        Wait for a free request slot.
+
+        :returns: Start time of the request, to pass to release()
+        :rtype: float
+        """
+        with self.condition:
+            start = self.clock()
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            self.metrics["requests"] += 1
+            now = self.clock()
+            self.metrics["wait_time"] += now - start
+            return now
+
+    def release(self, start, error=None):
+        """
+        Free a request slot, and adjust the limit from the request's outcome.
+
+        :param start: Start time returned by acquire()
+        :type start: float
+        :param error: Error raised by the request, if any
+        :type error: Exception, optional
+        """
+        with self.condition:
+            self.in_flight -= 1
+            if error is None:
+                self.record_success(self.clock() - start)
+            elif is_overload_error(error):
+                self.record_overload(start)
+            else:
+                self.metrics["failed"] += 1
+            self.condition.notify_all()
+
+    def record_success(self, latency):
+        self.metrics["succeeded"] += 1
+        if self.latency is None:
+            self.latency = self.baseline_latency = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+            self.baseline_latency = min(self.baseline_latency, self.latency)
+        if self.latency > self.baseline_latency * self.latency_tolerance:
+            return
+        if self.limit < self.max_limit:
+            old_limit = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            if int(self.limit) > old_limit:
+                self.metrics["increases"] += 1
+
+    def record_overload(self, start):
+        self.metrics["overloaded"] += 1
+        if self.last_decrease is not None and start < self.last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.last_decrease = self.clock()
+        self.metrics["decreases"] += 1
+        # The baseline is relearned at the new load.
+        self.baseline_latency = self.latency
+
+    def get_metrics(self):
+        """
+        Get the current limit, observed latencies and request counts.
+
+        :returns: Metrics
+        :rtype: dict
+        """
+        with self.condition:
+            return {
+                **self.metrics,
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "latency": self.latency,
+                "baseline_latency": self.baseline_latency,
+            }
+
+
+def get_adaptive_limiter(key, config):
+    """
+    Get the adaptive limiter shared by all threads for a key, e.g. a provider and model.
+
+    :param key: Limiter key
+    :type key: str
+    :param config: Configuration settings, limits are read from backend_options.adaptive_concurrency
+    :type config: Config
+    :returns: Adaptive limiter
+    :rtype: AdaptiveConcurrencyLimiter
+    """
+    with adaptive_limiters_lock:
+        limiter = adaptive_limiters.get(key)
+        if limiter is None:
+            options = config.get("backend_options.adaptive_concurrency") or {}
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=options.get("initial_limit", DEFAULT_INITIAL_LIMIT),
+                min_limit=options.get("min_limit", DEFAULT_MIN_LIMIT),
+                max_limit=options.get("max_limit", DEFAULT_MAX_LIMIT),
+                decrease_factor=options.get("decrease_factor", DEFAULT_DECREASE_FACTOR),
+                latency_tolerance=options.get("latency_tolerance", DEFAULT_LATENCY_TOLERANCE),
+            )
+            adaptive_limiters[key] = limiter
+        return limiter
+
+
+def get_adaptive_limiter_metrics():
+    """
+    Get the metrics of all adaptive limiters.
+
+    :returns: Metrics by limiter key
+    :rtype: dict
+    """
+    with adaptive_limiters_lock:
+        limiters = dict(adaptive_limiters)
+    return {key: limiter.get_metrics() for key, limiter in limiters.items()}
@@ -1,9 +1,46 @@
 import asyncio
+import threading
+import concurrent.futures
+
+_thread_state = threading.local()
 
 
 def ensure_event_loop():
+    """
+    Ensure the current thread has an event loop set.
+
+    The loop is created once per thread and reused on later calls.
+
+    :returns: The running or thread-local event loop
+    :rtype: asyncio.AbstractEventLoop
+    """
     try:
-        asyncio.get_running_loop()
+        return asyncio.get_running_loop()
     except RuntimeError:
+        pass
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
         loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        _thread_state.loop = loop
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def run_coroutine(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    If the calling thread already has a running event loop (e.g. a notebook),
+    the coroutine is run on a fresh loop in a helper thread instead.
+
+    :param coro: The coroutine to run
+    :type coro: Coroutine
+    :returns: The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        loop = ensure_event_loop()
+        return loop.run_until_complete(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
@@ -0,0 +1,172 @@
+import time
+import threading
+
+from lwe.core.adaptive_limiter import is_overload_error
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_INTERVAL = 30.0
+DEFAULT_HALF_OPEN_PROBES = 1
+DEFAULT_PROBE_TIMEOUT = 300.0
+
+
+def is_provider_failure(error):
+    """
+    Check if an error shows the provider is failing, rather than the request.
+
+    Overload errors, timeouts and connection errors count as failures.
+
+    :param error: The error
+    :type error: Exception
+    :returns: True if the error is a provider failure
+    :rtype: bool
+    """
+    if is_overload_error(error):
+        return True
+    if isinstance(error, ConnectionError):
+        return True
+    return "Connect" in type(error).__name__
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a provider endpoint.
+
+    After failure_threshold consecutive failures the circuit opens, and
+    requests fail fast for open_interval seconds. The circuit then goes
+    half open, letting half_open_probes requests through: a success closes
+    it, a failure opens it again. Probes without an outcome after
+    probe_timeout seconds are given up on, so a lost probe can't keep the
+    circuit half open.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        open_interval=DEFAULT_OPEN_INTERVAL,
+        half_open_probes=DEFAULT_HALF_OPEN_PROBES,
+        probe_timeout=DEFAULT_PROBE_TIMEOUT,
+        clock=time.monotonic,
+    ):
+        """
+        Initializes the circuit breaker.
+
+        :param failure_threshold: Consecutive failures that open the circuit
+        :type failure_threshold: int
+        :param open_interval: Seconds the circuit stays open before probing
+        :type open_interval: float
+        :param half_open_probes: Requests let through at once while half open
+        :type half_open_probes: int
+        :param probe_timeout: Seconds before a probe without an outcome is given up on
+        :type probe_timeout: float
+        :param clock: Function returning the current time in seconds
+        :type clock: callable, optional
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_interval = open_interval
+        self.half_open_probes = max(1, half_open_probes)
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probes = 0
+        self.probe_started_at = None
+        self.metrics = {
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+
+    def update_state(self, now):
+        if self.state == STATE_OPEN and now - self.opened_at >= self.open_interval:
+            self.state = STATE_HALF_OPEN
+            self.probes = 0
+        elif (
+            self.state == STATE_HALF_OPEN
+            and self.probes
+            and now - self.probe_started_at >= self.probe_timeout
+        ):
+            self.probes = 0
+
+    def allow_request(self):
+        """
+        Check if a request may be sent, reserving a probe while half open.
+
+        :returns: True if the request may be sent
+        :rtype: bool
+        """
+        with self.lock:
+            self.update_state(self.clock())
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_HALF_OPEN and self.probes < self.half_open_probes:
+                self.probes += 1
+                self.probe_started_at = self.clock()
+                return True
+            self.metrics["rejected"] += 1
+            return False
+
+    def record_result(self, error=None):
+        """
+        Record the outcome of an allowed request.
+
+        :param error: Error of the request, if any. Errors that aren't provider
+                      failures count as successes, as the provider responded.
+        :type error: Exception, optional
+        """
+        if error is not None and is_provider_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def release_probe(self):
+        """
+        Give back a request allowed without recording an outcome, e.g. one
+        that was interrupted before the provider responded.
+        """
+        with self.lock:
+            if self.state == STATE_HALF_OPEN and self.probes:
+                self.probes -= 1
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.state = STATE_CLOSED
+            self.probes = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.metrics["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != STATE_OPEN:
+                    self.metrics["opened"] += 1
+                self.state = STATE_OPEN
+                self.opened_at = self.clock()
+
+    def get_state(self):
+        """
+        Get the circuit state.
+
+        :returns: State, retry_in with seconds until an open circuit is probed,
+                  consecutive failures, and counts of failures, rejected
+                  requests and times opened
+        :rtype: dict
+        """
+        with self.lock:
+            now = self.clock()
+            self.update_state(now)
+            retry_in = None
+            if self.state == STATE_OPEN:
+                retry_in = max(0.0, self.opened_at + self.open_interval - now)
+            return {
+                "state": self.state,
+                "retry_in": retry_in,
+                "consecutive_failures": self.consecutive_failures,
+                **self.metrics,
+            }
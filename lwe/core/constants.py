@@ -20,6 +20,14 @@ SYSTEM_MESSAGE_CREATIVE_WRITER = "You are a creative writing assistant."
 DEFAULT_TITLE_GENERATION_SYSTEM_PROMPT = "You write short 3-5 word titles for any content"
 DEFAULT_TITLE_GENERATION_USER_PROMPT = "Write a title for this content:"
 TITLE_GENERATION_MAX_CHARACTERS = 1500
+DEFAULT_TITLE_BACKFILL_SYSTEM_PROMPT = "You write short 3-5 word titles for any content. You are given a JSON list of contents, reply with only a JSON list of titles, one title for each content, in the same order"
+DEFAULT_TITLE_BACKFILL_USER_PROMPT = "Write a title for each content in this list:"
+DEFAULT_TOOL_RESPONSE_SUMMARY_SYSTEM_PROMPT = (
+    "You summarize tool output for another assistant. Keep all facts, figures and identifiers "
+    "needed to answer the user, and drop everything else."
+)
+# Tokens kept free for the prompt when summarizing a tool response.
+TOOL_RESPONSE_SUMMARY_RESERVED_TOKENS = 500
 
 # Titles.
 NEW_CONVERSATION_TITLE = "[New Conversation]"
@@ -44,8 +52,49 @@ DEFAULT_CONFIG = {
         "default_user": None,
         "default_conversation_id": None,
         "title_generation": {
+            "strategy": "llm",
             "provider": None,
             "model": None,
+            "workers": 2,
+            "queue_size": 100,
+            "submit_timeout": 10,
+            "drain_timeout": 30,
+            "backfill_batch_size": 20,
+            "backfill_concurrency": 2,
+        },
+        "llm_cache": {
+            "enabled": True,
+            "max_entries": 16,
+        },
+        "adaptive_concurrency": {
+            "enabled": False,
+            "initial_limit": 4,
+            "min_limit": 1,
+            "max_limit": 32,
+            "decrease_factor": 0.5,
+            "latency_tolerance": 2.0,
+        },
+        "hedging": {
+            "enabled": False,
+            "delay": None,
+            "percentile": 95,
+            "min_samples": 20,
+            "max_extra_ratio": 0.1,
+            "preset": None,
+        },
+        "fallback_presets": [],
+        "circuit_breaker": {
+            "enabled": True,
+            "failure_threshold": 5,
+            "open_interval": 30,
+            "half_open_probes": 1,
+            "probe_timeout": 300,
+        },
+        "http_client": {
+            "max_connections": 100,
+            "max_keepalive_connections": 20,
+            "keepalive_expiry": 30,
+            "http2": False,
         },
     },
     "directories": {
@@ -73,6 +122,21 @@ DEFAULT_CONFIG = {
             "$CONFIG_DIR/profiles/$PROFILE/tools",
         ],
     },
+    "tools": {
+        "response": {
+            "max_tokens": None,
+            "strategy": "head_tail",
+            "max_rows": 20,
+            "summarize_max_input_tokens": None,
+        },
+    },
+    "workflow": {
+        "executor": "ansible",
+        "extraction_cache": {
+            "enabled": True,
+            "max_size_mb": 1024,
+        },
+    },
     "shell": {
         "prompt_prefix": "$TITLE$NEWLINE($TEMPERATURE/$MAX_SUBMISSION_TOKENS/$CURRENT_CONVERSATION_TOKENS): $SYSTEM_MESSAGE_ALIAS$NEWLINE$USER@$PRESET_OR_MODEL",
         "history_file": "%s%srepl_history.log" % (tempfile.gettempdir(), os.path.sep),
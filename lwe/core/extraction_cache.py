@@ -0,0 +1,218 @@
+import os
+import json
+import hashlib
+import tempfile
+
+from lwe.core.config import Config
+from lwe.core.logger import Logger
+from lwe.core.cache_manager import CacheManager
+
+EXTRACTION_CACHE_DIR = "text_extraction"
+DOWNLOADS_DIR = "downloads"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """
+    Hash the content of a file.
+
+    :param path: Path to the file
+    :type path: str
+    :returns: SHA-256 hex digest of the file content
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of extracted text.
+
+    Entries are keyed by a source key (a hash of the file content) and the
+    extractor name and version, so changed inputs or upgraded extractors
+    never return stale content. Downloaded URLs are kept with their
+    ETag/Last-Modified validators, so they can be revalidated with a
+    conditional request instead of downloaded again. The cache directory is
+    kept under a maximum size by evicting the least recently used entries.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initializes the class with the given configuration.
+
+        :param config: Configuration settings. If not provided, a default Config object is used.
+        :type config: Config, optional
+        """
+        self.config = config or Config()
+        self.log = Logger(self.__class__.__name__, self.config)
+        self.enabled = self.config.get("workflow.extraction_cache.enabled")
+        self.max_size = self.config.get("workflow.extraction_cache.max_size_mb") * 1024 * 1024
+        self.cache_dir = os.path.join(CacheManager(self.config).cache_dirs[0], EXTRACTION_CACHE_DIR)
+
+    def make_key(self, source_key, extractor, version):
+        """
+        Build the cache key for an extraction.
+
+        :param source_key: Key identifying the extracted content
+        :type source_key: str
+        :param extractor: Name of the extractor
+        :type extractor: str
+        :param version: Version of the extractor
+        :type version: str
+        :returns: Cache key
+        :rtype: str
+        """
+        return hashlib.sha256(f"{source_key}\0{extractor}\0{version}".encode("utf-8")).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def get(self, key):
+        """
+        Get extracted text from the cache.
+
+        :param key: Cache key
+        :type key: str
+        :returns: Extracted text, or None if not cached
+        :rtype: str | None
+        """
+        if not self.enabled:
+            return None
+        path = self.entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.log.warning(f"Failed to read extraction cache entry {path}: {e}")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.log.debug(f"Extraction cache hit: {key}")
+        return content
+
+    def set(self, key, content):
+        """
+        Store extracted text in the cache, evicting old entries if needed.
+
+        :param key: Cache key
+        :type key: str
+        :param content: Extracted text
+        :type content: str
+        """
+        if not self.enabled:
+            return
+        path = self.entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.log.warning(f"Failed to write extraction cache entry {path}: {e}")
+            return
+        self.log.debug(f"Extraction cache stored: {key}")
+        self.evict(keep=path)
+
+    def download_paths(self, url):
+        url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, DOWNLOADS_DIR, url_key)
+        return f"{base}.json", f"{base}.download"
+
+    def make_download_dir(self):
+        """
+        Create the directory downloads are stored in.
+
+        :returns: Path to the directory
+        :rtype: str
+        """
+        download_dir = os.path.join(self.cache_dir, DOWNLOADS_DIR)
+        os.makedirs(download_dir, exist_ok=True)
+        return download_dir
+
+    def get_download(self, url):
+        """
+        Get a stored download of a URL.
+
+        :param url: The URL
+        :type url: str
+        :returns: Download record with path, etag, last_modified, extension and sha256, or None
+        :rtype: dict | None
+        """
+        if not self.enabled:
+            return None
+        record_path, body_path = self.download_paths(url)
+        try:
+            with open(record_path, "r") as f:
+                record = json.load(f)
+            os.utime(body_path)
+        except (OSError, ValueError):
+            return None
+        record["path"] = body_path
+        return record
+
+    def set_download(self, url, path, record):
+        """
+        Store a download of a URL, moving the downloaded file into the cache.
+
+        The file should be in the download directory, see make_download_dir().
+
+        :param url: The URL
+        :type url: str
+        :param path: Path to the downloaded file
+        :type path: str
+        :param record: Download record with etag, last_modified, extension and sha256
+        :type record: dict
+        :returns: Path to the stored file
+        :rtype: str
+        """
+        record_path, body_path = self.download_paths(url)
+        try:
+            os.replace(path, body_path)
+            with open(record_path, "w") as f:
+                json.dump(record, f)
+        except OSError as e:
+            self.log.warning(f"Failed to store download of {url}: {e}")
+            return path
+        self.evict(keep=body_path)
+        return body_path
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache is under its maximum size.
+
+        :param keep: Path of an entry that is in use and must not be removed
+        :type keep: str, optional
+        """
+        entries = []
+        total_size = 0
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+        if total_size <= self.max_size:
+            return
+        for _mtime, size, path in sorted(entries):
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.log.debug(f"Evicted extraction cache entry: {path}")
+            total_size -= size
+            if total_size <= self.max_size:
+                break
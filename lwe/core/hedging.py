@@ -0,0 +1,172 @@
+import asyncio
+import threading
+
+from collections import deque
+
+DEFAULT_PERCENTILE = 95
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_EXTRA_RATIO = 0.1
+LATENCY_WINDOW = 200
+
+latency_trackers = {}
+latency_trackers_lock = threading.Lock()
+
+hedging_loop = None
+hedging_loop_lock = threading.Lock()
+
+
+class LatencyTracker:
+    """
+    Recent request latencies, and the budget for hedge requests.
+
+    Hedge requests are capped at max_extra_ratio of all requests, so
+    hedging can't add more than that fraction to the cost.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        """
+        Initializes the tracker.
+
+        :param window: Number of recent latencies kept
+        :type window: int, optional
+        """
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def record_latency(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+
+    def percentile(self, percentile=DEFAULT_PERCENTILE, min_samples=DEFAULT_MIN_SAMPLES):
+        """
+        Get a percentile of the recent latencies.
+
+        :param percentile: Percentile, 0 to 100
+        :type percentile: float, optional
+        :param min_samples: Latencies needed before a percentile is returned
+        :type min_samples: int, optional
+        :returns: Latency in seconds, or None if there are too few samples
+        :rtype: float | None
+        """
+        with self.lock:
+            if not self.latencies or len(self.latencies) < min_samples:
+                return None
+            latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+    def allow_hedge(self, max_extra_ratio=DEFAULT_MAX_EXTRA_RATIO):
+        """
+        Take a hedge request from the budget, if there's one left.
+
+        :param max_extra_ratio: Maximum hedge requests as a fraction of all requests
+        :type max_extra_ratio: float, optional
+        :returns: True if the hedge request is allowed
+        :rtype: bool
+        """
+        with self.lock:
+            if self.hedges + 1 > self.requests * max_extra_ratio:
+                return False
+            self.hedges += 1
+            return True
+
+    def get_metrics(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "samples": len(self.latencies),
+            }
+
+
+def get_latency_tracker(key):
+    """
+    Get the latency tracker shared by all threads for a key, e.g. a provider and model.
+
+    :param key: Tracker key
+    :type key: str
+    :returns: Latency tracker
+    :rtype: LatencyTracker
+    """
+    with latency_trackers_lock:
+        tracker = latency_trackers.get(key)
+        if tracker is None:
+            tracker = latency_trackers[key] = LatencyTracker()
+        return tracker
+
+
+def get_hedging_loop():
+    """
+    Get the event loop hedged requests run on, starting it on first use.
+
+    All hedged requests share one loop in a background thread, so the
+    async HTTP clients shared by a provider's LLMs are only used from
+    one loop.
+
+    :returns: Event loop
+    :rtype: asyncio.AbstractEventLoop
+    """
+    global hedging_loop
+    with hedging_loop_lock:
+        if hedging_loop is None:
+            hedging_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=hedging_loop.run_forever, name="lwe-hedging", daemon=True
+            ).start()
+        return hedging_loop
+
+
+def run_hedged(primary, hedge=None, delay=None):
+    """
+    Run a request, hedging it with a duplicate request if it's slow.
+
+    Blocks until a request succeeds, or all requests fail.
+
+    :param primary: Function returning the primary request's coroutine
+    :type primary: callable
+    :param hedge: Function returning the hedge request's coroutine, or None to not hedge
+    :type hedge: callable, optional
+    :param delay: Seconds to wait for the primary request before hedging
+    :type delay: float, optional
+    :returns: Response, and whether the hedge request won
+    :rtype: tuple
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        race_requests(primary, hedge, delay), get_hedging_loop()
+    )
+    return future.result()
+
+
+async def race_requests(primary, hedge=None, delay=None):
+    """
+    Race a primary request and a delayed hedge request, cancelling the loser.
+
+    The first successful response wins. If a request fails, the other is
+    awaited, and the primary request's error is raised if both fail.
+    """
+    primary_task = asyncio.ensure_future(primary())
+    tasks = [primary_task]
+    if hedge is not None and delay is not None:
+        await asyncio.wait(tasks, timeout=delay)
+        if not primary_task.done():
+            coroutine = hedge()
+            if coroutine is not None:
+                tasks.append(asyncio.ensure_future(coroutine))
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if task in done and task.exception() is None:
+                    return task.result(), task is not primary_task
+        errors = [task.exception() for task in tasks]
+        raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
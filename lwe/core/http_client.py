@@ -0,0 +1,166 @@
+import threading
+
+import httpx
+
+from lwe.core.logger import Logger
+from lwe.core.load_balancer import AsyncLoadBalancingTransport, LoadBalancingTransport
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+class SharedHttpClients:
+    """
+    Shared, pooled httpx clients for the LLMs built by a provider.
+
+    One sync and one async client are created on first use, and passed to
+    every LLM the provider builds, so connections are kept alive and reused
+    across requests instead of each LLM opening its own pool.
+
+    Requests and new connections are counted, to measure connection reuse.
+
+    With a load balancer, requests are routed across its endpoints.
+    """
+
+    def __init__(self, config, name, load_balancer=None):
+        """
+        Initializes the clients.
+
+        :param config: Configuration settings
+        :type config: Config
+        :param name: Name used in log messages, usually the provider name
+        :type name: str
+        :param load_balancer: Load balancer routing requests across endpoints
+        :type load_balancer: LoadBalancer, optional
+        """
+        self.config = config
+        self.log = Logger(self.__class__.__name__, self.config)
+        self.name = name
+        self.load_balancer = load_balancer
+        self.lock = threading.Lock()
+        self.client = None
+        self.async_client = None
+        self.metrics = {
+            "requests": 0,
+            "connections": 0,
+        }
+
+    def get_option(self, key, default):
+        value = self.config.get(f"backend_options.http_client.{key}")
+        return default if value is None else value
+
+    def get_client_kwargs(self):
+        limits = httpx.Limits(
+            max_connections=self.get_option("max_connections", DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=self.get_option(
+                "max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=self.get_option("keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY),
+        )
+        http2 = self.get_option("http2", False)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                self.log.warning("HTTP/2 requires the h2 package, falling back to HTTP/1.1")
+                http2 = False
+        return {"limits": limits, "http2": http2}
+
+    def count_request(self, request):
+        with self.lock:
+            self.metrics["requests"] += 1
+        request.extensions["trace"] = self.trace
+
+    async def acount_request(self, request):
+        with self.lock:
+            self.metrics["requests"] += 1
+        request.extensions["trace"] = self.atrace
+
+    def count_connection(self, event_name):
+        if event_name == "connection.connect_tcp.complete":
+            with self.lock:
+                self.metrics["connections"] += 1
+
+    def trace(self, event_name, _info):
+        self.count_connection(event_name)
+
+    async def atrace(self, event_name, _info):
+        self.count_connection(event_name)
+
+    def get_client(self):
+        """
+        Get the shared sync client, creating it on first use.
+
+        :returns: Client
+        :rtype: httpx.Client
+        """
+        with self.lock:
+            if self.client is None:
+                self.log.debug(f"Creating shared HTTP client for {self.name}")
+                kwargs = self.get_client_kwargs()
+                if self.load_balancer:
+                    self.load_balancer.start_health_checks()
+                    kwargs = {
+                        "transport": LoadBalancingTransport(
+                            self.load_balancer, httpx.HTTPTransport(**kwargs)
+                        )
+                    }
+                self.client = httpx.Client(event_hooks={"request": [self.count_request]}, **kwargs)
+            return self.client
+
+    def get_async_client(self):
+        """
+        Get the shared async client, creating it on first use.
+
+        :returns: Client
+        :rtype: httpx.AsyncClient
+        """
+        with self.lock:
+            if self.async_client is None:
+                self.log.debug(f"Creating shared async HTTP client for {self.name}")
+                kwargs = self.get_client_kwargs()
+                if self.load_balancer:
+                    self.load_balancer.start_health_checks()
+                    kwargs = {
+                        "transport": AsyncLoadBalancingTransport(
+                            self.load_balancer, httpx.AsyncHTTPTransport(**kwargs)
+                        )
+                    }
+                self.async_client = httpx.AsyncClient(
+                    event_hooks={"request": [self.acount_request]}, **kwargs
+                )
+            return self.async_client
+
+    def get_metrics(self):
+        """
+        Get connection reuse metrics.
+
+        :returns: Counts of requests, new connections and reused connections,
+                  and per endpoint stats if requests are load balanced
+        :rtype: dict
+        """
+        with self.lock:
+            requests = self.metrics["requests"]
+            connections = self.metrics["connections"]
+        metrics = {
+            "requests": requests,
+            "connections": connections,
+            "reused": max(0, requests - connections),
+        }
+        if self.load_balancer:
+            metrics["endpoints"] = self.load_balancer.get_metrics()
+        return metrics
+
+    def close(self):
+        """
+        Close the sync client, and stop the load balancer's health checks.
+        The async client is closed when it's garbage collected.
+        """
+        if self.load_balancer:
+            self.load_balancer.close()
+        with self.lock:
+            client, self.client = self.client, None
+            self.async_client = None
+        if client is not None:
+            client.close()
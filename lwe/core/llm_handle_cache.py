@@ -0,0 +1,153 @@
+import os
+import json
+import inspect
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from lwe.core.config import Config
+from lwe.core.logger import Logger
+
+DEFAULT_MAX_ENTRIES = 16
+
+
+class LlmHandleCache:
+    """
+    Keep fully built LLM handles warm between requests.
+
+    Handles are keyed by provider, preset name, the final model customizations
+    (preset plus any overrides) and the attached tools. A cached handle is
+    discarded when the provider instance is replaced (e.g. a plugin reload), or
+    when the preset file, tool files or provider plugin file change on disk.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initializes the class with the given configuration.
+
+        :param config: Configuration settings. If not provided, a default Config object is used.
+        :type config: Config, optional
+        """
+        self.config = config or Config()
+        self.log = Logger(self.__class__.__name__, self.config)
+        self.enabled = self.config.get("backend_options.llm_cache.enabled")
+        self.max_entries = (
+            self.config.get("backend_options.llm_cache.max_entries") or DEFAULT_MAX_ENTRIES
+        )
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def make_key(self, provider, preset_name, customizations, tool_names, tool_choice):
+        """
+        Build a cache key for an LLM handle.
+
+        :param provider: Provider instance
+        :type provider: ProviderBase
+        :param preset_name: Preset name
+        :type preset_name: str
+        :param customizations: Final model customizations, without tools
+        :type customizations: dict
+        :param tool_names: Names of attached tools
+        :type tool_names: list
+        :param tool_choice: Tool choice
+        :type tool_choice: str | dict | None
+        :returns: Cache key, or None if the handle can't be cached
+        :rtype: str | None
+        """
+        if not self.enabled or not provider.get_capability("reusable_llm", True):
+            return None
+        try:
+            serialized = json.dumps(
+                [provider.name, preset_name, customizations, sorted(tool_names), tool_choice],
+                sort_keys=True,
+            )
+        except TypeError:
+            self.log.debug("Model customizations are not serializable, not caching LLM handle")
+            return None
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get_file_signature(self, filepath):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_dependency_signatures(self, provider, filepaths):
+        """
+        Get the current signatures of the files a handle depends on.
+
+        :param provider: Provider instance
+        :type provider: ProviderBase
+        :param filepaths: Paths of preset and tool files
+        :type filepaths: list
+        :returns: Signatures keyed by filepath
+        :rtype: dict
+        """
+        try:
+            filepaths = list(filepaths) + [inspect.getfile(provider.__class__)]
+        except TypeError:
+            pass
+        return {filepath: self.get_file_signature(filepath) for filepath in filepaths if filepath}
+
+    def get(self, key, provider, filepaths):
+        """
+        Get a cached LLM handle.
+
+        :param key: Cache key
+        :type key: str
+        :param provider: Provider instance the handle must have been built with
+        :type provider: ProviderBase
+        :param filepaths: Paths of preset and tool files the handle depends on
+        :type filepaths: list
+        :returns: The cached handle, or None
+        """
+        if key is None:
+            return None
+        signatures = self.get_dependency_signatures(provider, filepaths)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and (entry["provider"] is not provider or entry["signatures"] != signatures):
+                self.log.debug(f"Invalidating stale LLM handle: {key}")
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.log.debug(
+                f"Reusing cached LLM handle: {key}, hits: {self.stats['hits']}, misses: {self.stats['misses']}"
+            )
+            return entry["handle"]
+
+    def set(self, key, provider, filepaths, handle):
+        """
+        Cache an LLM handle.
+
+        :param key: Cache key
+        :type key: str
+        :param provider: Provider instance the handle was built with
+        :type provider: ProviderBase
+        :param filepaths: Paths of preset and tool files the handle depends on
+        :type filepaths: list
+        :param handle: The handle to cache
+        """
+        if key is None:
+            return
+        signatures = self.get_dependency_signatures(provider, filepaths)
+        with self.lock:
+            self.entries[key] = {
+                "provider": provider,
+                "signatures": signatures,
+                "handle": handle,
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,435 @@
+import time
+import threading
+
+import httpx
+
+from lwe.core.logger import Logger
+
+ROUTING_LEAST_OUTSTANDING = "least_outstanding"
+ROUTING_ROUND_ROBIN = "round_robin"
+ROUTING_STRATEGIES = (ROUTING_LEAST_OUTSTANDING, ROUTING_ROUND_ROBIN)
+
+DEFAULT_EJECT_AFTER_FAILURES = 3
+DEFAULT_EJECT_DURATION = 30.0
+DEFAULT_HEALTH_CHECK_PATH = "/models"
+HEALTH_CHECK_TIMEOUT = 5.0
+LATENCY_SMOOTHING = 0.2
+
+# Errors raised before the request reached the server, safe to retry on another endpoint.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class Endpoint:
+    """
+    An API endpoint, with its routing state and latency stats.
+    """
+
+    def __init__(self, url, weight=1):
+        self.url = url.rstrip("/")
+        self.weight = max(1, weight)
+        self.current_weight = 0
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = None
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.latency = None
+        self.total_latency = 0.0
+
+    def is_available(self, now):
+        return self.healthy and (self.ejected_until is None or now >= self.ejected_until)
+
+    def get_metrics(self, now):
+        responses = self.requests - self.failures
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "available": self.is_available(now),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency": self.latency,
+            "average_latency": self.total_latency / responses if responses else None,
+        }
+
+
+class LoadBalancer:
+    """
+    Routes requests across several endpoints serving the same API.
+
+    Endpoints are chosen by least outstanding requests relative to their
+    weight, or by weighted round robin. An endpoint is ejected for
+    eject_duration seconds after eject_after_failures consecutive connection
+    failures, and after failing an active health check until it passes one.
+    If every endpoint is ejected, they are all tried anyway.
+    """
+
+    def __init__(
+        self,
+        config,
+        endpoints,
+        routing=ROUTING_LEAST_OUTSTANDING,
+        eject_after_failures=DEFAULT_EJECT_AFTER_FAILURES,
+        eject_duration=DEFAULT_EJECT_DURATION,
+        health_check_interval=None,
+        health_check_path=DEFAULT_HEALTH_CHECK_PATH,
+        clock=time.monotonic,
+    ):
+        """
+        Initializes the load balancer.
+
+        :param config: Configuration settings
+        :type config: Config
+        :param endpoints: Endpoints, as base URLs or dicts with url and weight keys
+        :type endpoints: list
+        :param routing: Routing strategy, least_outstanding or round_robin
+        :type routing: str, optional
+        :param eject_after_failures: Consecutive connection failures that eject an endpoint
+        :type eject_after_failures: int, optional
+        :param eject_duration: Seconds an endpoint stays ejected after connection failures
+        :type eject_duration: float, optional
+        :param health_check_interval: Seconds between active health checks, disabled if not provided
+        :type health_check_interval: float, optional
+        :param health_check_path: Path requested on each endpoint by health checks
+        :type health_check_path: str, optional
+        :param clock: Function returning the current time in seconds
+        :type clock: callable, optional
+        """
+        if not endpoints:
+            raise ValueError("At least one endpoint is required")
+        if routing not in ROUTING_STRATEGIES:
+            raise ValueError(
+                f"Invalid routing strategy {routing}, must be one of: {', '.join(ROUTING_STRATEGIES)}"
+            )
+        self.log = Logger(self.__class__.__name__, config)
+        self.endpoints = [
+            (
+                Endpoint(endpoint)
+                if isinstance(endpoint, str)
+                else Endpoint(endpoint["url"], endpoint.get("weight", 1))
+            )
+            for endpoint in endpoints
+        ]
+        self.routing = routing
+        self.eject_after_failures = eject_after_failures
+        self.eject_duration = eject_duration
+        self.health_check_interval = health_check_interval
+        self.health_check_path = health_check_path
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.next_index = 0
+        self.health_check_thread = None
+        self.stopped = threading.Event()
+
+    @property
+    def base_url(self):
+        """
+        The base URL that requests are routed from, the first endpoint's URL.
+        """
+        return self.endpoints[0].url
+
+    def route_url(self, url):
+        """
+        Get the path of a request URL relative to an endpoint's URL.
+
+        :param url: Request URL
+        :type url: str
+        :returns: Relative path, or None if the URL is not under any endpoint
+        :rtype: str | None
+        """
+        for endpoint in self.endpoints:
+            if url == endpoint.url or url.startswith(f"{endpoint.url}/"):
+                return url[len(endpoint.url) :]
+        return None
+
+    def choose(self, exclude=None):
+        """
+        Choose an endpoint for a request, and count it as outstanding.
+
+        :param exclude: Endpoints already tried for the request
+        :type exclude: list, optional
+        :returns: Endpoint, or None if all endpoints were tried
+        :rtype: Endpoint | None
+        """
+        exclude = exclude or []
+        with self.lock:
+            now = self.clock()
+            candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+            if not candidates:
+                return None
+            available = [endpoint for endpoint in candidates if endpoint.is_available(now)]
+            candidates = available or candidates
+            if self.routing == ROUTING_ROUND_ROBIN:
+                endpoint = self.choose_round_robin(candidates)
+            else:
+                endpoint = self.choose_least_outstanding(candidates)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def choose_round_robin(self, candidates):
+        # Smooth weighted round robin, spreading heavier endpoints across the rotation.
+        total = sum(endpoint.weight for endpoint in candidates)
+        for endpoint in candidates:
+            endpoint.current_weight += endpoint.weight
+        endpoint = max(candidates, key=lambda endpoint: endpoint.current_weight)
+        endpoint.current_weight -= total
+        return endpoint
+
+    def choose_least_outstanding(self, candidates):
+        # Rotate the starting point so ties are spread across endpoints.
+        self.next_index = (self.next_index + 1) % len(candidates)
+        rotated = candidates[self.next_index :] + candidates[: self.next_index]
+        return min(rotated, key=lambda endpoint: (endpoint.outstanding + 1) / endpoint.weight)
+
+    def record_response(self, endpoint, latency):
+        """
+        Record a response from an endpoint.
+
+        :param endpoint: Endpoint
+        :type endpoint: Endpoint
+        :param latency: Seconds until the response headers were received
+        :type latency: float
+        """
+        with self.lock:
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = None
+            endpoint.total_latency += latency
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += LATENCY_SMOOTHING * (latency - endpoint.latency)
+
+    def record_failure(self, endpoint, error):
+        """
+        Record a connection failure, ejecting the endpoint after too many in a row.
+
+        :param endpoint: Endpoint
+        :type endpoint: Endpoint
+        :param error: Connection error
+        :type error: Exception
+        """
+        with self.lock:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.eject_after_failures:
+                endpoint.ejected_until = self.clock() + self.eject_duration
+                self.log.warning(
+                    f"Ejecting endpoint {endpoint.url} for {self.eject_duration} seconds "
+                    f"after {endpoint.consecutive_failures} connection failures: {error}"
+                )
+
+    def release(self, endpoint):
+        """
+        Stop counting a request to an endpoint as outstanding.
+
+        :param endpoint: Endpoint
+        :type endpoint: Endpoint
+        """
+        with self.lock:
+            endpoint.outstanding -= 1
+
+    def check_health(self, client=None):
+        """
+        Request the health check path on every endpoint, marking them healthy or not.
+
+        Any response below 500 counts as healthy, as the path may require
+        authentication.
+
+        :param client: HTTP client to use
+        :type client: httpx.Client, optional
+        """
+        owned = client is None
+        client = client or httpx.Client(timeout=HEALTH_CHECK_TIMEOUT)
+        try:
+            for endpoint in self.endpoints:
+                try:
+                    response = client.get(f"{endpoint.url}{self.health_check_path}")
+                    healthy = response.status_code < 500
+                except httpx.HTTPError as e:
+                    self.log.debug(f"Health check failed for {endpoint.url}: {e}")
+                    healthy = False
+                with self.lock:
+                    if endpoint.healthy != healthy:
+                        self.log.info(
+                            f"Endpoint {endpoint.url} is {'healthy' if healthy else 'unhealthy'}"
+                        )
+                    endpoint.healthy = healthy
+        finally:
+            if owned:
+                client.close()
+
+    def start_health_checks(self):
+        """
+        Start active health checks in a background thread, if an interval is configured.
+        """
+        if not self.health_check_interval or self.health_check_thread is not None:
+            return
+        self.health_check_thread = threading.Thread(
+            target=self.run_health_checks, name="lwe-health-check", daemon=True
+        )
+        self.health_check_thread.start()
+
+    def run_health_checks(self):
+        with httpx.Client(timeout=HEALTH_CHECK_TIMEOUT) as client:
+            while not self.stopped.is_set():
+                self.check_health(client)
+                self.stopped.wait(self.health_check_interval)
+
+    def close(self):
+        """
+        Stop active health checks.
+        """
+        self.stopped.set()
+
+    def get_metrics(self):
+        """
+        Get per endpoint routing and latency stats.
+
+        :returns: Metrics for each endpoint
+        :rtype: list
+        """
+        with self.lock:
+            now = self.clock()
+            return [endpoint.get_metrics(now) for endpoint in self.endpoints]
+
+
+class LoadBalancingMixin:
+    def prepare_request(self, request, endpoint, path):
+        url = httpx.URL(f"{endpoint.url}{path}")
+        request.url = url
+        request.headers["Host"] = url.netloc.decode("ascii")
+        return request
+
+    def get_path(self, request):
+        return self.load_balancer.route_url(str(request.url))
+
+
+class LoadBalancingTransport(LoadBalancingMixin, httpx.BaseTransport):
+    """
+    httpx transport routing requests under the load balancer's endpoints.
+
+    Requests failing to connect are retried on another endpoint, until
+    every endpoint has been tried. Other requests pass through unchanged.
+    """
+
+    def __init__(self, load_balancer, transport):
+        self.load_balancer = load_balancer
+        self.transport = transport
+
+    def handle_request(self, request):
+        path = self.get_path(request)
+        if path is None:
+            return self.transport.handle_request(request)
+        tried = []
+        while True:
+            endpoint = self.load_balancer.choose(tried)
+            tried.append(endpoint)
+            start = time.monotonic()
+            try:
+                response = self.transport.handle_request(
+                    self.prepare_request(request, endpoint, path)
+                )
+            except RETRYABLE_ERRORS as e:
+                self.load_balancer.release(endpoint)
+                self.load_balancer.record_failure(endpoint, e)
+                if len(tried) == len(self.load_balancer.endpoints):
+                    raise
+                continue
+            except Exception:
+                self.load_balancer.release(endpoint)
+                raise
+            self.load_balancer.record_response(endpoint, time.monotonic() - start)
+            response.stream = ReleasingStream(response.stream, self.load_balancer, endpoint)
+            return response
+
+    def close(self):
+        self.load_balancer.close()
+        self.transport.close()
+
+
+class AsyncLoadBalancingTransport(LoadBalancingMixin, httpx.AsyncBaseTransport):
+    """
+    Async version of LoadBalancingTransport.
+    """
+
+    def __init__(self, load_balancer, transport):
+        self.load_balancer = load_balancer
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        path = self.get_path(request)
+        if path is None:
+            return await self.transport.handle_async_request(request)
+        tried = []
+        while True:
+            endpoint = self.load_balancer.choose(tried)
+            tried.append(endpoint)
+            start = time.monotonic()
+            try:
+                response = await self.transport.handle_async_request(
+                    self.prepare_request(request, endpoint, path)
+                )
+            except RETRYABLE_ERRORS as e:
+                self.load_balancer.release(endpoint)
+                self.load_balancer.record_failure(endpoint, e)
+                if len(tried) == len(self.load_balancer.endpoints):
+                    raise
+                continue
+            except Exception:
+                self.load_balancer.release(endpoint)
+                raise
+            self.load_balancer.record_response(endpoint, time.monotonic() - start)
+            response.stream = AsyncReleasingStream(response.stream, self.load_balancer, endpoint)
+            return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReleasingStream(httpx.SyncByteStream):
+    """
+    Response stream that stops counting its request as outstanding when closed.
+    """
+
+    def __init__(self, stream, load_balancer, endpoint):
+        self.stream = stream
+        self.load_balancer = load_balancer
+        self.endpoint = endpoint
+        self.released = False
+
+    def __iter__(self):
+        yield from self.stream
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            if not self.released:
+                self.released = True
+                self.load_balancer.release(self.endpoint)
+
+
+class AsyncReleasingStream(httpx.AsyncByteStream):
+    """
+    Async version of ReleasingStream.
+    """
+
+    def __init__(self, stream, load_balancer, endpoint):
+        self.stream = stream
+        self.load_balancer = load_balancer
+        self.endpoint = endpoint
+        self.released = False
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            if not self.released:
+                self.released = True
+                self.load_balancer.release(self.endpoint)
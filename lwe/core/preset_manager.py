@@ -1,5 +1,4 @@
 import os
-import copy
 import yaml
 
 from lwe.core.config import Config
@@ -39,16 +38,34 @@ class PresetManager:
             os.path.join(util.get_package_root(self), "presets"),
         ]
         self.all_preset_dirs = self.system_preset_dirs + self.user_preset_dirs
+        # Parsed presets keyed by filepath, with the file stats they were parsed from.
+        self.preset_index = {}
+        # Preset names not found, with the preset dir stats at the time of the lookup.
+        self.missing_presets = {}
         self.load_presets()
 
     def ensure_preset(self, preset_name):
+        """
+        Ensure a preset exists, reloading presets if it is not yet known.
+
+        Presets are shared, and must be treated as read-only by callers.
+
+        :param preset_name: Preset name
+        :type preset_name: str
+        :returns: success, (metadata, customizations) preset tuple, message
+        :rtype: tuple
+        """
         if not preset_name:
             return False, None, "No preset name specified"
         self.log.debug(f"Ensuring preset {preset_name} exists")
         if preset_name not in self.presets:
+            dirs_signature = self.get_preset_dirs_signature()
+            if self.missing_presets.get(preset_name) == dirs_signature:
+                return False, preset_name, f"Preset {preset_name!r} not found"
             self.load_presets()
-        if preset_name not in self.presets:
-            return False, preset_name, f"Preset {preset_name!r} not found"
+            if preset_name not in self.presets:
+                self.missing_presets[preset_name] = dirs_signature
+                return False, preset_name, f"Preset {preset_name!r} not found"
         message = f"preset {preset_name} exists"
         self.log.debug(message)
         return True, self.presets[preset_name], message
@@ -68,6 +85,8 @@ class PresetManager:
             "max_submission_tokens": int,
             "return_on_tool_call": bool,
             "return_on_tool_response": bool,
+            "requests_per_minute": int,
+            "tokens_per_minute": int,
         }
 
     def load_test_preset(self):
@@ -96,33 +115,74 @@ class PresetManager:
             )
             self.presets["test_2"] = test_preset_2
 
+    def get_file_signature(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_preset_dirs_signature(self):
+        """
+        Build a signature that changes when preset files are added, removed or renamed.
+
+        :returns: Modification times of all preset directories
+        :rtype: tuple
+        """
+        return tuple(self.get_file_signature(preset_dir) for preset_dir in self.all_preset_dirs)
+
+    def load_preset_file(self, filepath):
+        """
+        Load a preset file, reusing the parsed preset if the file is unchanged.
+
+        :param filepath: Path to the preset file
+        :type filepath: str
+        :returns: (metadata, customizations) preset tuple, or None on error
+        :rtype: tuple | None
+        """
+        signature = self.get_file_signature(filepath)
+        indexed = self.preset_index.get(filepath)
+        if indexed and indexed[0] == signature:
+            return indexed[1]
+        self.log.debug(f"Loading YAML file: {filepath}")
+        try:
+            with open(filepath, "r") as file:
+                content = yaml.safe_load(file)
+            metadata, customizations = self.parse_preset_dict(content)
+        except Exception as e:
+            self.log.error(f"Error loading YAML file {filepath!r}: {e}")
+            self.preset_index.pop(filepath, None)
+            return None
+        metadata["filepath"] = filepath
+        preset = (metadata, customizations)
+        self.preset_index[filepath] = (signature, preset)
+        return preset
+
     def load_presets(self):
         self.log.debug("Loading presets from dirs: %s" % ", ".join(self.all_preset_dirs))
-        self.presets = copy.deepcopy(self.additional_presets)
+        self.presets = dict(self.additional_presets)
         self.load_test_preset()
+        seen_filepaths = set()
         try:
             for preset_dir in self.all_preset_dirs:
                 if os.path.exists(preset_dir) and os.path.isdir(preset_dir):
                     self.log.info(f"Processing directory: {preset_dir}")
                     for file_name in os.listdir(preset_dir):
                         if file_name.endswith(".yaml"):
-                            self.log.debug(f"Loading YAML file: {file_name}")
-                            try:
-                                filepath = os.path.join(preset_dir, file_name)
-                                with open(filepath, "r") as file:
-                                    content = yaml.safe_load(file)
-                            except Exception as e:
-                                self.log.error(f"Error loading YAML file {file_name!r}: {e}")
+                            filepath = os.path.join(preset_dir, file_name)
+                            seen_filepaths.add(filepath)
+                            preset = self.load_preset_file(filepath)
+                            if preset is None:
                                 continue
-                            metadata, customizations = self.parse_preset_dict(content)
-                            metadata["filepath"] = filepath
                             preset_name = file_name[:-5]  # Remove '.yaml' extension
-                            self.presets[preset_name] = (metadata, customizations)
+                            self.presets[preset_name] = preset
                             self.log.info(f"Successfully loaded preset: {preset_name}")
                 else:
                     message = f"Failed to load presets: Directory {preset_dir!r} not found or not a directory"
                     self.log.error(message)
                     return False, None, message
+            for filepath in set(self.preset_index) - seen_filepaths:
+                del self.preset_index[filepath]
             return True, self.presets, "Presets successfully loaded"
         except Exception as e:
             message = f"An error occurred while loading presets: {e}"
@@ -9,6 +9,7 @@ from typing import (
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
 
 from lwe.core.plugin import Plugin
+from lwe.core.http_client import SharedHttpClients
 from lwe.core import constants
 from lwe.core import util
 
@@ -116,6 +117,20 @@ class ProviderBase(Plugin):
         self.load_models()
         self.set_customizations(self.default_customizations())
 
+    def get_http_clients(self):
+        """
+        Get the HTTP clients shared by the LLMs this provider builds.
+
+        Only used by providers with the http_client capability, whose LLMs
+        accept http_client and http_async_client arguments.
+
+        :returns: Shared clients
+        :rtype: SharedHttpClients
+        """
+        if getattr(self, "http_clients", None) is None:
+            self.http_clients = SharedHttpClients(self.config, self.name)
+        return self.http_clients
+
     def default_config(self):
         return {}
 
@@ -334,8 +349,18 @@ class ProviderBase(Plugin):
             else self.get_customizations()
         )
         final_customizations.update(customizations)
+        # Customizations may be shared with presets, and LLM classes can modify
+        # nested dicts like model_kwargs in place.
+        final_customizations = {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in final_customizations.items()
+        }
         for key in constants.PROVIDER_PRIVATE_CUSTOMIZATION_KEYS:
             final_customizations.pop(key, None)
+        if self.get_capability("http_client"):
+            http_clients = self.get_http_clients()
+            final_customizations.setdefault("http_client", http_clients.get_client())
+            final_customizations.setdefault("http_async_client", http_clients.get_async_client())
         llm_class = self.llm_factory()
         llm_pre_init_method = getattr(self, "llm_pre_init", None)
         if llm_pre_init_method:
@@ -1,7 +1,16 @@
+import threading
+
 from lwe.core.config import Config
 from lwe.core.logger import Logger
 from lwe.core import constants
 from lwe.core.plugin_manager import PluginManager
+from lwe.core.circuit_breaker import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_HALF_OPEN_PROBES,
+    DEFAULT_OPEN_INTERVAL,
+    DEFAULT_PROBE_TIMEOUT,
+    CircuitBreaker,
+)
 
 
 class ProviderManager:
@@ -10,6 +19,8 @@ class ProviderManager:
         self.plugin_manager = plugin_manager or PluginManager(self.config)
         self.log = Logger(self.__class__.__name__, self.config)
         self.provider_plugins = self.get_provider_plugins()
+        self.circuit_breakers = {}
+        self.circuit_breakers_lock = threading.Lock()
 
     def get_provider_plugins(self):
         provider_plugins = {
@@ -40,3 +51,41 @@ class ProviderManager:
     def get_provider_from_name(self, provider_name):
         full_name = self.full_name(provider_name)
         return self.provider_plugins[full_name] if full_name in self.provider_plugins else None
+
+    def get_circuit_breaker(self, provider_name, endpoint=None):
+        """
+        Get the circuit breaker for a provider endpoint, shared by all requests.
+
+        :param provider_name: Provider name
+        :type provider_name: str
+        :param endpoint: Endpoint URL, if the provider has several
+        :type endpoint: str, optional
+        :returns: Circuit breaker, or None if circuit breakers are disabled
+        :rtype: CircuitBreaker | None
+        """
+        options = self.config.get("backend_options.circuit_breaker") or {}
+        if not options.get("enabled"):
+            return None
+        key = self.full_name(provider_name)
+        if endpoint:
+            key = f"{key} ({endpoint})"
+        with self.circuit_breakers_lock:
+            if key not in self.circuit_breakers:
+                self.circuit_breakers[key] = CircuitBreaker(
+                    failure_threshold=options.get("failure_threshold", DEFAULT_FAILURE_THRESHOLD),
+                    open_interval=options.get("open_interval", DEFAULT_OPEN_INTERVAL),
+                    half_open_probes=options.get("half_open_probes", DEFAULT_HALF_OPEN_PROBES),
+                    probe_timeout=options.get("probe_timeout", DEFAULT_PROBE_TIMEOUT),
+                )
+            return self.circuit_breakers[key]
+
+    def get_circuit_breaker_states(self):
+        """
+        Get the state of every circuit breaker.
+
+        :returns: Circuit breaker states, keyed by provider and endpoint
+        :rtype: dict
+        """
+        with self.circuit_breakers_lock:
+            circuit_breakers = dict(self.circuit_breakers)
+        return {key: breaker.get_state() for key, breaker in circuit_breakers.items()}
@@ -0,0 +1,190 @@
+import time
+import threading
+
+SECONDS_PER_MINUTE = 60.0
+
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity per minute.
+
+    Reservations are always granted, and may take the bucket below zero.
+    The caller waits until the debt is repaid, so callers are served in
+    the order they reserved.
+    """
+
+    def __init__(self, capacity, now):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+
+    @property
+    def rate(self):
+        return self.capacity / SECONDS_PER_MINUTE
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """
+        Reserve tokens.
+
+        :param amount: Number of tokens, capped at the capacity of the bucket
+        :type amount: float
+        :param now: Current time
+        :type now: float
+        :returns: Seconds to wait before using the tokens
+        :rtype: float
+        """
+        self.refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount, now):
+        self.refill(now)
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """
+    Client side requests per minute and tokens per minute limits.
+
+    Tokens are reserved from the prompt token estimate before a request, and
+    corrected with the token usage reported by the provider afterwards.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=None,
+        tokens_per_minute=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Initializes the rate limiter.
+
+        :param requests_per_minute: Maximum requests per minute, unlimited if not provided
+        :type requests_per_minute: int, optional
+        :param tokens_per_minute: Maximum tokens per minute, unlimited if not provided
+        :type tokens_per_minute: int, optional
+        :param clock: Function returning the current time in seconds
+        :type clock: callable, optional
+        :param sleep: Function sleeping for a number of seconds
+        :type sleep: callable, optional
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.requests = None
+        self.tokens = None
+        self.metrics = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_time": 0.0,
+        }
+        self.set_limits(requests_per_minute, tokens_per_minute)
+
+    def set_limits(self, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Set the limits, keeping the current bucket levels where possible.
+
+        :param requests_per_minute: Maximum requests per minute, unlimited if not provided
+        :type requests_per_minute: int, optional
+        :param tokens_per_minute: Maximum tokens per minute, unlimited if not provided
+        :type tokens_per_minute: int, optional
+        """
+        with self.lock:
+            now = self.clock()
+            self.requests = self.update_bucket(self.requests, requests_per_minute, now)
+            self.tokens = self.update_bucket(self.tokens, tokens_per_minute, now)
+
+    def update_bucket(self, bucket, capacity, now):
+        if not capacity:
+            return None
+        if bucket is None:
+            return TokenBucket(capacity, now)
+        bucket.refill(now)
+        bucket.capacity = capacity
+        bucket.tokens = min(bucket.tokens, capacity)
+        return bucket
+
+    @property
+    def limits_tokens(self):
+        return self.tokens is not None
+
+    def acquire(self, tokens=0):
+        """
+        Wait until a request with a number of tokens is allowed.
+
+        :param tokens: Estimated number of tokens used by the request
+        :type tokens: int
+        :returns: Seconds waited
+        :rtype: float
+        """
+        with self.lock:
+            now = self.clock()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.metrics["requests"] += 1
+            if wait > 0:
+                self.metrics["throttled"] += 1
+                self.metrics["wait_time"] += wait
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated_tokens, used_tokens):
+        """
+        Correct the tokens reserved for a request with the tokens it used.
+
+        :param estimated_tokens: Tokens reserved by acquire()
+        :type estimated_tokens: int
+        :param used_tokens: Tokens reported by the provider
+        :type used_tokens: int
+        """
+        if self.tokens is None:
+            return
+        with self.lock:
+            self.tokens.adjust(used_tokens - estimated_tokens, self.clock())
+
+    def get_metrics(self):
+        """
+        Get rate limiting metrics.
+
+        :returns: Counts of requests and throttled requests, and total wait time
+        :rtype: dict
+        """
+        with self.lock:
+            return dict(self.metrics)
+
+
+def get_rate_limiter(key, requests_per_minute=None, tokens_per_minute=None):
+    """
+    Get the rate limiter shared by all threads for a key, e.g. a provider and model.
+
+    :param key: Rate limiter key
+    :type key: str
+    :param requests_per_minute: Maximum requests per minute
+    :type requests_per_minute: int, optional
+    :param tokens_per_minute: Maximum tokens per minute
+    :type tokens_per_minute: int, optional
+    :returns: Rate limiter, or None if no limits are set
+    :rtype: RateLimiter | None
+    """
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    with rate_limiters_lock:
+        rate_limiter = rate_limiters.get(key)
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+            rate_limiters[key] = rate_limiter
+            return rate_limiter
+    rate_limiter.set_limits(requests_per_minute, tokens_per_minute)
+    return rate_limiter
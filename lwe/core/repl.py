@@ -5,6 +5,7 @@ import yaml
 import os
 import traceback
 import signal
+import shlex
 import frontmatter
 import pyperclip
 
@@ -639,6 +640,29 @@ class Repl:
                     "Current conversation has no title, you must send information first",
                 )
 
+    def command_backfill_titles(self, arg):
+        """
+        Generate titles for untitled conversations
+
+        Several conversations are titled in each request to the LLM, see the
+        backend_options.title_generation settings for batch size and concurrency.
+
+        Arguments:
+            limit: maximum number of conversations to title (default all)
+
+        Examples:
+            {COMMAND}
+            {COMMAND} 50
+        """
+        limit = None
+        if arg:
+            try:
+                limit = int(arg)
+            except ValueError:
+                return False, arg, "Invalid limit, must be an integer"
+        util.print_markdown("* Generating titles for untitled conversations...")
+        return self.backend.backfill_titles(limit=limit)
+
     def command_chat(self, arg):
         """
         Retrieve chat content
@@ -1020,6 +1044,7 @@ class Repl:
             * prompt-edit-run: Collect values for template variables, then open in an editor, then run it on editor save and close
             * prompt-run: Collect values for template variables, then run it
             * run: Run a template
+            * batch: Run a template over each row of a CSV, JSONL or SQLite file
             * show: Show a template
 
         Arguments:
@@ -1027,6 +1052,13 @@ class Repl:
 
             For copy, a new template name is also required.
 
+            For batch, an input file and an output JSONL file are also required,
+            followed by optional key=value options:
+                * concurrency: Maximum number of requests in flight
+                * query: SQL query, required for SQLite input files
+                * resume: Set to false to overwrite the output file instead of
+                  skipping rows already completed in it
+
         Examples:
             * /template copy mytemplate.md mytemplate_copy.md
             * /template delete mytemplate.md
@@ -1035,6 +1067,8 @@ class Repl:
             * /template prompt-edit-run mytemplate.md
             * /template prompt-run mytemplate.md
             * /template run mytemplate.md
+            * /template batch mytemplate.md rows.csv results.jsonl concurrency=8
+            * /template batch mytemplate.md data.db results.jsonl query="SELECT * FROM reviews"
             * /template show mytemplate.md
         """
         return self.dispatch_command_action("template", args)
@@ -1135,6 +1169,37 @@ class Repl:
         _template, variables, substitutions = response
         return self.run_template(template_name, substitutions)
 
+    def action_template_batch(self, template_name=None, input_source=None, output_file=None, *args):
+        """
+        Run a template over each row of a dataset.
+
+        :param template_name: The name of the template.
+        :type template_name: str
+        :param input_source: Path to a CSV, JSONL or SQLite file.
+        :type input_source: str
+        :param output_file: Path to the JSONL output file.
+        :type output_file: str
+        :param args: Options in key=value format.
+        :type args: tuple
+        """
+        if not template_name or not input_source or not output_file:
+            return False, None, "Template name, input file and output file required"
+        try:
+            options = dict(arg.split("=", 1) for arg in shlex.split(" ".join(args)))
+        except ValueError:
+            return False, args, "Batch options must be in key=value format"
+        unknown = set(options) - {"concurrency", "query", "resume"}
+        if unknown:
+            return False, options, f"Unknown batch options: {', '.join(sorted(unknown))}"
+        return self.backend.run_template_batch(
+            template_name,
+            input_source,
+            output_file,
+            query=options.get("query"),
+            concurrency=options.get("concurrency"),
+            resume=options.get("resume", "true").lower() not in ["false", "no", "0"],
+        )
+
     def action_template_prompt_run(self, template_name):
         """
         Prompt for template variable values, then run.
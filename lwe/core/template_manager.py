@@ -1,15 +1,24 @@
 import os
+import copy
 import frontmatter
 import shutil
 import tempfile
 
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound, meta
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    TemplateNotFound,
+    meta,
+)
 
 from lwe.core.config import Config
 from lwe.core.logger import Logger
+from lwe.core.cache_manager import CacheManager
 import lwe.core.util as util
 
 TEMP_TEMPLATE_DIR = "lwe-temp-templates"
+TEMPLATE_BYTECODE_CACHE_DIR = "templates"
 
 
 class TemplateManager:
@@ -40,7 +49,9 @@ class TemplateManager:
             self.user_template_dirs + self.system_template_dirs + [self.temp_template_dir]
         )
         self.templates = []
-        self.templates_env = None
+        self.templates_env = self.make_templates_env()
+        self.template_variables_cache = {}
+        self.template_source_cache = {}
 
     def template_builtin_variables(self):
         """
@@ -65,7 +76,8 @@ class TemplateManager:
         if not template_name:
             return False, None, "No template name specified"
         self.log.debug(f"Ensuring template {template_name} exists")
-        self.load_templates()
+        if template_name not in self.templates or not self.template_exists(template_name):
+            self.load_templates()
         if template_name not in self.templates:
             return False, template_name, f"Template {template_name!r} not found"
         message = f"Template {template_name} exists"
@@ -273,14 +285,61 @@ class TemplateManager:
         """
         substitutions = substitutions or {}
         template, _ = self.get_template_and_variables(template_name)
-        source = frontmatter.load(template.filename)
-        template_substitutions, overrides = self.extract_template_run_overrides(source.metadata)
+        metadata, final_template = self.get_parsed_template_source(template_name, template.filename)
+        template_substitutions, overrides = self.extract_template_run_overrides(metadata)
         final_substitutions = {**template_substitutions, **substitutions}
         self.log.debug(f"Rendering template: {template_name}")
-        final_template = self.templates_env.from_string(source.content)
         message = final_template.render(**final_substitutions)
         return message, overrides
 
+    def get_parsed_template_source(self, template_name, filepath):
+        """
+        Get the frontmatter metadata and compiled body of a template file.
+
+        Results are cached by file path and modification time.
+
+        :param template_name: The name of the template
+        :type template_name: str
+        :param filepath: The path of the template file
+        :type filepath: str
+        :return: A copy of the metadata, and the compiled template body
+        :rtype: tuple
+        """
+        file_key = self.get_file_cache_key(filepath)
+        cached = self.template_source_cache.get(filepath)
+        if cached and cached[0] == file_key:
+            _file_key, metadata, compiled = cached
+        else:
+            self.log.debug(f"Parsing template source: {filepath}")
+            source = frontmatter.load(filepath)
+            metadata = source.metadata
+            compiled = self.compile_template_content(template_name, filepath, source.content)
+            self.template_source_cache[filepath] = (file_key, metadata, compiled)
+        return copy.deepcopy(metadata), compiled
+
+    def compile_template_content(self, template_name, filepath, content):
+        """
+        Compile template content, using the bytecode cache when possible.
+
+        :param template_name: The name of the template
+        :type template_name: str
+        :param filepath: The path of the template file
+        :type filepath: str
+        :param content: The template content to compile
+        :type content: str
+        :return: The compiled template
+        :rtype: jinja2.Template
+        """
+        env = self.templates_env
+        bucket_name = f"{template_name}:content"
+        bucket = env.bytecode_cache.get_bucket(env, bucket_name, filepath, content)
+        code = bucket.code
+        if code is None:
+            code = env.compile(content, bucket_name, filepath)
+            bucket.code = code
+            env.bytecode_cache.set_bucket(bucket)
+        return env.template_class.from_code(env, code, env.make_globals(None))
+
     def process_template_builtin_variables(self, template_name, variables=None):
         """
         Process the built-in variables in a template.
@@ -351,6 +410,26 @@ class TemplateManager:
         if os.path.exists(filepath):
             os.remove(filepath)
 
+    def make_templates_env(self):
+        """
+        Create the Jinja environment shared by all template operations.
+
+        Compiled templates are cached in memory, and as bytecode in the cache
+        directory, and are reloaded when their source files change.
+
+        :return: The Jinja environment
+        :rtype: jinja2.Environment
+        """
+        cache_dir = os.path.join(
+            CacheManager(self.config).cache_dirs[0], TEMPLATE_BYTECODE_CACHE_DIR
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+        return Environment(
+            loader=FileSystemLoader(self.all_template_dirs),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+            auto_reload=True,
+        )
+
     def load_templates(self):
         """
         Load templates from directories.
@@ -358,11 +437,36 @@ class TemplateManager:
         :return: None
         """
         self.log.debug("Loading templates from dirs: %s" % ", ".join(self.all_template_dirs))
-        jinja_env = Environment(loader=FileSystemLoader(self.all_template_dirs))
-        filenames = jinja_env.list_templates()
-        self.templates_env = jinja_env
+        filenames = self.templates_env.list_templates()
         self.templates = filenames or []
 
+    def template_exists(self, template_name):
+        """
+        Check that a listed template can still be loaded.
+
+        :param template_name: The name of the template
+        :type template_name: str
+        :return: True if the template can be loaded, False otherwise
+        :rtype: bool
+        """
+        try:
+            self.templates_env.get_template(template_name)
+            return True
+        except TemplateNotFound:
+            return False
+
+    def get_file_cache_key(self, filepath):
+        """
+        Build a cache key that changes whenever a file changes.
+
+        :param filepath: The path of the file
+        :type filepath: str
+        :return: The file's modification time and size
+        :rtype: tuple
+        """
+        stat = os.stat(filepath)
+        return stat.st_mtime_ns, stat.st_size
+
     def get_template_and_variables(self, template_name):
         """
         Fetches a template and its variables.
@@ -376,10 +480,15 @@ class TemplateManager:
             template = self.templates_env.get_template(template_name)
         except TemplateNotFound:
             return None, None
+        file_key = self.get_file_cache_key(template.filename)
+        cached = self.template_variables_cache.get(template.filename)
+        if cached and cached[0] == file_key:
+            return template, set(cached[1])
         template_source = self.templates_env.loader.get_source(self.templates_env, template_name)
         parsed_content = self.templates_env.parse(template_source)
         variables = meta.find_undeclared_variables(parsed_content)
-        return template, variables
+        self.template_variables_cache[template.filename] = (file_key, variables)
+        return template, set(variables)
 
     def is_system_template(self, filepath):
         """
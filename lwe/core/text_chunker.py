@@ -0,0 +1,124 @@
+import re
+
+from lwe.core.token_manager import get_encoding_for_model
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_CHUNK_OVERLAP = 200
+
+HEADING_SPLIT_REGEX = re.compile(r"(?m)^(?=#{1,6}\s)")
+HEADING_LINE_REGEX = re.compile(r"^#{1,6}\s[^\n]*\s*$")
+PARAGRAPH_REGEX = re.compile(r".*?(?:\n[ \t]*\n\s*|\Z)", re.DOTALL)
+
+
+class TextChunker:
+    """
+    Split text into chunks of a maximum number of tokens.
+
+    Text is split on markdown headings first, then on paragraphs, and only
+    on raw token boundaries when a single paragraph is too large, so chunks
+    follow the structure of the document where possible. Consecutive chunks
+    can overlap by a number of tokens, to keep context across chunk borders.
+
+    Token counts use tiktoken, the same as TokenManager, and are approximate
+    for providers using other tokenizers.
+    """
+
+    def __init__(
+        self,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        overlap=DEFAULT_CHUNK_OVERLAP,
+        model_name=None,
+        encoding=None,
+    ):
+        """
+        Initializes the chunker.
+
+        :param chunk_size: Maximum tokens per chunk
+        :type chunk_size: int
+        :param overlap: Tokens repeated from the end of the previous chunk
+        :type overlap: int
+        :param model_name: Model to count tokens for, the default encoding is used if not provided
+        :type model_name: str, optional
+        :param encoding: Encoding to use instead of looking one up for the model
+        :type encoding: Encoding, optional
+        :raises ValueError: If the overlap is not smaller than the chunk size
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if overlap < 0 or overlap >= chunk_size:
+            raise ValueError("overlap must be at least 0 and smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.encoding = encoding or get_encoding_for_model(model_name)
+
+    def count_tokens(self, text):
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def split_units(self, text):
+        """
+        Split text into units no larger than the chunk size.
+
+        :returns: List of (text, tokens) tuples
+        :rtype: list
+        """
+        units = []
+        for section in HEADING_SPLIT_REGEX.split(text):
+            if not section:
+                continue
+            tokens = self.encoding.encode(section, disallowed_special=())
+            if len(tokens) <= self.chunk_size:
+                units.append((section, tokens))
+                continue
+            heading = ""
+            for paragraph in PARAGRAPH_REGEX.findall(section):
+                if not paragraph:
+                    continue
+                if not heading and HEADING_LINE_REGEX.match(paragraph):
+                    # Keep the heading together with the paragraph that follows it.
+                    heading = paragraph
+                    continue
+                paragraph = heading + paragraph
+                heading = ""
+                tokens = self.encoding.encode(paragraph, disallowed_special=())
+                if len(tokens) <= self.chunk_size:
+                    units.append((paragraph, tokens))
+                else:
+                    for i in range(0, len(tokens), self.chunk_size):
+                        part = tokens[i : i + self.chunk_size]
+                        units.append((self.encoding.decode(part), part))
+            if heading:
+                units.append((heading, self.encoding.encode(heading, disallowed_special=())))
+        return units
+
+    def chunk(self, text):
+        """
+        Split text into chunks.
+
+        :param text: Text to split
+        :type text: str
+        :returns: List of chunks, each a dict with index, content and tokens
+        :rtype: list
+        """
+        chunks = []
+        current = []
+        current_tokens = []
+
+        def emit():
+            content = "".join(current)
+            if content.strip():
+                chunks.append(
+                    {"index": len(chunks), "content": content, "tokens": len(current_tokens)}
+                )
+
+        for unit_text, unit_tokens in self.split_units(text):
+            if current and len(current_tokens) + len(unit_tokens) > self.chunk_size:
+                emit()
+                keep = min(self.overlap, self.chunk_size - len(unit_tokens))
+                tail = current_tokens[len(current_tokens) - keep :] if keep > 0 else []
+                current = [self.encoding.decode(tail)] if tail else []
+                current_tokens = list(tail)
+            current.append(unit_text)
+            current_tokens.extend(unit_tokens)
+        if current:
+            emit()
+        return chunks
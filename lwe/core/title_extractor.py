@@ -0,0 +1,89 @@
+import re
+from collections import Counter
+
+from lwe.core import constants
+
+DEFAULT_MAX_WORDS = 6
+
+CODE_BLOCK_REGEX = re.compile(r"```.*?(?:```|\Z)", re.DOTALL)
+URL_REGEX = re.compile(r"https?://\S+")
+SENTENCE_SPLIT_REGEX = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD_REGEX = re.compile(r"[A-Za-z0-9][A-Za-z0-9'+#.-]*[A-Za-z0-9+#]|[A-Za-z0-9]")
+
+STOPWORDS = frozenset("""
+    a about above after again against all am an and any are as at be because been before
+    being below between both but by can could did do does doing down during each few for
+    from further had has have having he her here hers herself him himself his how i if in
+    into is it its itself just let me more most my myself no nor not now of off on once
+    only or other our ours ourselves out over own please same she should so some such than
+    that the their theirs them themselves then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with
+    would you your yours yourself yourselves
+    give help hi hello hey know like make need tell thanks thank want write
+    """.split())
+
+
+def tokenize(text):
+    return WORD_REGEX.findall(text)
+
+
+def is_keyword(word):
+    return len(word) > 1 and word.lower() not in STOPWORDS
+
+
+def score_sentences(sentences):
+    """
+    Score sentences by the frequency of their keywords in the whole text.
+
+    Earlier sentences get a small bonus, as the topic of a message is
+    usually stated near its start.
+
+    :param sentences: Sentences to score
+    :type sentences: list
+    :returns: Scores, in the order of the sentences
+    :rtype: list
+    """
+    sentence_keywords = [
+        [word.lower() for word in tokenize(sentence) if is_keyword(word)] for sentence in sentences
+    ]
+    frequencies = Counter(word for keywords in sentence_keywords for word in keywords)
+    scores = []
+    for index, keywords in enumerate(sentence_keywords):
+        if not keywords:
+            scores.append(0.0)
+            continue
+        score = sum(frequencies[word] for word in keywords) / len(keywords)
+        scores.append(score + len(set(keywords)) * 0.1 + 1.0 / (index + 1))
+    return scores
+
+
+def capitalize(word):
+    return word[0].upper() + word[1:]
+
+
+def extract_title(text, max_words=DEFAULT_MAX_WORDS):
+    """
+    Build a short title from text, without calling an LLM.
+
+    The highest scoring sentence is picked, and its first keywords are used
+    as the title, in the order they appear.
+
+    :param text: Text to title, usually the first user message of a conversation
+    :type text: str
+    :param max_words: Maximum number of words in the title
+    :type max_words: int
+    :returns: Title, or None if the text has no words
+    :rtype: str | None
+    """
+    text = text[: constants.TITLE_GENERATION_MAX_CHARACTERS]
+    text = URL_REGEX.sub(" ", CODE_BLOCK_REGEX.sub(" ", text))
+    sentences = [s for s in SENTENCE_SPLIT_REGEX.split(text) if s.strip()]
+    if not sentences:
+        return None
+    scores = score_sentences(sentences)
+    sentence = sentences[scores.index(max(scores))]
+    words = tokenize(sentence)
+    if not words:
+        return None
+    keywords = [word for word in words if is_keyword(word)] or words
+    return " ".join(capitalize(word) for word in keywords[:max_words])
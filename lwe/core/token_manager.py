@@ -6,6 +6,28 @@ from lwe.core.logger import Logger
 
 from lwe.core import util
 
+DEFAULT_ENCODING = "cl100k_base"
+
+
+def get_encoding_for_model(model_name=None):
+    """
+    Get the tiktoken encoding for a model, falling back to the default encoding.
+
+    :param model_name: Model name, the default encoding is used if not provided
+    :type model_name: str, optional
+    :raises Exception: If error getting encoding
+    :returns: Encoding object
+    :rtype: Encoding
+    """
+    try:
+        if model_name is None:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as err:
+        raise Exception(f"Unable to get token encoding for model {model_name}: {str(err)}") from err
+
 
 class TokenManager:
     """Manage model tokens."""
@@ -29,15 +51,7 @@ class TokenManager:
         validate_models = self.provider.get_capability("validate_models", True)
         if validate_models and self.model_name not in self.provider.available_models:
             raise NotImplementedError(f"Unsupported model: {self.model_name}")
-        try:
-            encoding = tiktoken.encoding_for_model(self.model_name)
-        except KeyError:
-            encoding = tiktoken.get_encoding("cl100k_base")
-        except Exception as err:
-            raise Exception(
-                f"Unable to get token encoding for model {self.model_name}: {str(err)}"
-            ) from err
-        return encoding
+        return get_encoding_for_model(self.model_name)
 
     def get_num_tokens_from_messages(self, messages, encoding=None):
         """
@@ -96,3 +110,148 @@ class TokenManager:
             tools_string = json.dumps(tools, indent=2)
             num_tokens += len(encoding.encode(tools_string))
         return num_tokens
+
+    def get_num_tokens_from_text(self, text, encoding=None):
+        """
+        Get number of tokens for a string.
+
+        :param text: Text to count
+        :type text: str
+        :param encoding: Encoding to use, defaults to None to auto-detect
+        :type encoding: Encoding, optional
+        :returns: Number of tokens
+        :rtype: int
+        """
+        if not encoding:
+            encoding = self.get_token_encoding()
+        return len(encoding.encode(text))
+
+    def truncate_text(self, text, max_tokens, strategy="head_tail", encoding=None):
+        """
+        Truncate text to a maximum number of tokens.
+
+        :param text: Text to truncate
+        :type text: str
+        :param max_tokens: Maximum number of tokens to keep
+        :type max_tokens: int
+        :param strategy: One of head, tail, head_tail
+        :type strategy: str
+        :param encoding: Encoding to use, defaults to None to auto-detect
+        :type encoding: Encoding, optional
+        :returns: Truncated text
+        :rtype: str
+        """
+        if not encoding:
+            encoding = self.get_token_encoding()
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        omitted = len(tokens) - max_tokens
+        marker = f"\n...[{omitted} tokens truncated]...\n"
+        if strategy == "head":
+            return encoding.decode(tokens[:max_tokens]) + marker
+        if strategy == "tail":
+            return marker + encoding.decode(tokens[-max_tokens:])
+        if strategy == "head_tail":
+            head_tokens = max_tokens // 2
+            tail_tokens = max_tokens - head_tokens
+            head = encoding.decode(tokens[:head_tokens])
+            tail = encoding.decode(tokens[-tail_tokens:]) if tail_tokens else ""
+            return head + marker + tail
+        raise ValueError(f"Unknown truncation strategy: {strategy}")
+
+    def limit_response_rows(self, response, max_rows):
+        """
+        Limit the rows of a list result.
+
+        For a dict response, the largest top level list is limited.
+
+        :param response: Tool response
+        :type response: dict | list
+        :param max_rows: Maximum number of rows to keep
+        :type max_rows: int
+        :returns: Limited response, total row count or None if there were no rows to limit
+        :rtype: tuple
+        """
+        if isinstance(response, list):
+            if len(response) <= max_rows:
+                return response, None
+            return {"rows": response[:max_rows]}, len(response)
+        if isinstance(response, dict):
+            lists = [(key, value) for key, value in response.items() if isinstance(value, list)]
+            if lists:
+                key, rows = max(lists, key=lambda item: len(item[1]))
+                if len(rows) > max_rows:
+                    limited = dict(response)
+                    limited[key] = rows[:max_rows]
+                    return limited, len(rows)
+        return response, None
+
+    def fit_tool_response(self, response, settings, summarizer=None, encoding=None):
+        """
+        Fit a tool response within a token budget.
+
+        Strategies:
+            head, tail, head_tail: Truncate the serialized response.
+            rows: Limit the rows of a list result, falls back to head_tail.
+            summarize: Summarize the serialized response with the summarizer callable,
+                falls back to head_tail. Responses over summarize_max_input_tokens
+                are truncated with head_tail before being summarized.
+
+        :param response: Tool response
+        :type response: dict | list
+        :param settings: Response settings: max_tokens, strategy, max_rows,
+                         summarize_max_input_tokens
+        :type settings: dict
+        :param summarizer: Callable taking (text, max_tokens), returning a summary
+        :type summarizer: Callable, optional
+        :param encoding: Encoding to use, defaults to None to auto-detect
+        :type encoding: Encoding, optional
+        :returns: Response to send to the LLM, and whether it was modified
+        :rtype: tuple
+        """
+        max_tokens = settings.get("max_tokens")
+        if not max_tokens:
+            return response, False
+        if not encoding:
+            encoding = self.get_token_encoding()
+        text = json.dumps(response, indent=2, default=str)
+        original_tokens = self.get_num_tokens_from_text(text, encoding)
+        if original_tokens <= max_tokens:
+            return response, False
+        strategy = settings.get("strategy", "head_tail")
+        self.log.info(
+            f"Tool response of {original_tokens} tokens exceeds limit of {max_tokens}, applying strategy: {strategy}"
+        )
+        truncation = {
+            "strategy": strategy,
+            "original_tokens": original_tokens,
+        }
+        if strategy == "rows":
+            limited, total_rows = self.limit_response_rows(response, settings.get("max_rows", 20))
+            if total_rows is not None:
+                limited_text = json.dumps(limited, indent=2, default=str)
+                if self.get_num_tokens_from_text(limited_text, encoding) <= max_tokens:
+                    truncation["total_rows"] = total_rows
+                    return {**limited, "truncation": truncation}, True
+            strategy = "head_tail"
+        if strategy == "summarize":
+            summary = None
+            if summarizer:
+                summary_input = text
+                max_input_tokens = settings.get("summarize_max_input_tokens")
+                if max_input_tokens and original_tokens > max_input_tokens:
+                    summary_input = self.truncate_text(
+                        text, max_input_tokens, "head_tail", encoding
+                    )
+                    truncation["summarized_tokens"] = max_input_tokens
+                try:
+                    summary = summarizer(summary_input, max_tokens)
+                except Exception as e:
+                    self.log.warning(f"Tool response summarization failed: {e}")
+            if summary and self.get_num_tokens_from_text(summary, encoding) <= max_tokens:
+                return {"summary": summary, "truncation": truncation}, True
+            strategy = "head_tail"
+        truncation["strategy"] = strategy
+        content = self.truncate_text(text, max_tokens, strategy, encoding)
+        return {"content": content, "truncation": truncation}, True
@@ -1,5 +1,8 @@
 from abc import abstractmethod
 
+import copy
+import inspect
+import threading
 import yaml
 
 from pathlib import Path
@@ -8,8 +11,19 @@ from lwe.core.config import Config
 from lwe.core.logger import Logger
 from lwe.core.doc_parser import func_to_openai_tool_spec
 
+# Parsed tool config files, keyed by path, with the file signature they were parsed from.
+config_file_cache = {}
+config_file_cache_lock = threading.Lock()
+
 
 class Tool:
+    # Set to True, or a dict of cache settings (ttl, max_entries, persist), to
+    # memoize results of a deterministic tool.
+    cache = None
+    # Dict of response settings (max_tokens, strategy, max_rows) overriding the
+    # global tools.response configuration.
+    response = None
+
     def __init__(self, config):
         self.config = config or Config()
         self.log = Logger(self.__class__.__name__, self.config)
@@ -20,23 +34,83 @@ class Tool:
     def set_filepath(self, filepath):
         self.filepath = filepath
 
-    def get_config(self):
+    @property
+    def is_async(self):
+        return inspect.iscoroutinefunction(self.__call__)
+
+    def load_config_file(self):
+        """
+        Load the tool's ``.config.yaml``.
+
+        Tool instances are created for each call, so the parsed file is
+        cached for all instances, and parsed again only when it changes.
+
+        :returns: Configuration, or None if the tool has no config file
+        :rtype: dict | None
+        """
         filepath = Path(self.filepath)
         config_filepath = filepath.with_suffix(".config.yaml")
-        if config_filepath.is_file():
-            try:
-                self.log.debug(
-                    f"Loading configuration for {self.name} from filepath: {config_filepath}"
-                )
-                with open(config_filepath, "r") as config_file:
-                    config = yaml.safe_load(config_file)
-                self.log.debug(f"Loaded YAML configuration for {self.name}: {config}")
-                return config
-            except Exception as e:
-                self.log.error(f"Error loading configuration for {self.name}: {str(e)}")
-                raise ValueError(f"Failed to load configuration file for {self.name}") from e
+        try:
+            stat = config_filepath.stat()
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(config_filepath)
+        with config_file_cache_lock:
+            cached = config_file_cache.get(key)
+        if cached and cached[0] == signature:
+            return copy.deepcopy(cached[1])
+        try:
+            self.log.debug(
+                f"Loading configuration for {self.name} from filepath: {config_filepath}"
+            )
+            with open(config_filepath, "r") as config_file:
+                config = yaml.safe_load(config_file)
+            self.log.debug(f"Loaded YAML configuration for {self.name}: {config}")
+        except Exception as e:
+            self.log.error(f"Error loading configuration for {self.name}: {str(e)}")
+            raise ValueError(f"Failed to load configuration file for {self.name}") from e
+        with config_file_cache_lock:
+            config_file_cache[key] = (signature, config)
+        return copy.deepcopy(config)
+
+    def get_config(self):
+        config = self.load_config_file()
+        if config is not None:
+            config.pop("cache", None)
+            config.pop("response", None)
+            return config
         return func_to_openai_tool_spec(self.name, self.__call__)
 
+    def get_cache_config(self):
+        """
+        Get the result cache settings for the tool.
+
+        Settings in the tool's ``.config.yaml`` take precedence over the
+        ``cache`` class attribute.
+
+        :returns: Cache settings, or None if the tool is not cacheable
+        :rtype: dict | None
+        """
+        config = self.load_config_file() or {}
+        cache = config.get("cache", self.cache)
+        if not cache:
+            return None
+        return {} if cache is True else dict(cache)
+
+    def get_response_config(self):
+        """
+        Get the response size settings for the tool.
+
+        Settings in the tool's ``.config.yaml`` take precedence over the
+        ``response`` class attribute.
+
+        :returns: Response settings
+        :rtype: dict
+        """
+        config = self.load_config_file() or {}
+        return dict(config.get("response", self.response) or {})
+
     @abstractmethod
     def __call__(self, **kwargs):
         pass
@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import importlib
 import traceback
 
@@ -10,6 +11,8 @@ from langchain_core.utils.function_calling import convert_to_openai_function
 
 from lwe.core.config import Config
 from lwe.core.logger import Logger
+from lwe.core.async_compat import run_coroutine
+from lwe.core.tool_result_cache import ToolResultCache
 import lwe.core.util as util
 
 LANGCHAIN_TOOL_PREFIX = "Langchain-"
@@ -34,6 +37,7 @@ class ToolManager:
             os.path.join(util.get_package_root(self), "tools"),
         ]
         self.all_tool_dirs = self.system_tool_dirs + self.user_tool_dirs
+        self.result_cache = ToolResultCache(self.config)
 
     def make_user_tool_dirs(self):
         for tool_dir in self.user_tool_dirs:
@@ -188,6 +192,24 @@ class ToolManager:
             self.log.error(f"Error loading tool configuration for {tool_name}: {str(e)}")
             raise RuntimeError(f"Failed to load configuration for {tool_name}") from e
 
+    def get_tool_response_config(self, tool_name):
+        """
+        Get the response size settings for a tool.
+
+        Tool level settings are merged over the global tools.response settings.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :returns: Response settings
+        :rtype: dict
+        """
+        settings = dict(self.config.get("tools.response") or {})
+        if not self.is_langchain_tool(tool_name):
+            success, tool_instance, _user_message = self.get_tool(tool_name)
+            if success:
+                settings.update(tool_instance.get_response_config())
+        return settings
+
     def get_tool(self, tool_name):
         self.log.debug(f"Getting tool: {tool_name}")
         success, tool_path, user_message = self.load_tool(tool_name)
@@ -196,9 +218,50 @@ class ToolManager:
         tool_instance = self.setup_tool_instance(tool_name, tool_path)
         return True, tool_instance, f"Tool {tool_name!r} retrieved successfully"
 
-    def run_tool(self, tool_name, input_data):
+    def prepare_tool_input(self, input_data):
         if isinstance(input_data, str):
             input_data = json.loads(input_data, strict=False)
+        return input_data
+
+    def tool_success_response(self, tool_name, output_data, cache_settings=None):
+        cache_status = ""
+        if cache_settings is not None:
+            stats = self.result_cache.get_stats(tool_name)
+            cache_status = f" (cache hits: {stats['hits']}, misses: {stats['misses']})"
+        self.log.info(
+            f"Tool {tool_name} executed successfully{cache_status}, output data: {output_data}"
+        )
+        return True, output_data, f"Tool {tool_name!r} executed successfully"
+
+    def get_cached_tool_response(self, tool_name, input_data, cache_settings):
+        if cache_settings is None:
+            return None
+        hit, output_data = self.result_cache.get(tool_name, input_data, cache_settings)
+        if not hit:
+            return None
+        stats = self.result_cache.get_stats(tool_name)
+        self.log.info(
+            f"Tool {tool_name} served from cache (cache hits: {stats['hits']}, misses: {stats['misses']}), output data: {output_data}"
+        )
+        return True, output_data, f"Tool {tool_name!r} executed successfully (cached)"
+
+    def cache_tool_response(self, tool_name, input_data, output_data, cache_settings):
+        if cache_settings is None:
+            return
+        if isinstance(output_data, dict) and "error" in output_data:
+            self.log.debug(f"Not caching error response from tool {tool_name}")
+            return
+        self.result_cache.set(tool_name, input_data, output_data, cache_settings)
+
+    def tool_error_response(self, tool_name, error):
+        message = f"Error: Exception occurred while executing {tool_name}: {str(error)}"
+        self.log.error(message)
+        if self.config.debug:
+            traceback.print_exc()
+        return False, None, message
+
+    def run_tool(self, tool_name, input_data):
+        input_data = self.prepare_tool_input(input_data)
         if self.is_langchain_tool(tool_name):
             return self.run_langchain_tool(tool_name, input_data)
         self.log.debug(f"Running tool: {tool_name} with data: {input_data}")
@@ -206,15 +269,70 @@ class ToolManager:
         if not success:
             return False, tool_instance, user_message
         try:
-            output_data = tool_instance(**input_data)
-            self.log.info(f"Tool {tool_name} executed successfully, output data: {output_data}")
-            return True, output_data, f"Tool {tool_name!r} executed successfully"
+            cache_settings = tool_instance.get_cache_config()
+            cached_response = self.get_cached_tool_response(tool_name, input_data, cache_settings)
+            if cached_response:
+                return cached_response
+            if tool_instance.is_async:
+                output_data = run_coroutine(tool_instance(**input_data))
+            else:
+                output_data = tool_instance(**input_data)
+            self.cache_tool_response(tool_name, input_data, output_data, cache_settings)
+            return self.tool_success_response(tool_name, output_data, cache_settings)
         except Exception as e:
-            message = f"Error: Exception occurred while executing {tool_name}: {str(e)}"
-            self.log.error(message)
-            if self.config.debug:
-                traceback.print_exc()
-            return False, None, message
+            return self.tool_error_response(tool_name, e)
+
+    async def arun_tool(self, tool_name, input_data):
+        """Run a tool from a running event loop.
+
+        Async tools are awaited directly, sync tools are run in a worker thread
+        so they do not block the loop.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :param input_data: Tool arguments
+        :type input_data: dict | str
+        :returns: success, response, message
+        :rtype: tuple
+        """
+        input_data = self.prepare_tool_input(input_data)
+        if self.is_langchain_tool(tool_name):
+            return await asyncio.to_thread(self.run_langchain_tool, tool_name, input_data)
+        self.log.debug(f"Running tool asynchronously: {tool_name} with data: {input_data}")
+        success, tool_instance, user_message = self.get_tool(tool_name)
+        if not success:
+            return False, tool_instance, user_message
+        try:
+            cache_settings = tool_instance.get_cache_config()
+            cached_response = self.get_cached_tool_response(tool_name, input_data, cache_settings)
+            if cached_response:
+                return cached_response
+            if tool_instance.is_async:
+                output_data = await tool_instance(**input_data)
+            else:
+                output_data = await asyncio.to_thread(tool_instance, **input_data)
+            self.cache_tool_response(tool_name, input_data, output_data, cache_settings)
+            return self.tool_success_response(tool_name, output_data, cache_settings)
+        except Exception as e:
+            return self.tool_error_response(tool_name, e)
+
+    async def arun_tools(self, tool_calls):
+        return await asyncio.gather(
+            *[self.arun_tool(tool_name, input_data) for tool_name, input_data in tool_calls]
+        )
+
+    def run_tools(self, tool_calls):
+        """Run several tools concurrently.
+
+        Sync and async tools may be mixed freely.
+
+        :param tool_calls: List of (tool_name, input_data) tuples
+        :type tool_calls: list
+        :returns: List of (success, response, message) tuples, in input order
+        :rtype: list
+        """
+        self.log.debug(f"Running {len(tool_calls)} tools concurrently")
+        return run_coroutine(self.arun_tools(tool_calls))
 
     def is_system_tool(self, filepath):
         for dir in self.system_tool_dirs:
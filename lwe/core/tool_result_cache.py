@@ -0,0 +1,170 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from lwe.core.config import Config
+from lwe.core.logger import Logger
+from lwe.core.cache_manager import CacheManager
+
+TOOL_RESULT_CACHE_DIR = "tool_results"
+DEFAULT_MAX_ENTRIES = 128
+
+
+class ToolResultCache:
+    """
+    Memoize the results of deterministic tools.
+
+    Results are kept in a per-tool LRU, and optionally persisted to the cache
+    directory so they survive across sessions.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initializes the class with the given configuration.
+
+        :param config: Configuration settings. If not provided, a default Config object is used.
+        :type config: Config, optional
+        """
+        self.config = config or Config()
+        self.log = Logger(self.__class__.__name__, self.config)
+        self.cache_manager = CacheManager(self.config)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.stats = {}
+
+    def make_key(self, input_data):
+        """
+        Build a canonical cache key from tool arguments.
+
+        :param input_data: Tool arguments
+        :type input_data: dict
+        :returns: Canonical JSON representation of the arguments
+        :rtype: str
+        """
+        return json.dumps(input_data, sort_keys=True, separators=(",", ":"), default=str)
+
+    def make_cache_file_key(self, tool_name, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(TOOL_RESULT_CACHE_DIR, tool_name, f"{digest}.json")
+
+    def get_stats(self, tool_name):
+        """
+        Get hit/miss counters for a tool.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :returns: Dict with hits and misses
+        :rtype: dict
+        """
+        with self.lock:
+            return dict(self.stats.get(tool_name, {"hits": 0, "misses": 0}))
+
+    def _record(self, tool_name, hit):
+        stats = self.stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    def _is_expired(self, expires):
+        return expires is not None and expires <= time.time()
+
+    def _load_persisted(self, tool_name, key):
+        file_key = self.make_cache_file_key(tool_name, key)
+        success, entry, _user_message = self.cache_manager.cache_get(file_key)
+        if not success or entry.get("key") != key:
+            return None
+        if self._is_expired(entry.get("expires")):
+            self.cache_manager.cache_delete(file_key)
+            return None
+        return entry["expires"], entry["response"]
+
+    def _persist(self, tool_name, key, expires, response):
+        file_key = self.make_cache_file_key(tool_name, key)
+        os.makedirs(
+            os.path.dirname(os.path.join(self.cache_manager.cache_dirs[0], file_key)),
+            exist_ok=True,
+        )
+        entry = {"key": key, "expires": expires, "response": response}
+        success, _content, user_message = self.cache_manager.cache_set(file_key, entry)
+        if not success:
+            self.log.warning(user_message)
+
+    def get(self, tool_name, input_data, settings):
+        """
+        Look up a cached tool result.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :param input_data: Tool arguments
+        :type input_data: dict
+        :param settings: Tool cache settings
+        :type settings: dict
+        :returns: Tuple of (hit, response)
+        :rtype: tuple
+        """
+        key = self.make_key(input_data)
+        with self.lock:
+            tool_entries = self.entries.setdefault(tool_name, OrderedDict())
+            entry = tool_entries.get(key)
+            if entry and self._is_expired(entry[0]):
+                del tool_entries[key]
+                entry = None
+            if entry is None and settings.get("persist"):
+                entry = self._load_persisted(tool_name, key)
+                if entry:
+                    tool_entries[key] = entry
+            if entry is None:
+                self._record(tool_name, False)
+                return False, None
+            tool_entries.move_to_end(key)
+            self._record(tool_name, True)
+            return True, copy.deepcopy(entry[1])
+
+    def set(self, tool_name, input_data, response, settings):
+        """
+        Store a tool result.
+
+        :param tool_name: Tool name
+        :type tool_name: str
+        :param input_data: Tool arguments
+        :type input_data: dict
+        :param response: Tool response
+        :type response: dict
+        :param settings: Tool cache settings
+        :type settings: dict
+        """
+        key = self.make_key(input_data)
+        ttl = settings.get("ttl")
+        expires = time.time() + ttl if ttl else None
+        max_entries = settings.get("max_entries", DEFAULT_MAX_ENTRIES)
+        with self.lock:
+            tool_entries = self.entries.setdefault(tool_name, OrderedDict())
+            tool_entries[key] = (expires, copy.deepcopy(response))
+            tool_entries.move_to_end(key)
+            if settings.get("persist"):
+                self._persist(tool_name, key, expires, response)
+            while len(tool_entries) > max_entries:
+                evicted_key, _entry = tool_entries.popitem(last=False)
+                self.log.debug(f"Evicted cached result for tool {tool_name}: {evicted_key}")
+                if settings.get("persist"):
+                    self.cache_manager.cache_delete(
+                        self.make_cache_file_key(tool_name, evicted_key)
+                    )
+
+    def clear(self, tool_name=None):
+        """
+        Clear in-memory cached results and counters.
+
+        :param tool_name: Tool name, or None to clear all tools
+        :type tool_name: str, optional
+        """
+        with self.lock:
+            if tool_name is None:
+                self.entries.clear()
+                self.stats.clear()
+            else:
+                self.entries.pop(tool_name, None)
+                self.stats.pop(tool_name, None)
@@ -1,7 +1,6 @@
 import os
 import re
 import json
-import copy
 import subprocess
 import inspect
 import shutil
@@ -61,6 +60,30 @@ def merge_dicts(dict1, dict2):
     return dict1
 
 
+def merge_dicts_copy(dict1, dict2):
+    """
+    Merge dict2 into a copy of dict1, leaving both unchanged.
+
+    Only the nested dicts on merged paths are copied, other values are
+    shared with the originals, so neither the result nor its values may be
+    modified in place.
+
+    :param dict1: Base dict
+    :type dict1: dict
+    :param dict2: Dict to merge in
+    :type dict2: dict
+    :returns: Merged dict
+    :rtype: dict
+    """
+    merged = dict(dict1)
+    for key, value in dict2.items():
+        if isinstance(merged.get(key), dict) and isinstance(value, dict):
+            merged[key] = merge_dicts_copy(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
 def underscore_to_dash(text):
     return text.replace("_", "-")
 
@@ -474,7 +497,7 @@ def extract_preset_configuration_from_request_overrides(request_overrides, activ
                 "No active preset to override",
             )
         if "preset_overrides" in request_overrides:
-            preset_overrides = copy.deepcopy(request_overrides["preset_overrides"])
+            preset_overrides = request_overrides["preset_overrides"]
     return (
         True,
         (preset_name, preset_overrides, activate_preset),
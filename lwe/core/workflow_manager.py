@@ -29,8 +29,36 @@ class WorkflowManager:
             os.path.join(util.get_package_root(self), "workflows"),
         ]
         self.all_workflow_dirs = self.system_workflow_dirs + self.user_workflow_dirs
+        self.native_executor = None
+        self.native_executor_factory = None
         self.load_workflows()
 
+    def set_native_executor(self, native_executor):
+        """
+        Set the executor used to run supported workflows in-process.
+
+        :param native_executor: Native workflow executor
+        :type native_executor: NativeWorkflowExecutor
+        """
+        self.native_executor = native_executor
+
+    def set_native_executor_factory(self, native_executor_factory):
+        """
+        Set a callable building the native executor, only called when the
+        native executor is first used.
+
+        :param native_executor_factory: Callable returning a native workflow executor
+        :type native_executor_factory: callable
+        """
+        self.native_executor_factory = native_executor_factory
+
+    def use_native_executor(self):
+        if self.config.get("workflow.executor") != "native":
+            return False
+        if self.native_executor is None and self.native_executor_factory is not None:
+            self.native_executor = self.native_executor_factory()
+        return self.native_executor is not None
+
     def get_workflow_dir(self):
         package_root = util.get_package_root(self)
         workflow_dir = os.path.join(package_root, "backends", "api", "workflow")
@@ -117,13 +145,24 @@ class WorkflowManager:
         return ""
 
     def run(self, workflow_name, workflow_args):
-        success, _, user_message = self.ensure_runnable_workflow(workflow_name)
+        success, workflow, user_message = self.ensure_runnable_workflow(workflow_name)
         if not success:
             return success, workflow_name, user_message
-        self.set_workflow_environment()
         success, workflow_file, message = self.ensure_workflow(workflow_name)
         if not success:
             return success, workflow_file, message
+        if self.use_native_executor():
+            success, _, user_message = self.native_executor.check_workflow(workflow, workflow_file)
+            if success:
+                self.log.info(f"Running workflow {workflow_name} from {workflow_file} natively")
+                return self.native_executor.run(
+                    workflow_name, workflow, workflow_file, workflow_args
+                )
+            self.log.info(f"{user_message}, falling back to Ansible")
+        return self.run_ansible(workflow_name, workflow_file, workflow_args)
+
+    def run_ansible(self, workflow_name, workflow_file, workflow_args):
+        self.set_workflow_environment()
         self.log.info(
             f"Running workflow {workflow_name} from {workflow_file} with args: {workflow_args}"
         )
@@ -17,6 +17,30 @@ USER_DIRECTORIES = [
 ]
 
 
+def run_template_batch(shell, args):
+    """
+    Run the --template-batch batch and exit, if one was given.
+
+    :param shell: The shell
+    :type shell: ApiRepl
+    :param args: Parsed command line arguments
+    :type args: argparse.Namespace
+    """
+    if args.template_batch is None:
+        return
+    template_name, input_source, output_file = args.template_batch
+    success, _result, user_message = shell.backend.run_template_batch(
+        template_name,
+        input_source,
+        output_file,
+        query=args.batch_query,
+        concurrency=args.batch_concurrency,
+        resume=args.batch_resume,
+    )
+    util.print_status_message(success, user_message)
+    exit(0 if success else 1)
+
+
 def main():
     dummy_config = Config()
     parser = argparse.ArgumentParser()
@@ -104,6 +128,33 @@ def main():
         action="store",
         help="Arguments to pass to the workflow",
     )
+    parser.add_argument(
+        "--template-batch",
+        nargs=3,
+        metavar=("TEMPLATE", "INPUT", "OUTPUT"),
+        action="store",
+        help="Run TEMPLATE over each row of INPUT (CSV, JSONL or SQLite), writing results to OUTPUT (JSONL)",
+    )
+    parser.add_argument(
+        "--batch-query",
+        metavar="SQL",
+        action="store",
+        help="SQL query selecting the rows, required for SQLite --template-batch input",
+    )
+    parser.add_argument(
+        "--batch-concurrency",
+        metavar="NUM",
+        type=int,
+        action="store",
+        help="Maximum number of --template-batch requests in flight",
+    )
+    parser.add_argument(
+        "--batch-no-resume",
+        default=True,
+        dest="batch_resume",
+        action="store_false",
+        help="Overwrite the --template-batch output file instead of resuming from it",
+    )
     parser.add_argument(
         "--cache-dir",
         metavar="PATH",
@@ -209,6 +260,7 @@ def main():
         shell.default("\n\n".join(shell_prompt))
         exit(0)
     else:
+        run_template_batch(shell, args)
         if args.workflow is not None:
             success, result, user_message = shell.backend.workflow_manager.run(
                 args.workflow, args.workflow_args
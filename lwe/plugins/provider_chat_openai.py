@@ -32,6 +32,7 @@ class ProviderChatOpenai(Provider):
         return {
             "chat": True,
             "validate_models": self.validate_models,
+            "http_client": True,
         }
 
     @property
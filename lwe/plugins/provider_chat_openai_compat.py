@@ -6,6 +6,8 @@ from pydantic import Field
 from langchain_openai import ChatOpenAI
 
 from lwe.core.provider import Provider, PresetValue
+from lwe.core.http_client import SharedHttpClients
+from lwe.core.load_balancer import LoadBalancer
 
 
 class CustomChatOpenAICompat(ChatOpenAI):
@@ -33,14 +35,28 @@ class CustomChatOpenAICompat(ChatOpenAI):
 class ProviderChatOpenaiCompat(Provider):
     """
     Access to third-party chat models via an OpenAI compatible API
+
+    Requests can be load balanced across several endpoints serving the same
+    models, configured in the plugin's endpoints setting.
     """
 
+    def default_config(self):
+        return {
+            "endpoints": [],
+            "routing": "least_outstanding",
+            "eject_after_failures": 3,
+            "eject_duration": 30,
+            "health_check_interval": None,
+            "health_check_path": "/models",
+        }
+
     @property
     def capabilities(self):
         return {
             "chat": True,
             "validate_models": False,
             "models": {},
+            "http_client": True,
         }
 
     @property
@@ -53,6 +69,31 @@ class ProviderChatOpenaiCompat(Provider):
     def llm_factory(self):
         return CustomChatOpenAICompat
 
+    def get_http_clients(self):
+        if getattr(self, "http_clients", None) is None:
+            self.http_clients = SharedHttpClients(self.config, self.name, self.make_load_balancer())
+        return self.http_clients
+
+    def make_load_balancer(self):
+        config = self.config.get(f"plugins.{self.name}") or {}
+        if not config.get("endpoints"):
+            return None
+        return LoadBalancer(
+            self.config,
+            config["endpoints"],
+            routing=config.get("routing", "least_outstanding"),
+            eject_after_failures=config.get("eject_after_failures", 3),
+            eject_duration=config.get("eject_duration", 30),
+            health_check_interval=config.get("health_check_interval"),
+            health_check_path=config.get("health_check_path", "/models"),
+        )
+
+    def llm_pre_init(self, customizations):
+        load_balancer = self.get_http_clients().load_balancer
+        if load_balancer and not customizations.get("openai_api_base"):
+            customizations["openai_api_base"] = load_balancer.base_url
+        return customizations
+
     def customization_config(self):
         return {
             "verbose": PresetValue(bool),
@@ -182,6 +182,8 @@ class CustomFakeMessagesListChatModel(FakeMessagesListChatModel):
 DEFAULT_CAPABILITIES = {
     "chat": True,
     "validate_models": False,
+    # Fake LLMs rotate through their responses, so must not be shared between requests.
+    "reusable_llm": False,
     "models": {
         "gpt-3.5-turbo": {
             "max_tokens": 4096,
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+import argparse
+import copy
+import os
+import tempfile
+import time
+import tracemalloc
+
+from lwe.core.config import Config
+from lwe.backends.api.backend import ApiBackend
+from lwe.backends.api.request import ApiRequest
+
+MB = 1024 * 1024
+
+
+def make_config(config_dir, data_dir):
+    config = Config(config_dir, data_dir)
+    config.set("database", "sqlite:///:memory:")
+    config.set("plugins.enabled", ["provider_fake_llm"])
+    config.set("backend_options.title_generation.provider", "fake_llm")
+    config.set("log.console.level", "error")
+    return config
+
+
+def make_messages(count, payload_size):
+    payload = "x" * payload_size
+    messages = []
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append(
+            {
+                "role": role,
+                "message": f"Message {i}: {payload}",
+                "message_type": "content",
+                "message_metadata": {"index": i},
+            }
+        )
+    return messages
+
+
+def measure(name, func):
+    tracemalloc.reset_peak()
+    before, _peak = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    after, peak = tracemalloc.get_traced_memory()
+    print(
+        f"{name}: {elapsed * 1000:.1f} ms, peak {(peak - before) / MB:.2f} MB, "
+        f"retained {(after - before) / MB:.2f} MB"
+    )
+    return result
+
+
+def run_benchmark(message_count, payload_size, max_submission_tokens):
+    with tempfile.TemporaryDirectory() as config_dir, tempfile.TemporaryDirectory() as data_dir:
+        os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "fake-api-key")
+        backend = ApiBackend(make_config(config_dir, data_dir))
+        success, provider, user_message = backend.provider_manager.load_provider("fake_llm")
+        if not success:
+            raise RuntimeError(user_message)
+        old_messages = make_messages(message_count, payload_size)
+        history_size = sum(len(m["message"]) for m in old_messages) / MB
+        print(f"Conversation: {message_count} messages, {history_size:.2f} MB of message content")
+        request = ApiRequest(
+            config=backend.config,
+            provider=provider,
+            provider_manager=backend.provider_manager,
+            tool_manager=backend.tool_manager,
+            input="Summarize the conversation",
+            preset_manager=backend.preset_manager,
+            old_messages=old_messages,
+            max_submission_tokens=max_submission_tokens,
+        )
+        tracemalloc.start()
+        try:
+            measure("Deep copy of history, for comparison", lambda: copy.deepcopy(old_messages))
+            measure("Set up request LLM", request.set_request_llm)
+            _new_messages, messages = measure("Prepare messages", request.prepare_ask_request)
+            measure("Build chat request", lambda: request.build_chat_request(messages))
+        finally:
+            tracemalloc.stop()
+            backend.title_generator.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure memory allocated while preparing an LLM request for a long conversation"
+    )
+    parser.add_argument("--messages", type=int, default=1000, help="Conversation length")
+    parser.add_argument(
+        "--payload-size", type=int, default=20000, help="Characters of content per message"
+    )
+    parser.add_argument(
+        "--max-submission-tokens",
+        type=int,
+        default=100000000,
+        help="Max submission tokens, lower it to include stripping old messages",
+    )
+    args = parser.parse_args()
+    run_benchmark(args.messages, args.payload_size, args.max_submission_tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from unittest.mock import Mock
+
+from langchain_core.messages import AIMessage
+
+from lwe.backends.api.database import Database
+from lwe.backends.api.orm import Orm, Manager
+from lwe.backends.api.conversation import ConversationManager
+from lwe.backends.api.message import MessageManager
+from lwe.backends.api.title_generator import TitleGenerator
+
+
+def make_title_generator(test_config, provider_manager, responses):
+    orm = Orm(test_config)
+    database = Database(test_config, orm=orm)
+    database.create_schema()
+    title_generator = TitleGenerator(test_config, provider_manager, orm)
+    provider = provider_manager.get_provider_from_name("fake_llm")
+    llm = provider.make_llm(
+        customizations={"responses": [AIMessage(content=response) for response in responses]}
+    )
+    title_generator.title_llm = (provider, llm)
+    return title_generator
+
+
+def add_conversation(orm, user, title=None, user_message="say hello"):
+    conversation_manager = ConversationManager(orm.config, orm)
+    message_manager = MessageManager(orm.config, orm)
+    _success, conversation, _message = conversation_manager.add_conversation(user.id, title=title)
+    message_manager.add_message(
+        conversation.id,
+        "system",
+        "You are a helpful assistant.",
+        "content",
+        None,
+        "fake_llm",
+        "",
+        "",
+    )
+    if user_message:
+        message_manager.add_message(
+            conversation.id, "user", user_message, "content", None, "fake_llm", "", ""
+        )
+    return conversation.id
+
+
+def get_title(orm, conversation_id):
+    _success, conversation, _message = ConversationManager(orm.config, orm).get_conversation(
+        conversation_id
+    )
+    return conversation.title
+
+
+def test_backfill_titles_in_batches(test_config, provider_manager):
+    title_generator = make_title_generator(
+        test_config,
+        provider_manager,
+        ['```json\n["Title One", "Title Two"]\n```', '["Title Three"]'],
+    )
+    orm = title_generator.orm
+    user = Manager(test_config, orm=orm).orm_add_user("test", None, None)
+    titled_id = add_conversation(orm, user, title="Existing title")
+    ids = [add_conversation(orm, user, user_message=f"message {i}") for i in range(3)]
+    no_user_message_id = add_conversation(orm, user, user_message=None)
+    success, stats, message = title_generator.backfill(user.id, batch_size=2, concurrency=1)
+    assert success
+    assert stats["conversations"] == 4
+    assert stats["batches"] == 2
+    assert stats["titled"] == 3
+    assert stats["skipped"] == 1
+    assert stats["fallback"] == 0
+    assert [get_title(orm, id) for id in ids] == ["Title One", "Title Two", "Title Three"]
+    assert get_title(orm, titled_id) == "Existing title"
+    assert get_title(orm, no_user_message_id) is None
+
+
+def test_backfill_titles_respects_limit(test_config, provider_manager):
+    title_generator = make_title_generator(test_config, provider_manager, ['["Title One"]'])
+    orm = title_generator.orm
+    user = Manager(test_config, orm=orm).orm_add_user("test", None, None)
+    ids = [add_conversation(orm, user) for _i in range(3)]
+    success, stats, message = title_generator.backfill(user.id, batch_size=5, limit=1)
+    assert success
+    assert stats["conversations"] == 1
+    assert get_title(orm, ids[0]) == "Title One"
+    assert get_title(orm, ids[1]) is None
+
+
+def test_backfill_titles_invalid_response_falls_back(test_config, provider_manager):
+    title_generator = make_title_generator(
+        test_config, provider_manager, ["Not a list of titles", "Single Title"]
+    )
+    orm = title_generator.orm
+    user = Manager(test_config, orm=orm).orm_add_user("test", None, None)
+    conversation_id = add_conversation(orm, user)
+    success, stats, message = title_generator.backfill(user.id)
+    assert success
+    assert stats["fallback"] == 1
+    assert stats["titled"] == 1
+    assert get_title(orm, conversation_id) == "Single Title"
+
+
+def test_generate_title_heuristic_strategy(test_config, provider_manager):
+    test_config.set("backend_options.title_generation.strategy", "heuristic")
+    title_generator = make_title_generator(test_config, provider_manager, [])
+    title_generator.invoke_title_llm = Mock()
+    orm = title_generator.orm
+    user = Manager(test_config, orm=orm).orm_add_user("test", None, None)
+    conversation_id = add_conversation(orm, user, user_message="Explain python decorators")
+    title_generator.submit(conversation_id)
+    assert get_title(orm, conversation_id) == "Explain Python Decorators"
+    assert title_generator.get_metrics()["completed"] == 1
+    title_generator.invoke_title_llm.assert_not_called()
+
+
+def test_backfill_titles_heuristic_strategy(test_config, provider_manager):
+    test_config.set("backend_options.title_generation.strategy", "heuristic")
+    title_generator = make_title_generator(test_config, provider_manager, [])
+    title_generator.invoke_title_llm = Mock()
+    orm = title_generator.orm
+    user = Manager(test_config, orm=orm).orm_add_user("test", None, None)
+    topics = ["alpha", "beta", "gamma"]
+    ids = [add_conversation(orm, user, user_message=f"Topic {topic}") for topic in topics]
+    success, stats, message = title_generator.backfill(user.id)
+    assert success
+    assert stats["titled"] == 3
+    assert stats["batches"] == 0
+    assert [get_title(orm, id) for id in ids] == ["Topic Alpha", "Topic Beta", "Topic Gamma"]
+    title_generator.invoke_title_llm.assert_not_called()
@@ -0,0 +1,122 @@
+import threading
+
+from lwe.core import adaptive_limiter as adaptive_limiter_module
+from lwe.core.adaptive_limiter import (
+    AdaptiveConcurrencyLimiter,
+    get_adaptive_limiter,
+    get_adaptive_limiter_metrics,
+    is_overload_error,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+def run_request(limiter, clock, latency=1.0, error=None):
+    start = limiter.acquire()
+    clock.now += latency
+    limiter.release(start, error)
+
+
+def test_is_overload_error():
+    assert is_overload_error(StatusError(429))
+    assert is_overload_error(StatusError(503))
+    assert not is_overload_error(StatusError(400))
+    assert is_overload_error(TimeoutError())
+    assert is_overload_error(APITimeoutError())
+    assert not is_overload_error(ValueError("bad request"))
+    assert not is_overload_error("error message")
+
+
+def test_limit_grows_while_latency_stable():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4, clock=clock)
+    for _i in range(20):
+        run_request(limiter, clock)
+    metrics = limiter.get_metrics()
+    assert metrics["limit"] == 4
+    assert metrics["succeeded"] == 20
+    assert metrics["latency"] == 1.0
+
+
+def test_limit_does_not_grow_when_latency_rises():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, latency_tolerance=1.5, clock=clock)
+    run_request(limiter, clock, latency=1.0)
+    for _i in range(20):
+        run_request(limiter, clock, latency=10.0)
+    assert limiter.get_metrics()["limit"] <= 3
+
+
+def test_overload_cuts_limit_once_per_burst():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, clock=clock)
+    starts = [limiter.acquire() for _i in range(4)]
+    clock.now += 1
+    for start in starts:
+        limiter.release(start, StatusError(429))
+    metrics = limiter.get_metrics()
+    assert metrics["limit"] == 4
+    assert metrics["overloaded"] == 4
+    assert metrics["decreases"] == 1
+    run_request(limiter, clock, error=StatusError(500))
+    assert limiter.get_metrics()["limit"] == 2
+
+
+def test_limit_never_below_min():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, clock=clock)
+    for _i in range(5):
+        run_request(limiter, clock, error=TimeoutError())
+    assert limiter.get_metrics()["limit"] == 1
+
+
+def test_other_errors_do_not_change_limit():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, clock=clock)
+    run_request(limiter, clock, error=ValueError("invalid"))
+    metrics = limiter.get_metrics()
+    assert metrics["limit"] == 4
+    assert metrics["failed"] == 1
+
+
+def test_acquire_blocks_at_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    start = limiter.acquire()
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.release(limiter.acquire())
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.1)
+    assert limiter.get_metrics()["in_flight"] == 1
+    limiter.release(start)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_get_adaptive_limiter_shared_per_key(test_config, monkeypatch):
+    monkeypatch.setattr(adaptive_limiter_module, "adaptive_limiters", {})
+    test_config.set("backend_options.adaptive_concurrency.initial_limit", 3)
+    limiter = get_adaptive_limiter("provider:model", test_config)
+    assert get_adaptive_limiter("provider:model", test_config) is limiter
+    assert limiter.get_metrics()["limit"] == 3
+    assert list(get_adaptive_limiter_metrics()) == ["provider:model"]
@@ -0,0 +1,130 @@
+import httpx
+
+from lwe.core.circuit_breaker import CircuitBreaker, is_provider_failure
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def make_breaker(clock, **kwargs):
+    return CircuitBreaker(failure_threshold=2, open_interval=10, clock=clock, **kwargs)
+
+
+def test_is_provider_failure():
+    assert is_provider_failure(StatusError(503))
+    assert is_provider_failure(StatusError(429))
+    assert is_provider_failure(TimeoutError())
+    assert is_provider_failure(ConnectionRefusedError())
+    assert is_provider_failure(APIConnectionError())
+    assert is_provider_failure(httpx.ConnectError("refused"))
+    assert not is_provider_failure(StatusError(400))
+    assert not is_provider_failure(ValueError("bad response"))
+
+
+def test_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_result(StatusError(500))
+    breaker.record_result()
+    breaker.record_result(StatusError(500))
+    assert breaker.allow_request()
+    breaker.record_result(StatusError(500))
+    assert not breaker.allow_request()
+    state = breaker.get_state()
+    assert state["state"] == "open"
+    assert state["retry_in"] == 10
+    assert state["rejected"] == 1
+    assert state["opened"] == 1
+
+
+def test_request_errors_do_not_open():
+    breaker = make_breaker(FakeClock())
+    for _i in range(5):
+        breaker.record_result(ValueError("invalid"))
+    assert breaker.get_state()["state"] == "closed"
+
+
+def test_half_open_probe_closes_on_success():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _i in range(2):
+        breaker.record_failure()
+    clock.now += 10
+    assert breaker.get_state()["state"] == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_result()
+    assert breaker.get_state()["state"] == "closed"
+    assert breaker.allow_request()
+
+
+def test_half_open_probe_failure_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock, half_open_probes=2)
+    for _i in range(2):
+        breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    breaker.record_result(TimeoutError())
+    state = breaker.get_state()
+    assert state["state"] == "open"
+    assert state["opened"] == 2
+    assert not breaker.allow_request()
+
+
+def test_released_probe_lets_another_through():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _i in range(2):
+        breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.get_state()["state"] == "half_open"
+    assert breaker.allow_request()
+
+
+def test_lost_probe_times_out():
+    clock = FakeClock()
+    breaker = make_breaker(clock, probe_timeout=60)
+    for _i in range(2):
+        breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow_request()
+    clock.now += 59
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_provider_manager_breakers_per_endpoint(test_config, provider_manager):
+    breaker = provider_manager.get_circuit_breaker("fake_llm")
+    assert provider_manager.get_circuit_breaker("provider_fake_llm") is breaker
+    other = provider_manager.get_circuit_breaker("fake_llm", "http://replica:8000/v1")
+    assert other is not breaker
+    states = provider_manager.get_circuit_breaker_states()
+    assert set(states) == {"provider_fake_llm", "provider_fake_llm (http://replica:8000/v1)"}
+    assert states["provider_fake_llm"]["state"] == "closed"
+
+
+def test_provider_manager_breakers_disabled(test_config, provider_manager):
+    test_config.set("backend_options.circuit_breaker.enabled", False)
+    assert provider_manager.get_circuit_breaker("fake_llm") is None
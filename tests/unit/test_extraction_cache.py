@@ -0,0 +1,59 @@
+import os
+import time
+
+from unittest.mock import Mock
+
+from lwe.core.extraction_cache import ExtractionCache
+from lwe.backends.api.workflow.library import text_extractor
+
+
+def test_get_miss_then_hit(test_config):
+    cache = ExtractionCache(test_config)
+    key = cache.make_key("sha256:abc", "pymupdf4llm", "1.0")
+    assert cache.get(key) is None
+    cache.set(key, "Extracted text")
+    assert ExtractionCache(test_config).get(key) == "Extracted text"
+
+
+def test_key_includes_extractor_version(test_config):
+    cache = ExtractionCache(test_config)
+    assert cache.make_key("sha256:abc", "pymupdf4llm", "1.0") != cache.make_key(
+        "sha256:abc", "pymupdf4llm", "1.1"
+    )
+
+
+def test_disabled_cache(test_config):
+    test_config.set("workflow.extraction_cache.enabled", False)
+    cache = ExtractionCache(test_config)
+    cache.set("abc", "Extracted text")
+    assert cache.get("abc") is None
+
+
+def test_least_recently_used_entries_evicted_over_max_size(test_config):
+    cache = ExtractionCache(test_config)
+    cache.max_size = 25
+    cache.set("aa1", "x" * 10)
+    cache.set("aa2", "x" * 10)
+    past = time.time() - 60
+    os.utime(cache.entry_path("aa2"), (past, past))
+    os.utime(cache.entry_path("aa1"), (past + 1, past + 1))
+    cache.set("aa3", "x" * 10)
+    assert cache.get("aa1") is not None
+    assert cache.get("aa2") is None
+    assert cache.get("aa3") is not None
+
+
+def test_extract_content_uses_cache_for_unchanged_file(test_config, tmp_path, monkeypatch):
+    extract = Mock(side_effect=lambda path, *args: (f"Markdown {open(path, 'rb').read()!r}", True))
+    monkeypatch.setattr(text_extractor, "extract_text_pymupdf", extract)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"one")
+    cache = ExtractionCache(test_config)
+    assert text_extractor.extract_content(str(path), cache=cache)[1] == "Markdown b'one'"
+    assert text_extractor.extract_content(str(path), max_length=8, cache=cache)[1] == "Markdown"
+    assert extract.call_count == 1
+    path.write_bytes(b"two")
+    assert text_extractor.extract_content(str(path), cache=cache)[1] == "Markdown b'two'"
+    assert extract.call_count == 2
+    text_extractor.extract_content(str(path))
+    assert extract.call_count == 3
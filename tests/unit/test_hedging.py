@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from lwe.core import hedging as hedging_module
+from lwe.core.hedging import LatencyTracker, get_latency_tracker, run_hedged
+
+
+def make_request(result, delay=0.0, error=None, events=None, name=None):
+    async def request():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if events is not None:
+                events.append(f"{name} cancelled")
+            raise
+        if error:
+            raise error
+        return result
+
+    return request
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker()
+    for latency in range(1, 10):
+        tracker.record_latency(latency / 10)
+    assert tracker.percentile(95, min_samples=10) is None
+    tracker.record_latency(1.0)
+    assert tracker.percentile(95, min_samples=10) == 1.0
+    assert tracker.percentile(50, min_samples=10) == 0.6
+
+
+def test_allow_hedge_caps_extra_requests():
+    tracker = LatencyTracker()
+    assert not tracker.allow_hedge(0.5)
+    for _i in range(4):
+        tracker.record_request()
+    assert tracker.allow_hedge(0.5)
+    assert tracker.allow_hedge(0.5)
+    assert not tracker.allow_hedge(0.5)
+    assert tracker.get_metrics() == {"requests": 4, "hedges": 2, "samples": 0}
+
+
+def test_fast_primary_is_not_hedged():
+    hedges = []
+    response, hedge_won = run_hedged(
+        make_request("primary"), lambda: hedges.append(1) or make_request("hedge")(), 1.0
+    )
+    assert (response, hedge_won) == ("primary", False)
+    assert hedges == []
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    events = []
+    response, hedge_won = run_hedged(
+        make_request("primary", delay=5, events=events, name="primary"),
+        make_request("hedge"),
+        0.05,
+    )
+    assert (response, hedge_won) == ("hedge", True)
+    assert events == ["primary cancelled"]
+
+
+def test_hedge_used_when_primary_fails_after_delay():
+    response, hedge_won = run_hedged(
+        make_request(None, delay=0.2, error=RuntimeError("primary failed")),
+        make_request("hedge", delay=0.3),
+        0.05,
+    )
+    assert (response, hedge_won) == ("hedge", True)
+
+
+def test_all_requests_failing_raises_primary_error():
+    with pytest.raises(RuntimeError, match="primary failed"):
+        run_hedged(
+            make_request(None, delay=0.1, error=RuntimeError("primary failed")),
+            make_request(None, error=ValueError("hedge failed")),
+            0.05,
+        )
+
+
+def test_hedge_declined_waits_for_primary():
+    response, hedge_won = run_hedged(make_request("primary", delay=0.1), lambda: None, 0.01)
+    assert (response, hedge_won) == ("primary", False)
+
+
+def test_get_latency_tracker_shared_per_key(monkeypatch):
+    monkeypatch.setattr(hedging_module, "latency_trackers", {})
+    tracker = get_latency_tracker("provider:model")
+    assert get_latency_tracker("provider:model") is tracker
+    assert get_latency_tracker("provider:other") is not tracker
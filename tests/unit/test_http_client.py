@@ -0,0 +1,123 @@
+import sys
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lwe.core.http_client import SharedHttpClients
+from lwe.core.plugin_manager import PluginManager
+from lwe.core.provider_manager import ProviderManager
+
+from ..base import FakeBackend
+
+
+@pytest.fixture
+def openai_server():
+    """
+    Local stand-in for an OpenAI compatible chat completions API, with keep-alive.
+    """
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            body = json.dumps(
+                {
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": request["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "Hello from the server"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.connections = connections
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def compat_provider(test_config):
+    test_config.set("plugins.enabled", ["provider_fake_llm", "provider_chat_openai_compat"])
+    plugin_manager = PluginManager(test_config, FakeBackend(test_config))
+    provider_manager = ProviderManager(test_config, plugin_manager)
+    provider = provider_manager.get_provider_from_name("chat_openai_compat")
+    yield provider
+    provider.get_http_clients().close()
+
+
+def make_llm(provider, server):
+    return provider.make_llm(
+        customizations={
+            "model_name": "test-model",
+            "openai_api_base": server.base_url,
+            "openai_api_key": "test-key",
+        }
+    )
+
+
+def test_llms_share_http_client(compat_provider, openai_server):
+    llm1 = make_llm(compat_provider, openai_server)
+    llm2 = make_llm(compat_provider, openai_server)
+    assert llm1.http_client is llm2.http_client
+    assert llm1.http_async_client is llm2.http_async_client
+
+
+def test_connections_are_reused_across_llms(compat_provider, openai_server):
+    for _i in range(3):
+        result = make_llm(compat_provider, openai_server).invoke("Hi")
+        assert result.content == "Hello from the server"
+    metrics = compat_provider.get_http_clients().get_metrics()
+    assert metrics == {"requests": 3, "connections": 1, "reused": 2}
+    assert len(openai_server.connections) == 1
+
+
+def test_provider_without_capability_gets_no_client(provider_manager):
+    provider = provider_manager.get_provider_from_name("fake_llm")
+    llm = provider.make_llm()
+    assert not hasattr(llm, "http_client")
+
+
+def test_client_limits_from_config(test_config):
+    test_config.set("backend_options.http_client.max_connections", 5)
+    test_config.set("backend_options.http_client.max_keepalive_connections", 2)
+    clients = SharedHttpClients(test_config, "test")
+    limits = clients.get_client_kwargs()["limits"]
+    assert limits.max_connections == 5
+    assert limits.max_keepalive_connections == 2
+    clients.close()
+
+
+def test_http2_falls_back_without_h2(test_config, monkeypatch):
+    test_config.set("backend_options.http_client.http2", True)
+    monkeypatch.setitem(sys.modules, "h2", None)
+    clients = SharedHttpClients(test_config, "test")
+    assert clients.get_client_kwargs()["http2"] is False
@@ -0,0 +1,78 @@
+from unittest.mock import Mock
+
+from lwe.core.llm_handle_cache import LlmHandleCache
+
+
+def make_provider(name="provider_fake_llm", reusable=True):
+    provider = Mock()
+    provider.name = name
+    provider.get_capability = Mock(return_value=reusable)
+    return provider
+
+
+def make_key(cache, provider, customizations=None, tool_names=None):
+    return cache.make_key(
+        provider, "test", customizations or {"model_name": "gpt-4o"}, tool_names or [], None
+    )
+
+
+def test_make_key(test_config):
+    cache = LlmHandleCache(test_config)
+    provider = make_provider()
+    assert make_key(cache, provider, tool_names=["a", "b"]) == make_key(
+        cache, provider, tool_names=["b", "a"]
+    )
+    assert make_key(cache, provider) != make_key(cache, provider, {"model_name": "gpt-4"})
+    assert make_key(cache, provider) != make_key(cache, make_provider("provider_other"))
+
+
+def test_make_key_uncacheable(test_config):
+    cache = LlmHandleCache(test_config)
+    assert make_key(cache, make_provider(reusable=False)) is None
+    assert make_key(cache, make_provider(), {"client": object()}) is None
+    test_config.set("backend_options.llm_cache.enabled", False)
+    assert make_key(LlmHandleCache(test_config), make_provider()) is None
+
+
+def test_get_set(test_config):
+    cache = LlmHandleCache(test_config)
+    provider = make_provider()
+    key = make_key(cache, provider)
+    assert cache.get(key, provider, []) is None
+    cache.set(key, provider, [], "handle")
+    assert cache.get(key, provider, []) == "handle"
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+def test_get_invalidated_by_new_provider_instance(test_config):
+    cache = LlmHandleCache(test_config)
+    provider = make_provider()
+    key = make_key(cache, provider)
+    cache.set(key, provider, [], "handle")
+    assert cache.get(key, make_provider(), []) is None
+
+
+def test_get_invalidated_by_file_change(test_config, tmp_path):
+    cache = LlmHandleCache(test_config)
+    provider = make_provider()
+    tool_file = tmp_path / "tool.py"
+    tool_file.write_text("one")
+    key = make_key(cache, provider)
+    cache.set(key, provider, [str(tool_file)], "handle")
+    assert cache.get(key, provider, [str(tool_file)]) == "handle"
+    tool_file.write_text("changed")
+    assert cache.get(key, provider, [str(tool_file)]) is None
+
+
+def test_lru_eviction(test_config):
+    test_config.set("backend_options.llm_cache.max_entries", 2)
+    cache = LlmHandleCache(test_config)
+    provider = make_provider()
+    keys = [make_key(cache, provider, {"model_name": f"model-{i}"}) for i in range(3)]
+    cache.set(keys[0], provider, [], "handle 0")
+    cache.set(keys[1], provider, [], "handle 1")
+    cache.get(keys[0], provider, [])
+    cache.set(keys[2], provider, [], "handle 2")
+    assert cache.get(keys[0], provider, []) == "handle 0"
+    assert cache.get(keys[1], provider, []) is None
+    assert cache.get(keys[2], provider, []) == "handle 2"
@@ -0,0 +1,215 @@
+import json
+import socket
+import threading
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from lwe.core.load_balancer import LoadBalancer
+from lwe.core.plugin_manager import PluginManager
+from lwe.core.provider_manager import ProviderManager
+
+from ..base import FakeBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_openai_server(name):
+    """
+    Local stand-in for an OpenAI compatible API replica, replying with its name.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, data):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.send_json({"object": "list", "data": []})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_json(
+                {
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": request["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": name},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }
+            )
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    return server
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/v1"
+
+
+@pytest.fixture
+def openai_servers():
+    servers = [make_openai_server("one"), make_openai_server("two")]
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_compat_provider(test_config):
+    providers = []
+
+    def make(endpoints, **options):
+        test_config.set("plugins.enabled", ["provider_fake_llm", "provider_chat_openai_compat"])
+        test_config.set("plugins.provider_chat_openai_compat", {"endpoints": endpoints, **options})
+        plugin_manager = PluginManager(test_config, FakeBackend(test_config))
+        provider = ProviderManager(test_config, plugin_manager).get_provider_from_name(
+            "chat_openai_compat"
+        )
+        providers.append(provider)
+        return provider
+
+    yield make
+    for provider in providers:
+        provider.get_http_clients().close()
+
+
+def invoke(provider):
+    llm = provider.make_llm(
+        customizations={"model_name": "test-model", "openai_api_key": "test-key", "max_retries": 0}
+    )
+    return llm.invoke("Hi").content
+
+
+def test_round_robin_follows_weights(test_config):
+    load_balancer = LoadBalancer(
+        test_config,
+        [{"url": "http://a/v1", "weight": 2}, "http://b/v1"],
+        routing="round_robin",
+    )
+    chosen = []
+    for _i in range(6):
+        endpoint = load_balancer.choose()
+        load_balancer.release(endpoint)
+        chosen.append(endpoint.url)
+    assert Counter(chosen) == {"http://a/v1": 4, "http://b/v1": 2}
+    assert chosen[:3] == ["http://a/v1", "http://b/v1", "http://a/v1"]
+
+
+def test_least_outstanding_avoids_busy_endpoint(test_config):
+    load_balancer = LoadBalancer(test_config, ["http://a/v1", "http://b/v1"])
+    busy = load_balancer.choose()
+    for _i in range(3):
+        endpoint = load_balancer.choose()
+        assert endpoint is not busy
+        load_balancer.release(endpoint)
+
+
+def test_invalid_routing_raises(test_config):
+    with pytest.raises(ValueError):
+        LoadBalancer(test_config, ["http://a/v1"], routing="random")
+
+
+def test_route_url(test_config):
+    load_balancer = LoadBalancer(test_config, ["http://a/v1/", "http://b/v1"])
+    assert load_balancer.base_url == "http://a/v1"
+    assert load_balancer.route_url("http://a/v1/chat/completions") == "/chat/completions"
+    assert load_balancer.route_url("http://b/v1/models") == "/models"
+    assert load_balancer.route_url("http://a/v10/models") is None
+
+
+def test_endpoint_ejected_after_failures_then_retried(test_config):
+    clock = FakeClock()
+    load_balancer = LoadBalancer(
+        test_config,
+        ["http://a/v1", "http://b/v1"],
+        eject_after_failures=2,
+        eject_duration=10,
+        clock=clock,
+    )
+    bad = load_balancer.endpoints[0]
+    for _i in range(2):
+        load_balancer.record_failure(bad, httpx.ConnectError("refused"))
+    for _i in range(4):
+        endpoint = load_balancer.choose()
+        assert endpoint is not bad
+        load_balancer.release(endpoint)
+    clock.now += 10
+    assert load_balancer.get_metrics()[0]["available"]
+    load_balancer.record_response(bad, 0.5)
+    assert bad.consecutive_failures == 0
+
+
+def test_all_endpoints_ejected_still_tried(test_config):
+    load_balancer = LoadBalancer(test_config, ["http://a/v1"], eject_after_failures=1)
+    endpoint = load_balancer.endpoints[0]
+    load_balancer.record_failure(endpoint, httpx.ConnectError("refused"))
+    assert load_balancer.choose() is endpoint
+    assert load_balancer.choose([endpoint]) is None
+
+
+def test_health_check_marks_endpoints(test_config, openai_servers):
+    load_balancer = LoadBalancer(test_config, [openai_servers[0].base_url, unused_url()])
+    load_balancer.check_health()
+    metrics = load_balancer.get_metrics()
+    assert metrics[0]["available"]
+    assert not metrics[1]["available"]
+
+
+def test_requests_spread_across_endpoints(make_compat_provider, openai_servers):
+    provider = make_compat_provider(
+        [server.base_url for server in openai_servers], routing="round_robin"
+    )
+    responses = [invoke(provider) for _i in range(4)]
+    assert Counter(responses) == {"one": 2, "two": 2}
+    metrics = provider.get_http_clients().get_metrics()["endpoints"]
+    assert [endpoint["requests"] for endpoint in metrics] == [2, 2]
+    assert all(endpoint["outstanding"] == 0 for endpoint in metrics)
+    assert all(endpoint["latency"] is not None for endpoint in metrics)
+
+
+def test_connection_errors_fail_over(make_compat_provider, openai_servers):
+    provider = make_compat_provider(
+        [unused_url(), openai_servers[0].base_url], routing="round_robin", eject_after_failures=1
+    )
+    assert [invoke(provider) for _i in range(3)] == ["one", "one", "one"]
+    metrics = provider.get_http_clients().get_metrics()["endpoints"]
+    assert metrics[0]["failures"] == 1
+    assert not metrics[0]["available"]
+    assert metrics[1]["requests"] == 3
+
+
+def test_no_endpoints_uses_single_base(make_compat_provider):
+    provider = make_compat_provider([])
+    assert provider.get_http_clients().load_balancer is None
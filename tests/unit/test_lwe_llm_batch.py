@@ -0,0 +1,96 @@
+import threading
+import time
+
+from unittest.mock import Mock
+
+from lwe.backends.api.workflow.library.lwe_llm_batch import run_batch, validate_params
+
+
+def make_backend(fail_on=None, delay=0):
+    backend = Mock()
+    lock = threading.Lock()
+    backend.in_flight = 0
+    backend.max_in_flight = 0
+    backend.store_thread = None
+
+    def build_message_from_template(template_name, template_vars=None, overrides=None):
+        if template_vars.get("broken"):
+            return False, None, "Template error"
+        return (
+            True,
+            (f"Review: {template_vars['text']}", {"request_overrides": {"title": "Review"}}),
+            "Built message",
+        )
+
+    def make_isolated_request(message, request_overrides):
+        with lock:
+            backend.in_flight += 1
+            backend.max_in_flight = max(backend.max_in_flight, backend.in_flight)
+        time.sleep(delay)
+        with lock:
+            backend.in_flight -= 1
+        if fail_on and fail_on in message:
+            return False, None, "LLM call failed"
+        return True, (message.upper(), Mock(), []), "Success"
+
+    def store_isolated_request(request, new_messages, response_content, user, title=None):
+        backend.store_thread = threading.current_thread()
+        conversation = Mock()
+        conversation.id = len(response_content)
+        return True, conversation, "Stored"
+
+    backend.build_message_from_template = Mock(side_effect=build_message_from_template)
+    backend.make_isolated_request = Mock(side_effect=make_isolated_request)
+    backend.store_isolated_request = Mock(side_effect=store_isolated_request)
+    return backend
+
+
+def test_validate_params():
+    assert validate_params(["hi"], None, None, False, None) is None
+    assert validate_params(None, "test.md", [{}], True, 1) is None
+    assert validate_params(None, None, None, False, None)
+    assert validate_params(["hi"], "test.md", [{}], False, None)
+    assert validate_params(None, "test.md", None, False, None)
+    assert validate_params(["hi"], None, None, True, None)
+
+
+def test_run_batch_messages_in_order_with_bounded_concurrency():
+    backend = make_backend(delay=0.02)
+    messages = [f"message {i}" for i in range(8)]
+    results = run_batch(backend, messages=messages, concurrency=3)
+    assert [result["index"] for result in results] == list(range(8))
+    assert [result["response"] for result in results] == [m.upper() for m in messages]
+    assert 1 < backend.max_in_flight <= 3
+
+
+def test_run_batch_per_item_errors():
+    backend = make_backend(fail_on="bad")
+    results = run_batch(backend, messages=["good", "bad", "good"])
+    assert [result["success"] for result in results] == [True, False, True]
+    assert "LLM call failed" in results[1]["error"]
+
+
+def test_run_batch_template_items():
+    backend = make_backend()
+    results = run_batch(
+        backend,
+        template_name="review.md",
+        items=[{"text": "great"}, {"broken": True}],
+        template_vars={"text": "default"},
+        request_overrides={"system_message": "Be brief"},
+    )
+    assert results[0] == {"index": 0, "success": True, "response": "REVIEW: GREAT"}
+    assert results[1] == {"index": 1, "success": False, "error": "Template error"}
+    backend.make_isolated_request.assert_called_once_with(
+        "Review: great",
+        {"title": "Review", "system_message": "Be brief", "adaptive_concurrency": True},
+    )
+
+
+def test_run_batch_persist_stores_from_calling_thread():
+    backend = make_backend()
+    user = Mock()
+    results = run_batch(backend, messages=["one", "three"], user=user, title="Batch")
+    assert [result["conversation_id"] for result in results] == [3, 5]
+    assert backend.store_isolated_request.call_count == 2
+    assert backend.store_thread is threading.current_thread()
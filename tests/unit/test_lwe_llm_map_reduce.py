@@ -0,0 +1,90 @@
+from unittest.mock import Mock
+
+from lwe.core.text_chunker import TextChunker
+from lwe.backends.api.workflow.library.lwe_llm_map_reduce import run_map_reduce, validate_params
+
+
+class CharEncoding:
+    def encode(self, text, disallowed_special=()):
+        return [ord(char) for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+def make_backend(fail_on=None):
+    backend = Mock()
+
+    def make_isolated_request(message, request_overrides):
+        if fail_on and fail_on in message:
+            return False, None, "LLM call failed"
+        prompt, text = message.split("\n\n", 1)
+        summary = f"{prompt[0]}({text[:4]})"
+        return True, (summary, Mock(), []), "Success"
+
+    backend.make_isolated_request = Mock(side_effect=make_isolated_request)
+    return backend
+
+
+def make_chunker(chunk_size):
+    return TextChunker(chunk_size, 0, encoding=CharEncoding())
+
+
+def test_validate_params():
+    assert validate_params("text", None) is None
+    assert validate_params(None, ["chunk"]) is None
+    assert validate_params(None, None)
+    assert validate_params("text", ["chunk"])
+
+
+def test_single_chunk_is_mapped_and_reduced():
+    backend = make_backend()
+    success, result, _user_message = run_map_reduce(
+        backend, make_chunker(100), content="Short", map_prompt="Map", reduce_prompt="Reduce"
+    )
+    assert success
+    assert result == {
+        "response": "R(M(Sh)",
+        "chunk_count": 1,
+        "map_results": ["M(Shor)"],
+        "reduce_rounds": 1,
+    }
+
+
+def test_map_then_reduce():
+    backend = make_backend()
+    content = "\n\n".join(["aaaa" * 5, "bbbb" * 5, "cccc" * 5])
+    success, result, _user_message = run_map_reduce(
+        backend, make_chunker(25), content=content, map_prompt="Map", reduce_prompt="Reduce"
+    )
+    assert success
+    assert result["chunk_count"] == 3
+    assert result["map_results"] == ["M(aaaa)", "M(bbbb)", "M(cccc)"]
+    assert result["response"] == "R(M(aa)"
+    assert result["reduce_rounds"] == 1
+
+
+def test_reduce_in_rounds_when_results_too_large():
+    backend = make_backend()
+    chunks = [f"chunk {i}" for i in range(8)]
+    success, result, _user_message = run_map_reduce(
+        backend,
+        make_chunker(100),
+        chunks=chunks,
+        map_prompt="Map",
+        reduce_prompt="Reduce",
+        max_reduce_tokens=20,
+    )
+    assert success
+    assert result["reduce_rounds"] > 1
+    assert result["response"].startswith("R(")
+
+
+def test_map_failure():
+    backend = make_backend(fail_on="bad")
+    success, _result, user_message = run_map_reduce(
+        backend, make_chunker(100), chunks=["good", "bad"], map_prompt="Map"
+    )
+    assert not success
+    assert "Map step failed" in user_message
+    assert "LLM call failed" in user_message
@@ -0,0 +1,92 @@
+import json
+
+from unittest.mock import Mock
+
+from lwe.backends.api.workflow.callback_plugins.lwe_profile import (
+    CallbackModule,
+    extract_llm_stats,
+    format_task_summary,
+)
+
+
+def make_stats(prompt_tokens=10, completion_tokens=5, model="gpt-4o"):
+    return {
+        "provider": "chat_openai",
+        "model": model,
+        "preset": None,
+        "llm_calls": 1,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "llm_time": 1.5,
+        "time_to_first_token": 0.5,
+    }
+
+
+def make_task(uuid, name, action):
+    task = Mock()
+    task._uuid = uuid
+    task.action = action
+    task.get_name = Mock(return_value=name)
+    return task
+
+
+def make_result(task, result):
+    return Mock(_task=task, _result=result)
+
+
+def test_extract_llm_stats_merges_loop_results():
+    result = {
+        "results": [
+            {"stats": make_stats()},
+            {"stats": make_stats(prompt_tokens=None, model="gpt-4o-mini")},
+            {"skipped": True},
+        ]
+    }
+    stats = extract_llm_stats(result)
+    assert stats["requests"] == 2
+    assert stats["llm_calls"] == 2
+    assert stats["prompt_tokens"] == 10
+    assert stats["completion_tokens"] == 10
+    assert stats["llm_time"] == 3.0
+    assert stats["models"] == ["gpt-4o", "gpt-4o-mini"]
+    assert extract_llm_stats({"changed": False}) is None
+
+
+def test_format_task_summary():
+    task = {
+        "name": "Ask",
+        "action": "lwe_llm",
+        "status": "changed",
+        "duration": 2.0,
+        "llm": extract_llm_stats({"stats": make_stats(prompt_tokens=None)}),
+    }
+    summary = format_task_summary(task)
+    assert summary.startswith("Ask (lwe_llm, changed): 2.00s")
+    assert "chat_openai/gpt-4o" in summary
+    assert "tokens in/out: ?/5" in summary
+    assert "first token: 0.50s" in summary
+
+
+def test_callback_writes_sorted_summary_and_profile(tmp_path):
+    display = Mock(verbosity=0)
+    callback = CallbackModule(display=display)
+    callback._plugin_options["output_dir"] = str(tmp_path)
+    callback._plugin_options["summary_limit"] = 0
+    callback.v2_playbook_on_start(Mock(_file_name="/workflows/test-workflow.yaml"))
+    fast = make_task("1", "Fast task", "debug")
+    callback.v2_playbook_on_task_start(fast, False)
+    callback.v2_runner_on_ok(make_result(fast, {"changed": False}))
+    slow = make_task("2", "Slow task", "lwe_llm")
+    callback.v2_playbook_on_task_start(slow, False)
+    callback.tasks[-1]["start"] -= 10
+    callback.v2_runner_on_ok(make_result(slow, {"changed": True, "stats": make_stats()}))
+    callback.v2_playbook_on_stats(Mock())
+    lines = [call.args[0] for call in display.display.call_args_list]
+    assert lines[0].startswith("Slow task (lwe_llm, changed)")
+    assert lines[1].startswith("Fast task (debug, ok)")
+    (profile_file,) = tmp_path.glob("lwe-workflow-profile-test-workflow-*.json")
+    profile = json.loads(profile_file.read_text())
+    assert profile["playbook"] == "test-workflow"
+    assert [task["name"] for task in profile["tasks"]] == ["Fast task", "Slow task"]
+    assert profile["llm"]["requests"] == 1
+    assert profile["llm"]["prompt_tokens"] == 10
@@ -0,0 +1,114 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from lwe.backends.api.workflow.library.lwe_sqlite_query import run_query, validate_query
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = str(tmp_path / "test.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items VALUES (?, ?)", [(i, f"item {i}") for i in range(1, 6)])
+    conn.commit()
+    conn.close()
+    return db
+
+
+def test_run_query_select_and_update(db):
+    result = run_query(db, "SELECT * FROM items WHERE id > ?", [3])
+    assert result == {
+        "data": [{"id": 4, "name": "item 4"}, {"id": 5, "name": "item 5"}],
+        "row_count": 2,
+    }
+    result = run_query(db, "UPDATE items SET name = ? WHERE id < ?", ["small", 3])
+    assert result == {"data": [], "row_count": 2}
+
+
+def test_run_query_executemany(db):
+    result = run_query(
+        db, "INSERT INTO items (name) VALUES (?)", [["six"], ["seven"]], executemany=True
+    )
+    assert result["row_count"] == 2
+    result = run_query(
+        db,
+        ["DELETE FROM items WHERE id = ?", "INSERT INTO items (name) VALUES (?)"],
+        [[[1], [2]], [["eight"]]],
+        executemany=True,
+    )
+    assert result["row_count"] == 3
+    assert run_query(db, "SELECT COUNT(*) AS total FROM items")["data"] == [{"total": 6}]
+
+
+def test_run_query_offset_pagination(db):
+    result = run_query(db, "SELECT * FROM items ORDER BY id", limit=2, offset=2)
+    assert [row["id"] for row in result["data"]] == [3, 4]
+    assert result["next_offset"] == 4
+    result = run_query(db, "SELECT * FROM items ORDER BY id", limit=2, offset=4)
+    assert [row["id"] for row in result["data"]] == [5]
+    assert result["next_offset"] is None
+
+
+def test_run_query_keyset_pagination(db):
+    ids = []
+    after = None
+    while True:
+        result = run_query(db, "SELECT * FROM items", limit=2, keyset_column="id", after=after)
+        ids.extend(row["id"] for row in result["data"])
+        after = result["next_cursor"]
+        if after is None:
+            break
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_run_query_keyset_column_not_selected(db):
+    with pytest.raises(ValueError, match="keyset_column 'id' is not selected"):
+        run_query(db, "SELECT name FROM items", limit=2, keyset_column="id")
+
+
+def test_run_query_output_file(db, tmp_path):
+    output_file = str(tmp_path / "items.jsonl")
+    result = run_query(db, "SELECT * FROM items ORDER BY id", output_file=output_file)
+    assert result == {"data": [], "row_count": 5, "output_file": output_file}
+    with open(output_file) as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[0] == {"id": 1, "name": "item 1"}
+    output_file = str(tmp_path / "items.csv")
+    run_query(db, "SELECT * FROM items ORDER BY id", limit=3, output_file=output_file)
+    with open(output_file, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["id", "name"], ["1", "item 1"], ["2", "item 2"], ["3", "item 3"]]
+
+
+def test_run_query_pragmas(db):
+    result = run_query(db, "PRAGMA journal_mode", pragmas={"journal_mode": "WAL"})
+    assert result["data"] == [{"journal_mode": "wal"}]
+
+
+def test_run_query_rolls_back_on_error(db):
+    with pytest.raises(sqlite3.Error):
+        run_query(
+            db,
+            ["DELETE FROM items", "INSERT INTO missing VALUES (?)"],
+            [[], [1]],
+        )
+    assert run_query(db, "SELECT COUNT(*) AS total FROM items")["data"] == [{"total": 5}]
+
+
+def test_validate_query():
+    assert validate_query("SELECT 1", []) is None
+    assert validate_query(["SELECT 1"], [[]]) is None
+    assert validate_query("INSERT INTO t VALUES (?)", [[1], [2]], executemany=True) is None
+    assert validate_query("SELECT * FROM t", [], limit=10, keyset_column="id") is None
+    assert validate_query("SELECT 1", "bad")
+    assert validate_query(["SELECT 1"], [[], []])
+    assert validate_query("INSERT INTO t VALUES (?)", [1, 2], executemany=True)
+    assert validate_query("SELECT * FROM t", [], keyset_column="id")
+    assert validate_query("SELECT * FROM t", [], limit=10, keyset_column="id; DROP TABLE t")
+    assert validate_query("SELECT * FROM t", [], offset=10)
+    assert validate_query(["SELECT 1"], [[]], output_file="/tmp/out.jsonl")
+    assert validate_query("SELECT 1", [], output_format="xml")
+    assert validate_query("SELECT 1", [], pragmas={"journal_mode": "WAL; DROP TABLE t"})
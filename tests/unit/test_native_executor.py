@@ -0,0 +1,383 @@
+import sqlite3
+
+import yaml
+
+from unittest.mock import Mock
+
+from lwe.core.workflow_manager import WorkflowManager
+from lwe.backends.api.workflow.native_executor import NativeWorkflowExecutor
+
+
+def make_backend(test_config):
+    backend = Mock()
+    backend.config = test_config
+    backend.conversation_id = None
+    backend.current_user = None
+    backend.return_only = False
+
+    def ask(message, request_overrides=None):
+        backend.conversation_id = 42
+        return True, f"Answer: {message}", "Success"
+
+    backend.ask = Mock(side_effect=ask)
+    backend.run_template = Mock(return_value=(True, "Template answer", "Success"))
+    return backend
+
+
+def write_workflow(directory, name, content):
+    filepath = directory / name
+    filepath.write_text(yaml.safe_dump(content))
+    return str(filepath)
+
+
+def make_play(tasks, play_vars=None):
+    return [{"name": "Test", "hosts": "localhost", "vars": play_vars or {}, "tasks": tasks}]
+
+
+def run_workflow(executor, tmp_path, workflow, workflow_args=""):
+    workflow_file = write_workflow(tmp_path, "test.yaml", workflow)
+    success, _workflow, user_message = executor.check_workflow(workflow, workflow_file)
+    assert success, user_message
+    return executor.run("test", workflow, workflow_file, workflow_args)
+
+
+def test_check_workflow_supported(test_config, tmp_path):
+    executor = NativeWorkflowExecutor(make_backend(test_config))
+    workflow = make_play([{"name": "Hello", "ansible.builtin.debug": {"msg": "Hello World!"}}])
+    workflow_file = write_workflow(tmp_path, "test.yaml", workflow)
+    success, _workflow, _user_message = executor.check_workflow(workflow, workflow_file)
+    assert success
+
+
+def test_check_workflow_unsupported(test_config, tmp_path):
+    executor = NativeWorkflowExecutor(make_backend(test_config))
+    workflows = [
+        make_play([{"stat": {"path": "/tmp"}}]),
+        make_play([{"debug": {"msg": "{{ lookup('pipe', 'date') }}"}}]),
+        make_play([{"debug": {"msg": "{{ foo | nosuchfilter }}"}}]),
+        make_play([{"lwe_command": {"command": "new"}}]),
+        make_play([{"include_tasks": "missing.yaml"}]),
+        make_play([{"lwe_llm": {"message": "Hi", "profile": "other"}}]),
+        make_play([{"lwe_llm": {"message": "Hi"}}]),
+        [{"hosts": "webservers", "tasks": []}],
+    ]
+    for workflow in workflows:
+        workflow_file = write_workflow(tmp_path, "test.yaml", workflow)
+        success, _workflow, _user_message = executor.check_workflow(workflow, workflow_file)
+        assert not success
+
+
+def test_run_vars_facts_loop_when(test_config, tmp_path, capsys):
+    executor = NativeWorkflowExecutor(make_backend(test_config))
+    workflow = make_play(
+        [
+            {"set_fact": {"doubled": "{{ numbers | map('int') | map('string') | list }}"}},
+            {
+                "name": "Show {{ item }}",
+                "debug": {"msg": "Number {{ item }} of {{ doubled | length }}"},
+                "loop": "{{ doubled }}",
+                "when": "item != '2'",
+                "register": "shown",
+            },
+            {"debug": {"msg": "{{ greeting }}"}},
+        ],
+        play_vars={"numbers": [1, 2, 3], "greeting": "default"},
+    )
+    success, stats, _user_message = run_workflow(
+        executor, tmp_path, workflow, "greeting='hi there'"
+    )
+    assert success
+    output = capsys.readouterr().out
+    assert "Number 1 of 3" in output
+    assert "Number 2 of 3" not in output
+    assert "Number 3 of 3" in output
+    assert "hi there" in output
+    assert stats["failed"] == 0
+
+
+def test_run_facts_override_task_vars(test_config, tmp_path, capsys):
+    executor = NativeWorkflowExecutor(make_backend(test_config))
+    workflow = make_play(
+        [
+            {"set_fact": {"value": "fact", "item": "fact item"}},
+            {"debug": {"msg": "Task sees {{ value }}"}, "vars": {"value": "task var"}},
+            {
+                "block": [{"debug": {"msg": "Block sees {{ value }}"}}],
+                "vars": {"value": "block var"},
+            },
+            {"debug": {"msg": "Loop sees {{ item }}"}, "loop": ["loop item"]},
+        ]
+    )
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    output = capsys.readouterr().out
+    assert "Task sees fact" in output
+    assert "Block sees fact" in output
+    assert "Loop sees loop item" in output
+
+
+def test_run_output_respects_return_only(test_config, tmp_path, capsys):
+    backend = make_backend(test_config)
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play([{"name": "Show [/bold]", "debug": {"msg": "Shown [/red] as is"}}])
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    output = capsys.readouterr().out
+    assert "TASK [Show [/bold]]" in output
+    assert "Shown [/red] as is" in output
+    backend.return_only = True
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    assert capsys.readouterr().out == ""
+
+
+def test_run_include_tasks_with_loop(test_config, tmp_path, capsys):
+    executor = NativeWorkflowExecutor(make_backend(test_config))
+    write_workflow(tmp_path, "include.yaml", [{"debug": {"msg": "Included {{ current }}"}}])
+    workflow = make_play(
+        [
+            {
+                "include_tasks": "include.yaml",
+                "loop": ["a", "b"],
+                "loop_control": {"loop_var": "current"},
+            }
+        ]
+    )
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    output = capsys.readouterr().out
+    assert "Included a" in output
+    assert "Included b" in output
+
+
+def test_run_lwe_llm_restores_backend_state(test_config, tmp_path, capsys):
+    backend = make_backend(test_config)
+    backend.conversation_id = 7
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play(
+        [
+            {
+                "lwe_llm": {
+                    "message": "Say {{ word }}",
+                    "profile": "test",
+                    "preset": "test",
+                    "title": "Test",
+                },
+                "register": "result",
+            },
+            {"debug": {"msg": "{{ result.response }} ({{ result.conversation_id }})"}},
+            {
+                "lwe_llm": {
+                    "template": "test.md",
+                    "profile": "test",
+                    "template_vars": {"word": "{{ word }}"},
+                }
+            },
+        ],
+        play_vars={"word": "hello"},
+    )
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    backend.ask.assert_called_once_with(
+        "Say hello", request_overrides={"preset": "test", "title": "Test"}
+    )
+    backend.run_template.assert_called_once_with(
+        "test.md", {"word": "hello"}, {"request_overrides": {}}
+    )
+    assert "Answer: Say hello (42)" in capsys.readouterr().out
+    assert backend.conversation_id == 7
+
+
+def test_run_failure_stops_workflow(test_config, tmp_path, capsys):
+    backend = make_backend(test_config)
+    backend.ask = Mock(return_value=(False, None, "Network error"))
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play(
+        [
+            {
+                "lwe_llm": {"message": "Hi", "profile": "test"},
+                "register": "result",
+                "ignore_errors": True,
+            },
+            {"debug": {"msg": "Failed: {{ result is failed }}"}},
+            {"lwe_llm": {"message": "Hi", "profile": "test"}, "register": "result"},
+            {"debug": {"msg": "Not reached"}},
+        ]
+    )
+    success, stats, user_message = run_workflow(executor, tmp_path, workflow)
+    assert not success
+    assert "Network error" in user_message
+    output = capsys.readouterr().out
+    assert "Failed: True" in output
+    assert "Not reached" not in output
+    assert stats["failed"] == 2
+
+
+def test_run_until_retries(test_config, tmp_path):
+    backend = make_backend(test_config)
+    backend.ask = Mock(side_effect=[(False, None, "Error"), (True, "Answer", "Success")])
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play(
+        [
+            {
+                "lwe_llm": {"message": "Hi", "profile": "test"},
+                "register": "result",
+                "until": "result is not failed",
+                "retries": 2,
+                "delay": 0,
+            },
+        ]
+    )
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    assert backend.ask.call_count == 2
+
+
+def test_run_coerces_module_args(test_config, tmp_path, capsys):
+    backend = make_backend(test_config)
+    backend.make_isolated_request = Mock(return_value=(False, None, "Error"))
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play(
+        [
+            {
+                "lwe_llm_batch": {
+                    "messages": ["a"],
+                    "profile": "test",
+                    "concurrency": "1",
+                    "persist": "no",
+                    "fail_on_error": "false",
+                },
+                "register": "batch",
+            },
+            {
+                "lwe_llm": {"message": "Hi", "profile": "test", "max_submission_tokens": "lots"},
+                "register": "result",
+                "ignore_errors": True,
+            },
+            {"debug": {"msg": "{{ batch.failure_count }} {{ result.msg }}"}},
+        ]
+    )
+    success, _stats, user_message = run_workflow(executor, tmp_path, workflow)
+    assert success, user_message
+    assert "1 argument 'max_submission_tokens' is of type" in capsys.readouterr().out
+    backend.ask.assert_not_called()
+
+
+def test_run_lwe_sqlite_query(test_config, tmp_path, capsys):
+    db = str(tmp_path / "test.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items (id INTEGER, name TEXT)")
+    conn.execute("INSERT INTO items VALUES (1, 'one'), (2, 'two')")
+    conn.commit()
+    conn.close()
+    executor = NativeWorkflowExecutor(make_backend(test_config))
+    workflow = make_play(
+        [
+            {
+                "lwe_sqlite_query": {"db": db, "query": "SELECT * FROM items ORDER BY id"},
+                "register": "rows",
+            },
+            {"debug": {"msg": "{{ rows.row_count }}: {{ rows.data.1.name }}"}},
+        ]
+    )
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    assert "2: two" in capsys.readouterr().out
+
+
+def test_workflow_manager_falls_back_to_ansible(test_config, tmp_path):
+    test_config.set("workflow.executor", "native")
+    test_config.set("directories.workflows", [str(tmp_path)])
+    write_workflow(tmp_path, "native.yaml", make_play([{"debug": {"msg": "Hi"}}]))
+    write_workflow(tmp_path, "fallback.yaml", make_play([{"stat": {"path": "/tmp"}}]))
+    workflow_manager = WorkflowManager(test_config)
+    workflow_manager.set_native_executor(NativeWorkflowExecutor(make_backend(test_config)))
+    workflow_manager.run_ansible = Mock(return_value=(True, None, "Ran with Ansible"))
+    success, _stats, user_message = workflow_manager.run("native", "")
+    assert success
+    assert user_message == "Workflow native completed"
+    workflow_manager.run_ansible.assert_not_called()
+    success, _result, user_message = workflow_manager.run("fallback", "")
+    assert user_message == "Ran with Ansible"
+
+
+def test_workflow_manager_builds_native_executor_when_used(test_config):
+    workflow_manager = WorkflowManager(test_config)
+    factory = Mock(side_effect=lambda: NativeWorkflowExecutor(make_backend(test_config)))
+    workflow_manager.set_native_executor_factory(factory)
+    test_config.set("workflow.executor", "ansible")
+    assert not workflow_manager.use_native_executor()
+    factory.assert_not_called()
+    test_config.set("workflow.executor", "native")
+    assert workflow_manager.use_native_executor()
+    assert workflow_manager.use_native_executor()
+    factory.assert_called_once()
+
+
+def test_run_lwe_llm_batch(test_config, tmp_path, capsys):
+    backend = make_backend(test_config)
+    backend.make_isolated_request = Mock(
+        side_effect=lambda message, overrides: (True, (message.upper(), Mock(), []), "Success")
+    )
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play(
+        [
+            {
+                "lwe_llm_batch": {
+                    "messages": ["{{ first }}", "b"],
+                    "profile": "test",
+                    "preset": "test",
+                },
+                "register": "batch",
+            },
+            {"debug": {"msg": "{{ batch.results | map(attribute='response') | join(',') }}"}},
+        ],
+        play_vars={"first": "a"},
+    )
+    success, _stats, _user_message = run_workflow(executor, tmp_path, workflow)
+    assert success
+    assert "A,B" in capsys.readouterr().out
+    backend.make_isolated_request.assert_any_call(
+        "a", {"preset": "test", "adaptive_concurrency": True}
+    )
+
+
+def test_run_text_chunker_and_map_reduce(test_config, tmp_path, capsys, monkeypatch):
+    class CharEncoding:
+        def encode(self, text, disallowed_special=()):
+            return [ord(char) for char in text]
+
+        def decode(self, tokens):
+            return "".join(chr(token) for token in tokens)
+
+    monkeypatch.setattr(
+        "lwe.core.text_chunker.get_encoding_for_model", lambda model_name=None: CharEncoding()
+    )
+    backend = make_backend(test_config)
+    backend.make_isolated_request = Mock(
+        side_effect=lambda message, overrides: (True, (f"[{len(message)}]", Mock(), []), "Success")
+    )
+    executor = NativeWorkflowExecutor(backend)
+    workflow = make_play(
+        [
+            {
+                "text_chunker": {"content": "{{ text }}", "chunk_size": 10, "overlap": 0},
+                "register": "chunked",
+            },
+            {
+                "lwe_llm_map_reduce": {
+                    "chunks": "{{ chunked.chunks }}",
+                    "map_prompt": "Map",
+                    "profile": "test",
+                    "reduce_prompt": "Reduce",
+                },
+                "register": "summary",
+            },
+            {"debug": {"msg": "{{ chunked.chunk_count }} {{ summary.response }}"}},
+        ],
+        play_vars={"text": "a" * 25},
+    )
+    success, _stats, user_message = run_workflow(executor, tmp_path, workflow)
+    assert success, user_message
+    assert "3 [" in capsys.readouterr().out
+    assert backend.make_isolated_request.call_count == 4
@@ -0,0 +1,106 @@
+import os
+import yaml
+
+from unittest.mock import Mock
+
+from lwe.core.preset_manager import PresetManager
+
+
+def make_preset_file(preset_manager, preset_name, model_name="gpt-4o"):
+    content = {
+        "metadata": {
+            "name": preset_name,
+            "provider": "fake_llm",
+        },
+        "model_customizations": {
+            "model_name": model_name,
+        },
+    }
+    filepath = os.path.join(preset_manager.user_preset_dirs[-1], f"{preset_name}.yaml")
+    with open(filepath, "w") as f:
+        yaml.safe_dump(content, f)
+    return filepath
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_load_presets(preset_manager):
+    filepath = make_preset_file(preset_manager, "my_preset")
+    success, presets, _user_message = preset_manager.load_presets()
+    assert success is True
+    metadata, customizations = presets["my_preset"]
+    assert metadata["filepath"] == filepath
+    assert customizations == {"model_name": "gpt-4o"}
+    assert "test" in presets
+
+
+def test_load_presets_reuses_unchanged_presets(preset_manager):
+    make_preset_file(preset_manager, "my_preset")
+    preset_manager.load_presets()
+    preset = preset_manager.presets["my_preset"]
+    preset_manager.parse_preset_dict = Mock(wraps=preset_manager.parse_preset_dict)
+    preset_manager.load_presets()
+    assert preset_manager.presets["my_preset"] is preset
+    preset_manager.parse_preset_dict.assert_not_called()
+
+
+def test_load_presets_reparses_changed_presets(preset_manager):
+    filepath = make_preset_file(preset_manager, "my_preset")
+    preset_manager.load_presets()
+    make_preset_file(preset_manager, "my_preset", model_name="gpt-4o-mini")
+    bump_mtime(filepath)
+    preset_manager.load_presets()
+    _metadata, customizations = preset_manager.presets["my_preset"]
+    assert customizations == {"model_name": "gpt-4o-mini"}
+
+
+def test_load_presets_drops_deleted_presets(preset_manager):
+    filepath = make_preset_file(preset_manager, "my_preset")
+    preset_manager.load_presets()
+    os.remove(filepath)
+    preset_manager.load_presets()
+    assert "my_preset" not in preset_manager.presets
+    assert filepath not in preset_manager.preset_index
+
+
+def test_load_presets_skips_invalid_yaml(preset_manager):
+    filepath = os.path.join(preset_manager.user_preset_dirs[-1], "broken.yaml")
+    with open(filepath, "w") as f:
+        f.write("metadata: [")
+    success, presets, _user_message = preset_manager.load_presets()
+    assert success is True
+    assert "broken" not in presets
+
+
+def test_load_presets_does_not_copy_additional_presets(test_config):
+    additional_preset = ({"name": "extra", "provider": "fake_llm"}, {})
+    preset_manager = PresetManager(test_config, additional_presets={"extra": additional_preset})
+    assert preset_manager.presets["extra"] is additional_preset
+
+
+def test_ensure_preset_found(preset_manager):
+    make_preset_file(preset_manager, "my_preset")
+    preset_manager.load_presets = Mock(wraps=preset_manager.load_presets)
+    success, preset, _user_message = preset_manager.ensure_preset("my_preset")
+    assert success is True
+    assert preset[1] == {"model_name": "gpt-4o"}
+    preset_manager.load_presets.assert_called_once()
+    preset_manager.ensure_preset("my_preset")
+    preset_manager.load_presets.assert_called_once()
+
+
+def test_ensure_preset_negative_lookup_cache(preset_manager):
+    preset_manager.load_presets = Mock(wraps=preset_manager.load_presets)
+    success, _preset, user_message = preset_manager.ensure_preset("missing")
+    assert success is False
+    assert "not found" in user_message
+    preset_manager.ensure_preset("missing")
+    preset_manager.load_presets.assert_called_once()
+    filepath = make_preset_file(preset_manager, "missing")
+    bump_mtime(os.path.dirname(filepath))
+    success, _preset, _user_message = preset_manager.ensure_preset("missing")
+    assert success is True
+    assert preset_manager.load_presets.call_count == 2
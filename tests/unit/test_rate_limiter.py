@@ -0,0 +1,92 @@
+import threading
+
+from lwe.core import rate_limiter as rate_limiter_module
+from lwe.core.rate_limiter import RateLimiter, get_rate_limiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_rate_limiter(requests_per_minute=None, tokens_per_minute=None):
+    clock = FakeClock()
+    return (
+        RateLimiter(requests_per_minute, tokens_per_minute, clock=clock, sleep=clock.sleep),
+        clock,
+    )
+
+
+def test_requests_per_minute():
+    rate_limiter, clock = make_rate_limiter(requests_per_minute=60)
+    for _i in range(60):
+        assert rate_limiter.acquire() == 0
+    assert rate_limiter.acquire() == 1.0
+    assert clock.sleeps == [1.0]
+    metrics = rate_limiter.get_metrics()
+    assert metrics["requests"] == 61
+    assert metrics["throttled"] == 1
+
+
+def test_requests_refill_over_time():
+    rate_limiter, clock = make_rate_limiter(requests_per_minute=60)
+    for _i in range(60):
+        rate_limiter.acquire()
+    clock.now += 30
+    for _i in range(30):
+        assert rate_limiter.acquire() == 0
+    assert rate_limiter.acquire() > 0
+
+
+def test_tokens_per_minute():
+    rate_limiter, clock = make_rate_limiter(tokens_per_minute=600)
+    assert rate_limiter.acquire(500) == 0
+    assert rate_limiter.acquire(200) == 10.0
+
+
+def test_tokens_larger_than_capacity_do_not_block_forever():
+    rate_limiter, clock = make_rate_limiter(tokens_per_minute=600)
+    assert rate_limiter.acquire(5000) == 0
+    assert rate_limiter.acquire(1) == 0.1
+
+
+def test_record_usage_corrects_estimate():
+    rate_limiter, clock = make_rate_limiter(tokens_per_minute=600)
+    rate_limiter.acquire(100)
+    rate_limiter.record_usage(100, 700)
+    assert rate_limiter.acquire(0) == 0
+    assert rate_limiter.acquire(60) == 16.0
+
+
+def test_no_limits_no_rate_limiter():
+    assert get_rate_limiter("test:none") is None
+
+
+def test_rate_limiter_shared_per_key(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "rate_limiters", {})
+    rate_limiter = get_rate_limiter("provider:model", requests_per_minute=10)
+    assert get_rate_limiter("provider:model", requests_per_minute=20) is rate_limiter
+    assert rate_limiter.requests.capacity == 20
+    assert get_rate_limiter("provider:other", requests_per_minute=10) is not rate_limiter
+
+
+def test_rate_limiter_thread_safe():
+    rate_limiter, clock = make_rate_limiter(requests_per_minute=1000)
+    threads = [
+        threading.Thread(target=lambda: [rate_limiter.acquire() for _i in range(100)])
+        for _i in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert rate_limiter.get_metrics()["requests"] == 1000
+    assert clock.sleeps == []
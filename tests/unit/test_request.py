@@ -1,4 +1,6 @@
+import asyncio
 import copy
+import time
 import pytest
 
 from unittest.mock import Mock, patch
@@ -8,6 +10,9 @@ from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, Sys
 from lwe.core import constants
 from lwe.core import util
 from lwe.core.token_manager import TokenManager
+from lwe.core.llm_handle_cache import LlmHandleCache
+from lwe.core.rate_limiter import get_rate_limiter
+from lwe.core.hedging import get_latency_tracker
 from lwe.backends.api.request import ApiRequest  # noqa: F401
 from ..base import (
     clean_output,
@@ -147,7 +152,7 @@ def test_build_request_config_success_no_preset_name(
             "preset_overrides": {"five": "six"},
         }
     )
-    request.expand_tools = Mock(return_value=({"key": "value"}, None, None))
+    request.prepare_tools = Mock(return_value=({"key": "value"}, [], None))
     request.tool_cache = Mock()
     success, response, user_message = request.build_request_config(
         {
@@ -181,7 +186,7 @@ def test_build_request_config_success_with_preset_name(
             "preset_overrides": {"five": "six"},
         }
     )
-    request.expand_tools = Mock(return_value=({"key": "value"}, None, None))
+    request.prepare_tools = Mock(return_value=({"key": "value"}, [], None))
     request.tool_cache = Mock()
     success, response, user_message = request.build_request_config(
         {
@@ -200,6 +205,75 @@ def test_build_request_config_success_with_preset_name(
     assert isinstance(response[5], TokenManager)
 
 
+def make_llm_handle_cache_request(test_config, tool_manager, provider_manager, preset_manager):
+    provider = make_provider(provider_manager)
+    capabilities = copy.deepcopy(provider.capabilities)
+    capabilities["reusable_llm"] = True
+    provider.capabilities = capabilities
+    request = make_api_request(
+        test_config, tool_manager, provider_manager, preset_manager, provider
+    )
+    request.llm_handle_cache = LlmHandleCache(test_config)
+    return request, provider
+
+
+def make_llm_handle_cache_config(model_name=constants.API_BACKEND_DEFAULT_MODEL):
+    return {
+        "preset_name": "test",
+        "metadata": {"name": "test", "provider": "fake_llm"},
+        "customizations": {"model_name": model_name},
+        "preset_overrides": {},
+    }
+
+
+def test_build_request_config_reuses_cached_llm(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request, provider = make_llm_handle_cache_request(
+        test_config, tool_manager, provider_manager, preset_manager
+    )
+    provider.make_llm = Mock(wraps=provider.make_llm)
+    _success, first, _user_message = request.build_request_config(make_llm_handle_cache_config())
+    _success, second, _user_message = request.build_request_config(make_llm_handle_cache_config())
+    assert second[2] is first[2]
+    provider.make_llm.assert_called_once()
+    _success, third, _user_message = request.build_request_config(
+        make_llm_handle_cache_config("gpt-4o")
+    )
+    assert third[2] is not first[2]
+    assert provider.make_llm.call_count == 2
+
+
+def test_build_request_config_llm_cache_invalidated_by_preset_file_change(
+    test_config, tool_manager, provider_manager, preset_manager, tmp_path
+):
+    request, provider = make_llm_handle_cache_request(
+        test_config, tool_manager, provider_manager, preset_manager
+    )
+    preset_file = tmp_path / "test.yaml"
+    preset_file.write_text("metadata: {}")
+    config = make_llm_handle_cache_config()
+    config["metadata"]["filepath"] = str(preset_file)
+    provider.make_llm = Mock(wraps=provider.make_llm)
+    request.build_request_config(copy.deepcopy(config))
+    preset_file.write_text("metadata: {name: test}")
+    request.build_request_config(copy.deepcopy(config))
+    assert provider.make_llm.call_count == 2
+
+
+def test_build_request_config_llm_cache_skips_non_reusable_provider(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request, provider = make_llm_handle_cache_request(
+        test_config, tool_manager, provider_manager, preset_manager
+    )
+    provider.capabilities["reusable_llm"] = False
+    provider.make_llm = Mock(wraps=provider.make_llm)
+    request.build_request_config(make_llm_handle_cache_config())
+    request.build_request_config(make_llm_handle_cache_config())
+    assert provider.make_llm.call_count == 2
+
+
 def test_build_request_config_failure(test_config, tool_manager, provider_manager, preset_manager):
     request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
     request.load_provider = Mock(return_value=(False, None, "Error"))
@@ -324,6 +398,33 @@ def test_merge_preset_overrides(test_config, tool_manager, provider_manager, pre
     }
 
 
+def test_merge_preset_overrides_leaves_inputs_unchanged(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    provider = make_provider(provider_manager)
+    request = make_api_request(
+        test_config, tool_manager, provider_manager, preset_manager, provider
+    )
+    metadata = {"key": "value"}
+    customizations = {"key": "value", "model_kwargs": {"key3": "value3"}}
+    preset_overrides = {"model_customizations": {"key2": "value2"}}
+    config = request.merge_preset_overrides(
+        {
+            "metadata": metadata,
+            "customizations": customizations,
+            "preset_overrides": preset_overrides,
+        }
+    )
+    assert config["customizations"] == {
+        "key": "value",
+        "key2": "value2",
+        "model_kwargs": {"key3": "value3"},
+    }
+    assert customizations == {"key": "value", "model_kwargs": {"key3": "value3"}}
+    assert preset_overrides == {"model_customizations": {"key2": "value2"}}
+    assert config["metadata"] is metadata
+
+
 def test_extract_metadata_customizations_with_preset_name(
     test_config, tool_manager, provider_manager, preset_manager
 ):
@@ -640,6 +741,18 @@ def test_strip_out_messages_over_max_tokens_two_messages_stripped(
     assert "stripped out 2 oldest messages" in clean_output(captured.out)
 
 
+def test_strip_out_messages_over_max_tokens_shares_messages(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.token_manager = Mock()
+    request.token_manager.get_num_tokens_from_messages = Mock(side_effect=[100, 60, 30, 30])
+    messages = copy.deepcopy(TEST_BASIC_MESSAGES)
+    result = request.strip_out_messages_over_max_tokens(messages, 50)
+    assert len(messages) == len(TEST_BASIC_MESSAGES)
+    assert result[0] is messages[2]
+
+
 def test_strip_out_messages_over_max_tokens_all_messages_stripped(
     test_config, tool_manager, provider_manager, preset_manager
 ):
@@ -1141,14 +1254,14 @@ def test_execute_tool_calls_success(test_config, tool_manager, provider_manager,
             "role": "tool",
         },
     )
-    request.execute_tool_call = Mock(return_value=tool_response)
+    request.run_tool_calls = Mock(return_value=[tool_response])
     request.build_tool_response_message = Mock(return_value=tool_response_message)
     request.check_forced_tool = Mock(return_value=False)
     request.call_llm = Mock(return_value=(True, "test response", "LLM call succeeded"))
     request.post_response = Mock(return_value=("test response", new_messages))
     result = request.execute_tool_calls(tool_calls, new_messages)
     assert result == ("test response", new_messages)
-    request.execute_tool_call.assert_called_once_with(tool_calls[0])
+    request.run_tool_calls.assert_called_once_with(tool_calls)
     request.build_tool_response_message.assert_called_once_with(tool_calls[0], tool_response)
     request.check_forced_tool.assert_called_once()
     request.call_llm.assert_called_once_with(new_messages)
@@ -1179,14 +1292,14 @@ def test_execute_tool_calls_forced(test_config, tool_manager, provider_manager,
             "role": "tool",
         },
     )
-    request.execute_tool_call = Mock(return_value=tool_response)
+    request.run_tool_calls = Mock(return_value=[tool_response])
     request.build_tool_response_message = Mock(return_value=tool_response_message)
     request.check_forced_tool = Mock(return_value=True)
     request.call_llm = Mock()
     request.post_response = Mock()
     result = request.execute_tool_calls(tool_calls, new_messages)
     assert result == (tool_response, new_messages)
-    request.execute_tool_call.assert_called_once_with(tool_calls[0])
+    request.run_tool_calls.assert_called_once_with(tool_calls)
     request.build_tool_response_message.assert_called_once_with(tool_calls[0], tool_response)
     request.check_forced_tool.assert_called_once()
     request.call_llm.assert_not_called()
@@ -1219,7 +1332,7 @@ def test_execute_tool_calls_llm_failure(
             "role": "tool",
         },
     )
-    request.execute_tool_call = Mock(return_value=tool_response)
+    request.run_tool_calls = Mock(return_value=[tool_response])
     request.build_tool_response_message = Mock(return_value=tool_response_message)
     request.check_forced_tool = Mock(return_value=False)
     request.call_llm = Mock(return_value=(False, None, "LLM call failed"))
@@ -1227,7 +1340,7 @@ def test_execute_tool_calls_llm_failure(
     with pytest.raises(ValueError) as excinfo:
         request.execute_tool_calls(tool_calls, new_messages)
     assert "LLM call failed" in str(excinfo.value)
-    request.execute_tool_call.assert_called_once_with(tool_calls[0])
+    request.run_tool_calls.assert_called_once_with(tool_calls)
     request.build_tool_response_message.assert_called_once_with(tool_calls[0], tool_response)
     request.check_forced_tool.assert_called_once()
     request.call_llm.assert_called_once_with(new_messages)
@@ -1304,6 +1417,38 @@ def test_build_tool_response_message_with_id(
     }
 
 
+def test_build_tool_response_message_over_token_limit(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    test_config.set("tools.response.max_tokens", 10)
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    fitted_response = {"content": "foo...", "truncation": {"strategy": "head_tail"}}
+    request.token_manager = Mock()
+    request.token_manager.fit_tool_response = Mock(return_value=(fitted_response, True))
+    tool_call = {"name": "test_tool", "args": {"word": "foo", "repeats": 100}}
+    tool_response = {"result": " ".join(["foo"] * 100)}
+    result = request.build_tool_response_message(tool_call, tool_response)
+    assert result == {
+        "role": "tool",
+        "message": fitted_response,
+        "message_type": "tool_response",
+        "message_metadata": {"name": tool_call["name"], "full_response": tool_response},
+    }
+    settings = request.token_manager.fit_tool_response.call_args.args[1]
+    assert settings["max_tokens"] == 10
+    assert settings["summarize_max_input_tokens"] == (
+        request.max_submission_tokens - 10 - constants.TOOL_RESPONSE_SUMMARY_RESERVED_TOKENS
+    )
+
+
+def test_fit_tool_response_no_limit(test_config, tool_manager, provider_manager, preset_manager):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.token_manager = Mock()
+    tool_response = {"result": "foo"}
+    assert request.fit_tool_response("test_tool", tool_response) == (tool_response, False)
+    request.token_manager.fit_tool_response.assert_not_called()
+
+
 @patch("lwe.backends.api.request.convert_message_to_dict")
 def test_extract_message_content_no_tool_calls(
     mock_convert_message_to_dict, test_config, tool_manager, provider_manager, preset_manager
@@ -1520,6 +1665,40 @@ def test_run_tool_failure(test_config, tool_manager, provider_manager, preset_ma
     assert json_obj == {"error": "message"}
 
 
+def test_run_tool_calls_success(test_config, tool_manager, provider_manager, preset_manager):
+    request = make_api_request(
+        test_config, tool_manager, provider_manager, preset_manager, return_only=True
+    )
+    tool_calls = [
+        {"name": "test_tool", "args": {"word": "foo", "repeats": 1}, "id": "call_1"},
+        {"name": "test_tool", "args": {"word": "bar", "repeats": 2}, "id": "call_2"},
+    ]
+    request.tool_manager.run_tools = Mock(
+        return_value=[
+            (True, {"result": "foo"}, "message"),
+            (True, {"result": "bar bar"}, "message"),
+        ]
+    )
+    tool_responses = request.run_tool_calls(tool_calls)
+    request.tool_manager.run_tools.assert_called_once_with(
+        [("test_tool", {"word": "foo", "repeats": 1}), ("test_tool", {"word": "bar", "repeats": 2})]
+    )
+    assert tool_responses == [{"result": "foo"}, {"result": "bar bar"}]
+
+
+def test_run_tool_calls_failure(test_config, tool_manager, provider_manager, preset_manager):
+    request = make_api_request(
+        test_config, tool_manager, provider_manager, preset_manager, return_only=True
+    )
+    tool_calls = [
+        {"name": "test_tool", "args": {}, "id": "call_1"},
+    ]
+    request.tool_manager.run_tools = Mock(return_value=[(False, None, "Tool exploded")])
+    with pytest.raises(ValueError) as excinfo:
+        request.run_tool_calls(tool_calls)
+    assert "Tool exploded" in str(excinfo.value)
+
+
 def test_is_tool_response_message(test_config, tool_manager, provider_manager, preset_manager):
     request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
     assert request.is_tool_response_message({"message_type": "tool_response"}) is True
@@ -1530,3 +1709,385 @@ def test_terminate_stream(test_config, tool_manager, provider_manager, preset_ma
     request.streaming = True
     request.terminate_stream(None, None)
     assert request.streaming is False
+
+
+def test_record_llm_call_accumulates_stats(
+    test_config, provider_manager, tool_manager, preset_manager
+):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.model_name = "gpt-4o"
+    response = AIMessage(
+        content="Hi",
+        usage_metadata={"input_tokens": 10, "output_tokens": 3, "total_tokens": 13},
+    )
+    request.record_llm_call(response, time.perf_counter() - 1)
+    request.first_chunk_time = None
+    request.record_llm_call(AIMessage(content="Again"), time.perf_counter())
+    stats = request.get_stats()
+    assert stats["model"] == "gpt-4o"
+    assert stats["llm_calls"] == 2
+    assert stats["prompt_tokens"] == 10
+    assert stats["completion_tokens"] == 3
+    assert stats["time_to_first_token"] >= 1
+    assert stats["llm_time"] >= stats["time_to_first_token"]
+
+
+def test_call_llm_rate_limited(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    monkeypatch.setattr("lwe.core.rate_limiter.rate_limiters", {})
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.preset = ({"requests_per_minute": 1, "tokens_per_minute": 1000}, {})
+    request.model_name = "test-model"
+    request.token_manager = Mock()
+    request.token_manager.get_num_tokens_from_messages.return_value = 10
+    request.build_chat_request = Mock(return_value=["built message"])
+    response = AIMessage(
+        content="response",
+        usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+    )
+    request.execute_llm_non_streaming = Mock(return_value=(True, response, "Response received"))
+    sleep = Mock()
+    monkeypatch.setattr("lwe.core.rate_limiter.time.sleep", sleep)
+    success, _response, _user_message = request.call_llm(["message"])
+    assert success is True
+    sleep.assert_not_called()
+    rate_limiter = get_rate_limiter("provider_fake_llm:test-model", 1, 1000)
+    rate_limiter.sleep = sleep
+    request.call_llm(["message"])
+    assert sleep.call_count == 1
+    assert request.get_stats()["rate_limit_wait"] > 0
+    request.token_manager.get_num_tokens_from_messages.assert_called_with(["message"])
+
+
+def test_get_rate_limits_preset_overrides_provider_config(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    test_config.set(
+        "plugins.provider_fake_llm.rate_limits",
+        {
+            "default": {"requests_per_minute": 10, "tokens_per_minute": 100},
+            "test-model": {"tokens_per_minute": 200},
+        },
+    )
+    request.model_name = "test-model"
+    request.preset = ({}, {})
+    assert request.get_rate_limits() == {"requests_per_minute": 10, "tokens_per_minute": 200}
+    request.preset = ({"requests_per_minute": 5}, {})
+    assert request.get_rate_limits() == {"requests_per_minute": 5, "tokens_per_minute": 200}
+
+
+def test_call_llm_adaptive_concurrency(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    monkeypatch.setattr("lwe.core.adaptive_limiter.adaptive_limiters", {})
+    request = make_api_request(
+        test_config,
+        tool_manager,
+        provider_manager,
+        preset_manager,
+        request_overrides={"adaptive_concurrency": True},
+    )
+    request.build_chat_request = Mock(return_value=["built message"])
+    request.execute_llm_non_streaming = Mock(return_value=(True, "response", "Response received"))
+    request.call_llm(["message"])
+    limiter = request.get_adaptive_limiter()
+    metrics = limiter.get_metrics()
+    assert metrics["succeeded"] == 1
+    assert metrics["in_flight"] == 0
+    error = Exception("rate limited")
+    error.status_code = 429
+    request.execute_llm_non_streaming = Mock(side_effect=error)
+    with pytest.raises(Exception):
+        request.call_llm(["message"])
+    metrics = limiter.get_metrics()
+    assert metrics["overloaded"] == 1
+    assert metrics["in_flight"] == 0
+
+
+def test_call_llm_adaptive_concurrency_releases_slot_on_interrupt(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    monkeypatch.setattr("lwe.core.adaptive_limiter.adaptive_limiters", {})
+    request = make_api_request(
+        test_config,
+        tool_manager,
+        provider_manager,
+        preset_manager,
+        request_overrides={"adaptive_concurrency": True},
+    )
+    request.build_chat_request = Mock(return_value=["built message"])
+    request.execute_llm_non_streaming = Mock(side_effect=KeyboardInterrupt)
+    with pytest.raises(KeyboardInterrupt):
+        request.call_llm(["message"])
+    metrics = request.get_adaptive_limiter().get_metrics()
+    assert metrics["in_flight"] == 0
+    assert metrics["failed"] == 1
+    assert metrics["overloaded"] == 0
+
+
+def test_call_llm_adaptive_concurrency_disabled(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    assert request.get_adaptive_limiter() is None
+
+
+def make_hedging_llm(response, delay=0.0, error=None):
+    async def ainvoke(messages):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return AIMessage(content=response)
+
+    llm = Mock()
+    llm.ainvoke = Mock(side_effect=ainvoke)
+    llm.invoke = Mock(side_effect=error, return_value=AIMessage(content=response))
+    return llm
+
+
+def make_hedging_request(test_config, tool_manager, provider_manager, preset_manager, overrides):
+    request = make_api_request(
+        test_config, tool_manager, provider_manager, preset_manager, request_overrides=overrides
+    )
+    request.model_name = "hedge-test-model"
+    request.build_chat_request = Mock(side_effect=lambda messages, provider=None: messages)
+    return request
+
+
+def test_call_llm_hedged_to_preset(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    monkeypatch.setattr("lwe.core.hedging.latency_trackers", {})
+    request = make_hedging_request(
+        test_config,
+        tool_manager,
+        provider_manager,
+        preset_manager,
+        {"hedging": {"delay": 0.05, "max_extra_ratio": 1.0, "preset": "backup"}},
+    )
+    request.llm = make_hedging_llm("slow", delay=5)
+    hedge_llm = make_hedging_llm("fast")
+    request.get_preset_llm_target = Mock(
+        return_value=(True, (request.provider, hedge_llm, "backup"), "Built LLM")
+    )
+    success, response, _user_message = request.call_llm(["message"])
+    assert success
+    assert response.content == "fast"
+    request.get_preset_llm_target.assert_called_once_with("backup")
+    stats = request.get_stats()
+    assert stats["hedged_requests"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_call_llm_hedging_respects_budget(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    monkeypatch.setattr("lwe.core.hedging.latency_trackers", {})
+    request = make_hedging_request(
+        test_config,
+        tool_manager,
+        provider_manager,
+        preset_manager,
+        {"hedging": {"delay": 0.01, "max_extra_ratio": 0.5}},
+    )
+    request.llm = make_hedging_llm("primary", delay=0.1)
+    success, response, _user_message = request.call_llm(["message"])
+    assert success
+    assert response.content == "primary"
+    assert request.get_stats()["hedged_requests"] == 0
+    assert request.llm.ainvoke.call_count == 1
+
+
+def test_call_llm_hedging_uses_observed_percentile(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    monkeypatch.setattr("lwe.core.hedging.latency_trackers", {})
+    request = make_hedging_request(
+        test_config,
+        tool_manager,
+        provider_manager,
+        preset_manager,
+        {"hedging": {"min_samples": 3, "max_extra_ratio": 1.0}},
+    )
+    request.llm = make_hedging_llm("primary")
+    for _i in range(3):
+        request.call_llm(["message"])
+    assert request.get_stats()["hedged_requests"] == 0
+    tracker = get_latency_tracker(f"{request.provider.name}:hedge-test-model")
+    assert tracker.percentile(95, min_samples=3) is not None
+
+
+def test_call_llm_falls_back_in_order(test_config, tool_manager, provider_manager, preset_manager):
+    request = make_hedging_request(
+        test_config,
+        tool_manager,
+        provider_manager,
+        preset_manager,
+        {"fallback_presets": ["missing", "broken", "backup"]},
+    )
+    request.llm = make_hedging_llm("", error=RuntimeError("provider down"))
+    targets = {
+        "broken": (request.provider, make_hedging_llm("", error=RuntimeError("down")), "broken"),
+        "backup": (request.provider, make_hedging_llm("from backup"), "backup"),
+    }
+    request.get_preset_llm_target = Mock(
+        side_effect=lambda name: (
+            (True, targets[name], "Built LLM") if name in targets else (False, None, "Not found")
+        )
+    )
+    success, response, user_message = request.call_llm(["message"])
+    assert success
+    assert response.content == "from backup"
+    assert "backup" in user_message
+    assert request.get_stats()["fallbacks"] == 1
+
+
+def test_call_llm_fallbacks_exhausted_raises(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_hedging_request(
+        test_config, tool_manager, provider_manager, preset_manager, {"fallback_presets": ["a"]}
+    )
+    request.llm = make_hedging_llm("", error=RuntimeError("provider down"))
+    request.get_preset_llm_target = Mock(return_value=(False, None, "Not found"))
+    with pytest.raises(RuntimeError, match="provider down"):
+        request.call_llm(["message"])
+
+
+def test_get_hedging_options(test_config, tool_manager, provider_manager, preset_manager):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    assert request.get_hedging_options() is None
+    request.request_overrides = {"hedging": True}
+    assert request.get_hedging_options()["percentile"] == 95
+    request.request_overrides = {"hedging": {"delay": 2}}
+    assert request.get_hedging_options()["delay"] == 2
+    test_config.set("backend_options.hedging.enabled", True)
+    request.request_overrides = {"hedging": False}
+    assert request.get_hedging_options() is None
+
+
+def test_get_preset_llm_target_keeps_tool_cache(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.set_request_llm()
+    tool_cache = request.tool_cache
+    success, target, _user_message = request.get_preset_llm_target("test")
+    assert success
+    provider, llm, preset_name = target
+    assert provider.name == "provider_fake_llm"
+    assert preset_name == "test"
+    assert llm is not request.llm
+    assert request.tool_cache is tool_cache
+    success, _target, _user_message = request.get_preset_llm_target("missing")
+    assert not success
+
+
+def test_call_llm_circuit_breaker_fails_fast(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    test_config.set("backend_options.circuit_breaker.failure_threshold", 2)
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.build_chat_request = Mock(return_value=["built message"])
+    error = Exception("service unavailable")
+    error.status_code = 503
+    request.execute_llm_non_streaming = Mock(side_effect=error)
+    for _i in range(2):
+        with pytest.raises(Exception):
+            request.call_llm(["message"])
+    success, _response, user_message = request.call_llm(["message"])
+    assert not success
+    assert "circuit breaker is open" in user_message
+    assert request.execute_llm_non_streaming.call_count == 2
+    states = provider_manager.get_circuit_breaker_states()
+    assert states[request.provider.name]["state"] == "open"
+
+
+def make_half_open_request(test_config, tool_manager, provider_manager, preset_manager):
+    test_config.set("backend_options.circuit_breaker.failure_threshold", 1)
+    test_config.set("backend_options.circuit_breaker.open_interval", 0)
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.get_circuit_breaker().record_failure()
+    return request
+
+
+def test_call_llm_circuit_probe_released_on_build_error(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_half_open_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.build_chat_request = Mock(side_effect=ValueError("bad file"))
+    with pytest.raises(ValueError):
+        request.call_llm(["message"])
+    breaker = request.get_circuit_breaker()
+    assert breaker.get_state()["state"] == "half_open"
+    assert breaker.allow_request()
+
+
+def test_call_llm_circuit_probe_released_on_interrupt(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_half_open_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.build_chat_request = Mock(return_value=["built message"])
+    request.llm = Mock(spec=["invoke", "dict"])
+    request.llm.invoke.side_effect = KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        request.call_llm(["message"])
+    breaker = request.get_circuit_breaker()
+    assert breaker.get_state()["state"] == "half_open"
+    assert breaker.allow_request()
+
+
+def test_get_circuit_breaker_per_provider_when_load_balanced(
+    test_config, tool_manager, provider_manager, preset_manager, monkeypatch
+):
+    request = make_api_request(test_config, tool_manager, provider_manager, preset_manager)
+    request.llm = Mock(spec=["openai_api_base"], openai_api_base="http://gpu-1:8000/v1")
+    endpoint_breaker = request.get_circuit_breaker()
+    assert endpoint_breaker is provider_manager.get_circuit_breaker(
+        request.provider.name, "http://gpu-1:8000/v1"
+    )
+    monkeypatch.setattr(
+        request.provider,
+        "http_clients",
+        Mock(load_balancer=Mock(base_url="http://gpu-1:8000/v1")),
+        raising=False,
+    )
+    assert request.get_circuit_breaker() is provider_manager.get_circuit_breaker(
+        request.provider.name
+    )
+
+
+def test_call_llm_circuit_open_uses_fallback(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_hedging_request(
+        test_config, tool_manager, provider_manager, preset_manager, {"fallback_presets": ["b"]}
+    )
+    request.llm = make_hedging_llm("primary")
+    breaker = request.get_circuit_breaker()
+    for _i in range(test_config.get("backend_options.circuit_breaker.failure_threshold")):
+        breaker.record_failure()
+    request.get_preset_llm_target = Mock(
+        return_value=(True, (request.provider, make_hedging_llm("from backup"), "b"), "Built")
+    )
+    success, response, _user_message = request.call_llm(["message"])
+    assert success
+    assert response.content == "from backup"
+    request.llm.invoke.assert_not_called()
+
+
+def test_call_llm_resilient_records_circuit_failure(
+    test_config, tool_manager, provider_manager, preset_manager
+):
+    request = make_hedging_request(
+        test_config, tool_manager, provider_manager, preset_manager, {"fallback_presets": ["b"]}
+    )
+    request.llm = make_hedging_llm("", error=TimeoutError("timed out"))
+    request.get_preset_llm_target = Mock(
+        return_value=(True, (request.provider, make_hedging_llm("from backup"), "b"), "Built")
+    )
+    success, _response, _user_message = request.call_llm(["message"])
+    assert success
+    assert request.get_circuit_breaker().get_state()["consecutive_failures"] == 1
@@ -0,0 +1,191 @@
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from unittest.mock import Mock
+
+from lwe.backends.api.template_batch import TemplateBatchRunner, iter_rows
+
+
+def make_backend(fail_on=None, delay=0):
+    backend = Mock()
+    lock = threading.Lock()
+    backend.in_flight = 0
+    backend.max_in_flight = 0
+
+    def build_message_from_template(template_name, template_vars=None, overrides=None):
+        return True, (f"Review: {template_vars['text']}", {}), "Built message"
+
+    def run_isolated_request(message, request_overrides):
+        with lock:
+            backend.in_flight += 1
+            backend.max_in_flight = max(backend.max_in_flight, backend.in_flight)
+        time.sleep(delay)
+        with lock:
+            backend.in_flight -= 1
+        if fail_on and fail_on in message:
+            return False, None, "LLM call failed"
+        return True, message.upper(), "Success"
+
+    backend.build_message_from_template = Mock(side_effect=build_message_from_template)
+    backend.run_isolated_request = Mock(side_effect=run_isolated_request)
+    return backend
+
+
+def write_jsonl(filepath, rows):
+    with open(filepath, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def read_results(filepath):
+    with open(filepath) as f:
+        return sorted((json.loads(line) for line in f), key=lambda result: result["index"])
+
+
+def test_iter_rows_csv(tmp_path):
+    filepath = tmp_path / "rows.csv"
+    filepath.write_text("text,stars\ngreat,5\nbad,1\n")
+    assert list(iter_rows(str(filepath))) == [
+        {"text": "great", "stars": "5"},
+        {"text": "bad", "stars": "1"},
+    ]
+
+
+def test_iter_rows_jsonl(tmp_path):
+    filepath = tmp_path / "rows.jsonl"
+    write_jsonl(filepath, [{"text": "great"}, {"text": "bad"}])
+    assert list(iter_rows(str(filepath))) == [{"text": "great"}, {"text": "bad"}]
+
+
+def test_iter_rows_sqlite(tmp_path):
+    filepath = str(tmp_path / "rows.db")
+    conn = sqlite3.connect(filepath)
+    conn.execute("CREATE TABLE reviews (id INTEGER, text TEXT)")
+    conn.executemany("INSERT INTO reviews VALUES (?, ?)", [(1, "great"), (2, "bad")])
+    conn.commit()
+    conn.close()
+    rows = iter_rows(filepath, "SELECT text FROM reviews ORDER BY id")
+    assert list(rows) == [{"text": "great"}, {"text": "bad"}]
+
+
+def test_iter_rows_sqlite_requires_query(tmp_path):
+    with pytest.raises(ValueError):
+        iter_rows(str(tmp_path / "rows.db"))
+
+
+def test_iter_rows_unsupported(tmp_path):
+    with pytest.raises(ValueError):
+        iter_rows(str(tmp_path / "rows.txt"))
+
+
+def test_run_writes_result_per_row(test_config, tmp_path):
+    input_file = tmp_path / "rows.jsonl"
+    output_file = str(tmp_path / "results.jsonl")
+    write_jsonl(input_file, [{"text": f"review {i}"} for i in range(10)])
+    backend = make_backend(fail_on="review 3")
+    runner = TemplateBatchRunner(backend, test_config)
+    success, stats, _user_message = runner.run(
+        "review.md", str(input_file), output_file, template_vars={"extra": "value"}
+    )
+    assert success is True
+    assert stats == {"total": 10, "succeeded": 9, "failed": 1, "skipped": 0}
+    results = read_results(output_file)
+    assert [result["index"] for result in results] == list(range(10))
+    assert results[0]["response"] == "REVIEW: REVIEW 0"
+    assert results[0]["row"] == {"text": "review 0"}
+    assert results[3]["success"] is False
+    assert results[3]["error"] == "LLM call failed"
+    template_vars = backend.build_message_from_template.call_args_list[0].kwargs["template_vars"]
+    assert template_vars == {"extra": "value", "text": "review 0"}
+
+
+def test_run_bounds_concurrency(test_config, tmp_path):
+    input_file = tmp_path / "rows.jsonl"
+    output_file = str(tmp_path / "results.jsonl")
+    write_jsonl(input_file, [{"text": f"review {i}"} for i in range(12)])
+    backend = make_backend(delay=0.05)
+    runner = TemplateBatchRunner(backend, test_config)
+    start = time.monotonic()
+    success, stats, _user_message = runner.run(
+        "review.md", str(input_file), output_file, concurrency=3
+    )
+    elapsed = time.monotonic() - start
+    assert success is True
+    assert stats["succeeded"] == 12
+    assert backend.max_in_flight == 3
+    assert elapsed < 12 * 0.05
+
+
+def test_run_resumes_from_checkpoint(test_config, tmp_path):
+    input_file = tmp_path / "rows.jsonl"
+    output_file = tmp_path / "results.jsonl"
+    write_jsonl(input_file, [{"text": f"review {i}"} for i in range(4)])
+    output_file.write_text(
+        json.dumps({"index": 0, "success": True, "row": {}, "response": "done"})
+        + "\n"
+        + json.dumps({"index": 1, "success": False, "row": {}, "error": "failed"})
+        + "\n"
+        + '{"index": 2, "succ'
+    )
+    backend = make_backend()
+    runner = TemplateBatchRunner(backend, test_config)
+    success, stats, _user_message = runner.run("review.md", str(input_file), str(output_file))
+    assert success is True
+    assert stats == {"total": 4, "succeeded": 3, "failed": 0, "skipped": 1}
+    assert backend.run_isolated_request.call_count == 3
+    lines = output_file.read_text().splitlines()
+    results = [json.loads(line) for line in lines if line.endswith("}")]
+    assert sorted(result["index"] for result in results if result["success"]) == [0, 1, 2, 3]
+
+
+def test_run_without_resume_overwrites_output(test_config, tmp_path):
+    input_file = tmp_path / "rows.jsonl"
+    output_file = tmp_path / "results.jsonl"
+    write_jsonl(input_file, [{"text": "review 0"}])
+    output_file.write_text(json.dumps({"index": 0, "success": True, "response": "old"}) + "\n")
+    backend = make_backend()
+    runner = TemplateBatchRunner(backend, test_config)
+    runner.run("review.md", str(input_file), str(output_file), resume=False)
+    results = read_results(output_file)
+    assert len(results) == 1
+    assert results[0]["response"] == "REVIEW: REVIEW 0"
+
+
+def test_run_records_template_render_failures(test_config, tmp_path):
+    input_file = tmp_path / "rows.jsonl"
+    output_file = str(tmp_path / "results.jsonl")
+    write_jsonl(input_file, [{"text": "review 0"}])
+    backend = make_backend()
+    backend.build_message_from_template = Mock(side_effect=RuntimeError("bad template"))
+    runner = TemplateBatchRunner(backend, test_config)
+    success, stats, _user_message = runner.run("review.md", str(input_file), output_file)
+    assert success is True
+    assert stats["failed"] == 1
+    assert "bad template" in read_results(output_file)[0]["error"]
+    backend.run_isolated_request.assert_not_called()
+
+
+def test_run_unsupported_input(test_config, tmp_path):
+    runner = TemplateBatchRunner(make_backend(), test_config)
+    success, _stats, user_message = runner.run(
+        "review.md", str(tmp_path / "rows.txt"), str(tmp_path / "results.jsonl")
+    )
+    assert success is False
+    assert "Unsupported" in user_message
+
+
+def test_run_invalid_concurrency(test_config, tmp_path):
+    input_file = tmp_path / "rows.jsonl"
+    write_jsonl(input_file, [{"text": "review 0"}])
+    backend = make_backend()
+    runner = TemplateBatchRunner(backend, test_config)
+    success, _stats, user_message = runner.run(
+        "review.md", str(input_file), str(tmp_path / "results.jsonl"), concurrency="lots"
+    )
+    assert success is False
+    assert "Invalid batch concurrency 'lots'" in user_message
+    backend.run_isolated_request.assert_not_called()
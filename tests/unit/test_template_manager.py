@@ -2,6 +2,7 @@ from unittest.mock import Mock, patch
 
 import os
 import yaml
+import frontmatter
 
 from jinja2 import Environment, Template
 
@@ -97,6 +98,80 @@ Hello, {{ name }}
     assert overrides == {"request_overrides": {"title": "Existent Template"}}
 
 
+def test_build_message_from_template_uses_cached_source(template_manager):
+    template_name = "cached.md"
+    make_template_file(template_manager, template_name, "Hello, {{ name }}")
+    with patch("lwe.core.template_manager.frontmatter.load", wraps=frontmatter.load) as mock_load:
+        first, _ = template_manager.build_message_from_template(template_name, {"name": "foo"})
+        second, _ = template_manager.build_message_from_template(template_name, {"name": "bar"})
+    assert first == "Hello, foo"
+    assert second == "Hello, bar"
+    assert mock_load.call_count == 1
+
+
+def test_build_message_from_template_reloads_changed_file(template_manager):
+    template_name = "changed.md"
+    filepath = make_template_file(template_manager, template_name, "Hello, {{ name }}")
+    template_manager.build_message_from_template(template_name, {"name": "foo"})
+    stat = os.stat(filepath)
+    with open(filepath, "w") as f:
+        f.write("Goodbye, {{ name }}")
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    message, _ = template_manager.build_message_from_template(template_name, {"name": "foo"})
+    remove_template_file(template_manager, template_name)
+    assert message == "Goodbye, foo"
+
+
+def test_build_message_from_template_overrides_are_isolated(template_manager):
+    template_name = "overrides.md"
+    template_content = """
+---
+request_overrides:
+  title: Original
+---
+Hello
+"""
+    make_template_file(template_manager, template_name, template_content)
+    _message, overrides = template_manager.build_message_from_template(template_name)
+    overrides["request_overrides"]["title"] = "Changed"
+    _message, overrides = template_manager.build_message_from_template(template_name)
+    remove_template_file(template_manager, template_name)
+    assert overrides == {"request_overrides": {"title": "Original"}}
+
+
+def test_compile_template_content_writes_bytecode_cache(template_manager):
+    template_name = "bytecode.md"
+    filepath = make_template_file(template_manager, template_name, "Hello, {{ name }}")
+    template_manager.build_message_from_template(template_name, {"name": "foo"})
+    cache_dir = template_manager.templates_env.bytecode_cache.directory
+    assert len(os.listdir(cache_dir)) > 0
+    other_template_manager = TemplateManager(template_manager.config)
+    with patch.object(
+        other_template_manager.templates_env,
+        "compile",
+        wraps=other_template_manager.templates_env.compile,
+    ) as mock_compile:
+        compiled = other_template_manager.compile_template_content(
+            template_name, filepath, "Hello, {{ name }}"
+        )
+    remove_template_file(template_manager, template_name)
+    assert compiled.render(name="bar") == "Hello, bar"
+    mock_compile.assert_not_called()
+
+
+def test_ensure_template_only_reloads_on_miss(template_manager):
+    template_name = "ensure.md"
+    make_template_file(template_manager, template_name)
+    template_manager.load_templates = Mock(wraps=template_manager.load_templates)
+    success, _name, _user_message = template_manager.ensure_template(template_name)
+    assert success is True
+    template_manager.load_templates.assert_not_called()
+    remove_template_file(template_manager, template_name)
+    success, _name, _user_message = template_manager.ensure_template(template_name)
+    assert success is False
+    template_manager.load_templates.assert_called_once()
+
+
 def test_process_template_builtin_variables(template_manager):
     variables = ["clipboard"]
     with patch("pyperclip.paste", return_value="test_value"):
@@ -115,8 +190,10 @@ def test_make_user_template_dirs(template_manager, tmpdir):
 
 
 def test_load_templates(template_manager):
+    templates_env = template_manager.templates_env
     template_manager.load_templates()
     assert isinstance(template_manager.templates_env, Environment)
+    assert template_manager.templates_env is templates_env
     assert isinstance(template_manager.templates, list)
 
 
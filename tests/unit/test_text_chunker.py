@@ -0,0 +1,51 @@
+import pytest
+
+from lwe.core.text_chunker import TextChunker
+
+
+class CharEncoding:
+    """One token per character, for predictable token counts."""
+
+    def encode(self, text, disallowed_special=()):
+        return [ord(char) for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+def make_chunker(chunk_size, overlap=0):
+    return TextChunker(chunk_size, overlap, encoding=CharEncoding())
+
+
+def test_small_text_is_one_chunk():
+    chunks = make_chunker(100).chunk("Short text.")
+    assert chunks == [{"index": 0, "content": "Short text.", "tokens": 11}]
+
+
+def test_chunks_split_on_headings():
+    first = "# One\n\n" + "a" * 30 + "\n\n"
+    second = "## Two\n\n" + "b" * 30 + "\n"
+    chunks = make_chunker(50).chunk(first + second)
+    assert [chunk["content"] for chunk in chunks] == [first, second]
+
+
+def test_chunks_split_on_paragraphs_then_tokens():
+    text = "# Heading\n\n" + "a" * 20 + "\n\n" + "b" * 45 + "\n\n" + "c" * 10
+    chunks = make_chunker(30).chunk(text)
+    assert all(chunk["tokens"] <= 30 for chunk in chunks)
+    assert "".join(chunk["content"] for chunk in chunks) == text
+    assert chunks[0]["content"] == "# Heading\n\n" + "a" * 19
+
+
+def test_chunks_overlap():
+    text = "\n\n".join(char * 18 for char in "abc")
+    chunks = make_chunker(30, overlap=5).chunk(text)
+    assert len(chunks) == 3
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk["content"].startswith(previous["content"][-5:])
+        assert chunk["tokens"] <= 30
+
+
+def test_invalid_overlap():
+    with pytest.raises(ValueError):
+        make_chunker(10, overlap=10)
@@ -0,0 +1,160 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz
+import pytest
+
+from lwe.core.extraction_cache import ExtractionCache
+from lwe.backends.api.workflow.library import text_extractor
+from lwe.backends.api.workflow.library.text_extractor import (
+    extract_content,
+    get_url_extension,
+    parse_page_range,
+)
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = str(tmp_path / "doc.pdf")
+    doc = fitz.open()
+    for number in range(1, 11):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page number {number}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def http_server(pdf):
+    """
+    Local HTTP stand-in serving a PDF with an ETag, an HTML page, and an oversized body.
+    """
+    with open(pdf, "rb") as f:
+        pdf_bytes = f.read()
+    routes = {
+        "/doc": ("application/pdf", pdf_bytes),
+        "/page": ("text/html; charset=utf-8", b"<html><body><p>Hello page</p></body></html>"),
+        "/big": ("text/plain", b"x" * 5000),
+    }
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get("If-None-Match")))
+            content_type, body = routes[self.path]
+            etag = f'"{len(body)}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.requests_seen = requests_seen
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_url_extension():
+    assert get_url_extension("http://example.com/file", "application/pdf") == ".pdf"
+    assert get_url_extension("http://example.com/file.docx", "application/octet-stream") == ".docx"
+    assert get_url_extension("http://example.com/", None) == ".html"
+
+
+def test_extract_url_uses_content_type(http_server):
+    success, content, _user_message = extract_content(f"{http_server.base_url}/doc")
+    assert success
+    assert "Page number 10" in content
+    success, content, _user_message = extract_content(f"{http_server.base_url}/page")
+    assert success
+    assert "Hello page" in content
+
+
+def test_extract_url_enforces_max_download_size(http_server):
+    success, _content, user_message = extract_content(
+        f"{http_server.base_url}/big", max_download_size=1000
+    )
+    assert not success
+    assert "exceeds 1000 bytes" in user_message
+
+
+def test_extract_url_conditional_request(http_server, test_config, monkeypatch):
+    cache = ExtractionCache(test_config)
+    url = f"{http_server.base_url}/doc"
+    success, first, _user_message = extract_content(url, cache=cache)
+    assert success
+    monkeypatch.setattr(
+        text_extractor,
+        "extract_pages_pymupdf",
+        lambda *args: pytest.fail("Cached content should be used"),
+    )
+    success, second, _user_message = extract_content(url, cache=cache)
+    assert success
+    assert second == first
+    assert http_server.requests_seen[0][1] is None
+    assert http_server.requests_seen[1][1] is not None
+
+
+def test_parse_page_range():
+    assert parse_page_range("1-3,5", 10) == [1, 2, 3, 5]
+    assert parse_page_range("8-", 10) == [8, 9, 10]
+    assert parse_page_range("-2, 4", 10) == [1, 2, 4]
+    with pytest.raises(ValueError, match="'one' is not a page number"):
+        parse_page_range("one", 10)
+    with pytest.raises(ValueError, match="'a' is not a page number"):
+        parse_page_range("a-3", 10)
+    with pytest.raises(ValueError, match="Invalid page range '5-1': start page is after end page"):
+        parse_page_range("1,5-1", 10)
+
+
+def test_extract_pages(pdf):
+    success, content, _user_message = extract_content(pdf, pages=[3, 1])
+    assert success
+    assert content.index("Page number 1") < content.index("Page number 3")
+    assert "Page number 2" not in content
+    success, content, _user_message = extract_content(pdf, page_range="9-")
+    assert "Page number 9" in content
+    assert "Page number 10" in content
+    assert "Page number 8" not in content
+
+
+def test_extract_invalid_pages(pdf):
+    success, _content, user_message = extract_content(pdf, pages=[11])
+    assert not success
+    assert "out of range" in user_message
+
+
+def test_early_stop_extracts_only_needed_pages(pdf, monkeypatch):
+    calls = []
+
+    def extract_pages(path, pages):
+        calls.append(pages)
+        return "x" * 10 * len(pages)
+
+    monkeypatch.setattr(text_extractor, "extract_pages_pymupdf", extract_pages)
+    success, content, _user_message = extract_content(pdf, max_length=35, early_stop=True)
+    assert success
+    assert content == "x" * 35
+    assert calls == [[0, 1, 2, 3]]
+
+
+def test_workers_reassemble_pages_in_order(pdf):
+    _success, sequential, _user_message = extract_content(pdf)
+    success, parallel, _user_message = extract_content(pdf, workers=3)
+    assert success
+    positions = [parallel.index(f"Page number {number} ") for number in range(1, 11)]
+    assert positions == sorted(positions)
+    assert parallel.split() == sequential.split()
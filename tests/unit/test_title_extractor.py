@@ -0,0 +1,39 @@
+from lwe.core import constants
+from lwe.core.title_extractor import extract_title
+
+
+def test_extract_title_uses_keywords():
+    title = extract_title("Can you help me write a python script that parses CSV files?")
+    assert title == "Python Script Parses CSV Files"
+
+
+def test_extract_title_picks_best_sentence():
+    title = extract_title(
+        "Hi there. Explain how Kubernetes schedules pods. "
+        "I am confused about Kubernetes taints and pods."
+    )
+    assert title.startswith("Explain Kubernetes Schedules Pods")
+
+
+def test_extract_title_limits_words():
+    title = extract_title("alpha beta gamma delta epsilon zeta eta theta", max_words=3)
+    assert title == "Alpha Beta Gamma"
+
+
+def test_extract_title_ignores_code_and_urls():
+    title = extract_title("```\nimport os\n```\nhttps://example.com/docs Summarize documentation")
+    assert title == "Summarize Documentation"
+
+
+def test_extract_title_only_stopwords():
+    assert extract_title("hello") == "Hello"
+
+
+def test_extract_title_no_words():
+    assert extract_title("") is None
+    assert extract_title("  ?! ") is None
+
+
+def test_extract_title_truncates_content():
+    content = "x " * constants.TITLE_GENERATION_MAX_CHARACTERS + "keyword"
+    assert "Keyword" not in extract_title(content)
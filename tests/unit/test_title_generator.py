@@ -0,0 +1,111 @@
+import threading
+from unittest.mock import Mock
+
+from lwe.backends.api.title_generator import TitleGenerator
+
+
+def make_title_generator(test_config, provider_manager, workers=2, queue_size=100):
+    test_config.set("backend_options.title_generation.workers", workers)
+    test_config.set("backend_options.title_generation.queue_size", queue_size)
+    test_config.set("backend_options.title_generation.submit_timeout", 0)
+    title_generator = TitleGenerator(test_config, provider_manager, Mock())
+    title_generator.is_in_memory_database = Mock(return_value=False)
+    return title_generator
+
+
+def test_submit_in_memory_database_runs_inline(test_config, provider_manager):
+    title_generator = TitleGenerator(test_config, provider_manager, Mock())
+    title_generator.is_in_memory_database = Mock(return_value=True)
+    title_generator.generate_title = Mock(return_value=True)
+    title_generator.submit(1)
+    title_generator.generate_title.assert_called_once_with(1)
+    assert title_generator.threads == []
+    metrics = title_generator.get_metrics()
+    assert metrics["submitted"] == 1
+    assert metrics["completed"] == 1
+
+
+def test_submit_uses_bounded_workers(test_config, provider_manager):
+    title_generator = make_title_generator(test_config, provider_manager, workers=2)
+    generated = []
+    title_generator.generate_title = Mock(side_effect=lambda id: generated.append(id) or True)
+    for conversation_id in range(10):
+        title_generator.submit(conversation_id)
+    assert len(title_generator.threads) == 2
+    assert title_generator.shutdown(timeout=5)
+    assert sorted(generated) == list(range(10))
+    metrics = title_generator.get_metrics()
+    assert metrics["submitted"] == 10
+    assert metrics["completed"] == 10
+    assert metrics["queue_depth"] == 0
+    assert title_generator.orm.session.remove.call_count >= 10
+
+
+def test_submit_full_queue_runs_inline(test_config, provider_manager):
+    title_generator = make_title_generator(test_config, provider_manager, workers=1, queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+    caller = threading.current_thread()
+    inline = []
+
+    def generate_title(conversation_id):
+        if threading.current_thread() is caller:
+            inline.append(conversation_id)
+        else:
+            started.set()
+            release.wait(5)
+        return True
+
+    title_generator.generate_title = Mock(side_effect=generate_title)
+    title_generator.submit(1)
+    started.wait(5)
+    title_generator.submit(2)
+    title_generator.submit(3)
+    assert inline == [3]
+    release.set()
+    assert title_generator.shutdown(timeout=5)
+    metrics = title_generator.get_metrics()
+    assert metrics["inline"] == 1
+    assert metrics["completed"] == 3
+
+
+def test_failed_title_is_counted(test_config, provider_manager):
+    title_generator = make_title_generator(test_config, provider_manager)
+    title_generator.generate_title = Mock(side_effect=RuntimeError("boom"))
+    title_generator.submit(1)
+    assert title_generator.shutdown(timeout=5)
+    assert title_generator.get_metrics()["failed"] == 1
+
+
+def test_submit_after_shutdown_runs_inline(test_config, provider_manager):
+    title_generator = make_title_generator(test_config, provider_manager)
+    title_generator.generate_title = Mock(return_value=True)
+    title_generator.shutdown()
+    title_generator.submit(1)
+    title_generator.generate_title.assert_called_once_with(1)
+    assert title_generator.threads == []
+
+
+def test_get_title_provider_llm_is_reused(test_config, provider_manager):
+    test_config.set("backend_options.title_generation.provider", "fake_llm")
+    title_generator = TitleGenerator(test_config, provider_manager, Mock())
+    provider, llm = title_generator.get_title_provider_llm()
+    assert provider.name == "provider_fake_llm"
+    assert title_generator.get_title_provider_llm()[1] is llm
+    title_generator.reset()
+    assert title_generator.get_title_provider_llm()[1] is not llm
+
+
+def test_submit_heuristic_strategy_runs_inline(test_config, provider_manager):
+    test_config.set("backend_options.title_generation.strategy", "heuristic")
+    title_generator = make_title_generator(test_config, provider_manager)
+    title_generator.generate_title = Mock(return_value=True)
+    title_generator.submit(1)
+    title_generator.generate_title.assert_called_once_with(1)
+    assert title_generator.threads == []
+
+
+def test_invalid_strategy_uses_llm(test_config, provider_manager):
+    test_config.set("backend_options.title_generation.strategy", "bogus")
+    title_generator = TitleGenerator(test_config, provider_manager, Mock())
+    assert title_generator.strategy == "llm"
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from lwe.core.token_manager import TokenManager
@@ -108,3 +110,158 @@ def test_get_num_tokens_from_messages_with_tool(test_config, tool_cache, provide
     ]
     num_tokens = token_manager.get_num_tokens_from_messages(messages)
     assert num_tokens == 381
+
+
+class CharacterEncoding:
+    """One token per character, avoids loading tiktoken encodings."""
+
+    def encode(self, text):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def get_test_encoding():
+    return CharacterEncoding()
+
+
+def test_truncate_text_within_limit(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    assert token_manager.truncate_text("foo bar", 10, encoding=get_test_encoding()) == "foo bar"
+
+
+@pytest.mark.parametrize(
+    "strategy,starts_with,ends_with",
+    [
+        ("head", "word0 ", "truncated]...\n"),
+        ("tail", "\n...[", " word99"),
+        ("head_tail", "word0 ", " word99"),
+    ],
+)
+def test_truncate_text_strategies(
+    test_config, tool_cache, provider_manager, strategy, starts_with, ends_with
+):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    text = " ".join(f"word{i}" for i in range(100))
+    truncated = token_manager.truncate_text(text, 20, strategy, encoding=get_test_encoding())
+    assert truncated.startswith(starts_with)
+    assert truncated.endswith(ends_with)
+    assert "tokens truncated" in truncated
+
+
+def test_truncate_text_unknown_strategy(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    with pytest.raises(ValueError):
+        token_manager.truncate_text("foo " * 50, 5, "middle", encoding=get_test_encoding())
+
+
+def test_limit_response_rows(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"columns": ["id"], "rows": [[i] for i in range(10)]}
+    limited, total_rows = token_manager.limit_response_rows(response, 3)
+    assert limited == {"columns": ["id"], "rows": [[0], [1], [2]]}
+    assert total_rows == 10
+    limited, total_rows = token_manager.limit_response_rows(list(range(10)), 3)
+    assert limited == {"rows": [0, 1, 2]}
+    assert total_rows == 10
+    assert token_manager.limit_response_rows(response, 20) == (response, None)
+
+
+def test_fit_tool_response_within_limit(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"result": "foo"}
+    settings = {"max_tokens": 100}
+    assert token_manager.fit_tool_response(response, settings, encoding=get_test_encoding()) == (
+        response,
+        False,
+    )
+
+
+def test_fit_tool_response_head_tail(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"result": " ".join(f"word{i}" for i in range(500))}
+    settings = {"max_tokens": 50, "strategy": "head_tail"}
+    fitted, modified = token_manager.fit_tool_response(
+        response, settings, encoding=get_test_encoding()
+    )
+    assert modified is True
+    assert fitted["truncation"]["strategy"] == "head_tail"
+    assert fitted["truncation"]["original_tokens"] > 50
+    assert "word0" in fitted["content"]
+    assert "word499" in fitted["content"]
+
+
+def test_fit_tool_response_rows(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"rows": [{"id": i, "name": f"row {i}"} for i in range(200)]}
+    settings = {"max_tokens": 400, "strategy": "rows", "max_rows": 5}
+    fitted, modified = token_manager.fit_tool_response(
+        response, settings, encoding=get_test_encoding()
+    )
+    assert modified is True
+    assert len(fitted["rows"]) == 5
+    assert fitted["truncation"]["total_rows"] == 200
+
+
+def test_fit_tool_response_rows_falls_back_to_head_tail(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"result": "foo " * 500}
+    settings = {"max_tokens": 50, "strategy": "rows", "max_rows": 5}
+    fitted, _modified = token_manager.fit_tool_response(
+        response, settings, encoding=get_test_encoding()
+    )
+    assert fitted["truncation"]["strategy"] == "head_tail"
+    assert "content" in fitted
+
+
+def test_fit_tool_response_summarize(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"result": "foo " * 500}
+    settings = {"max_tokens": 50, "strategy": "summarize"}
+    calls = []
+
+    def summarizer(text, max_tokens):
+        calls.append((json.loads(text), max_tokens))
+        return "Many foos."
+
+    fitted, modified = token_manager.fit_tool_response(
+        response, settings, summarizer=summarizer, encoding=get_test_encoding()
+    )
+    assert modified is True
+    assert fitted["summary"] == "Many foos."
+    assert calls == [(response, 50)]
+
+
+def test_fit_tool_response_summarize_truncates_input(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    encoding = get_test_encoding()
+    response = {"result": "foo " * 500}
+    settings = {"max_tokens": 50, "strategy": "summarize", "summarize_max_input_tokens": 100}
+    inputs = []
+
+    def summarizer(text, max_tokens):
+        inputs.append(text)
+        return "Many foos."
+
+    fitted, _modified = token_manager.fit_tool_response(
+        response, settings, summarizer=summarizer, encoding=encoding
+    )
+    assert fitted["summary"] == "Many foos."
+    assert fitted["truncation"]["summarized_tokens"] == 100
+    assert "tokens truncated" in inputs[0]
+    assert len(encoding.encode(inputs[0])) < 150
+
+
+def test_fit_tool_response_summarize_failure_falls_back(test_config, tool_cache, provider_manager):
+    token_manager = make_token_manager(test_config, tool_cache, provider_manager)
+    response = {"result": "foo " * 500}
+    settings = {"max_tokens": 50, "strategy": "summarize"}
+
+    def summarizer(text, max_tokens):
+        raise RuntimeError("no summary")
+
+    fitted, _modified = token_manager.fit_tool_response(
+        response, settings, summarizer=summarizer, encoding=get_test_encoding()
+    )
+    assert fitted["truncation"]["strategy"] == "head_tail"
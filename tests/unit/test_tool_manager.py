@@ -0,0 +1,265 @@
+import time
+import os
+import yaml
+
+from unittest.mock import patch
+
+import lwe.core.util as util
+
+SYNC_TOOL = '''
+import time
+
+from lwe.core.tool import Tool
+
+
+class SyncSleepTool(Tool):
+    def __call__(self, word: str, delay: float = 0) -> dict:
+        """
+        Echo a word after a delay.
+
+        :param word: The word to echo.
+        :type word: str
+        :param delay: Seconds to wait.
+        :type delay: float
+        :return: A dictionary containing the word.
+        :rtype: dict
+        """
+        time.sleep(delay)
+        return {"result": word}
+'''
+
+ASYNC_TOOL = '''
+import asyncio
+
+from lwe.core.tool import Tool
+
+
+class AsyncSleepTool(Tool):
+    async def __call__(self, word: str, delay: float = 0) -> dict:
+        """
+        Echo a word after a delay.
+
+        :param word: The word to echo.
+        :type word: str
+        :param delay: Seconds to wait.
+        :type delay: float
+        :return: A dictionary containing the word.
+        :rtype: dict
+        """
+        await asyncio.sleep(delay)
+        if word == "fail":
+            raise RuntimeError("async failure")
+        return {"result": word[::-1]}
+'''
+
+
+def make_tool_file(tool_manager, tool_name, content):
+    filepath = util.create_file(tool_manager.user_tool_dirs[0], f"{tool_name}.py", content)
+    tool_manager.load_tools()
+    return filepath
+
+
+def test_get_tool_is_async(tool_manager):
+    make_tool_file(tool_manager, "sync_sleep_tool", SYNC_TOOL)
+    make_tool_file(tool_manager, "async_sleep_tool", ASYNC_TOOL)
+    _success, sync_tool, _user_message = tool_manager.get_tool("sync_sleep_tool")
+    _success, async_tool, _user_message = tool_manager.get_tool("async_sleep_tool")
+    assert sync_tool.is_async is False
+    assert async_tool.is_async is True
+
+
+def test_get_tool_config_async_tool(tool_manager):
+    make_tool_file(tool_manager, "async_sleep_tool", ASYNC_TOOL)
+    config = tool_manager.get_tool_config("async_sleep_tool")
+    assert config["name"] == "async_sleep_tool"
+    assert "word" in config["parameters"]["properties"]
+
+
+def test_run_tool_async_tool(tool_manager):
+    make_tool_file(tool_manager, "async_sleep_tool", ASYNC_TOOL)
+    success, response, user_message = tool_manager.run_tool("async_sleep_tool", {"word": "foo"})
+    assert success is True
+    assert response == {"result": "oof"}
+
+
+def test_run_tool_async_tool_failure(tool_manager):
+    make_tool_file(tool_manager, "async_sleep_tool", ASYNC_TOOL)
+    success, response, user_message = tool_manager.run_tool("async_sleep_tool", '{"word": "fail"}')
+    assert success is False
+    assert response is None
+    assert "async failure" in user_message
+
+
+def test_run_tools_mixed_sync_and_async_concurrently(tool_manager):
+    make_tool_file(tool_manager, "sync_sleep_tool", SYNC_TOOL)
+    make_tool_file(tool_manager, "async_sleep_tool", ASYNC_TOOL)
+    tool_calls = [
+        ("async_sleep_tool", {"word": "foo", "delay": 0.3}),
+        ("sync_sleep_tool", {"word": "bar", "delay": 0.3}),
+        ("async_sleep_tool", {"word": "baz", "delay": 0.3}),
+    ]
+    start = time.monotonic()
+    results = tool_manager.run_tools(tool_calls)
+    elapsed = time.monotonic() - start
+    assert [response for _success, response, _message in results] == [
+        {"result": "oof"},
+        {"result": "bar"},
+        {"result": "zab"},
+    ]
+    assert all(success for success, _response, _message in results)
+    assert elapsed < 0.8
+
+
+def test_run_tools_reports_individual_failures(tool_manager):
+    make_tool_file(tool_manager, "async_sleep_tool", ASYNC_TOOL)
+    results = tool_manager.run_tools(
+        [
+            ("async_sleep_tool", {"word": "foo"}),
+            ("async_sleep_tool", {"word": "fail"}),
+            ("missing_tool", {}),
+        ]
+    )
+    assert results[0] == (True, {"result": "oof"}, "Tool 'async_sleep_tool' executed successfully")
+    assert results[1][0] is False
+    assert results[2][0] is False
+    assert "not found" in results[2][2]
+
+
+CACHED_TOOL = '''
+import uuid
+
+from lwe.core.tool import Tool
+
+
+class CachedTool(Tool):
+    cache = {"ttl": 60, "max_entries": 10}
+
+    def __call__(self, word: str) -> dict:
+        """
+        Echo a word with a unique nonce.
+
+        :param word: The word to echo.
+        :type word: str
+        :return: A dictionary containing the word and nonce.
+        :rtype: dict
+        """
+        if word == "error":
+            return {"error": uuid.uuid4().hex}
+        return {"result": word, "nonce": uuid.uuid4().hex}
+'''
+
+CACHED_TOOL_CONFIG = """
+name: cached_tool
+description: Echo a word with a unique nonce.
+parameters:
+  type: object
+  properties:
+    word:
+      type: string
+  required:
+    - word
+cache:
+  max_entries: 1
+"""
+
+
+def test_run_tool_cacheable_tool_serves_repeat_calls(tool_manager):
+    make_tool_file(tool_manager, "cached_tool", CACHED_TOOL)
+    _success, first, _message = tool_manager.run_tool("cached_tool", {"word": "foo"})
+    success, second, message = tool_manager.run_tool("cached_tool", '{"word": "foo"}')
+    assert success is True
+    assert second == first
+    assert "cached" in message
+    assert tool_manager.result_cache.get_stats("cached_tool") == {"hits": 1, "misses": 1}
+    _success, third, _message = tool_manager.run_tool("cached_tool", {"word": "bar"})
+    assert third["nonce"] != first["nonce"]
+
+
+def test_run_tool_does_not_cache_uncacheable_tool(tool_manager):
+    make_tool_file(tool_manager, "sync_sleep_tool", SYNC_TOOL)
+    tool_manager.run_tool("sync_sleep_tool", {"word": "foo"})
+    tool_manager.run_tool("sync_sleep_tool", {"word": "foo"})
+    assert tool_manager.result_cache.get_stats("sync_sleep_tool") == {"hits": 0, "misses": 0}
+
+
+def test_run_tool_does_not_cache_error_responses(tool_manager):
+    make_tool_file(tool_manager, "cached_tool", CACHED_TOOL)
+    _success, first, _message = tool_manager.run_tool("cached_tool", {"word": "error"})
+    _success, second, _message = tool_manager.run_tool("cached_tool", {"word": "error"})
+    assert first != second
+
+
+def test_run_tools_serves_cached_results(tool_manager):
+    make_tool_file(tool_manager, "cached_tool", CACHED_TOOL)
+    _success, first, _message = tool_manager.run_tool("cached_tool", {"word": "foo"})
+    results = tool_manager.run_tools([("cached_tool", {"word": "foo"})])
+    assert results[0][1] == first
+
+
+def test_cache_config_from_config_file(tool_manager):
+    filepath = make_tool_file(tool_manager, "cached_tool", CACHED_TOOL)
+    util.create_file(os.path.dirname(filepath), "cached_tool.config.yaml", CACHED_TOOL_CONFIG)
+    _success, tool, _message = tool_manager.get_tool("cached_tool")
+    assert tool.get_cache_config() == {"max_entries": 1}
+    assert "cache" not in tool_manager.get_tool_config("cached_tool")
+    _success, foo, _message = tool_manager.run_tool("cached_tool", {"word": "foo"})
+    tool_manager.run_tool("cached_tool", {"word": "bar"})
+    _success, foo_again, _message = tool_manager.run_tool("cached_tool", {"word": "foo"})
+    assert foo_again["nonce"] != foo["nonce"]
+
+
+def test_tool_config_file_parsed_once_until_changed(tool_manager):
+    filepath = make_tool_file(tool_manager, "cached_tool", CACHED_TOOL)
+    util.create_file(os.path.dirname(filepath), "cached_tool.config.yaml", CACHED_TOOL_CONFIG)
+    with patch("lwe.core.tool.yaml.safe_load", wraps=yaml.safe_load) as safe_load:
+        for _i in range(3):
+            _success, tool, _message = tool_manager.get_tool("cached_tool")
+            assert tool.get_cache_config() == {"max_entries": 1}
+            assert tool.get_response_config() == {}
+        assert safe_load.call_count == 1
+        config_filepath = os.path.join(os.path.dirname(filepath), "cached_tool.config.yaml")
+        util.create_file(
+            os.path.dirname(filepath),
+            "cached_tool.config.yaml",
+            CACHED_TOOL_CONFIG.replace("max_entries: 1", "max_entries: 2"),
+        )
+        os.utime(config_filepath, ns=(0, os.stat(config_filepath).st_mtime_ns + 1000))
+        _success, tool, _message = tool_manager.get_tool("cached_tool")
+        assert tool.get_cache_config() == {"max_entries": 2}
+        assert safe_load.call_count == 2
+
+
+LIMITED_TOOL = '''
+from lwe.core.tool import Tool
+
+
+class LimitedTool(Tool):
+    response = {"max_tokens": 100, "strategy": "rows"}
+
+    def __call__(self) -> dict:
+        """
+        Return nothing.
+
+        :return: An empty dictionary.
+        :rtype: dict
+        """
+        return {}
+'''
+
+
+def test_get_tool_response_config_merges_global_and_tool_settings(tool_manager):
+    make_tool_file(tool_manager, "limited_tool", LIMITED_TOOL)
+    make_tool_file(tool_manager, "sync_sleep_tool", SYNC_TOOL)
+    tool_manager.config.set("tools.response.max_rows", 5)
+    assert tool_manager.get_tool_response_config("limited_tool") == {
+        "max_tokens": 100,
+        "strategy": "rows",
+        "max_rows": 5,
+        "summarize_max_input_tokens": None,
+    }
+    assert tool_manager.get_tool_response_config("sync_sleep_tool") == {
+        "max_tokens": None,
+        "strategy": "head_tail",
+        "max_rows": 5,
+        "summarize_max_input_tokens": None,
+    }
@@ -0,0 +1,67 @@
+import time
+
+from lwe.core.tool_result_cache import ToolResultCache
+
+
+def test_make_key_is_canonical(test_config):
+    cache = ToolResultCache(test_config)
+    assert cache.make_key({"b": 1, "a": [1, 2]}) == cache.make_key({"a": [1, 2], "b": 1})
+
+
+def test_get_miss_then_hit(test_config):
+    cache = ToolResultCache(test_config)
+    hit, response = cache.get("tool", {"a": 1}, {})
+    assert hit is False
+    assert response is None
+    cache.set("tool", {"a": 1}, {"result": 1}, {})
+    hit, response = cache.get("tool", {"a": 1}, {})
+    assert hit is True
+    assert response == {"result": 1}
+    assert cache.get_stats("tool") == {"hits": 1, "misses": 1}
+
+
+def test_cached_response_is_isolated_from_caller(test_config):
+    cache = ToolResultCache(test_config)
+    cache.set("tool", {"a": 1}, {"result": [1]}, {})
+    _hit, response = cache.get("tool", {"a": 1}, {})
+    response["result"].append(2)
+    _hit, response = cache.get("tool", {"a": 1}, {})
+    assert response == {"result": [1]}
+
+
+def test_entries_expire_after_ttl(test_config):
+    cache = ToolResultCache(test_config)
+    settings = {"ttl": 0.05}
+    cache.set("tool", {"a": 1}, {"result": 1}, settings)
+    time.sleep(0.1)
+    hit, _response = cache.get("tool", {"a": 1}, settings)
+    assert hit is False
+
+
+def test_least_recently_used_entry_is_evicted(test_config):
+    cache = ToolResultCache(test_config)
+    settings = {"max_entries": 2}
+    cache.set("tool", {"a": 1}, {"result": 1}, settings)
+    cache.set("tool", {"a": 2}, {"result": 2}, settings)
+    cache.get("tool", {"a": 1}, settings)
+    cache.set("tool", {"a": 3}, {"result": 3}, settings)
+    assert cache.get("tool", {"a": 1}, settings)[0] is True
+    assert cache.get("tool", {"a": 2}, settings)[0] is False
+    assert cache.get("tool", {"a": 3}, settings)[0] is True
+
+
+def test_persisted_entries_survive_new_instance(test_config):
+    settings = {"persist": True}
+    ToolResultCache(test_config).set("tool", {"a": 1}, {"result": 1}, settings)
+    cache = ToolResultCache(test_config)
+    assert cache.get("tool", {"a": 1}, settings) == (True, {"result": 1})
+    assert cache.get("tool", {"a": 1}, {}) == (True, {"result": 1})
+    assert ToolResultCache(test_config).get("tool", {"a": 1}, {}) == (False, None)
+
+
+def test_clear(test_config):
+    cache = ToolResultCache(test_config)
+    cache.set("tool", {"a": 1}, {"result": 1}, {})
+    cache.clear("tool")
+    assert cache.get("tool", {"a": 1}, {})[0] is False
+    assert cache.get_stats("tool") == {"hits": 0, "misses": 1}
@@ -7,6 +7,7 @@ from lwe.core.util import (
     introspect_commands,
     command_with_leader,
     merge_dicts,
+    merge_dicts_copy,
     underscore_to_dash,
     dash_to_underscore,
     list_to_completion_hash,
@@ -73,6 +74,16 @@ class TestClass:
         expected = {"a": 1, "b": {"c": 2, "d": 3}, "e": 4}
         assert merge_dicts(dict1, dict2) == expected
 
+    def test_merge_dicts_copy(self):
+        dict1 = {"a": 1, "b": {"c": 2}, "f": {"g": 5}}
+        dict2 = {"b": {"d": 3}, "e": 4}
+        expected = {"a": 1, "b": {"c": 2, "d": 3}, "e": 4, "f": {"g": 5}}
+        merged = merge_dicts_copy(dict1, dict2)
+        assert merged == expected
+        assert dict1 == {"a": 1, "b": {"c": 2}, "f": {"g": 5}}
+        assert dict2 == {"b": {"d": 3}, "e": 4}
+        assert merged["f"] is dict1["f"]
+
     def test_underscore_to_dash(self):
         assert underscore_to_dash("some_text") == "some-text"
 